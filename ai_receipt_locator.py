@@ -24,6 +24,9 @@ from datetime import datetime, date
 import pandas as pd
 from openai import OpenAI
 
+from local_receipt_index import LocalReceiptIndex
+from services.image_normalizer import NormalizedImage, encode_for_vision
+
 # Import local OCR system (Donut primary with ensemble fallback)
 try:
     from receipt_ocr_local import extract_receipt_fields_local, validate_extraction
@@ -270,9 +273,9 @@ load_meta_cache()
 # VISION EXTRACTION
 # =============================================================================
 
-def encode_image(path: Path) -> str:
+def encode_image(path: Path) -> NormalizedImage:
     with path.open("rb") as f:
-        return base64.b64encode(f.read()).decode("utf-8")
+        return encode_for_vision(f.read())
 
 
 VISION_PROMPT = """
@@ -439,7 +442,7 @@ def vision_extract(path: Path):
             print(f"   🔄 Falling back to GPT-4.1 Vision...")
 
     # FALLBACK 2: GPT-4.1 Vision (API cost, but most reliable)
-    b64 = encode_image(path)
+    image = encode_image(path)
 
     try:
         resp = client.chat.completions.create(
@@ -450,7 +453,7 @@ def vision_extract(path: Path):
                 "content": [
                     {"type": "text", "text": VISION_PROMPT},
                     {"type": "image_url", "image_url": {
-                        "url": f"data:image/jpeg;base64,{b64}",
+                        "url": image.data_url(),
                         "detail": "high"
                     }}
                 ]
@@ -519,6 +522,12 @@ def get_meta(filename):
     return None
 
 
+# Amount index over RECEIPT_DIR, refreshed when the folder changes
+receipt_index = LocalReceiptIndex(
+    RECEIPT_DIR, get_meta, parse_amount=parse_amount, parse_date=parse_date_fuzzy
+)
+
+
 # =============================================================================
 # MATCHING ENGINE
 # =============================================================================
@@ -553,14 +562,10 @@ def find_best_receipt(chase_row: dict):
     best = None
     best_score = 0.0
 
-    for fname in os.listdir(RECEIPT_DIR):
-        if not fname.lower().endswith((".jpg", ".jpeg", ".png", ".webp")):
-            continue
-
-        meta = get_meta(fname)
-        if not meta:
-            continue
+    # Only receipts whose amount can reach the 0.70 threshold get scored
+    receipt_index.refresh()
 
+    for fname, meta in receipt_index.candidates(chase_amt):
         # Amount score with restaurant tip detection
         r_total = meta.get("total_amount") or 0
         r_subtotal = meta.get("subtotal_amount") or 0
@@ -603,7 +608,7 @@ def find_best_receipt(chase_row: dict):
         # =====================================================================
         # INTELLIGENT DATE SCORING (PERMISSIVE - USES OCR INTELLIGENCE)
         # =====================================================================
-        r_date = parse_date_fuzzy(meta.get("receipt_date") or "")
+        r_date = receipt_index.receipt_date(fname)
 
         # NEW APPROACH: Calculate date score for ALL receipts (don't reject before scoring)
         # This allows OCR intelligence to find matches even with date mismatches
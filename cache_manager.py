@@ -9,14 +9,24 @@ Features:
 - TTL-based cache expiration
 - Atomic updates
 - Context manager support
+- Incremental (change-feed) refresh of DataFrames via a high-water mark
+- Per-user DataFrame shards with a memory budget and LRU eviction
+- O(1) keyed row lookup and single-assignment multi-column row patches
+- Compact dtype schemas (categoricals, datetime64, float64, nullable booleans)
 """
 
+import logging
+import os
 import threading
 import time
-from typing import Any, Optional, Callable, TypeVar
-from functools import wraps
+from collections import OrderedDict
+from functools import partial, wraps
+from typing import Any, Optional, Callable, Tuple, TypeVar
+import numpy as np
 import pandas as pd
 
+logger = logging.getLogger(__name__)
+
 T = TypeVar('T')
 
 
@@ -101,6 +111,199 @@ class ThreadSafeCache:
             return value
 
 
+class RowLocator:
+    """
+    O(1) key -> row position lookup for one column of a DataFrame.
+
+    The hash index is built once per frame object (pandas builds the
+    hashtable lazily on first lookup) and rebuilt automatically when a
+    different frame is passed in or a hit no longer matches its key. Keys
+    changed in place are only picked up after reset().
+
+    Usage:
+        locator = RowLocator('_index')
+        pos = locator.position(df, 1234)
+        if pos is not None:
+            patch_row(df, pos, {'Notes': 'hello'})
+    """
+
+    def __init__(self, key_column: str = '_index'):
+        self._key_column = key_column
+        self._frame: Optional[pd.DataFrame] = None
+        self._index: Optional[pd.Index] = None
+
+    def reset(self) -> None:
+        """Forget the index (next lookup rebuilds it)."""
+        self._frame = None
+        self._index = None
+
+    def position(self, df: pd.DataFrame, key: Any) -> Optional[int]:
+        """Integer row position of the first row whose key column equals key."""
+        if df is None or self._key_column not in df.columns:
+            return None
+
+        for attempt in range(2):
+            if self._frame is not df or self._index is None or len(self._index) != len(df):
+                self._index = pd.Index(df[self._key_column])
+                self._frame = df
+
+            try:
+                loc = self._index.get_loc(key)
+            except (KeyError, TypeError):
+                return None
+
+            if isinstance(loc, slice):
+                pos = loc.start
+            elif isinstance(loc, (int, np.integer)):
+                pos = int(loc)
+            else:
+                # Duplicate keys: boolean mask
+                hits = np.flatnonzero(loc)
+                if not len(hits):
+                    return None
+                pos = int(hits[0])
+
+            # Frame mutated in place since the index was built: rebuild once
+            if df[self._key_column].iat[pos] == key:
+                return pos
+            self.reset()
+
+        return None
+
+
+# Strings treated as True when coercing into a boolean column
+_TRUE_STRINGS = frozenset({'1', 'true', 't', 'yes', 'y'})
+
+
+def apply_schema(df: pd.DataFrame, schema: dict, max_category_ratio: float = 0.5) -> dict:
+    """
+    Convert DataFrame columns in place to compact dtypes.
+
+    Schema values:
+        'category' - low-cardinality strings; missing values stay missing
+                     (skipped if unique/rows exceeds max_category_ratio)
+        'datetime' - datetime64, unparseable values become NaT
+        'float'    - float64 (e.g. DECIMAL amounts), missing values become NaN
+        'boolean'  - nullable boolean, NULL stays <NA>
+
+    Args:
+        df: DataFrame to convert in place
+        schema: Dictionary of column -> kind; absent columns are ignored
+        max_category_ratio: Upper bound on unique/rows for categoricals
+
+    Returns:
+        Dict with 'bytes_before', 'bytes_after' and 'columns' converted
+    """
+    cols = [col for col in schema if col in df.columns]
+    before = int(df[cols].memory_usage(deep=True, index=False).sum()) if cols else 0
+    converted = []
+
+    for col in cols:
+        kind = schema[col]
+        series = df[col]
+        try:
+            if kind == 'category':
+                if isinstance(series.dtype, pd.CategoricalDtype):
+                    continue
+                if len(series) and series.nunique() / len(series) > max_category_ratio:
+                    continue
+                df[col] = series.astype('category')
+            elif kind == 'datetime':
+                df[col] = pd.to_datetime(series, errors='coerce')
+            elif kind == 'float':
+                df[col] = pd.to_numeric(series, errors='coerce').astype('float64')
+            elif kind == 'boolean':
+                df[col] = series.map(_coerce_bool).astype('boolean')
+            else:
+                continue
+            converted.append(col)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"Schema conversion skipped for {col}: {e}")
+
+    after = int(df[cols].memory_usage(deep=True, index=False).sum()) if cols else 0
+    return {'bytes_before': before, 'bytes_after': after, 'columns': converted}
+
+
+def row_to_dict(df: pd.DataFrame, position: int) -> dict:
+    """
+    One row as a dict, with missing categorical/boolean values as None.
+
+    Categorical and nullable boolean columns read missing values back as
+    NaN/<NA>; callers written against the raw SQL frame expect None (and
+    treat it as falsy).
+    """
+    row = df.iloc[position].to_dict()
+    for col, dtype in df.dtypes.items():
+        if (isinstance(dtype, pd.CategoricalDtype) or isinstance(dtype, pd.BooleanDtype)) \
+                and pd.isna(row.get(col)):
+            row[col] = None
+    return row
+
+
+def _coerce_bool(value: Any) -> Any:
+    """Coerce DB/UI flag values (1, '0', 'true', None, '') to bool or NA."""
+    if value is None or value is pd.NA or value == '':
+        return pd.NA
+    if isinstance(value, float) and np.isnan(value):
+        return pd.NA
+    if isinstance(value, str):
+        return value.strip().lower() in _TRUE_STRINGS
+    return bool(value)
+
+
+def _coerce_for_dtype(dtype: Any, value: Any) -> Any:
+    """Coerce a patch value to fit a compact column dtype where possible."""
+    if isinstance(dtype, pd.CategoricalDtype):
+        return value
+    if pd.api.types.is_bool_dtype(dtype):
+        return _coerce_bool(value)
+    if pd.api.types.is_float_dtype(dtype) and not isinstance(value, float):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return np.nan
+    if pd.api.types.is_datetime64_any_dtype(dtype) and not isinstance(value, pd.Timestamp):
+        return pd.to_datetime(value, errors='coerce')
+    return value
+
+
+def patch_row(df: pd.DataFrame, position: int, updates: dict, add_missing: bool = False) -> None:
+    """
+    Write a multi-column patch into one row by position.
+
+    Uses scalar positional setters (iat): for a single row they are several
+    times cheaper than a list-valued iloc assignment, which goes through
+    pandas' block indexer. Values are coerced to compact column dtypes (see
+    apply_schema); categoricals gain new categories as needed, and columns
+    that still can't hold the value are upcast to object.
+
+    Args:
+        df: DataFrame to modify in place
+        position: Integer row position (see RowLocator)
+        updates: Dictionary of column -> new value
+        add_missing: Create columns that don't exist yet (filled with "")
+    """
+    columns = df.columns
+    for col, value in updates.items():
+        if col not in columns:
+            if not add_missing:
+                continue
+            df[col] = ""
+            columns = df.columns
+
+        col_pos = columns.get_loc(col)
+        dtype = df.dtypes.iloc[col_pos]
+        try:
+            value = _coerce_for_dtype(dtype, value)
+            if isinstance(dtype, pd.CategoricalDtype) and value not in dtype.categories \
+                    and not pd.isna(value):
+                df[col] = df[col].cat.add_categories([value])
+            df.iat[position, col_pos] = value
+        except (TypeError, ValueError):
+            df[col] = df[col].astype(object)
+            df.iat[position, col_pos] = value
+
+
 class DataFrameCache:
     """
     Thread-safe cache specifically for pandas DataFrames.
@@ -108,12 +311,22 @@ class DataFrameCache:
     Provides atomic read/write operations and prevents race conditions
     when multiple threads access the transaction DataFrame.
 
+    When a ``delta_loader`` is supplied the cache does one full load and
+    afterwards refreshes by merging only the rows changed since the last
+    high-water mark (upsert on ``key_column``). Full reloads only happen on
+    first use, when the delta loader asks for one, when the merged row count
+    disagrees with the source, or every ``full_reload_seconds`` as a safety net.
+
     Usage:
         df_cache = DataFrameCache(ttl_seconds=300)
 
         # Thread-safe read
         df = df_cache.get_dataframe()
 
+        # Incremental read: loader returns (df, watermark),
+        # delta_loader(watermark) returns (changed_rows, watermark) or None
+        df = df_cache.get_dataframe(loader=full_load, delta_loader=load_changes)
+
         # Thread-safe update
         with df_cache.write_lock():
             df = df_cache.get_dataframe_unsafe()
@@ -121,12 +334,25 @@ class DataFrameCache:
             df_cache.set_dataframe(df)
     """
 
-    def __init__(self, ttl_seconds: int = 300):
+    def __init__(self, ttl_seconds: int = 300, key_column: str = '_index',
+                 full_reload_seconds: Optional[int] = 3600):
         self._lock = threading.RLock()
         self._df: Optional[pd.DataFrame] = None
         self._timestamp: Optional[float] = None
         self._ttl = ttl_seconds
         self._load_in_progress = False
+        self._key_column = key_column
+        self._full_reload_seconds = full_reload_seconds
+        self._full_load_timestamp: Optional[float] = None
+        self._watermark: Any = None
+        self._locator = RowLocator(key_column)
+        self._stats = {
+            'full_loads': 0,
+            'delta_loads': 0,
+            'rows_merged': 0,
+            'last_full_load_seconds': None,
+            'last_delta_load_seconds': None,
+        }
 
     @property
     def is_valid(self) -> bool:
@@ -137,37 +363,159 @@ class DataFrameCache:
             age = time.time() - self._timestamp
             return age < self._ttl
 
-    def get_dataframe(self, loader: Callable[[], pd.DataFrame] = None) -> Optional[pd.DataFrame]:
+    @property
+    def watermark(self) -> Any:
+        """High-water mark of the last full or delta load (None if unknown)."""
+        with self._lock:
+            return self._watermark
+
+    def get_dataframe(
+        self,
+        loader: Callable[[], Any] = None,
+        delta_loader: Callable[[Any], Optional[Tuple[pd.DataFrame, Any]]] = None,
+    ) -> Optional[pd.DataFrame]:
         """
         Get DataFrame from cache, optionally loading if expired.
 
         Args:
-            loader: Optional callable to load data if cache is invalid
+            loader: Optional callable to load data if cache is invalid. When
+                delta_loader is given it must return a (DataFrame, watermark) tuple.
+            delta_loader: Optional callable taking the current watermark and
+                returning (changed_rows, new_watermark), or None to request a
+                full reload.
 
         Returns:
             DataFrame copy (thread-safe) or None if no data
         """
+        with self._lock:
+            # Return existing data even if expired (better than nothing)
+            if self.refresh(loader=loader, delta_loader=delta_loader):
+                return self._df.copy()
+            return None
+
+    def refresh(
+        self,
+        loader: Callable[[], Any] = None,
+        delta_loader: Callable[[Any], Optional[Tuple[pd.DataFrame, Any]]] = None,
+    ) -> bool:
+        """
+        Load or refresh the cached frame if expired, without copying it.
+
+        Same loader contract as get_dataframe(). Use before get_row() /
+        update_row() so single-row access never pays for a full-frame copy.
+
+        Returns:
+            True if the cache holds data (possibly expired if loading failed)
+        """
         with self._lock:
             # Check if cache is valid
             if self.is_valid and self._df is not None:
-                return self._df.copy()
+                return True
 
             # Cache invalid - try to load if loader provided
             if loader is not None and not self._load_in_progress:
                 self._load_in_progress = True
                 try:
-                    new_df = loader()
+                    if delta_loader is not None and self._apply_delta(delta_loader):
+                        return True
+
+                    start = time.time()
+                    result = loader()
+                    if delta_loader is not None:
+                        new_df, self._watermark = result
+                    else:
+                        new_df = result
                     self._df = new_df
                     self._timestamp = time.time()
-                    return self._df.copy()
+                    self._full_load_timestamp = self._timestamp
+                    self._stats['full_loads'] += 1
+                    self._stats['last_full_load_seconds'] = round(self._timestamp - start, 4)
+                    return True
                 finally:
                     self._load_in_progress = False
 
-            # Return existing data even if expired (better than nothing)
-            if self._df is not None:
-                return self._df.copy()
+            return self._df is not None
 
-            return None
+    def _full_reload_due(self) -> bool:
+        """Check whether the periodic safety-net full reload is due."""
+        if self._full_load_timestamp is None:
+            return True
+        if not self._full_reload_seconds:
+            return False
+        return time.time() - self._full_load_timestamp >= self._full_reload_seconds
+
+    def _apply_delta(self, delta_loader: Callable[[Any], Optional[Tuple[pd.DataFrame, Any]]]) -> bool:
+        """
+        Refresh the cached frame from a change feed (call with lock held).
+
+        Returns:
+            True if the delta was applied, False if a full reload is needed
+        """
+        if self._df is None or self._watermark is None or self._full_reload_due():
+            return False
+
+        start = time.time()
+        try:
+            result = delta_loader(self._watermark)
+        except Exception as e:
+            logger.warning(f"Delta load failed, falling back to full reload: {e}")
+            return False
+
+        if result is None:
+            return False
+
+        changed, watermark = result
+        merged = self._merge_frames(self._df, changed)
+
+        # The source knows how many rows it holds; a mismatch means rows were
+        # removed (or missed) upstream and only a full reload can fix that.
+        expected = watermark.get('row_count') if isinstance(watermark, dict) else None
+        if expected is not None and len(merged) != expected:
+            logger.info(f"Delta merge produced {len(merged)} rows, source has {expected}; full reload")
+            return False
+
+        self._df = merged
+        self._watermark = watermark
+        self._timestamp = time.time()
+        self._stats['delta_loads'] += 1
+        self._stats['rows_merged'] += 0 if changed is None else len(changed)
+        self._stats['last_delta_load_seconds'] = round(self._timestamp - start, 4)
+        return True
+
+    def _merge_frames(self, base: pd.DataFrame, changed: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """Upsert ``changed`` rows into ``base`` keyed on the key column."""
+        if changed is None or changed.empty:
+            return base
+
+        key = self._key_column
+        keep = base.loc[~base[key].isin(changed[key])]
+        merged = pd.concat([keep, changed], ignore_index=True)
+        if not merged[key].is_monotonic_increasing:
+            merged = merged.sort_values(key, kind='stable').reset_index(drop=True)
+
+        # concat turns categoricals with differing categories into object;
+        # restore the compact dtype over the union of categories
+        for col, dtype in base.dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype) and col in merged.columns \
+                    and not isinstance(merged[col].dtype, pd.CategoricalDtype):
+                merged[col] = merged[col].astype('category')
+        return merged
+
+    def merge_rows(self, changed: pd.DataFrame) -> None:
+        """Thread-safe upsert of changed rows keyed on the key column."""
+        with self._lock:
+            if self._df is None:
+                return
+            self._df = self._merge_frames(self._df, changed)
+
+    def stats(self) -> dict:
+        """Load statistics for monitoring (full vs. delta loads)."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['rows'] = 0 if self._df is None else len(self._df)
+            stats['valid'] = self.is_valid
+            stats['watermark'] = str(self._watermark) if self._watermark is not None else None
+            return stats
 
     def get_dataframe_unsafe(self) -> Optional[pd.DataFrame]:
         """
@@ -183,10 +531,18 @@ class DataFrameCache:
             self._df = df
             self._timestamp = time.time()
 
-    def invalidate(self) -> None:
-        """Invalidate cache, forcing reload on next access."""
+    def invalidate(self, full: bool = False) -> None:
+        """
+        Invalidate cache, forcing a refresh on next access.
+
+        Args:
+            full: If True, drop the high-water mark so the next access does a
+                full reload instead of an incremental one
+        """
         with self._lock:
             self._timestamp = None
+            if full:
+                self._watermark = None
 
     def write_lock(self):
         """
@@ -200,6 +556,16 @@ class DataFrameCache:
         """
         return self._lock
 
+    def _position(self, index_col: str, index_val: Any) -> Optional[int]:
+        """Row position for a key (hash lookup on the key column, else a scan)."""
+        if index_col == self._key_column:
+            return self._locator.position(self._df, index_val)
+
+        mask = self._df[index_col] == index_val
+        if not mask.any():
+            return None
+        return int(np.flatnonzero(mask.to_numpy())[0])
+
     def update_row(self, index_col: str, index_val: Any, updates: dict) -> bool:
         """
         Thread-safe row update.
@@ -216,14 +582,11 @@ class DataFrameCache:
             if self._df is None:
                 return False
 
-            mask = self._df[index_col] == index_val
-            if not mask.any():
+            pos = self._position(index_col, index_val)
+            if pos is None:
                 return False
 
-            for col, val in updates.items():
-                if col in self._df.columns:
-                    self._df.loc[mask, col] = val
-
+            patch_row(self._df, pos, updates)
             return True
 
     def get_row(self, index_col: str, index_val: Any) -> Optional[dict]:
@@ -241,11 +604,11 @@ class DataFrameCache:
             if self._df is None:
                 return None
 
-            mask = self._df[index_col] == index_val
-            if not mask.any():
+            pos = self._position(index_col, index_val)
+            if pos is None:
                 return None
 
-            return self._df.loc[mask].iloc[0].to_dict()
+            return row_to_dict(self._df, pos)
 
     def append_row(self, row_data: dict) -> None:
         """Thread-safe row append."""
@@ -257,8 +620,206 @@ class DataFrameCache:
             self._timestamp = time.time()
 
 
+class UserDataFrameCache:
+    """
+    Per-user shards of DataFrameCache with a shared memory budget.
+
+    Each user gets their own incrementally refreshed frame, so a change by one
+    tenant only refreshes that tenant's shard. Shard sizes are measured with
+    ``DataFrame.memory_usage(deep=True)`` after every load; when the total
+    exceeds ``max_bytes`` the least recently used shards are evicted.
+
+    A ``user_id`` of None selects the all-users shard (background jobs, or
+    deployments without user scoping).
+
+    Usage:
+        cache = UserDataFrameCache(ttl_seconds=300, max_bytes=512 * 1024 * 1024)
+
+        # loader(user_id) / delta_loader(watermark, user_id)
+        df = cache.get_dataframe(user_id, loader=full_load, delta_loader=load_changes)
+        cache.invalidate(user_id)
+    """
+
+    ALL_USERS = '*'
+
+    def __init__(self, ttl_seconds: int = 300, max_bytes: int = 512 * 1024 * 1024,
+                 key_column: str = '_index', full_reload_seconds: Optional[int] = 3600):
+        self._lock = threading.RLock()
+        self._shards: 'OrderedDict[str, DataFrameCache]' = OrderedDict()
+        self._sizes: dict = {}
+        self._versions: dict = {}
+        self._ttl = ttl_seconds
+        self._max_bytes = max_bytes
+        self._key_column = key_column
+        self._full_reload_seconds = full_reload_seconds
+        self._evictions = 0
+
+    def _shard_key(self, user_id: Optional[str]) -> str:
+        return self.ALL_USERS if user_id is None else str(user_id)
+
+    def shard(self, user_id: Optional[str]) -> DataFrameCache:
+        """Get (or create) the shard for a user and mark it most recently used."""
+        key = self._shard_key(user_id)
+        with self._lock:
+            shard = self._shards.get(key)
+            if shard is None:
+                shard = DataFrameCache(
+                    ttl_seconds=self._ttl,
+                    key_column=self._key_column,
+                    full_reload_seconds=self._full_reload_seconds,
+                )
+                self._shards[key] = shard
+            self._shards.move_to_end(key)
+            return shard
+
+    def get_dataframe(
+        self,
+        user_id: Optional[str],
+        loader: Callable[[Optional[str]], Any] = None,
+        delta_loader: Callable[[Any, Optional[str]], Optional[Tuple[pd.DataFrame, Any]]] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Get a user's DataFrame, loading or refreshing only that user's shard.
+
+        Args:
+            user_id: User whose rows to return (None for all users)
+            loader: Callable taking user_id, see DataFrameCache.get_dataframe
+            delta_loader: Callable taking (watermark, user_id)
+
+        Returns:
+            DataFrame copy or None if no data
+        """
+        shard = self.shard(user_id)
+        df = shard.get_dataframe(
+            loader=partial(loader, user_id) if loader is not None else None,
+            delta_loader=(lambda wm: delta_loader(wm, user_id)) if delta_loader is not None else None,
+        )
+        self._account(self._shard_key(user_id), shard)
+        return df
+
+    def refresh(
+        self,
+        user_id: Optional[str],
+        loader: Callable[[Optional[str]], Any] = None,
+        delta_loader: Callable[[Any, Optional[str]], Optional[Tuple[pd.DataFrame, Any]]] = None,
+    ) -> bool:
+        """Load or refresh a user's shard if expired, without copying it."""
+        shard = self.shard(user_id)
+        available = shard.refresh(
+            loader=partial(loader, user_id) if loader is not None else None,
+            delta_loader=(lambda wm: delta_loader(wm, user_id)) if delta_loader is not None else None,
+        )
+        self._account(self._shard_key(user_id), shard)
+        return available
+
+    def _account(self, key: str, shard: DataFrameCache) -> None:
+        """Re-measure a shard after it (re)loaded and enforce the memory budget."""
+        stats = shard.stats()
+        version = (stats['full_loads'], stats['delta_loads'], stats['rows'])
+        with self._lock:
+            if self._shards.get(key) is not shard:
+                return
+            measure = self._versions.get(key) != version
+
+        # Measure outside the registry lock so other users' reads never wait
+        # on this shard
+        if measure:
+            with shard.write_lock():
+                frame = shard.get_dataframe_unsafe()
+                size = int(frame.memory_usage(deep=True).sum()) if frame is not None else 0
+
+        with self._lock:
+            if self._shards.get(key) is not shard:
+                return
+            if measure:
+                self._sizes[key] = size
+                self._versions[key] = version
+            self._evict(keep=key)
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Drop least recently used shards until under budget (call with lock held)."""
+        while self.total_bytes > self._max_bytes:
+            victim = next((k for k in self._shards if k != keep), None)
+            if victim is None:
+                break
+            self._shards.pop(victim)
+            self._sizes.pop(victim, None)
+            self._versions.pop(victim, None)
+            self._evictions += 1
+            logger.info(f"Evicted DataFrame cache shard for user {victim} (memory budget)")
+
+    @property
+    def total_bytes(self) -> int:
+        """Measured memory held by all shards."""
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def invalidate(self, user_id: Optional[str] = None, full: bool = False) -> None:
+        """
+        Invalidate shards, forcing a refresh on next access.
+
+        Args:
+            user_id: Only invalidate this user's shard (and the all-users shard);
+                None invalidates every shard
+            full: If True, force full reloads instead of incremental ones
+        """
+        with self._lock:
+            if user_id is None:
+                targets = list(self._shards.values())
+            else:
+                targets = [self._shards[k] for k in (self._shard_key(user_id), self.ALL_USERS)
+                           if k in self._shards]
+        for shard in targets:
+            shard.invalidate(full=full)
+
+    def evict(self, user_id: Optional[str]) -> bool:
+        """Drop a user's shard entirely. Returns True if it existed."""
+        key = self._shard_key(user_id)
+        with self._lock:
+            self._sizes.pop(key, None)
+            self._versions.pop(key, None)
+            return self._shards.pop(key, None) is not None
+
+    def update_row(self, index_col: str, index_val: Any, updates: dict) -> bool:
+        """
+        Patch a row in every shard that holds it.
+
+        Returns:
+            True if at least one shard was updated
+        """
+        with self._lock:
+            shards = list(self._shards.values())
+        updated = False
+        for shard in shards:
+            updated = shard.update_row(index_col, index_val, updates) or updated
+        return updated
+
+    def get_row(self, index_col: str, index_val: Any, user_id: Optional[str] = None) -> Optional[dict]:
+        """Row lookup in a user's shard (None if the shard isn't loaded)."""
+        with self._lock:
+            shard = self._shards.get(self._shard_key(user_id))
+        if shard is None:
+            return None
+        return shard.get_row(index_col, index_val)
+
+    def stats(self) -> dict:
+        """Memory and load statistics per shard for monitoring."""
+        with self._lock:
+            shards = list(self._shards.items())
+            sizes = dict(self._sizes)
+            evictions = self._evictions
+        return {
+            'shards': len(shards),
+            'total_bytes': sum(sizes.values()),
+            'max_bytes': self._max_bytes,
+            'evictions': evictions,
+            'users': {key: dict(shard.stats(), bytes=sizes.get(key, 0)) for key, shard in shards},
+        }
+
+
 # Global instances
 _df_cache: Optional[DataFrameCache] = None
+_user_df_cache: Optional[UserDataFrameCache] = None
 _receipt_meta_cache: Optional[ThreadSafeCache] = None
 
 
@@ -270,6 +831,19 @@ def get_df_cache() -> DataFrameCache:
     return _df_cache
 
 
+def get_user_df_cache() -> UserDataFrameCache:
+    """
+    Get the global per-user DataFrame cache instance.
+
+    The memory budget is read from DF_CACHE_MAX_MB (default 512).
+    """
+    global _user_df_cache
+    if _user_df_cache is None:
+        max_mb = int(os.getenv('DF_CACHE_MAX_MB', '512'))
+        _user_df_cache = UserDataFrameCache(ttl_seconds=300, max_bytes=max_mb * 1024 * 1024)
+    return _user_df_cache
+
+
 def get_receipt_meta_cache() -> ThreadSafeCache:
     """Get the global receipt metadata cache instance."""
     global _receipt_meta_cache
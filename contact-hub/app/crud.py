@@ -2,9 +2,10 @@
 CRUD Operations for Contact Hub
 """
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy import or_, and_, func
 from typing import Optional, List, Dict, Any
+from bisect import bisect_right
 import phonenumbers
 from fuzzywuzzy import fuzz
 import csv
@@ -353,71 +354,141 @@ def remove_tag_from_contact(db: Session, contact_id: int, tag_id: int) -> bool:
 # Deduplication
 # =============================================================================
 
+# Fuzzy name threshold (fuzz.ratio on lowercased display names)
+NAME_MATCH_THRESHOLD = 85
+
+# Names compared with their neighbours in sorted order
+SORTED_NEIGHBORHOOD_WINDOW = 10
+
+# Trigrams shared by more names than this are too common to block on
+MAX_TRIGRAM_BLOCK = 500
+
+
+class _DisjointSet:
+    """Union-find over contact positions, keeping the strongest match per group"""
+    
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.rank = [0] * size
+        self.evidence: Dict[int, tuple] = {}
+    
+    def find(self, x: int) -> int:
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+    
+    def union(self, a: int, b: int, evidence: tuple):
+        """Join the groups of a and b; evidence is (score, match_reason, confidence)"""
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            if self.rank[ra] < self.rank[rb]:
+                ra, rb = rb, ra
+            self.parent[rb] = ra
+            if self.rank[ra] == self.rank[rb]:
+                self.rank[ra] += 1
+            other = self.evidence.pop(rb, None)
+            if other and (ra not in self.evidence or other[0] > self.evidence[ra][0]):
+                self.evidence[ra] = other
+        if ra not in self.evidence or evidence[0] > self.evidence[ra][0]:
+            self.evidence[ra] = evidence
+
+
+def _name_trigrams(name: str) -> set:
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _name_candidate_pairs(names: List[Optional[str]]):
+    """
+    Yield each pair of positions (i < j) whose names might be similar, once.
+    
+    Sorted-neighbourhood blocking catches names that agree at the start;
+    trigram blocks catch typos anywhere else.
+    """
+    neighbours: Dict[int, set] = {}
+    named = sorted((name, i) for i, name in enumerate(names) if name)
+    for offset, (_, i) in enumerate(named):
+        for _, j in named[offset + 1:offset + 1 + SORTED_NEIGHBORHOOD_WINDOW]:
+            neighbours.setdefault(min(i, j), set()).add(max(i, j))
+    
+    trigrams = [_name_trigrams(name) if name else set() for name in names]
+    blocks: Dict[str, List[int]] = {}
+    for i, grams in enumerate(trigrams):
+        for gram in grams:
+            blocks.setdefault(gram, []).append(i)
+    
+    for i, grams in enumerate(trigrams):
+        candidates = neighbours.pop(i, set())
+        for gram in grams:
+            block = blocks[gram]
+            if len(block) <= MAX_TRIGRAM_BLOCK:
+                candidates.update(block[bisect_right(block, i):])
+        for j in sorted(candidates):
+            yield i, j
+
+
 def find_duplicates(db: Session) -> List[Dict[str, Any]]:
-    """Find potential duplicate contacts"""
+    """
+    Find potential duplicate contacts.
+    
+    Contacts sharing a normalized email or phone are grouped directly from
+    exact-value buckets; display names are only compared within blocks
+    (see _name_candidate_pairs). Groups are transitive: if A matches B and
+    B matches C, all three are returned together.
+    """
     
     contacts = db.query(models.Contact).options(
-        joinedload(models.Contact.emails),
-        joinedload(models.Contact.phones),
+        selectinload(models.Contact.emails),
+        selectinload(models.Contact.phones),
     ).filter(models.Contact.is_archived == False).all()
     
-    duplicates = []
-    checked_pairs = set()
-    
-    for i, c1 in enumerate(contacts):
-        for c2 in contacts[i+1:]:
-            pair_key = (min(c1.id, c2.id), max(c1.id, c2.id))
-            if pair_key in checked_pairs:
-                continue
-            checked_pairs.add(pair_key)
-            
-            match_reason = None
-            confidence = 0.0
-            
-            # Check email match
-            c1_emails = {e.email.lower() for e in c1.emails}
-            c2_emails = {e.email.lower() for e in c2.emails}
-            if c1_emails & c2_emails:
-                match_reason = "Same email address"
-                confidence = 1.0
-            
-            # Check phone match
-            if not match_reason:
-                c1_phones = {p.normalized for p in c1.phones if p.normalized}
-                c2_phones = {p.normalized for p in c2.phones if p.normalized}
-                if c1_phones & c2_phones:
-                    match_reason = "Same phone number"
-                    confidence = 1.0
-            
-            # Check fuzzy name match
-            if not match_reason and c1.display_name and c2.display_name:
-                name_ratio = fuzz.ratio(
-                    c1.display_name.lower(),
-                    c2.display_name.lower()
-                )
-                if name_ratio >= 85:
-                    match_reason = f"Similar names ({name_ratio}% match)"
-                    confidence = name_ratio / 100.0
-            
-            if match_reason:
-                existing_group = None
-                for group in duplicates:
-                    group_ids = {c.id for c in group['contacts']}
-                    if c1.id in group_ids or c2.id in group_ids:
-                        existing_group = group
-                        break
-                
-                if existing_group:
-                    if c1 not in existing_group['contacts']:
-                        existing_group['contacts'].append(c1)
-                    if c2 not in existing_group['contacts']:
-                        existing_group['contacts'].append(c2)
+    groups = _DisjointSet(len(contacts))
+    
+    # Exact buckets: email first so it wins over phone when both match
+    for score, reason, keys_of in (
+        (3, "Same email address", lambda c: {e.email.lower() for e in c.emails}),
+        (2, "Same phone number", lambda c: {p.normalized for p in c.phones if p.normalized}),
+    ):
+        buckets: Dict[str, int] = {}
+        for i, contact in enumerate(contacts):
+            for key in keys_of(contact):
+                if key in buckets:
+                    groups.union(buckets[key], i, (score, reason, 1.0))
                 else:
-                    duplicates.append({
-                        'contacts': [c1, c2],
-                        'match_reason': match_reason,
-                        'confidence': confidence,
-                    })
+                    buckets[key] = i
+    
+    # Fuzzy names, only for candidate pairs from the blocks
+    names = [c.display_name.lower() if c.display_name else None for c in contacts]
+    for i, j in _name_candidate_pairs(names):
+        if groups.find(i) == groups.find(j):
+            continue
+        # ratio can't exceed 2 * shorter / total length, and fuzz.ratio
+        # rounds, so anything from threshold - 0.5 up can still match
+        shorter, longer = sorted((len(names[i]), len(names[j])))
+        if 200 * shorter < (NAME_MATCH_THRESHOLD - 0.5) * (shorter + longer):
+            continue
+        name_ratio = fuzz.ratio(names[i], names[j])
+        if name_ratio >= NAME_MATCH_THRESHOLD:
+            groups.union(i, j, (1 + name_ratio / 100.0,
+                                f"Similar names ({name_ratio}% match)",
+                                name_ratio / 100.0))
+    
+    members: Dict[int, List[models.Contact]] = {}
+    for i, contact in enumerate(contacts):
+        members.setdefault(groups.find(i), []).append(contact)
+    
+    duplicates = []
+    for root, group in members.items():
+        if len(group) > 1:
+            _, match_reason, confidence = groups.evidence[root]
+            duplicates.append({
+                'contacts': group,
+                'match_reason': match_reason,
+                'confidence': confidence,
+            })
     
     return duplicates
 
@@ -697,18 +768,36 @@ def import_vcard(db: Session, content: str) -> Dict[str, int]:
     return result
 
 
-def export_csv(
+# Contacts loaded per query when exporting
+EXPORT_CHUNK_SIZE = 500
+
+CSV_EXPORT_HEADERS = [
+    'First Name', 'Last Name', 'Display Name', 'Company', 'Job Title',
+    'Email 1', 'Email 2', 'Phone 1', 'Phone 2',
+    'Street', 'City', 'State', 'Postal Code', 'Country',
+    'Birthday', 'Notes', 'Tags', 'LinkedIn', 'Twitter',
+    'Last Interaction', 'Interaction Count'
+]
+
+
+def _iter_export_chunks(
     db: Session,
-    contact_ids: Optional[List[int]] = None,
-    tag_id: Optional[int] = None,
-) -> str:
-    """Export contacts to CSV"""
-    
+    contact_ids: Optional[List[int]],
+    tag_id: Optional[int],
+    relationships: List[Any],
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+):
+    """
+    Yield lists of contacts, chunk_size at a time, in id order.
+    
+    Each chunk is its own keyset-paginated query with selectinload. Only
+    one chunk is referenced at a time and the session holds loaded objects
+    weakly, so memory stays flat however many contacts are exported. (A
+    single yield_per query can't be used here: on MySQL the selectin
+    queries can't run while an unbuffered result is open on the connection.)
+    """
     query = db.query(models.Contact).options(
-        joinedload(models.Contact.emails),
-        joinedload(models.Contact.phones),
-        joinedload(models.Contact.addresses),
-        joinedload(models.Contact.tags),
+        *[selectinload(rel) for rel in relationships]
     )
     
     if contact_ids:
@@ -717,140 +806,178 @@ def export_csv(
     if tag_id:
         query = query.filter(models.Contact.tags.any(models.Tag.id == tag_id))
     
-    contacts = query.all()
+    last_id = 0
+    while True:
+        contacts = query.filter(models.Contact.id > last_id).order_by(
+            models.Contact.id
+        ).limit(chunk_size).all()
+        if not contacts:
+            return
+        last_id = contacts[-1].id
+        yield contacts
+        if len(contacts) < chunk_size:
+            return
+
+
+def _csv_row(contact: models.Contact) -> List[Any]:
+    emails = [e.email for e in contact.emails]
+    phones = [p.number for p in contact.phones]
+    primary_addr = next((a for a in contact.addresses if a.is_primary), 
+                       contact.addresses[0] if contact.addresses else None)
+    
+    return [
+        contact.first_name or '',
+        contact.last_name or '',
+        contact.display_name or '',
+        contact.company or '',
+        contact.job_title or '',
+        emails[0] if emails else '',
+        emails[1] if len(emails) > 1 else '',
+        phones[0] if phones else '',
+        phones[1] if len(phones) > 1 else '',
+        primary_addr.street1 if primary_addr else '',
+        primary_addr.city if primary_addr else '',
+        primary_addr.state if primary_addr else '',
+        primary_addr.postal_code if primary_addr else '',
+        primary_addr.country if primary_addr else '',
+        contact.birthday.strftime('%Y-%m-%d') if contact.birthday else '',
+        contact.notes or '',
+        ', '.join(t.name for t in contact.tags),
+        contact.linkedin_url or '',
+        contact.twitter_handle or '',
+        contact.last_interaction_at.isoformat() if contact.last_interaction_at else '',
+        contact.interaction_count or 0,
+    ]
+
+
+def iter_export_csv(
+    db: Session,
+    contact_ids: Optional[List[int]] = None,
+    tag_id: Optional[int] = None,
+):
+    """Export contacts to CSV, yielding the file one chunk of contacts at a time"""
     
     output = io.StringIO()
     writer = csv.writer(output)
+    writer.writerow(CSV_EXPORT_HEADERS)
     
-    headers = [
-        'First Name', 'Last Name', 'Display Name', 'Company', 'Job Title',
-        'Email 1', 'Email 2', 'Phone 1', 'Phone 2',
-        'Street', 'City', 'State', 'Postal Code', 'Country',
-        'Birthday', 'Notes', 'Tags', 'LinkedIn', 'Twitter',
-        'Last Interaction', 'Interaction Count'
+    relationships = [
+        models.Contact.emails,
+        models.Contact.phones,
+        models.Contact.addresses,
+        models.Contact.tags,
     ]
-    writer.writerow(headers)
-    
-    for contact in contacts:
-        emails = [e.email for e in contact.emails]
-        phones = [p.number for p in contact.phones]
-        primary_addr = next((a for a in contact.addresses if a.is_primary), 
-                           contact.addresses[0] if contact.addresses else None)
-        
-        row = [
-            contact.first_name or '',
-            contact.last_name or '',
-            contact.display_name or '',
-            contact.company or '',
-            contact.job_title or '',
-            emails[0] if emails else '',
-            emails[1] if len(emails) > 1 else '',
-            phones[0] if phones else '',
-            phones[1] if len(phones) > 1 else '',
-            primary_addr.street1 if primary_addr else '',
-            primary_addr.city if primary_addr else '',
-            primary_addr.state if primary_addr else '',
-            primary_addr.postal_code if primary_addr else '',
-            primary_addr.country if primary_addr else '',
-            contact.birthday.strftime('%Y-%m-%d') if contact.birthday else '',
-            contact.notes or '',
-            ', '.join(t.name for t in contact.tags),
-            contact.linkedin_url or '',
-            contact.twitter_handle or '',
-            contact.last_interaction_at.isoformat() if contact.last_interaction_at else '',
-            contact.interaction_count or 0,
-        ]
-        writer.writerow(row)
+    for contacts in _iter_export_chunks(db, contact_ids, tag_id, relationships):
+        for contact in contacts:
+            writer.writerow(_csv_row(contact))
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate()
     
-    return output.getvalue()
+    if output.tell():
+        yield output.getvalue()
 
 
-def export_vcard(
+def export_csv(
     db: Session,
     contact_ids: Optional[List[int]] = None,
     tag_id: Optional[int] = None,
 ) -> str:
-    """Export contacts to vCard format"""
+    """Export contacts to CSV"""
+    return ''.join(iter_export_csv(db, contact_ids=contact_ids, tag_id=tag_id))
+
+
+def _contact_vcard(contact: models.Contact) -> str:
+    vcard = vobject.vCard()
     
-    query = db.query(models.Contact).options(
-        joinedload(models.Contact.emails),
-        joinedload(models.Contact.phones),
-        joinedload(models.Contact.addresses),
+    # Name
+    vcard.add('n')
+    vcard.n.value = vobject.vcard.Name(
+        family=contact.last_name or '',
+        given=contact.first_name or '',
     )
     
-    if contact_ids:
-        query = query.filter(models.Contact.id.in_(contact_ids))
+    # Full name
+    vcard.add('fn')
+    vcard.fn.value = contact.display_name or f"{contact.first_name or ''} {contact.last_name or ''}".strip()
+    
+    # Organization
+    if contact.company:
+        vcard.add('org')
+        vcard.org.value = [contact.company]
+    
+    # Title
+    if contact.job_title:
+        vcard.add('title')
+        vcard.title.value = contact.job_title
+    
+    # Emails
+    for email in contact.emails:
+        e = vcard.add('email')
+        e.value = email.email
+        e.type_param = email.type.value.upper()
+    
+    # Phones
+    for phone in contact.phones:
+        t = vcard.add('tel')
+        t.value = phone.number
+        t.type_param = phone.type.value.upper()
+    
+    # Addresses
+    for addr in contact.addresses:
+        a = vcard.add('adr')
+        a.value = vobject.vcard.Address(
+            street=addr.street1 or '',
+            city=addr.city or '',
+            region=addr.state or '',
+            code=addr.postal_code or '',
+            country=addr.country or '',
+        )
+        a.type_param = addr.type.value.upper()
     
-    if tag_id:
-        query = query.filter(models.Contact.tags.any(models.Tag.id == tag_id))
+    # Birthday
+    if contact.birthday:
+        bday = vcard.add('bday')
+        bday.value = contact.birthday.strftime('%Y-%m-%d')
     
-    contacts = query.all()
+    # Note
+    if contact.notes:
+        note = vcard.add('note')
+        note.value = contact.notes
     
-    vcards = []
+    # URL
+    if contact.website:
+        url = vcard.add('url')
+        url.value = contact.website
     
-    for contact in contacts:
-        vcard = vobject.vCard()
-        
-        # Name
-        vcard.add('n')
-        vcard.n.value = vobject.vcard.Name(
-            family=contact.last_name or '',
-            given=contact.first_name or '',
-        )
-        
-        # Full name
-        vcard.add('fn')
-        vcard.fn.value = contact.display_name or f"{contact.first_name or ''} {contact.last_name or ''}".strip()
-        
-        # Organization
-        if contact.company:
-            vcard.add('org')
-            vcard.org.value = [contact.company]
-        
-        # Title
-        if contact.job_title:
-            vcard.add('title')
-            vcard.title.value = contact.job_title
-        
-        # Emails
-        for email in contact.emails:
-            e = vcard.add('email')
-            e.value = email.email
-            e.type_param = email.type.value.upper()
-        
-        # Phones
-        for phone in contact.phones:
-            t = vcard.add('tel')
-            t.value = phone.number
-            t.type_param = phone.type.value.upper()
-        
-        # Addresses
-        for addr in contact.addresses:
-            a = vcard.add('adr')
-            a.value = vobject.vcard.Address(
-                street=addr.street1 or '',
-                city=addr.city or '',
-                region=addr.state or '',
-                code=addr.postal_code or '',
-                country=addr.country or '',
-            )
-            a.type_param = addr.type.value.upper()
-        
-        # Birthday
-        if contact.birthday:
-            bday = vcard.add('bday')
-            bday.value = contact.birthday.strftime('%Y-%m-%d')
-        
-        # Note
-        if contact.notes:
-            note = vcard.add('note')
-            note.value = contact.notes
-        
-        # URL
-        if contact.website:
-            url = vcard.add('url')
-            url.value = contact.website
-        
-        vcards.append(vcard.serialize())
+    return vcard.serialize()
+
+
+def iter_export_vcard(
+    db: Session,
+    contact_ids: Optional[List[int]] = None,
+    tag_id: Optional[int] = None,
+):
+    """Export contacts to vCard format, yielding one chunk of contacts at a time"""
     
-    return '\n'.join(vcards)
+    relationships = [
+        models.Contact.emails,
+        models.Contact.phones,
+        models.Contact.addresses,
+    ]
+    separator = ''
+    for contacts in _iter_export_chunks(db, contact_ids, tag_id, relationships):
+        chunk = []
+        for contact in contacts:
+            chunk.append(separator + _contact_vcard(contact))
+            separator = '\n'
+        yield ''.join(chunk)
+
+
+def export_vcard(
+    db: Session,
+    contact_ids: Optional[List[int]] = None,
+    tag_id: Optional[int] = None,
+) -> str:
+    """Export contacts to vCard format"""
+    return ''.join(iter_export_vcard(db, contact_ids=contact_ids, tag_id=tag_id))
@@ -12,7 +12,7 @@ from datetime import datetime, timedelta
 import io
 import csv
 
-from .database import engine, get_db, Base
+from .database import engine, get_db, Base, SessionLocal
 from . import models, schemas, crud
 from . import interactions as interaction_service
 from . import reminders as reminder_service
@@ -594,18 +594,25 @@ async def import_vcard(file: UploadFile = File(...), db: Session = Depends(get_d
     return crud.import_vcard(db, content.decode('utf-8'))
 
 
+def _stream_export(export, **kwargs):
+    """Run a crud.iter_export_* generator in its own session while the response streams"""
+    db = SessionLocal()
+    try:
+        yield from export(db, **kwargs)
+    finally:
+        db.close()
+
+
 @app.get("/export/csv")
 def export_csv(
     contact_ids: Optional[str] = None,
     tag_id: Optional[int] = None,
-    db: Session = Depends(get_db),
 ):
     """Export contacts to CSV"""
     ids = [int(x) for x in contact_ids.split(',')] if contact_ids else None
-    csv_content = crud.export_csv(db, contact_ids=ids, tag_id=tag_id)
     
     return StreamingResponse(
-        iter([csv_content]),
+        _stream_export(crud.iter_export_csv, contact_ids=ids, tag_id=tag_id),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=contacts.csv"},
     )
@@ -615,14 +622,12 @@ def export_csv(
 def export_vcard(
     contact_ids: Optional[str] = None,
     tag_id: Optional[int] = None,
-    db: Session = Depends(get_db),
 ):
     """Export contacts to vCard"""
     ids = [int(x) for x in contact_ids.split(',')] if contact_ids else None
-    vcard_content = crud.export_vcard(db, contact_ids=ids, tag_id=tag_id)
     
     return StreamingResponse(
-        iter([vcard_content]),
+        _stream_export(crud.iter_export_vcard, contact_ids=ids, tag_id=tag_id),
         media_type="text/vcard",
         headers={"Content-Disposition": "attachment; filename=contacts.vcf"},
     )
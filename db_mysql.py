@@ -19,11 +19,13 @@ import threading
 import time
 import queue
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Any, Tuple
 from urllib.parse import urlparse
 from contextlib import contextmanager
 
+from cache_manager import apply_schema
+
 # Import structured logging if available
 try:
     from logging_config import get_logger, DatabaseLogger, log_timing
@@ -512,6 +514,8 @@ class MySQLReceiptDatabase:
         self.config = config or get_mysql_config()
         self._pool: Optional[ConnectionPool] = None
         self.use_mysql = False
+        # Memory savings of the compact transactions schema on the last load
+        self.schema_stats: Dict[str, Any] = {}
 
         # Check for read-only mode (for development environment using production DB)
         self.read_only = os.environ.get('DB_READ_ONLY', '').lower() in ('true', '1', 'yes')
@@ -1153,6 +1157,9 @@ class MySQLReceiptDatabase:
                     ("idx_ocr_method", "CREATE INDEX idx_ocr_method ON transactions(ocr_method)"),
                     # Composite index for dashboard stats
                     ("idx_business_date", "CREATE INDEX idx_business_date ON transactions(business_type, chase_date)"),
+                    # Change feed for the DataFrame cache (watermark + changed rows)
+                    ("idx_user_updated", "CREATE INDEX idx_user_updated ON transactions(user_id, updated_at)"),
+                    ("idx_updated_at", "CREATE INDEX idx_updated_at ON transactions(updated_at)"),
                 ]
 
                 # Get existing indexes
@@ -1419,6 +1426,7 @@ class MySQLReceiptDatabase:
             ("birthday", "DATE"),
             ("relationship_type", "VARCHAR(100)"),  # friend, colleague, family, client, vendor
             ("relationship_strength", "DECIMAL(3,2) DEFAULT 0.5"),  # 0-1 score
+            ("relationship_strength_computed_at", "DATETIME"),  # when relationship_strength was last materialized
             ("touch_frequency_days", "INT DEFAULT 30"),  # desired contact frequency
             ("last_touch_date", "DATE"),
             ("next_touch_date", "DATE"),
@@ -1772,58 +1780,179 @@ class MySQLReceiptDatabase:
         """)
         conn.commit()
 
-    def get_all_transactions(self) -> pd.DataFrame:
-        """Get all transactions as DataFrame (with UI-friendly column names)"""
-        if not self.use_mysql or not self._pool:
-            raise RuntimeError("MySQL not available")
-
-        query = "SELECT * FROM transactions ORDER BY _index"
-        with self._pool.connection() as conn:
-            df = pd.read_sql_query(query, conn)
-
-        # Map database columns to UI-friendly names
-        column_map = {
-            '_index': '_index',
-            'chase_date': 'Chase Date',
-            'chase_description': 'Chase Description',
-            'chase_amount': 'Chase Amount',
-            'chase_category': 'Chase Category',
-            'chase_type': 'Chase Type',
-            'receipt_file': 'Receipt File',
-            'business_type': 'Business Type',
-            'notes': 'Notes',
-            'ai_note': 'AI Note',
-            'ai_confidence': 'AI Confidence',
-            'ai_receipt_merchant': 'ai_receipt_merchant',
-            'ai_receipt_date': 'ai_receipt_date',
-            'ai_receipt_total': 'ai_receipt_total',
-            'review_status': 'Review Status',
-            'category': 'Category',
-            'report_id': 'Report ID',
-            'source': 'Source',
-            'mi_merchant': 'MI Merchant',
-            'mi_category': 'MI Category',
-            'mi_description': 'MI Description',
-            'mi_confidence': 'MI Confidence',
-            'mi_is_subscription': 'MI Is Subscription',
-            'mi_subscription_name': 'MI Subscription Name',
-            'mi_processed_at': 'MI Processed At',
-            'is_refund': 'Is Refund',
-            'already_submitted': 'Already Submitted',
-            'deleted': 'deleted',
-            'deleted_by_user': 'deleted_by_user',
-            'r2_url': 'R2 URL'
-        }
+    # Database column -> UI-friendly DataFrame column
+    TRANSACTION_COLUMN_MAP = {
+        '_index': '_index',
+        'chase_date': 'Chase Date',
+        'chase_description': 'Chase Description',
+        'chase_amount': 'Chase Amount',
+        'chase_category': 'Chase Category',
+        'chase_type': 'Chase Type',
+        'receipt_file': 'Receipt File',
+        'business_type': 'Business Type',
+        'notes': 'Notes',
+        'ai_note': 'AI Note',
+        'ai_confidence': 'AI Confidence',
+        'ai_receipt_merchant': 'ai_receipt_merchant',
+        'ai_receipt_date': 'ai_receipt_date',
+        'ai_receipt_total': 'ai_receipt_total',
+        'review_status': 'Review Status',
+        'category': 'Category',
+        'report_id': 'Report ID',
+        'source': 'Source',
+        'mi_merchant': 'MI Merchant',
+        'mi_category': 'MI Category',
+        'mi_description': 'MI Description',
+        'mi_confidence': 'MI Confidence',
+        'mi_is_subscription': 'MI Is Subscription',
+        'mi_subscription_name': 'MI Subscription Name',
+        'mi_processed_at': 'MI Processed At',
+        'is_refund': 'Is Refund',
+        'already_submitted': 'Already Submitted',
+        'deleted': 'deleted',
+        'deleted_by_user': 'deleted_by_user',
+        'r2_url': 'R2 URL'
+    }
+
+    # Compact dtypes for the cached transactions DataFrame (see cache_manager.apply_schema).
+    # Chase Date stays as loaded (date objects): callers str()/strptime it as YYYY-MM-DD.
+    # String columns stay object: routes fillna("") them and assign new labels
+    # (df.loc[mask, 'Business Type'] = 'EM.co'), which a categorical rejects.
+    TRANSACTION_SCHEMA = {
+        'Chase Amount': 'float',
+        'ai_receipt_total': 'float',
+        'AI Confidence': 'float',
+        'MI Confidence': 'float',
+        'MI Is Subscription': 'boolean',
+        'Is Refund': 'boolean',
+        'deleted': 'boolean',
+        'deleted_by_user': 'boolean',
+    }
+
+    # Re-read rows touched this long before the watermark so updates that
+    # committed late (statement time < commit time) are not missed
+    CHANGE_FEED_OVERLAP_SECONDS = 60
+
+    def _transactions_frame(self, df: pd.DataFrame, record_stats: bool = False) -> pd.DataFrame:
+        """Convert a raw transactions result set to the UI DataFrame shape.
 
-        df = df.rename(columns=column_map)
+        Args:
+            df: Raw result of SELECT * FROM transactions
+            record_stats: Store the schema memory savings in schema_stats
+        """
+        df = df.rename(columns=self.TRANSACTION_COLUMN_MAP)
         df = df.drop(columns=['id', 'created_at', 'updated_at'], errors='ignore')
 
         # Ensure _index is integer type for comparison operations
         if '_index' in df.columns:
             df['_index'] = pd.to_numeric(df['_index'], errors='coerce').fillna(0).astype(int)
 
+        stats = apply_schema(df, self.TRANSACTION_SCHEMA)
+        if record_stats and len(df) and stats['bytes_before']:
+            self.schema_stats = {
+                'rows': len(df),
+                'bytes_before': stats['bytes_before'],
+                'bytes_after': stats['bytes_after'],
+                'saved_percent': round(100 * (1 - stats['bytes_after'] / stats['bytes_before']), 1),
+                'columns': stats['columns'],
+            }
+
         return df
 
+    def get_all_transactions(self, user_id: Optional[str] = None) -> pd.DataFrame:
+        """Get all transactions as DataFrame (with UI-friendly column names)
+
+        Args:
+            user_id: If given, only this user's transactions
+        """
+        if not self.use_mysql or not self._pool:
+            raise RuntimeError("MySQL not available")
+
+        if user_id is None:
+            query = "SELECT * FROM transactions ORDER BY _index"
+            params = None
+        else:
+            query = "SELECT * FROM transactions WHERE user_id = %s ORDER BY _index"
+            params = (user_id,)
+
+        with self._pool.connection() as conn:
+            df = pd.read_sql_query(query, conn, params=params)
+
+        return self._transactions_frame(df, record_stats=True)
+
+    def get_transactions_watermark(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get the change-feed high-water mark for the transactions table.
+
+        Args:
+            user_id: If given, the watermark of this user's rows only
+
+        Returns:
+            Dict with 'updated_at' (latest row change), 'max_index' and
+            'row_count', used by the DataFrame cache for incremental refresh
+        """
+        if not self.use_mysql or not self._pool:
+            raise RuntimeError("MySQL not available")
+
+        query = """
+            SELECT MAX(updated_at) AS updated_at,
+                   MAX(_index) AS max_index,
+                   COUNT(*) AS row_count
+            FROM transactions
+        """
+        params = ()
+        if user_id is not None:
+            query += " WHERE user_id = %s"
+            params = (user_id,)
+
+        with self._pool.connection() as conn:
+            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            cursor.execute(query, params)
+            row = cursor.fetchone() or {}
+            cursor.close()
+
+        return {
+            'updated_at': row.get('updated_at'),
+            'max_index': int(row.get('max_index') or 0),
+            'row_count': int(row.get('row_count') or 0),
+        }
+
+    def get_transactions_changed_since(self, watermark: Dict[str, Any],
+                                       user_id: Optional[str] = None) -> pd.DataFrame:
+        """
+        Get transactions inserted or updated since a watermark.
+
+        Args:
+            watermark: Result of get_transactions_watermark()
+            user_id: If given, only this user's transactions
+
+        Returns:
+            DataFrame of changed rows (same shape as get_all_transactions)
+        """
+        if not self.use_mysql or not self._pool:
+            raise RuntimeError("MySQL not available")
+
+        user_filter = " AND user_id = %s" if user_id is not None else ""
+        user_params = [user_id] if user_id is not None else []
+
+        # Inserts by _index (primary key); updates by updated_at
+        # (idx_user_updated / idx_updated_at). A UNION rather than OR so
+        # each branch is an index range scan instead of a table scan.
+        query = f"SELECT * FROM transactions WHERE _index > %s{user_filter}"
+        params = [watermark.get('max_index', 0)] + user_params
+
+        since = watermark.get('updated_at')
+        if since is not None:
+            since = since - timedelta(seconds=self.CHANGE_FEED_OVERLAP_SECONDS)
+            query += f" UNION SELECT * FROM transactions WHERE updated_at >= %s{user_filter}"
+            params += [since] + user_params
+
+        query += " ORDER BY _index"
+        with self._pool.connection() as conn:
+            df = pd.read_sql_query(query, conn, params=tuple(params))
+
+        return self._transactions_frame(df)
+
     def get_transaction_by_index(self, index: int) -> Optional[Dict]:
         """Get single transaction by _index"""
         if not self.use_mysql or not self._pool:
@@ -1849,6 +1978,44 @@ class MySQLReceiptDatabase:
         'receipt_validation_status', 'receipt_validation_note'
     })
 
+    # Map user-facing column names to database columns
+    UPDATE_COLUMN_MAP = {
+        'Chase Date': 'chase_date',
+        'Chase Description': 'chase_description',
+        'Chase Amount': 'chase_amount',
+        'Chase Category': 'chase_category',
+        'Chase Type': 'chase_type',
+        'Receipt File': 'receipt_file',
+        'Business Type': 'business_type',
+        'Notes': 'notes',
+        'AI Note': 'ai_note',
+        'AI Confidence': 'ai_confidence',
+        'ai_receipt_merchant': 'ai_receipt_merchant',
+        'ai_receipt_date': 'ai_receipt_date',
+        'ai_receipt_total': 'ai_receipt_total',
+        'Review Status': 'review_status',
+        'Category': 'category',
+        'Report ID': 'report_id',
+        'Source': 'source'
+    }
+
+    # Rows per CASE-based UPDATE statement in update_transactions_bulk
+    BULK_UPDATE_CHUNK_SIZE = 500
+
+    def _update_columns(self, patch: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a patch to whitelisted database columns (SQL injection safe)."""
+        columns = {}
+        for key, value in patch.items():
+            db_col = self.UPDATE_COLUMN_MAP.get(key, key.lower().replace(' ', '_'))
+            if db_col == '_index':
+                continue
+            # SECURITY: Only allow whitelisted columns
+            if db_col not in self.ALLOWED_UPDATE_COLUMNS:
+                logger.warning(f"SECURITY: Rejected update to non-allowed column: {db_col}")
+                continue
+            columns[db_col] = value
+        return columns
+
     def update_transaction(self, index: int, patch: Dict[str, Any]) -> bool:
         """Update transaction with patch data (SQL injection safe)"""
         if not self.use_mysql or not self._pool:
@@ -1858,44 +2025,12 @@ class MySQLReceiptDatabase:
             logger.warning(f"[READ-ONLY] Blocked update_transaction for index {index}")
             return False
 
-        # Map user-facing column names to database columns
-        column_map = {
-            'Chase Date': 'chase_date',
-            'Chase Description': 'chase_description',
-            'Chase Amount': 'chase_amount',
-            'Chase Category': 'chase_category',
-            'Chase Type': 'chase_type',
-            'Receipt File': 'receipt_file',
-            'Business Type': 'business_type',
-            'Notes': 'notes',
-            'AI Note': 'ai_note',
-            'AI Confidence': 'ai_confidence',
-            'ai_receipt_merchant': 'ai_receipt_merchant',
-            'ai_receipt_date': 'ai_receipt_date',
-            'ai_receipt_total': 'ai_receipt_total',
-            'Review Status': 'review_status',
-            'Category': 'category',
-            'Report ID': 'report_id',
-            'Source': 'source'
-        }
-
-        set_clauses = []
-        values = []
-
-        for key, value in patch.items():
-            db_col = column_map.get(key, key.lower().replace(' ', '_'))
-            if db_col == '_index':
-                continue
-            # SECURITY: Only allow whitelisted columns
-            if db_col not in self.ALLOWED_UPDATE_COLUMNS:
-                logger.warning(f"SECURITY: Rejected update to non-allowed column: {db_col}")
-                continue
-            set_clauses.append(f"{db_col} = %s")
-            values.append(value)
-
-        if not set_clauses:
+        columns = self._update_columns(patch)
+        if not columns:
             return False
 
+        set_clauses = [f"{db_col} = %s" for db_col in columns]
+        values = list(columns.values())
         values.append(index)
         sql = f"UPDATE transactions SET {', '.join(set_clauses)} WHERE _index = %s"
 
@@ -1912,6 +2047,96 @@ class MySQLReceiptDatabase:
             logger.error(f"Update failed: {e}")
             return False
 
+    def update_transactions_bulk(self, updates: List[Tuple[int, Dict[str, Any]]]) -> Dict[int, bool]:
+        """
+        Update many transactions in one database transaction.
+
+        Patches for the same _index are merged (later keys win), then rows are
+        grouped by the set of columns they change. Each group is written with
+        CASE-based multi-row UPDATEs of up to BULK_UPDATE_CHUNK_SIZE rows, so
+        N single-row round trips and commits become a handful of statements
+        and one commit. All-or-nothing: any error rolls back every row.
+
+        Args:
+            updates: List of (index, patch) pairs, same patch format as
+                update_transaction()
+
+        Returns:
+            Dict of index -> True if the row exists and was written. Unlike
+            update_transaction(), unchanged-but-matched rows count as success.
+        """
+        if not self.use_mysql or not self._pool:
+            raise RuntimeError("MySQL not available")
+
+        merged: Dict[int, Dict[str, Any]] = {}
+        for index, patch in updates:
+            merged.setdefault(int(index), {}).update(self._update_columns(patch))
+
+        results = {index: False for index in merged}
+        if self.read_only:
+            logger.warning(f"[READ-ONLY] Blocked update_transactions_bulk for {len(merged)} rows")
+            return results
+
+        groups: Dict[Tuple[str, ...], List[Tuple[int, Dict[str, Any]]]] = {}
+        for index, columns in merged.items():
+            if columns:
+                groups.setdefault(tuple(sorted(columns)), []).append((index, columns))
+
+        if not groups:
+            return results
+
+        chunk_size = self.BULK_UPDATE_CHUNK_SIZE
+        try:
+            with self._pool.connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    # Which rows exist (MySQL rowcount only counts changed rows)
+                    indexes = [index for rows in groups.values() for index, _ in rows]
+                    existing = set()
+                    for start in range(0, len(indexes), chunk_size):
+                        chunk = indexes[start:start + chunk_size]
+                        placeholders = ','.join(['%s'] * len(chunk))
+                        cursor.execute(
+                            f"SELECT _index FROM transactions WHERE _index IN ({placeholders})",
+                            chunk
+                        )
+                        existing.update(row['_index'] for row in cursor.fetchall())
+
+                    for cols, rows in groups.items():
+                        for start in range(0, len(rows), chunk_size):
+                            chunk = rows[start:start + chunk_size]
+                            sql, params = self._bulk_update_sql(cols, chunk)
+                            cursor.execute(sql, params)
+                    # Commit is handled by context manager
+                finally:
+                    cursor.close()
+        except Exception as e:
+            logger.error(f"Bulk update failed ({len(merged)} rows): {e}")
+            return results
+
+        for index in existing:
+            if merged.get(index):
+                results[index] = True
+        return results
+
+    @staticmethod
+    def _bulk_update_sql(cols: Tuple[str, ...],
+                         rows: List[Tuple[int, Dict[str, Any]]]) -> Tuple[str, List[Any]]:
+        """Build one CASE-based UPDATE setting ``cols`` for every row."""
+        params: List[Any] = []
+        set_clauses = []
+        for col in cols:
+            whens = ' '.join(['WHEN %s THEN %s'] * len(rows))
+            set_clauses.append(f"{col} = CASE _index {whens} ELSE {col} END")
+            for index, columns in rows:
+                params.extend((index, columns[col]))
+
+        placeholders = ','.join(['%s'] * len(rows))
+        params.extend(index for index, _ in rows)
+        sql = (f"UPDATE transactions SET {', '.join(set_clauses)} "
+               f"WHERE _index IN ({placeholders})")
+        return sql, params
+
     def search_transactions(
         self,
         business_type: Optional[str] = None,
@@ -3399,39 +3624,14 @@ class MySQLReceiptDatabase:
     # AI-Powered Relationship Intelligence
     # =========================================================================
 
-    def atlas_calculate_relationship_strength(self, contact_id: int) -> Dict[str, Any]:
-        """Calculate relationship strength based on interactions and touchpoints"""
-        if not self.use_mysql or not self._pool:
-            return {}
-
-        self.ensure_connection()
-        cursor = self.conn.cursor()
+    # Contacts per grouped stats query / CASE update in the strength job
+    RELATIONSHIP_STRENGTH_CHUNK_SIZE = 1000
 
-        # Get interaction stats
-        cursor.execute("""
-            SELECT
-                COUNT(*) as total_interactions,
-                SUM(CASE WHEN occurred_at >= DATE_SUB(NOW(), INTERVAL 30 DAY) THEN 1 ELSE 0 END) as recent_30d,
-                SUM(CASE WHEN occurred_at >= DATE_SUB(NOW(), INTERVAL 90 DAY) THEN 1 ELSE 0 END) as recent_90d,
-                MAX(occurred_at) as last_interaction,
-                MIN(occurred_at) as first_interaction
-            FROM interactions i
-            JOIN interaction_contacts ic ON i.id = ic.interaction_id
-            WHERE ic.contact_id = %s
-        """, (contact_id,))
-        interaction_stats = dict(cursor.fetchone() or {})
-
-        # Get expense relationship
-        cursor.execute("""
-            SELECT COUNT(*) as expense_count, SUM(t.amount) as total_spent
-            FROM contact_expense_links cel
-            JOIN transactions t ON cel.transaction_index = t._index
-            WHERE cel.contact_id = %s
-        """, (contact_id,))
-        expense_stats = dict(cursor.fetchone() or {})
-
-        # Calculate strength score (0-1)
-        strength = 0.0
+    @staticmethod
+    def _relationship_strength_factors(interaction_stats: Dict[str, Any],
+                                       expense_stats: Dict[str, Any],
+                                       now: datetime) -> Tuple[float, Dict[str, float]]:
+        """Score (0-1) and per-factor breakdown from a contact's interaction/expense stats"""
         factors = {}
 
         # Interaction frequency factor (0-0.4)
@@ -3451,8 +3651,7 @@ class MySQLReceiptDatabase:
         # Recency factor (0-0.3)
         last = interaction_stats.get('last_interaction')
         if last:
-            from datetime import datetime
-            days_since = (datetime.now() - last).days if hasattr(last, 'days') else 0
+            days_since = (now - last).days if isinstance(last, datetime) else 0
             if days_since <= 7:
                 factors['recency'] = 0.3
             elif days_since <= 30:
@@ -3467,8 +3666,7 @@ class MySQLReceiptDatabase:
         # Longevity factor (0-0.2)
         first = interaction_stats.get('first_interaction')
         if first:
-            from datetime import datetime
-            days_known = (datetime.now() - first).days if hasattr(first, 'days') else 0
+            days_known = (now - first).days if isinstance(first, datetime) else 0
             if days_known >= 365:
                 factors['longevity'] = 0.2
             elif days_known >= 180:
@@ -3491,23 +3689,167 @@ class MySQLReceiptDatabase:
         else:
             factors['financial'] = 0
 
-        strength = sum(factors.values())
+        return round(sum(factors.values()), 2), factors
 
-        # Update contact's relationship_strength
-        cursor.execute("""
-            UPDATE contacts SET relationship_strength = %s WHERE id = %s
-        """, (round(strength, 2), contact_id))
-        self.conn.commit()
+    @staticmethod
+    def _relationship_strength_stats(cursor, contact_ids: List[int]) -> Tuple[Dict[int, Dict], Dict[int, Dict]]:
+        """Interaction and expense stats for many contacts, two grouped queries"""
+        placeholders = ','.join(['%s'] * len(contact_ids))
+
+        cursor.execute(f"""
+            SELECT
+                ic.contact_id,
+                COUNT(*) as total_interactions,
+                SUM(CASE WHEN occurred_at >= DATE_SUB(NOW(), INTERVAL 30 DAY) THEN 1 ELSE 0 END) as recent_30d,
+                SUM(CASE WHEN occurred_at >= DATE_SUB(NOW(), INTERVAL 90 DAY) THEN 1 ELSE 0 END) as recent_90d,
+                MAX(occurred_at) as last_interaction,
+                MIN(occurred_at) as first_interaction
+            FROM interactions i
+            JOIN interaction_contacts ic ON i.id = ic.interaction_id
+            WHERE ic.contact_id IN ({placeholders})
+            GROUP BY ic.contact_id
+        """, contact_ids)
+        interaction_stats = {}
+        for row in cursor.fetchall():
+            row = dict(row)
+            interaction_stats[row.pop('contact_id')] = row
+
+        cursor.execute(f"""
+            SELECT cel.contact_id, COUNT(*) as expense_count, SUM(t.amount) as total_spent
+            FROM contact_expense_links cel
+            JOIN transactions t ON cel.transaction_index = t._index
+            WHERE cel.contact_id IN ({placeholders})
+            GROUP BY cel.contact_id
+        """, contact_ids)
+        expense_stats = {}
+        for row in cursor.fetchall():
+            row = dict(row)
+            expense_stats[row.pop('contact_id')] = row
+
+        return interaction_stats, expense_stats
+
+    def atlas_calculate_relationship_strength(self, contact_id: int) -> Dict[str, Any]:
+        """Calculate relationship strength based on interactions and touchpoints"""
+        if not self.use_mysql or not self._pool:
+            return {}
+
+        with self.pooled_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT NOW() as now")
+                now = cursor.fetchone()['now']
+                interactions, expenses = self._relationship_strength_stats(cursor, [contact_id])
+                interaction_stats = interactions.get(contact_id) or {
+                    'total_interactions': 0, 'recent_30d': 0, 'recent_90d': 0,
+                    'last_interaction': None, 'first_interaction': None,
+                }
+                expense_stats = expenses.get(contact_id) or {'expense_count': 0, 'total_spent': None}
+
+                strength, factors = self._relationship_strength_factors(interaction_stats, expense_stats, now)
+
+                # Update contact's relationship_strength
+                if not self.read_only:
+                    cursor.execute("""
+                        UPDATE contacts SET relationship_strength = %s, relationship_strength_computed_at = %s,
+                            updated_at = updated_at
+                        WHERE id = %s
+                    """, (strength, now, contact_id))
+            finally:
+                cursor.close()
 
-        cursor.close()
         return {
             'contact_id': contact_id,
-            'strength': round(strength, 2),
+            'strength': strength,
             'factors': factors,
             'interaction_stats': interaction_stats,
             'expense_stats': expense_stats
         }
 
+    def atlas_refresh_relationship_strengths(self, full: bool = False,
+                                             max_age_days: int = 1) -> Dict[str, Any]:
+        """
+        Materialize relationship_strength for every contact that needs it.
+
+        A contact is recomputed when it has never been scored, has an
+        interaction (new or edited) or expense link since it was last
+        scored, or its score is older than max_age_days (recency and the
+        30-day window decay with time alone). full=True recomputes all.
+
+        Stats come from two grouped queries per RELATIONSHIP_STRENGTH_CHUNK_SIZE
+        contacts and scores are written with one CASE-based UPDATE per
+        chunk, instead of two queries and an UPDATE per contact.
+
+        Returns:
+            Dict with contacts checked/updated and the computed_at stamp
+        """
+        if not self.use_mysql or not self._pool:
+            return {'updated': 0}
+        if self.read_only:
+            logger.warning("[READ-ONLY] Blocked atlas_refresh_relationship_strengths")
+            return {'updated': 0}
+
+        start = time.time()
+        chunk_size = self.RELATIONSHIP_STRENGTH_CHUNK_SIZE
+        with self.pooled_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                # Stamp with the job's start time: anything logged while it runs
+                # is newer and gets picked up next time.
+                cursor.execute("SELECT NOW() as now")
+                now = cursor.fetchone()['now']
+
+                if full:
+                    cursor.execute("SELECT id FROM contacts")
+                else:
+                    cursor.execute("""
+                        SELECT id FROM contacts
+                        WHERE relationship_strength_computed_at IS NULL
+                           OR relationship_strength_computed_at < DATE_SUB(%s, INTERVAL %s DAY)
+                        UNION
+                        SELECT ic.contact_id FROM interaction_contacts ic
+                        JOIN interactions i ON i.id = ic.interaction_id
+                        JOIN contacts c ON c.id = ic.contact_id
+                        WHERE i.updated_at >= c.relationship_strength_computed_at
+                        UNION
+                        SELECT cel.contact_id FROM contact_expense_links cel
+                        JOIN contacts c ON c.id = cel.contact_id
+                        WHERE cel.created_at >= c.relationship_strength_computed_at
+                    """, (now, max_age_days))
+                contact_ids = sorted(row['id'] for row in cursor.fetchall())
+
+                for offset in range(0, len(contact_ids), chunk_size):
+                    chunk = contact_ids[offset:offset + chunk_size]
+                    interactions, expenses = self._relationship_strength_stats(cursor, chunk)
+
+                    params: List[Any] = []
+                    for contact_id in chunk:
+                        strength, _ = self._relationship_strength_factors(
+                            interactions.get(contact_id, {}), expenses.get(contact_id, {}), now)
+                        params.extend((contact_id, strength))
+                    placeholders = ','.join(['%s'] * len(chunk))
+                    whens = ' '.join(['WHEN %s THEN %s'] * len(chunk))
+                    # A rescore is not a contact edit: keep updated_at (ON UPDATE
+                    # CURRENT_TIMESTAMP) so the contact index catch-up ignores it
+                    cursor.execute(f"""
+                        UPDATE contacts
+                        SET relationship_strength = CASE id {whens} ELSE relationship_strength END,
+                            relationship_strength_computed_at = %s,
+                            updated_at = updated_at
+                        WHERE id IN ({placeholders})
+                    """, params + [now] + chunk)
+                # Commit is handled by context manager
+            finally:
+                cursor.close()
+
+        elapsed = round(time.time() - start, 2)
+        logger.info(f"Relationship strength refreshed for {len(contact_ids)} contacts in {elapsed}s")
+        return {
+            'updated': len(contact_ids),
+            'full': full,
+            'computed_at': str(now),
+            'seconds': elapsed,
+        }
+
     def atlas_get_relationship_insights(self, contact_id: int) -> Dict[str, Any]:
         """Get AI-ready relationship insights for a contact"""
         if not self.use_mysql or not self._pool:
@@ -3571,6 +3913,8 @@ class MySQLReceiptDatabase:
         if not self.use_mysql or not self._pool:
             return []
 
+        # "Declining engagement" reads the materialized relationship_strength,
+        # kept current by the hourly interaction sync and the refresh endpoint
         self.ensure_connection()
         cursor = self.conn.cursor()
 
@@ -44,18 +44,15 @@ def generate_with_openai(prompt, max_tokens=1000):
 
 def analyze_image_with_openai(image, prompt):
     """Analyze image using OpenAI GPT-4o vision"""
-    import base64
-    from io import BytesIO
+    from services.image_normalizer import normalize_image
 
     client = get_openai_client()
     if not client:
         return None
 
     try:
-        # Convert PIL image to base64
-        buffered = BytesIO()
-        image.save(buffered, format="JPEG")
-        image_base64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
+        # Normalize PIL image (rotate, grayscale, downscale) and encode
+        image_url = normalize_image(image).data_url()
 
         response = client.chat.completions.create(
             model="gpt-4o-mini",
@@ -63,7 +60,7 @@ def analyze_image_with_openai(image, prompt):
                 "role": "user",
                 "content": [
                     {"type": "text", "text": prompt},
-                    {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_base64}"}}
+                    {"type": "image_url", "image_url": {"url": image_url}}
                 ]
             }],
             max_tokens=1000,
@@ -24,6 +24,7 @@ import hashlib
 from dotenv import load_dotenv
 from PIL import Image
 from io import BytesIO
+from services.gmail_batch import fetch_messages, get_header, METADATA_HEADERS
 
 # =============================================================================
 # PDF TO IMAGE CONVERSION - PyMuPDF (Pure Python, Railway Compatible)
@@ -1460,8 +1461,14 @@ def analyze_image_with_vision(image_url_or_base64, subject_hint=None, from_hint=
         if image_url_or_base64.startswith('http'):
             image_content = {"type": "image_url", "image_url": {"url": image_url_or_base64}}
         else:
-            # Base64 encoded image
-            image_content = {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_url_or_base64}"}}
+            # Base64 encoded image - normalize (rotate, grayscale, downscale) before upload
+            from services.image_normalizer import normalize_base64
+            normalized = normalize_base64(image_url_or_base64)
+            if normalized:
+                image_url = normalized.data_url()
+            else:
+                image_url = f"data:image/jpeg;base64,{image_url_or_base64}"
+            image_content = {"type": "image_url", "image_url": {"url": image_url}}
 
         hint_text = ""
         if subject_hint:
@@ -2662,31 +2669,49 @@ def scan_gmail_for_new_receipts(account_email, since_date='2024-09-01'):
         new_receipts = []
         learned_patterns = get_learned_rejection_patterns()
 
-        for msg in messages:
-            try:
-                # Get full message
-                msg_data = service.users().messages().get(
-                    userId='me',
-                    id=msg['id'],
-                    format='full'
-                ).execute()
+        # Pass 1: headers + snippet only, in batches. Only messages the cheap
+        # filters can't rule out are fetched in full.
+        metadata = fetch_messages(service, [m['id'] for m in messages],
+                                  format='metadata', metadata_headers=METADATA_HEADERS)
+        candidates = {}
+        for msg_id, meta in metadata.items():
+            subject = get_header(meta, 'Subject')
+            from_email = get_header(meta, 'From')
+
+            # Parse from email
+            from_clean = re.findall(r'<(.+?)>', from_email)
+            from_email_clean = from_clean[0] if from_clean else from_email
+            domain = from_email_clean.split('@')[-1] if '@' in from_email_clean else ''
+
+            # Check if previously rejected domain
+            if 'domain' in learned_patterns and domain in learned_patterns['domain']:
+                print(f"   ⊘ Skipping {subject[:40]} - learned rejection pattern")
+                continue
+
+            # An attachment only adds to the score, so a message that fails
+            # even assuming one can't be a receipt
+            is_receipt, confidence = is_likely_receipt(subject, from_email_clean, meta.get('snippet', ''), True)
+            if not is_receipt:
+                print(f"   ⊘ Filtered out: {subject[:40]} (confidence: {confidence}%)")
+                continue
+            candidates[msg_id] = confidence
+
+        # Pass 2: full messages for the candidates
+        full_messages = fetch_messages(service, list(candidates))
+        print(f"   Fetched {len(full_messages)} of {len(messages)} messages in full")
 
+        for msg_id, msg_data in full_messages.items():
+            try:
                 # Extract metadata
-                headers = msg_data.get('payload', {}).get('headers', [])
-                subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), '')
-                from_email = next((h['value'] for h in headers if h['name'].lower() == 'from'), '')
-                date_str = next((h['value'] for h in headers if h['name'].lower() == 'date'), '')
+                subject = get_header(msg_data, 'Subject')
+                from_email = get_header(msg_data, 'From')
+                date_str = get_header(msg_data, 'Date')
 
                 # Parse from email
                 from_clean = re.findall(r'<(.+?)>', from_email)
                 from_email_clean = from_clean[0] if from_clean else from_email
                 domain = from_email_clean.split('@')[-1] if '@' in from_email_clean else ''
 
-                # Check if previously rejected domain
-                if 'domain' in learned_patterns and domain in learned_patterns['domain']:
-                    print(f"   ⊘ Skipping {subject[:40]} - learned rejection pattern")
-                    continue
-
                 # Get snippet
                 snippet = msg_data.get('snippet', '')
 
@@ -2725,8 +2750,11 @@ def scan_gmail_for_new_receipts(account_email, since_date='2024-09-01'):
 
                 has_attachment = len(attachments) > 0
 
-                # Smart filtering
-                is_receipt, confidence = is_likely_receipt(subject, from_email_clean, snippet, has_attachment)
+                # Smart filtering (pass 1 already scored it with an attachment)
+                if has_attachment:
+                    is_receipt, confidence = True, candidates[msg_id]
+                else:
+                    is_receipt, confidence = is_likely_receipt(subject, from_email_clean, snippet, has_attachment)
 
                 if not is_receipt:
                     print(f"   ⊘ Filtered out: {subject[:40]} (confidence: {confidence}%)")
@@ -2753,7 +2781,7 @@ def scan_gmail_for_new_receipts(account_email, since_date='2024-09-01'):
                             try:
                                 # Download attachment
                                 att_data = download_gmail_attachment(
-                                    service, msg['id'], att['attachment_id'], att['filename']
+                                    service, msg_id, att['attachment_id'], att['filename']
                                 )
                                 if att_data:
                                     # Convert to base64 for Vision API
@@ -2957,7 +2985,7 @@ def scan_gmail_for_new_receipts(account_email, since_date='2024-09-01'):
 
                 # Store receipt data - include ALL items even marketing/junk (user can decide)
                 receipt_data = {
-                    'email_id': msg['id'],
+                    'email_id': msg_id,
                     'gmail_account': account_email,
                     'subject': subject,
                     'from_email': from_email_clean,
@@ -3210,20 +3238,29 @@ def scan_gmail_intelligent(account_email, since_date=None, max_results=100):
             'already_exists': 0,
         }
 
-        for msg in messages:
-            try:
-                # Get full message
-                msg_data = service.users().messages().get(
-                    userId='me',
-                    id=msg['id'],
-                    format='full'
-                ).execute()
+        # Pass 1: headers only, in batches. Blocked domains are decided by
+        # the sender alone, so their bodies are never fetched.
+        metadata = fetch_messages(service, [m['id'] for m in messages],
+                                  format='metadata', metadata_headers=METADATA_HEADERS)
+        candidate_ids = []
+        for msg_id, meta in metadata.items():
+            domain = engine.extract_domain(get_header(meta, 'From'))
+            if domain and engine.is_blocked_domain(domain):
+                stats['blocked'] += 1
+                print(f"   🚫 BLOCKED: {domain[:30]} - {get_header(meta, 'Subject')[:40]}")
+                continue
+            candidate_ids.append(msg_id)
+
+        # Pass 2: full messages for everything else
+        full_messages = fetch_messages(service, candidate_ids)
+        print(f"   Fetched {len(full_messages)} of {len(messages)} messages in full")
 
+        for msg_id, msg_data in full_messages.items():
+            try:
                 # Extract metadata
-                headers = msg_data.get('payload', {}).get('headers', [])
-                subject = next((h['value'] for h in headers if h['name'].lower() == 'subject'), '')
-                from_email = next((h['value'] for h in headers if h['name'].lower() == 'from'), '')
-                date_str = next((h['value'] for h in headers if h['name'].lower() == 'date'), '')
+                subject = get_header(msg_data, 'Subject')
+                from_email = get_header(msg_data, 'From')
+                date_str = get_header(msg_data, 'Date')
 
                 # Clean from email
                 from_clean = re.findall(r'<(.+?)>', from_email)
@@ -3252,7 +3289,7 @@ def scan_gmail_intelligent(account_email, since_date=None, max_results=100):
 
                 # Build candidate for analysis
                 candidate = ReceiptCandidate(
-                    email_id=msg['id'],
+                    email_id=msg_id,
                     from_email=from_email_clean,
                     from_domain=domain,
                     subject=subject,
@@ -3304,7 +3341,7 @@ def scan_gmail_intelligent(account_email, since_date=None, max_results=100):
 
                 # Build receipt data
                 receipt_data = {
-                    'email_id': msg['id'],
+                    'email_id': msg_id,
                     'gmail_account': account_email,
                     'subject': subject,
                     'from_email': from_email_clean,
@@ -3796,6 +3833,8 @@ def reprocess_pending_receipts(limit=50, skip_with_amount=True):
             stats['skipped'] += len(account_receipts)
             continue
 
+        full_messages = fetch_messages(service, [r['email_id'] for r in account_receipts])
+
         for receipt in account_receipts:
             receipt_id = receipt['id']
             email_id = receipt['email_id']
@@ -3807,10 +3846,9 @@ def reprocess_pending_receipts(limit=50, skip_with_amount=True):
             print(f"\n   📨 #{receipt_id}: {subject[:50]}...")
 
             try:
-                # Fetch full email
-                msg_data = service.users().messages().get(
-                    userId='me', id=email_id, format='full'
-                ).execute()
+                msg_data = full_messages.get(email_id)
+                if msg_data is None:
+                    raise ValueError(f"Could not fetch email {email_id}")
 
                 payload = msg_data.get('payload', {})
 
@@ -0,0 +1,181 @@
+"""
+Local Receipt Index
+-------------------
+
+Amount-bucketed index over the local receipts folder, used by
+ai_receipt_locator.find_best_receipt so a lookup only scores receipts whose
+amount could possibly match instead of every file in the folder.
+
+Each receipt's metadata (cache / master CSV / vision, via the loader passed
+in) is read once when the file first appears. Entries are kept in
+whole-dollar buckets by total and by subtotal (for the restaurant-tip
+path). The folder is re-listed only when its mtime changes, and then only
+new or removed files are processed.
+
+Files replaced in place under the same name do not change the folder
+mtime; call refresh(force=True) after rewriting one.
+"""
+
+import math
+import os
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+RECEIPT_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+# find_best_receipt: score = 0.5*amount + 0.3*merchant + 0.2*date must reach
+# 0.70, so amount_score >= 0.4, i.e. diff <= 0.6 * scale
+AMOUNT_WINDOW = 0.6
+AMOUNT_SLACK = 0.01  # Float rounding at the window edges
+
+# Restaurant tip path: charge is 15-25% over the receipt subtotal
+TIP_LOW = 1.15
+TIP_HIGH = 1.25
+
+
+def amount_scale(amount: float) -> float:
+    """Amount tolerance used by find_best_receipt: $0.50 or 2%."""
+    return max(0.50, 0.02 * abs(amount))
+
+
+class LocalReceiptIndex:
+    """Incrementally refreshed amount index over a receipts directory."""
+
+    def __init__(
+        self,
+        receipt_dir: Path,
+        meta_loader: Callable[[str], Optional[dict]],
+        parse_amount: Callable = float,
+        parse_date: Callable = None,
+    ):
+        self.receipt_dir = Path(receipt_dir)
+        self.meta_loader = meta_loader
+        self.parse_amount = parse_amount
+        self.parse_date = parse_date
+
+        self._meta: Dict[str, dict] = {}
+        self._dates: Dict[str, Optional[date]] = {}
+        self._amounts: Dict[str, Tuple[float, float]] = {}
+        self._total_buckets: Dict[int, Set[str]] = {}
+        self._subtotal_buckets: Dict[int, Set[str]] = {}
+        self._files: Set[str] = set()
+        self._dir_mtime: Optional[int] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._meta)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def refresh(self, force: bool = False) -> bool:
+        """Pick up added/removed files. Returns True if the folder was re-listed."""
+        with self._lock:
+            try:
+                mtime = self.receipt_dir.stat().st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+
+            if not force and mtime is not None and mtime == self._dir_mtime:
+                return False
+
+            names = set()
+            if mtime is not None:
+                names = {
+                    name for name in os.listdir(self.receipt_dir)
+                    if name.lower().endswith(RECEIPT_EXTENSIONS)
+                }
+
+            added = names if force else names - self._files
+            for name in self._files - names:
+                self.remove(name)
+            for name in sorted(added):
+                self.add(name)
+
+            self._files = names
+            self._dir_mtime = mtime
+            return True
+
+    def add(self, filename: str):
+        """Load a file's metadata and (re-)index it."""
+        meta = self.meta_loader(filename)
+        with self._lock:
+            self.remove(filename)
+            self._files.add(filename)
+            if not meta:
+                return
+
+            total = self.parse_amount(meta.get("total_amount") or 0)
+            subtotal = self.parse_amount(meta.get("subtotal_amount") or 0)
+
+            self._meta[filename] = meta
+            self._amounts[filename] = (total, subtotal)
+            self._dates[filename] = (
+                self.parse_date(meta.get("receipt_date") or "") if self.parse_date else None
+            )
+            if total:
+                self._total_buckets.setdefault(math.floor(total), set()).add(filename)
+            if subtotal > 0:
+                self._subtotal_buckets.setdefault(math.floor(subtotal), set()).add(filename)
+
+    def remove(self, filename: str):
+        """Drop a file from the index."""
+        with self._lock:
+            self._files.discard(filename)
+            if self._meta.pop(filename, None) is None:
+                return
+            self._dates.pop(filename, None)
+            total, subtotal = self._amounts.pop(filename)
+            for buckets, amount in ((self._total_buckets, total), (self._subtotal_buckets, subtotal)):
+                bucket = buckets.get(math.floor(amount))
+                if bucket is not None:
+                    bucket.discard(filename)
+                    if not bucket:
+                        del buckets[math.floor(amount)]
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _collect(buckets: Dict[int, Set[str]], low: float, high: float) -> Set[str]:
+        found: Set[str] = set()
+        for key in range(math.floor(low), math.floor(high) + 1):
+            found |= buckets.get(key, set())
+        return found
+
+    def candidates(self, amount: float) -> List[Tuple[str, dict]]:
+        """
+        Receipts whose total (or tip-adjusted subtotal) can score for `amount`.
+
+        Returns:
+            [(filename, meta)] in filename order
+        """
+        if not amount:
+            return []
+
+        window = AMOUNT_WINDOW * amount_scale(amount) + AMOUNT_SLACK
+        with self._lock:
+            names = {
+                name for name in self._collect(
+                    self._total_buckets, amount - window, amount + window
+                )
+                if abs(self._amounts[name][0] - amount) <= window
+            }
+
+            if amount > 0:
+                sub_low = amount / TIP_HIGH - AMOUNT_SLACK
+                sub_high = amount / TIP_LOW + AMOUNT_SLACK
+                names |= {
+                    name for name in self._collect(self._subtotal_buckets, sub_low, sub_high)
+                    if sub_low <= self._amounts[name][1] <= sub_high
+                }
+
+            return [(name, self._meta[name]) for name in sorted(names)]
+
+    def receipt_date(self, filename: str) -> Optional[date]:
+        """Parsed receipt date for an indexed file."""
+        return self._dates.get(filename)
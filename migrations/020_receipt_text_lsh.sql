@@ -0,0 +1,17 @@
+-- Migration 020: MinHash/LSH band index for OCR text duplicate detection
+-- Created: 2026-10-16
+-- Purpose: Let DuplicateDetector find near-duplicate OCR text across the whole
+--          receipt library with one indexed lookup (see services/text_lsh.py)
+
+CREATE TABLE IF NOT EXISTS receipt_library_text_lsh (
+    receipt_id INT NOT NULL,
+    band TINYINT UNSIGNED NOT NULL,
+    bucket BIGINT NOT NULL,
+    PRIMARY KEY (receipt_id, band),
+    INDEX idx_band_bucket (band, bucket)
+);
+
+-- Existing receipts are indexed by DuplicateDetector.backfill_text_index(),
+-- which each app process starts in the background on its first text lookup
+
+-- ROLLBACK: DROP TABLE receipt_library_text_lsh;
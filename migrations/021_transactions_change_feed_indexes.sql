@@ -0,0 +1,18 @@
+-- Migration 021: Indexes for the transactions DataFrame cache change feed
+-- Created: 2026-10-16
+-- Purpose: get_transactions_watermark (MAX(updated_at), COUNT(*)) and
+--          get_transactions_changed_since (updated_at >= ?) run on every cache
+--          TTL refresh; without these they scan the whole transactions table
+
+-- Per-user watermark and changed rows
+CREATE INDEX idx_user_updated ON transactions(user_id, updated_at);
+
+-- Unscoped watermark and changed rows (all users)
+CREATE INDEX idx_updated_at ON transactions(updated_at);
+
+-- These indexes optimize queries like:
+-- SELECT MAX(updated_at), MAX(_index), COUNT(*) FROM transactions WHERE user_id = ?
+-- SELECT * FROM transactions WHERE _index > ? AND user_id = ?
+--   UNION SELECT * FROM transactions WHERE updated_at >= ? AND user_id = ?
+
+-- ROLLBACK: DROP INDEX idx_user_updated ON transactions; DROP INDEX idx_updated_at ON transactions;
@@ -9,6 +9,7 @@ from .extractor import (
     batch_process_receipts,
     set_primary_method,
     extract_with_donut,
+    extract_batch_with_donut,
 )
 from .donut_extractor import DonutReceiptExtractor, get_donut_extractor
 from .validation import (
@@ -27,6 +28,7 @@ __all__ = [
     "batch_process_receipts",
     "set_primary_method",
     "extract_with_donut",
+    "extract_batch_with_donut",
     "validate_extraction",
     "batch_validate",
     "ValidationConfig",
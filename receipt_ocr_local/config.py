@@ -24,6 +24,14 @@ class OCRConfig:
     enhance_contrast: bool = True
     target_width: int = 2000
 
+    # Skip denoise/contrast per image when quick quality metrics say they're not needed
+    adaptive_stages: bool = False
+    denoise_min_noise: float = 3.0      # Estimated noise sigma below this skips denoise
+    contrast_skip_range: float = 150.0  # 1st-99th percentile gray range at or above this skips CLAHE
+
+    # ReceiptPreprocessor.process_batch worker processes (0 = one per CPU)
+    preprocess_workers: int = 0
+
     # OCR Layer (DISABLED - compatibility issues on Python 3.14)
     use_paddle_ocr: bool = False
     paddle_lang: str = 'en'
@@ -11,7 +11,7 @@ from typing import Dict
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 # Import Donut extractor (primary)
-from .donut_extractor import extract_with_donut, get_donut_extractor
+from .donut_extractor import extract_with_donut, extract_batch_with_donut, get_donut_extractor
 from .validation import validate_extraction, batch_validate, ValidationConfig
 
 # Import ensemble OCR (fallback)
@@ -31,16 +31,15 @@ except ImportError:
     except ImportError:
         ENSEMBLE_AVAILABLE = False
 
-# Global instances
-_ocr_instance = None
+from services.ocr_engine_registry import get_ocr_engine_registry
+
 _use_donut = True  # Primary method
 
 def get_ocr():
-    """Get or create global ensemble OCR instance"""
-    global _ocr_instance
-    if _ocr_instance is None and ENSEMBLE_AVAILABLE:
-        _ocr_instance = UltimateFreeOCR()
-    return _ocr_instance
+    """Get the process-wide ensemble OCR instance (None if not installed)"""
+    if not ENSEMBLE_AVAILABLE:
+        return None
+    return get_ocr_engine_registry().get('ensemble')
 
 
 def extract_receipt_fields_local(image_path: str, config=None) -> Dict:
@@ -84,41 +83,17 @@ def extract_receipt_fields_local(image_path: str, config=None) -> Dict:
 
     use_donut = config.get('use_donut', _use_donut)
     fallback_to_ensemble = config.get('fallback_to_ensemble', True)
-    run_validation = config.get('validate', False)
-
-    result = None
-
-    def _maybe_validate(res):
-        """Apply validation if enabled"""
-        if run_validation and res.get('success'):
-            return validate_extraction(res)
-        return res
 
     # Try Donut first (primary method)
     if use_donut:
         try:
             result = extract_with_donut(image_path)
-
-            # Check if extraction was successful
-            if result.get('success') and result.get('confidence_score', 0) >= 0.5:
-                return _maybe_validate(result)
-
-            # Donut failed or low confidence - try fallback
-            if fallback_to_ensemble and ENSEMBLE_AVAILABLE:
-                print(f"Donut confidence {result.get('confidence_score', 0):.2f} < 0.5, trying ensemble...")
-                ensemble_result = _extract_with_ensemble(image_path)
-
-                # Use ensemble if it's better
-                if ensemble_result.get('confidence_score', 0) > result.get('confidence_score', 0):
-                    ensemble_result['donut_tried'] = True
-                    return _maybe_validate(ensemble_result)
-
-            return _maybe_validate(result)
+            return _finish_donut_result(image_path, result, config)
 
         except Exception as e:
             print(f"Donut extraction failed: {e}")
             if fallback_to_ensemble and ENSEMBLE_AVAILABLE:
-                return _maybe_validate(_extract_with_ensemble(image_path))
+                return _maybe_validate(_extract_with_ensemble(image_path), config)
             else:
                 return {
                     "error": str(e),
@@ -129,7 +104,7 @@ def extract_receipt_fields_local(image_path: str, config=None) -> Dict:
 
     # Use ensemble directly if Donut disabled
     if ENSEMBLE_AVAILABLE:
-        return _maybe_validate(_extract_with_ensemble(image_path))
+        return _maybe_validate(_extract_with_ensemble(image_path), config)
 
     return {
         "error": "No OCR method available",
@@ -138,6 +113,32 @@ def extract_receipt_fields_local(image_path: str, config=None) -> Dict:
     }
 
 
+def _maybe_validate(result: Dict, config: Dict) -> Dict:
+    """Apply validation if enabled"""
+    if config.get('validate', False) and result.get('success'):
+        return validate_extraction(result)
+    return result
+
+
+def _finish_donut_result(image_path: Path, result: Dict, config: Dict) -> Dict:
+    """Accept a Donut result, or fall back to ensemble OCR if it is low confidence"""
+    # Check if extraction was successful
+    if result.get('success') and result.get('confidence_score', 0) >= 0.5:
+        return _maybe_validate(result, config)
+
+    # Donut failed or low confidence - try fallback
+    if config.get('fallback_to_ensemble', True) and ENSEMBLE_AVAILABLE:
+        print(f"Donut confidence {result.get('confidence_score', 0):.2f} < 0.5, trying ensemble...")
+        ensemble_result = _extract_with_ensemble(image_path)
+
+        # Use ensemble if it's better
+        if ensemble_result.get('confidence_score', 0) > result.get('confidence_score', 0):
+            ensemble_result['donut_tried'] = True
+            return _maybe_validate(ensemble_result, config)
+
+    return _maybe_validate(result, config)
+
+
 def _extract_with_ensemble(image_path: Path) -> Dict:
     """Extract using ensemble OCR (PaddleOCR + EasyOCR + Tesseract)"""
 
@@ -203,30 +204,46 @@ def process_receipt_for_row(receipt_path: str, transaction_row: Dict = None, con
     return result
 
 
-def batch_process_receipts(receipt_paths: list, config=None) -> list:
+def batch_process_receipts(receipt_paths: list, config=None, batch_size: int = None) -> list:
     """
     Process multiple receipts in batch.
 
+    Donut runs over all existing files first with batched inference
+    (batch_size images per forward pass); low-confidence results then go
+    through the same ensemble fallback as extract_receipt_fields_local.
+
     Args:
         receipt_paths: List of receipt file paths
         config: OCR configuration
+        batch_size: Images per Donut forward pass (default: DONUT_BATCH_SIZE)
 
     Returns:
         List of results
     """
+    config = config or {}
     results = []
 
-    # Pre-load Donut model for efficiency
-    if config is None or config.get('use_donut', True):
+    donut_results = {}
+    if config.get('use_donut', _use_donut):
+        existing = [str(path) for path in receipt_paths if Path(path).exists()]
         try:
             extractor = get_donut_extractor()
-            extractor.load()
+            batched = extractor.extract_batch(
+                existing,
+                batch_size=batch_size,
+                progress_callback=lambda done, total: print(f"Donut [{done}/{total}]"),
+            )
+            donut_results = dict(zip(existing, batched))
         except Exception as e:
-            print(f"Warning: Could not pre-load Donut: {e}")
+            print(f"Warning: Batched Donut inference failed, processing one at a time: {e}")
 
     for i, path in enumerate(receipt_paths):
         print(f"Processing [{i+1}/{len(receipt_paths)}]: {path}")
-        result = extract_receipt_fields_local(path, config)
+        donut_result = donut_results.get(str(path))
+        if donut_result is not None:
+            result = _finish_donut_result(Path(path), donut_result, config)
+        else:
+            result = extract_receipt_fields_local(path, config)
         results.append(result)
 
     return results
@@ -246,6 +263,7 @@ __all__ = [
     'batch_process_receipts',
     'set_primary_method',
     'extract_with_donut',
+    'extract_batch_with_donut',
     'validate_extraction',
     'batch_validate',
     'ValidationConfig',
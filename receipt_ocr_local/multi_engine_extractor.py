@@ -51,18 +51,19 @@ class MultiEngineExtractor:
     """
 
     def __init__(self):
-        self.donut = get_donut_extractor()
         self._tesseract_available = self._check_tesseract()
-        self._easyocr_reader = None  # Lazy load for EasyOCR
+
+    @property
+    def donut(self) -> DonutReceiptExtractor:
+        """Shared Donut extractor (fetched per use so idle eviction can free it)"""
+        return get_donut_extractor()
 
     def _get_easyocr_reader(self):
-        """Get or create EasyOCR reader (lazy loading)"""
+        """Get the shared EasyOCR reader (supports handwriting), loading on first use"""
         if not EASYOCR_AVAILABLE:
             return None
-        if self._easyocr_reader is None:
-            logger.info("Loading EasyOCR reader (supports handwriting)...")
-            self._easyocr_reader = easyocr.Reader(['en'], gpu=False)
-        return self._easyocr_reader
+        from services.ocr_engine_registry import get_ocr_engine_registry
+        return get_ocr_engine_registry().get('easyocr')
 
     def _check_tesseract(self) -> bool:
         """Check if Tesseract is available"""
@@ -2,37 +2,116 @@
 Receipt Image Preprocessing - OpenCV Only
 Improves receipt images before Vision AI processing
 """
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 import cv2
 import numpy as np
 from pathlib import Path
-from typing import Tuple, Dict
+from typing import Tuple, Dict, List, Optional
 from PIL import Image, ExifTags
 
+# Per-process preprocessor for process_batch workers
+_worker_preprocessor = None
+
+
+def _init_worker(config):
+    """Pool initializer: one preprocessor per worker, single-threaded OpenCV"""
+    global _worker_preprocessor
+    cv2.setNumThreads(1)  # Parallelism comes from the pool
+    _worker_preprocessor = ReceiptPreprocessor(config)
+
+
+def _process_to_shared_memory(image_path: str, adaptive: Optional[bool]):
+    """
+    Worker: preprocess one image and hand the pixels back via shared memory.
+
+    Returns (shm_name, shape, dtype, metadata); the parent copies the array
+    out and unlinks the block. Errors come back as (None, None, None, metadata).
+    """
+    try:
+        img, metadata = _worker_preprocessor.process(image_path, adaptive=adaptive)
+    except Exception as e:
+        return None, None, None, {'error': str(e), 'steps_applied': []}
+
+    shm = shared_memory.SharedMemory(create=True, size=max(img.nbytes, 1))
+    np.ndarray(img.shape, dtype=img.dtype, buffer=shm.buf)[...] = img
+    shm.close()
+    return shm.name, img.shape, img.dtype.str, metadata
+
+
+def _read_shared_memory(name: str, shape, dtype) -> np.ndarray:
+    """Copy an array out of a worker's shared memory block and free it"""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _discard_shared_memory(future):
+    """Free the block of a finished worker whose result was never read"""
+    if future.cancelled() or future.exception() is not None:
+        return
+    name = future.result()[0]
+    if not name:
+        return
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return  # Already unlinked by _read_shared_memory
+    shm.close()
+    shm.unlink()
+
+
 class ReceiptPreprocessor:
     """Preprocesses receipt images using OpenCV"""
 
     def __init__(self, config):
         self.config = config
 
-    def process(self, image_path: str) -> Tuple[np.ndarray, Dict]:
+    def process(self, image_path: str, adaptive: Optional[bool] = None) -> Tuple[np.ndarray, Dict]:
         """
         Main preprocessing pipeline
 
+        Args:
+            image_path: Path to receipt image
+            adaptive: Skip denoise/contrast when quality metrics say the image
+                doesn't need them (default: config.adaptive_stages)
+
         Returns:
             (preprocessed_image, metadata)
         """
+        if adaptive is None:
+            adaptive = self.config.adaptive_stages
+
         metadata = {
             'original_size': None,
             'final_size': None,
             'rotation_deg': 0,
             'skew_angle': 0.0,
-            'steps_applied': []
+            'steps_applied': [],
+            'steps_skipped': []
         }
 
         # Load with EXIF rotation
         img = self._load_with_exif(image_path)
         metadata['original_size'] = img.shape[:2]
 
+        denoise = self.config.denoise
+        enhance_contrast = self.config.enhance_contrast
+        if adaptive:
+            quality = self._quality_metrics(img)
+            metadata['quality'] = quality
+            if denoise and quality['noise_sigma'] < self.config.denoise_min_noise:
+                denoise = False
+                metadata['steps_skipped'].append('denoise')
+            if enhance_contrast and quality['contrast'] >= self.config.contrast_skip_range:
+                enhance_contrast = False
+                metadata['steps_skipped'].append('contrast')
+
         # Auto-rotate (detect text orientation)
         if self.config.auto_rotate:
             img, rotation = self._auto_rotate(img)
@@ -55,7 +134,7 @@ class ReceiptPreprocessor:
                 metadata['steps_applied'].append('perspective_corrected')
 
         # Denoise
-        if self.config.denoise:
+        if denoise:
             img = self._denoise(img)
             metadata['steps_applied'].append('denoised')
 
@@ -69,7 +148,7 @@ class ReceiptPreprocessor:
         img = self._crop_borders(img)
 
         # Enhance contrast
-        if self.config.enhance_contrast:
+        if enhance_contrast:
             img = self._enhance_contrast(img)
             metadata['steps_applied'].append('contrast_enhanced')
 
@@ -81,6 +160,85 @@ class ReceiptPreprocessor:
 
         return img, metadata
 
+    def process_batch(self, image_paths: List[str], max_workers: Optional[int] = None,
+                      adaptive: Optional[bool] = None) -> List[Tuple[Optional[np.ndarray], Dict]]:
+        """
+        Preprocess many images in parallel worker processes.
+
+        Each worker writes its output into a shared memory block instead of
+        pickling the array back through the pool's pipe. Results are in input
+        order; an image that fails comes back as (None, {'error': ...}).
+
+        Args:
+            image_paths: Receipt image paths
+            max_workers: Worker processes (default: config.preprocess_workers or CPU count)
+            adaptive: Per-image stage skipping (default: config.adaptive_stages)
+        """
+        image_paths = [str(p) for p in image_paths]
+        max_workers = max_workers or self.config.preprocess_workers or os.cpu_count() or 1
+        max_workers = min(max_workers, len(image_paths))
+
+        if max_workers <= 1:
+            results = []
+            for path in image_paths:
+                try:
+                    results.append(self.process(path, adaptive=adaptive))
+                except Exception as e:
+                    results.append((None, {'error': str(e), 'steps_applied': []}))
+            return results
+
+        # spawn: forking a process with OpenCV's thread pool running can deadlock
+        context = multiprocessing.get_context('spawn')
+        futures = []
+        results = []
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                                     initializer=_init_worker, initargs=(self.config,)) as pool:
+                futures = [pool.submit(_process_to_shared_memory, path, adaptive) for path in image_paths]
+                try:
+                    for future in futures:
+                        name, shape, dtype, metadata = future.result()
+                        img = _read_shared_memory(name, shape, dtype) if name else None
+                        results.append((img, metadata))
+                except BaseException:
+                    for future in futures:
+                        future.cancel()  # Don't start images nobody will collect
+                    raise
+        finally:
+            # The pool has shut down, so every remaining future is finished or
+            # cancelled; unlink the blocks that were never read
+            for future in futures[len(results):]:
+                _discard_shared_memory(future)
+        return results
+
+    def _quality_metrics(self, img: np.ndarray) -> Dict:
+        """
+        Cheap image statistics used to skip stages in adaptive mode.
+
+        noise_sigma: Immerkaer's noise estimate on a full-resolution center
+            crop (downsampling would average the noise away), using the
+            median response so text edges don't count as noise
+        contrast: 1st-99th percentile grayscale range
+        brightness: grayscale mean
+        """
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        h, w = gray.shape
+        ch, cw = min(h, 512), min(w, 512)
+        y, x = (h - ch) // 2, (w - cw) // 2
+        crop = gray[y:y + ch, x:x + cw].astype(np.float32)
+
+        kernel = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+        response = np.abs(cv2.filter2D(crop, -1, kernel))[1:-1, 1:-1]
+        # |response| is half-normal with scale 6 * sigma; its median is 0.6745 of that
+        noise_sigma = float(np.median(response) / (0.6745 * 6)) if response.size else 0.0
+        low, high = np.percentile(gray, [1, 99])
+
+        return {
+            'noise_sigma': round(noise_sigma, 2),
+            'contrast': round(float(high - low), 2),
+            'brightness': round(float(gray.mean()), 2),
+        }
+
     def _load_with_exif(self, image_path: str) -> np.ndarray:
         """Load image and apply EXIF rotation"""
         try:
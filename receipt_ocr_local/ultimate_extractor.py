@@ -9,17 +9,11 @@ from pathlib import Path
 from typing import Dict
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from ultimate_free_ocr import UltimateFreeOCR
-
-# Global OCR instance (initialized once)
-_ocr_instance = None
+from services.ocr_engine_registry import get_ocr_engine_registry
 
 def get_ocr():
-    """Get or create global OCR instance"""
-    global _ocr_instance
-    if _ocr_instance is None:
-        _ocr_instance = UltimateFreeOCR()
-    return _ocr_instance
+    """Get the process-wide ensemble OCR instance (shared with extractor.py)"""
+    return get_ocr_engine_registry().get('ensemble')
 
 def extract_receipt_fields_local(image_path: str, config=None) -> Dict:
     """
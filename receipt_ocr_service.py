@@ -5,7 +5,7 @@ Unified Receipt OCR Service - OPTIMIZED FOR BULK VERIFICATION
 - Fallback: Local Llama 3.2 Vision (Ollama)
 - Output: Mindee-compatible schema
 - CACHING: MySQL-backed OCR cache for 10x faster verification
-- BATCH: Process 500+ receipts efficiently
+- BATCH: Process 500+ receipts concurrently within per-provider rate budgets
 
 Integrates with:
 - /mobile-upload endpoint
@@ -19,11 +19,13 @@ import io
 import json
 import base64
 import re
+import copy
 import hashlib
 import time
 import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, Callable, Iterator
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -69,6 +71,9 @@ except ImportError:
     def get_openai_client():
         return None
 
+# Shared vision preprocessing (EXIF rotate, grayscale, downscale, re-encode)
+from services.image_normalizer import normalize_image, NormalizedImage
+
 # Database connection for caching
 _db_connection = None
 
@@ -85,12 +90,24 @@ def get_db():
 
 class OCRCache:
     """
-    OCR result cache backed by MySQL.
+    Two-tier OCR result cache.
     Stores extracted receipt data by file hash to avoid re-processing.
+
+    An in-process LRU sits in front of the MySQL ocr_cache table:
+    (path, size, mtime) -> file hash skips re-reading the file, and
+    file hash -> result skips the DB round trip. Both are capped at
+    OCR_MEMORY_CACHE_SIZE entries.
     """
 
-    def __init__(self):
+    MEMORY_CACHE_SIZE = int(os.environ.get('OCR_MEMORY_CACHE_SIZE', 2048))
+
+    def __init__(self, memory_size: int = None):
         self.db = get_db()
+        self.memory_size = self.MEMORY_CACHE_SIZE if memory_size is None else memory_size
+        self._hashes: 'OrderedDict[tuple, str]' = OrderedDict()
+        self._results: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'db_hits': 0, 'misses': 0, 'hashes_computed': 0}
         self._ensure_table()
 
     def _ensure_table(self):
@@ -125,27 +142,66 @@ class OCRCache:
             if conn:
                 self.db.return_connection(conn)
 
+    def _remember(self, store: OrderedDict, key, value):
+        """Insert into an LRU tier, evicting the oldest entries past the cap."""
+        store[key] = value
+        store.move_to_end(key)
+        while len(store) > self.memory_size:
+            store.popitem(last=False)
+
     def _compute_hash(self, file_path: str) -> str:
-        """Compute SHA256 hash of file contents"""
-        path = Path(file_path)
-        if not path.exists():
+        """SHA256 of file contents, memoized by (path, size, mtime)"""
+        try:
+            st = os.stat(file_path)
+        except OSError:
             return ""
 
+        key = (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+        with self._memory_lock:
+            file_hash = self._hashes.get(key)
+            if file_hash:
+                self._hashes.move_to_end(key)
+                return file_hash
+
         sha256 = hashlib.sha256()
-        with open(path, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
                 sha256.update(chunk)
-        return sha256.hexdigest()
+        file_hash = sha256.hexdigest()
 
-    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
-        """Get cached OCR result for file"""
-        if not self.db:
-            return None
+        with self._memory_lock:
+            self._stats['hashes_computed'] += 1
+            self._remember(self._hashes, key, file_hash)
+        return file_hash
 
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Get cached OCR result for file (memory first, then MySQL)"""
         file_hash = self._compute_hash(file_path)
         if not file_hash:
             return None
 
+        with self._memory_lock:
+            data = self._results.get(file_hash)
+            if data is not None:
+                self._results.move_to_end(file_hash)
+                self._stats['memory_hits'] += 1
+                return copy.deepcopy(data)
+
+        data = self._get_from_db(file_hash)
+
+        with self._memory_lock:
+            if data is None:
+                self._stats['misses'] += 1
+                return None
+            self._stats['db_hits'] += 1
+            self._remember(self._results, file_hash, copy.deepcopy(data))
+        return data
+
+    def _get_from_db(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Look up a result in the ocr_cache table by file hash"""
+        if not self.db:
+            return None
+
         conn = None
         try:
             conn = self.db.get_connection()
@@ -171,13 +227,16 @@ class OCRCache:
 
     def set(self, file_path: str, data: Dict[str, Any]):
         """Cache OCR result for file"""
-        if not self.db:
-            return
-
         file_hash = self._compute_hash(file_path)
         if not file_hash:
             return
 
+        with self._memory_lock:
+            self._remember(self._results, file_hash, copy.deepcopy(data))
+
+        if not self.db:
+            return
+
         conn = None
         try:
             conn = self.db.get_connection()
@@ -219,10 +278,30 @@ class OCRCache:
             if conn:
                 self.db.return_connection(conn)
 
+    def memory_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and sizes for the in-process tier"""
+        with self._memory_lock:
+            stats = dict(self._stats)
+            stats.update({
+                "entries": len(self._results),
+                "hashes": len(self._hashes),
+                "max_entries": self.memory_size,
+            })
+        lookups = stats['memory_hits'] + stats['db_hits'] + stats['misses']
+        stats["hit_rate"] = round((stats['memory_hits'] + stats['db_hits']) / lookups, 3) if lookups else 0.0
+        return stats
+
+    def clear_memory(self):
+        """Drop the in-process tier (the MySQL table is untouched)"""
+        with self._memory_lock:
+            self._hashes.clear()
+            self._results.clear()
+
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
+        memory = self.memory_stats()
         if not self.db:
-            return {"enabled": False, "count": 0}
+            return {"enabled": False, "count": 0, "memory": memory}
 
         conn = None
         try:
@@ -230,9 +309,9 @@ class OCRCache:
             cursor = conn.cursor()
             cursor.execute("SELECT COUNT(*) as cnt FROM ocr_cache")
             row = cursor.fetchone()
-            return {"enabled": True, "count": row['cnt'] if row else 0}
+            return {"enabled": True, "count": row['cnt'] if row else 0, "memory": memory}
         except Exception as e:
-            return {"enabled": False, "error": str(e)}
+            return {"enabled": False, "error": str(e), "memory": memory}
         finally:
             if conn:
                 self.db.return_connection(conn)
@@ -338,6 +417,8 @@ class OCRCache:
         Run all cache cleanup operations.
         Returns dict with counts of entries removed by each method.
         """
+        # Evicted rows must not keep being served from memory
+        self.clear_memory()
         return {
             "old_entries": self.evict_old_entries(max_age_days),
             "size_limit": self.evict_by_size(max_entries),
@@ -422,6 +503,84 @@ class CircuitBreaker:
             }
 
 
+# Per-provider request budgets: (requests per minute, max in flight).
+# Override with OCR_<PROVIDER>_RPM / OCR_<PROVIDER>_CONCURRENCY.
+# An RPM of 0 means no rate limit (only the in-flight cap applies).
+PROVIDER_BUDGETS = {
+    'openai': (500, 8),   # gpt-4o-mini tier 1
+    'gemini': (15, 4),    # Gemini Flash free tier
+    'ollama': (0, 1),     # Local model, one request at a time
+}
+
+
+class ProviderBudget:
+    """
+    Token bucket plus in-flight cap for one OCR provider.
+    The bucket holds up to max_concurrent tokens and refills at the provider's
+    per-minute rate, so bursts never exceed what can run at once.
+    """
+
+    def __init__(self, requests_per_minute: float, max_concurrent: int):
+        self.rate = max(0.0, requests_per_minute) / 60.0
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.tokens = float(self.max_concurrent)
+        self.in_flight = 0
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate:
+            self.tokens = min(self.max_concurrent, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a token and an in-flight slot if both are available."""
+        with self._lock:
+            self._refill()
+            if self.in_flight >= self.max_concurrent:
+                return False
+            if self.rate:
+                if self.tokens < 1:
+                    return False
+                self.tokens -= 1
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        """Return the in-flight slot taken by try_acquire."""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    def wait_time(self) -> float:
+        """Seconds until the next token (0 if only the in-flight cap is limiting)."""
+        with self._lock:
+            self._refill()
+            if not self.rate or self.tokens >= 1:
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill()
+            return {
+                'requests_per_minute': self.rate * 60,
+                'max_concurrent': self.max_concurrent,
+                'in_flight': self.in_flight,
+                'tokens': round(self.tokens, 2),
+            }
+
+
+def build_provider_budgets() -> Dict[str, ProviderBudget]:
+    """Create provider budgets from PROVIDER_BUDGETS and env overrides."""
+    budgets = {}
+    for provider, (rpm, concurrency) in PROVIDER_BUDGETS.items():
+        rpm = float(os.getenv(f'OCR_{provider.upper()}_RPM', rpm))
+        concurrency = int(os.getenv(f'OCR_{provider.upper()}_CONCURRENCY', concurrency))
+        budgets[provider] = ProviderBudget(rpm, concurrency)
+    return budgets
+
+
 class ReceiptOCRService:
     """
     Production-ready receipt OCR with Mindee-quality extraction.
@@ -480,18 +639,23 @@ IMPORTANT:
 - Include ALL line items with their prices
 - Return ONLY valid JSON, no markdown, no explanation"""
 
-    def __init__(self, prefer_local: bool = False, use_cache: bool = True):
+    def __init__(self, prefer_local: bool = False, use_cache: bool = True,
+                 fallback_on_busy: bool = False):
         """
         Initialize OCR service.
 
         Args:
             prefer_local: If True, prefer Ollama over Gemini (for testing)
             use_cache: If True, use MySQL-backed cache for faster re-extraction
+            fallback_on_busy: If True, use the next provider while the preferred
+                one is over its rate budget instead of waiting for it
         """
         self.prefer_local = prefer_local
         self.use_cache = use_cache
+        self.fallback_on_busy = fallback_on_busy
         self.cache = get_ocr_cache() if use_cache else None
         self.circuit_breaker = CircuitBreaker(failure_threshold=5, timeout_seconds=300)
+        self.budgets = build_provider_budgets()
         self._validate_services()
 
     def _validate_services(self):
@@ -533,11 +697,13 @@ IMPORTANT:
         else:
             return Image.open(path).convert("RGB")
 
+    def _normalize(self, image: Image.Image) -> NormalizedImage:
+        """Provider-ready copy of the image (cached by content hash)"""
+        return normalize_image(image)
+
     def _image_to_base64(self, image: Image.Image) -> str:
-        """Convert PIL Image to base64 string"""
-        buffer = io.BytesIO()
-        image.save(buffer, format='PNG')
-        return base64.b64encode(buffer.getvalue()).decode()
+        """Convert PIL Image to a normalized base64 string"""
+        return self._normalize(image).base64()
 
     def _extract_with_openai(self, image: Image.Image) -> Optional[Dict[str, Any]]:
         """Extract using OpenAI Vision API (gpt-4o-mini) - primary provider"""
@@ -549,8 +715,8 @@ IMPORTANT:
             if not client:
                 return None
 
-            # Convert image to base64
-            img_base64 = self._image_to_base64(image)
+            # Normalize and encode image
+            image_url = self._normalize(image).data_url()
 
             response = client.chat.completions.create(
                 model="gpt-4o-mini",
@@ -558,7 +724,7 @@ IMPORTANT:
                     "role": "user",
                     "content": [
                         {"type": "text", "text": self.EXTRACTION_PROMPT},
-                        {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{img_base64}"}}
+                        {"type": "image_url", "image_url": {"url": image_url}}
                     ]
                 }],
                 max_tokens=1000,
@@ -580,7 +746,8 @@ IMPORTANT:
             return None
 
         try:
-            result = generate_content_with_fallback(self.EXTRACTION_PROMPT, image)
+            normalized = Image.open(io.BytesIO(self._normalize(image).data))
+            result = generate_content_with_fallback(self.EXTRACTION_PROMPT, normalized)
             if result:
                 return self._parse_json_response(result, "gemini")
         except Exception as e:
@@ -600,24 +767,33 @@ IMPORTANT:
 
         try:
             img_base64 = self._image_to_base64(image)
-
-            # Set 30 second timeout to prevent hanging
-            old_handler = signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(30)
-
-            try:
-                response = ollama.chat(
+            messages = [{
+                'role': 'user',
+                'content': self.EXTRACTION_PROMPT,
+                'images': [img_base64]
+            }]
+
+            if threading.current_thread() is not threading.main_thread():
+                # Batch worker thread: SIGALRM is main-thread only, use an HTTP timeout
+                response = ollama.Client(timeout=30).chat(
                     model='llama3.2-vision',
-                    messages=[{
-                        'role': 'user',
-                        'content': self.EXTRACTION_PROMPT,
-                        'images': [img_base64]
-                    }],
+                    messages=messages,
                     options={'temperature': 0}
                 )
-            finally:
-                signal.alarm(0)  # Cancel alarm
-                signal.signal(signal.SIGALRM, old_handler)  # Restore handler
+            else:
+                # Set 30 second timeout to prevent hanging
+                old_handler = signal.signal(signal.SIGALRM, timeout_handler)
+                signal.alarm(30)
+
+                try:
+                    response = ollama.chat(
+                        model='llama3.2-vision',
+                        messages=messages,
+                        options={'temperature': 0}
+                    )
+                finally:
+                    signal.alarm(0)  # Cancel alarm
+                    signal.signal(signal.SIGALRM, old_handler)  # Restore handler
 
             result = response['message']['content']
             return self._parse_json_response(result, "ollama")
@@ -825,6 +1001,10 @@ IMPORTANT:
         Extract receipt data from PIL Image.
         Uses circuit breaker pattern to skip failing providers.
 
+        Providers are tried in preference order. A provider over its rate
+        budget is waited for; the next provider is only used when it fails or
+        its circuit is open (or, with fallback_on_busy, while it is busy).
+
         Args:
             image: PIL Image object
 
@@ -848,27 +1028,47 @@ IMPORTANT:
                 ('ollama', self.ollama_ready, self._extract_with_ollama),
             ]
 
-        # Try each provider with circuit breaker protection
-        for provider_name, is_ready, extract_method in providers:
-            if not is_ready:
-                continue
+        # Try each provider with circuit breaker and rate budget protection
+        pending = [(name, method) for name, is_ready, method in providers if is_ready]
+        while pending:
+            attempted = False
+            for provider_name, extract_method in list(pending):
+                # Skip if circuit is open (provider failing too often)
+                if self.circuit_breaker.is_open(provider_name):
+                    print(f"⚡ Skipping {provider_name} (circuit open)")
+                    pending.remove((provider_name, extract_method))
+                    continue
 
-            # Skip if circuit is open (provider failing too often)
-            if self.circuit_breaker.is_open(provider_name):
-                print(f"⚡ Skipping {provider_name} (circuit open)")
-                continue
+                # Over budget right now - wait for it (or try the next provider)
+                budget = self.budgets.get(provider_name)
+                if budget and not budget.try_acquire():
+                    if self.fallback_on_busy:
+                        continue
+                    break
 
-            try:
-                result = extract_method(image)
-                if result and result.get('confidence', 0) > 0.3:
-                    self.circuit_breaker.record_success(provider_name)
-                    return result
-                else:
-                    # Low confidence counts as failure
+                pending.remove((provider_name, extract_method))
+                attempted = True
+                try:
+                    result = extract_method(image)
+                    if result and result.get('confidence', 0) > 0.3:
+                        self.circuit_breaker.record_success(provider_name)
+                        return result
+                    else:
+                        # Low confidence counts as failure
+                        self.circuit_breaker.record_failure(provider_name)
+                except Exception as e:
+                    print(f"⚠️ {provider_name} extraction failed: {e}")
                     self.circuit_breaker.record_failure(provider_name)
-            except Exception as e:
-                print(f"⚠️ {provider_name} extraction failed: {e}")
-                self.circuit_breaker.record_failure(provider_name)
+                finally:
+                    if budget:
+                        budget.release()
+                break
+
+            if pending and not attempted:
+                # The preferred provider (or, with fallback_on_busy, every one) is at its budget
+                busy = pending if self.fallback_on_busy else pending[:1]
+                wait = min(self.budgets[name].wait_time() for name, _ in busy)
+                time.sleep(min(max(wait, 0.05), 1.0))
 
         # Return empty result if extraction failed
         if not result:
@@ -976,15 +1176,51 @@ IMPORTANT:
 
     # ==================== BATCH PROCESSING ====================
 
+    def _batch_pool_size(self, max_workers: Optional[int] = None) -> int:
+        """Worker count: the in-flight budgets of all ready providers combined."""
+        ready = {
+            'openai': self.openai_ready,
+            'gemini': self.gemini_ready,
+            'ollama': self.ollama_ready,
+        }
+        size = sum(
+            budget.max_concurrent for name, budget in self.budgets.items() if ready.get(name)
+        ) or 1
+        return min(size, max_workers) if max_workers else size
+
+    def _run_batch(
+        self,
+        items: List[Any],
+        worker: Callable[[Any], Dict[str, Any]],
+        max_workers: Optional[int] = None
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Run worker over items concurrently.
+        Provider rate budgets in extract_from_image pace the actual API calls.
+
+        Yields:
+            (index, result) as each item completes
+        """
+        if not items:
+            return
+
+        with ThreadPoolExecutor(max_workers=self._batch_pool_size(max_workers)) as executor:
+            futures = {executor.submit(worker, item): i for i, item in enumerate(items)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
     def verify_batch(
         self,
         items: List[Dict[str, Any]],
-        max_workers: int = 4,
+        max_workers: Optional[int] = None,
         progress_callback: callable = None
     ) -> Dict[str, Any]:
         """
         Verify multiple receipts in batch for 10x faster bulk operations.
 
+        Receipts are verified concurrently; throughput is bounded by the
+        provider rate budgets (see PROVIDER_BUDGETS), not by serial latency.
+
         Args:
             items: List of dicts with keys:
                 - image_path: Path to receipt file
@@ -992,8 +1228,9 @@ IMPORTANT:
                 - amount: Expected amount (required)
                 - date: Expected date (optional)
                 - transaction_id: Optional ID for tracking
-            max_workers: Number of parallel workers (default 4)
-            progress_callback: Optional callback(completed, total, current_item)
+            max_workers: Cap on parallel workers (default: sum of provider budgets)
+            progress_callback: Optional callback(completed, total, current_item),
+                called from this thread as each receipt completes
 
         Returns:
             {
@@ -1001,31 +1238,27 @@ IMPORTANT:
                 "verified": 450,
                 "failed": 30,
                 "errors": 20,
-                "results": [...],
+                "results": [...],  # In input order
                 "duration_seconds": 45.2,
                 "avg_per_receipt": 0.09
             }
         """
         start_time = time.time()
-        results = []
+        results = [None] * len(items)
         verified = 0
         failed = 0
         errors = 0
 
-        # Process sequentially for API rate limiting
-        # (Gemini has 1500 req/day per key, parallel would hit limits faster)
-        for i, item in enumerate(items):
+        def verify_item(item: Dict[str, Any]) -> Dict[str, Any]:
             try:
                 image_path = item.get('image_path')
                 if not image_path or not Path(image_path).exists():
-                    results.append({
+                    return {
                         "transaction_id": item.get('transaction_id'),
                         "status": "error",
                         "error": "File not found",
                         "image_path": image_path
-                    })
-                    errors += 1
-                    continue
+                    }
 
                 expected = {
                     'merchant': item.get('merchant'),
@@ -1035,7 +1268,7 @@ IMPORTANT:
 
                 verification = self.verify_receipt(image_path, expected)
 
-                result = {
+                return {
                     "transaction_id": item.get('transaction_id'),
                     "image_path": image_path,
                     "status": "verified" if verification.get('overall_match') else "mismatch",
@@ -1049,26 +1282,28 @@ IMPORTANT:
                     }
                 }
 
-                results.append(result)
-
-                if verification.get('overall_match'):
-                    verified += 1
-                else:
-                    failed += 1
-
-                # Progress callback
-                if progress_callback:
-                    progress_callback(i + 1, len(items), result)
-
             except Exception as e:
-                results.append({
+                return {
                     "transaction_id": item.get('transaction_id'),
                     "image_path": item.get('image_path'),
                     "status": "error",
                     "error": str(e)
-                })
+                }
+
+        for completed, (index, result) in enumerate(self._run_batch(items, verify_item, max_workers), 1):
+            results[index] = result
+
+            if result['status'] == 'verified':
+                verified += 1
+            elif result['status'] == 'mismatch':
+                failed += 1
+            else:
                 errors += 1
 
+            # Progress callback
+            if progress_callback:
+                progress_callback(completed, len(items), result)
+
         duration = time.time() - start_time
         avg_time = duration / len(items) if items else 0
 
@@ -1085,21 +1320,25 @@ IMPORTANT:
     def extract_batch(
         self,
         image_paths: List[str],
-        progress_callback: callable = None
+        progress_callback: callable = None,
+        max_workers: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Extract data from multiple receipts in batch.
+        Runs concurrently within the provider rate budgets, like verify_batch.
 
         Args:
             image_paths: List of file paths
-            progress_callback: Optional callback(completed, total, current_result)
+            progress_callback: Optional callback(completed, total, current_result),
+                called from this thread as each receipt completes
+            max_workers: Cap on parallel workers (default: sum of provider budgets)
 
         Returns:
-            List of extraction results
+            List of extraction results, in input order
         """
-        results = []
+        results = [None] * len(image_paths)
 
-        for i, path in enumerate(image_paths):
+        def extract_item(path: str) -> Dict[str, Any]:
             try:
                 result = self.extract(path)
                 result['image_path'] = path
@@ -1111,11 +1350,13 @@ IMPORTANT:
                     'error': str(e),
                     'confidence': 0
                 }
+            return result
 
-            results.append(result)
+        for completed, (index, result) in enumerate(self._run_batch(image_paths, extract_item, max_workers), 1):
+            results[index] = result
 
             if progress_callback:
-                progress_callback(i + 1, len(image_paths), result)
+                progress_callback(completed, len(image_paths), result)
 
         return results
 
@@ -31,6 +31,8 @@ from enum import Enum
 
 from dotenv import load_dotenv
 
+from services.image_normalizer import NormalizedImage, encode_for_vision
+
 load_dotenv()
 
 # =============================================================================
@@ -168,14 +170,14 @@ class ReceiptVision:
                 issues=["File not found"]
             )
 
-        # Encode image
+        # Encode image (rotated, grayscale, downscaled for upload)
         with open(image_path, "rb") as f:
             image_data = f.read()
-        b64_image = base64.b64encode(image_data).decode("utf-8")
+        image = encode_for_vision(image_data)
 
         # Use GPT-4 Vision for detailed analysis
         if self.client:
-            return self._analyze_with_openai(image_path.name, b64_image)
+            return self._analyze_with_openai(image_path.name, image)
         elif self.gemini_model:
             return self._analyze_with_gemini(image_path, image_path.name)
         else:
@@ -187,7 +189,7 @@ class ReceiptVision:
                 issues=["No vision API available"]
             )
 
-    def _analyze_with_openai(self, filename: str, b64_image: str) -> ReceiptAnalysis:
+    def _analyze_with_openai(self, filename: str, image: NormalizedImage) -> ReceiptAnalysis:
         """Use GPT-4 Vision for receipt analysis"""
 
         prompt = """You are looking at a receipt image. Analyze it like a human accountant would.
@@ -229,7 +231,7 @@ IMPORTANT:
                     "content": [
                         {"type": "text", "text": prompt},
                         {"type": "image_url", "image_url": {
-                            "url": f"data:image/jpeg;base64,{b64_image}",
+                            "url": image.data_url(),
                             "detail": "high"
                         }}
                     ]
@@ -50,6 +50,7 @@ def get_ai_services():
             parse_amount_str,
             ensure_df,
             update_row_by_index,
+            update_rows_by_index,
             load_data,
             get_db_connection,
             return_db_connection,
@@ -66,6 +67,7 @@ def get_ai_services():
         services['parse_amount'] = parse_amount_str
         services['ensure_df'] = ensure_df
         services['update_row'] = update_row_by_index
+        services['update_rows'] = update_rows_by_index
         services['load_data'] = load_data
         services['get_db'] = get_db_connection
         services['return_db'] = return_db_connection
@@ -359,6 +361,7 @@ def api_ai_batch_categorize():
         indexes = uncategorized["_index"].tolist()[:limit]
 
     results = []
+    pending = {}  # _index -> patch, written in one bulk update below
     for idx in indexes[:limit]:
         try:
             mask = df["_index"] == idx
@@ -384,7 +387,7 @@ def api_ai_batch_categorize():
                 if result.get("business_type"):
                     update_data["Business Type"] = result["business_type"]
                 if update_data:
-                    services['update_row'](idx, update_data, source="batch_categorize")
+                    pending[idx] = update_data
 
             results.append({
                 "_index": idx,
@@ -398,6 +401,9 @@ def api_ai_batch_categorize():
             print(f"Batch categorize error for {idx}: {e}")
             continue
 
+    if pending:
+        services['update_rows'](pending, source="batch_categorize")
+
     return jsonify({
         "ok": True,
         "processed": len(results),
@@ -25,10 +25,11 @@ Routes (31 total):
   - POST /api/contact-hub/auto-link-expenses
   - GET /api/contact-hub/spending-by-contact
 
-- Relationship Intelligence (6 routes):
+- Relationship Intelligence (7 routes):
   - GET /api/contact-hub/touch-needed
   - GET /api/contact-hub/digest
   - GET /api/contact-hub/intelligence/strength/<id>
+  - POST /api/contact-hub/intelligence/strength/refresh
   - GET /api/contact-hub/intelligence/insights/<id>
   - GET /api/contact-hub/intelligence/recommendations
   - GET /api/contact-hub/intelligence/analysis
@@ -658,6 +659,24 @@ def api_contact_hub_relationship_strength(contact_id):
         return jsonify({"error": str(e)}), 500
 
 
+@contact_hub_bp.route("/api/contact-hub/intelligence/strength/refresh", methods=["POST"])
+@login_required_api
+def api_contact_hub_refresh_relationship_strengths():
+    """Recompute materialized relationship strength for changed (or, with full=true, all) contacts"""
+    services = get_contact_hub_services()
+    db_error = check_db_available(services)
+    if db_error:
+        return db_error
+
+    try:
+        data = request.get_json(silent=True) or {}
+        result = services['db'].atlas_refresh_relationship_strengths(full=bool(data.get('full')))
+        return jsonify({"ok": True, **result})
+    except Exception as e:
+        print(f"Relationship strength refresh error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
 @contact_hub_bp.route("/api/contact-hub/intelligence/insights/<int:contact_id>", methods=["GET"])
 @login_required_api
 def api_contact_hub_relationship_insights(contact_id):
@@ -19,6 +19,7 @@ Verification:
 Cache Management:
     GET  /api/ocr/cache-stats           - Get OCR cache statistics
     POST /api/ocr/cache-cleanup         - Clean up expired cache entries
+    GET  /api/ocr/engines               - Local OCR engine readiness and load times
 
 Transaction Integration:
     POST /api/ocr/extract-for-transaction/<id> - Extract OCR for transaction
@@ -392,6 +393,17 @@ def ocr_cache_stats():
         return jsonify({"error": str(e)}), 500
 
 
+@ocr_bp.route("/api/ocr/engines", methods=["GET"])
+def ocr_engine_status():
+    """Readiness and load time of the local OCR engines."""
+    _, is_authenticated, _ = get_auth_helpers()
+    if not is_authenticated():
+        return jsonify({'error': 'Authentication required'}), 401
+
+    from services.ocr_engine_registry import get_ocr_engine_registry
+    return jsonify({"ok": True, "status": get_ocr_engine_registry().status()})
+
+
 @ocr_bp.route("/api/ocr/cache-cleanup", methods=["POST"])
 def ocr_cache_cleanup():
     """Clean up expired OCR cache entries."""
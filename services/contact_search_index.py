@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Contact Search Index
+====================
+In-process substring search over the ATLAS contacts table.
+
+/api/atlas/contacts used to search with LIKE '%term%' on eight columns
+plus a REPLACE-chained phone match, which MySQL can't index, so every
+keystroke in contacts.html scanned the table twice (page + COUNT).
+
+The index keeps, per contact, case/accent-folded name, first/last name,
+email, company and job title, plus digits-only phone, with trigram
+postings over all of them. A search term of 3+ characters intersects
+the postings of its trigrams and verifies the survivors; shorter terms
+scan the (small) in-memory documents. Notes are too long to post
+trigrams for, so they are searched with str.find over one joined
+string. Matching and ranking follow the old SQL:
+
+    name match < first/last name match < email match < other, then name
+
+Usage:
+    index = ContactSearchIndex(loader=load_rows)
+    ids, total = index.search('smi', limit=100, offset=0)
+
+The index is kept current by upsert()/remove() from the contact CRUD
+endpoints. Writers that don't call it (other gunicorn workers, imports,
+sync jobs) are caught by a cheap version check (COUNT(*), MAX(updated_at))
+at most every ATLAS_CONTACT_INDEX_CHECK_SECONDS before a search: changed
+rows are re-read and upserted, and if rows were deleted the index is
+rebuilt. A full background rebuild also runs once the index is older
+than ATLAS_CONTACT_INDEX_TTL seconds, or on the first search after
+invalidate().
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_TTL = float(os.environ.get('ATLAS_CONTACT_INDEX_TTL', 300))
+CHECK_INTERVAL = float(os.environ.get('ATLAS_CONTACT_INDEX_CHECK_SECONDS', 2))
+
+# Columns needed to index a contact
+INDEX_COLUMNS = ('id', 'name', 'first_name', 'last_name', 'email', 'phone',
+                 'company', 'job_title', 'notes')
+
+# Trigram-posted fields, in the order used for ranking
+_FIELDS = ('name', 'first_name', 'last_name', 'email', 'company', 'job_title')
+
+_NON_DIGITS = re.compile(r'\D')
+
+
+def fold(text: Any) -> str:
+    """Lowercase and strip accents, like MySQL's *_ai_ci collations."""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKD', str(text))
+    return ''.join(c for c in text if not unicodedata.combining(c)).casefold()
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+@dataclass
+class _Document:
+    fields: Tuple[str, ...]  # folded _FIELDS
+    phone_digits: str
+    sort_name: str
+
+    def rank(self, term: str) -> Optional[int]:
+        """Rank of a match on term (0 best), or None if it doesn't match."""
+        name, first, last, email, company, job_title = self.fields
+        if term in name:
+            return 0
+        if term in first or term in last:
+            return 1
+        if term in email:
+            return 2
+        if term in company or term in job_title:
+            return 3
+        return None
+
+
+class ContactSearchIndex:
+    """
+    Thread-safe trigram index of contacts, loaded by `loader`.
+
+    version_loader returns (row count, latest updated_at) of the table and
+    changed_loader(since) the rows updated at or after since; with both,
+    searches catch up with writes made outside this process.
+    """
+
+    def __init__(self, loader: Optional[Callable[[], Iterable[Dict[str, Any]]]] = None,
+                 ttl: float = INDEX_TTL,
+                 version_loader: Optional[Callable[[], Tuple[int, Any]]] = None,
+                 changed_loader: Optional[Callable[[Any], Iterable[Dict[str, Any]]]] = None,
+                 check_interval: float = CHECK_INTERVAL):
+        self.loader = loader
+        self.ttl = ttl
+        self.version_loader = version_loader
+        self.changed_loader = changed_loader
+        self.check_interval = check_interval
+        self._version: Optional[Tuple[int, Any]] = None
+        self._checked_at: Optional[float] = None
+        self._catch_up_lock = threading.Lock()
+        self._lock = threading.RLock()
+        self._docs: Dict[Any, _Document] = {}
+        self._postings: Dict[str, Set[Any]] = {}
+        self._notes: Dict[Any, str] = {}
+        self._notes_blob: Optional[Tuple[str, List[int], List[Any]]] = None
+        self._built_at: Optional[float] = None
+        self._stale = False
+        self._rebuilding = False
+        self._mutations = 0
+
+    # -------------------------------------------------------------------------
+    # Maintenance
+    # -------------------------------------------------------------------------
+
+    def build(self, rows: Iterable[Dict[str, Any]]):
+        """Replace the index contents with rows (dicts with INDEX_COLUMNS)."""
+        fresh = ContactSearchIndex(ttl=self.ttl)
+        for row in rows:
+            fresh._add(row)
+        with self._lock:
+            self._docs, self._postings = fresh._docs, fresh._postings
+            self._notes, self._notes_blob = fresh._notes, None
+            self._built_at = time.monotonic()
+            self._stale = False
+        logger.info(f"Contact search index built: {len(self._docs)} contacts")
+
+    def upsert(self, row: Dict[str, Any]):
+        """Add or replace one contact."""
+        with self._lock:
+            self._remove(row['id'])
+            self._add(row)
+            self._mutations += 1
+
+    def remove(self, contact_id: Any):
+        with self._lock:
+            self._remove(contact_id)
+            self._mutations += 1
+
+    def invalidate(self):
+        """Rebuild from the loader on the next search."""
+        self._stale = True
+
+    def _add(self, row: Dict[str, Any]):
+        contact_id = row['id']
+        fields = tuple(fold(row.get(f)) for f in _FIELDS)
+        phone_digits = _NON_DIGITS.sub('', str(row.get('phone') or ''))
+        self._docs[contact_id] = _Document(fields, phone_digits, fields[0])
+        for gram in self._document_trigrams(self._docs[contact_id]):
+            self._postings.setdefault(gram, set()).add(contact_id)
+        notes = fold(row.get('notes'))
+        if notes:
+            self._notes[contact_id] = notes
+        self._notes_blob = None
+
+    def _remove(self, contact_id: Any):
+        doc = self._docs.pop(contact_id, None)
+        if doc is None:
+            return
+        for gram in self._document_trigrams(doc):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(contact_id)
+                if not ids:
+                    del self._postings[gram]
+        if self._notes.pop(contact_id, None) is not None:
+            self._notes_blob = None
+
+    @staticmethod
+    def _document_trigrams(doc: _Document) -> Set[str]:
+        grams = set()
+        for text in doc.fields:
+            grams |= _trigrams(text)
+        return grams | _trigrams(doc.phone_digits)
+
+    def _reload(self):
+        mutations = self._mutations
+        # Read the version first so writes during the load are caught up later
+        version = self.version_loader() if self.version_loader else None
+        self.build(self.loader())
+        self._version = version
+        self._checked_at = time.monotonic()
+        if self._mutations != mutations:
+            # An upsert/remove raced the load and may be missing from it
+            self._stale = True
+
+    def _catch_up(self):
+        """Apply writes made outside this process since the last check."""
+        if not self._catch_up_lock.acquire(blocking=False):
+            return  # Another search is already checking
+        try:
+            self._checked_at = time.monotonic()
+            version = self.version_loader()
+            if version == self._version:
+                return
+
+            count, _ = version
+            since = self._version[1] if self._version else None
+            if self.changed_loader and since is not None:
+                for row in self.changed_loader(since):
+                    self.upsert(row)
+                with self._lock:
+                    complete = len(self._docs) == count
+                if complete:
+                    self._version = version
+                    return
+
+            # Rows were deleted elsewhere (or there is no updated_at to go by)
+            self._reload()
+        finally:
+            self._catch_up_lock.release()
+
+    def _ensure_fresh(self):
+        if self.loader is None:
+            return
+        if self._built_at is None:
+            self._reload()
+            return
+        if self.version_loader and (self._checked_at is None or
+                                    time.monotonic() - self._checked_at >= self.check_interval):
+            self._catch_up()
+        with self._lock:
+            if self._rebuilding or (not self._stale and time.monotonic() - self._built_at < self.ttl):
+                return
+            # Serve the current contents while a background thread reloads
+            self._rebuilding = True
+
+        def rebuild():
+            try:
+                self._reload()
+            except Exception as e:
+                logger.warning(f"Contact search index rebuild failed: {e}")
+            finally:
+                self._rebuilding = False
+
+        threading.Thread(target=rebuild, name='contact-index-rebuild', daemon=True).start()
+
+    # -------------------------------------------------------------------------
+    # Search
+    # -------------------------------------------------------------------------
+
+    def _candidates(self, term: str) -> Iterable[Any]:
+        if len(term) < 3:
+            return list(self._docs)
+        postings = sorted((self._postings.get(g, set()) for g in _trigrams(term)), key=len)
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            candidates &= ids
+            if not candidates:
+                break
+        return candidates
+
+    def _notes_matches(self, term: str) -> Set[Any]:
+        if self._notes_blob is None:
+            ids = list(self._notes)
+            starts, offset = [], 0
+            for contact_id in ids:
+                starts.append(offset)
+                offset += len(self._notes[contact_id]) + 1
+            self._notes_blob = ('\x00'.join(self._notes[i] for i in ids), starts, ids)
+        blob, starts, ids = self._notes_blob
+        matches = set()
+        pos = blob.find(term)
+        while pos != -1:
+            i = bisect_right(starts, pos) - 1
+            matches.add(ids[i])
+            # Skip to the next document
+            pos = blob.find(term, starts[i + 1] if i + 1 < len(starts) else len(blob))
+        return matches
+
+    def search(self, query: str, limit: int = 100, offset: int = 0) -> Tuple[List[Any], int]:
+        """
+        Return (ids of the requested page, total matches) for query.
+
+        Digits in the query (3 or more) also match phone numbers with
+        formatting removed.
+        """
+        self._ensure_fresh()
+        term = fold(query)
+        digits = _NON_DIGITS.sub('', query)
+        if not term:
+            return [], 0
+
+        with self._lock:
+            ranked = []
+            for contact_id in self._candidates(term):
+                rank = self._docs[contact_id].rank(term)
+                if rank is not None:
+                    ranked.append((rank, contact_id))
+            matched = {contact_id for _, contact_id in ranked}
+
+            extra = self._notes_matches(term)
+            if len(digits) >= 3:
+                extra |= {contact_id for contact_id in self._candidates(digits)
+                          if digits in self._docs[contact_id].phone_digits}
+            ranked.extend((3, contact_id) for contact_id in extra - matched)
+
+            ranked.sort(key=lambda r: (r[0], self._docs[r[1]].sort_name, str(r[1])))
+
+        total = len(ranked)
+        return [contact_id for _, contact_id in ranked[offset:offset + limit]], total
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'contacts': len(self._docs),
+                'trigrams': len(self._postings),
+                'age_seconds': (round(time.monotonic() - self._built_at, 1)
+                                if self._built_at is not None else None),
+                'stale': self._stale,
+                'rebuilding': self._rebuilding,
+            }
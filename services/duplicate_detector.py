@@ -16,6 +16,8 @@ import os
 import io
 import hashlib
 import logging
+import threading
+import time
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 from typing import Optional, List, Dict, Any, Tuple
@@ -27,6 +29,8 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from db_mysql import MySQLReceiptDatabase
+from services.phash_index import PHashIndex
+from services.text_lsh import text_band_keys, update_text_lsh
 
 # Optional imports
 try:
@@ -49,6 +53,25 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Process-wide pHash index over receipt_library, loaded on first lookup.
+# Each gunicorn worker has its own copy, so before a lookup it picks up
+# receipts other workers added (id > the last seen id) once the index is
+# PHASH_INDEX_REFRESH_SECONDS old, and rebuilds completely every
+# PHASH_INDEX_RELOAD_SECONDS to catch re-hashes.
+PHASH_INDEX_REFRESH_SECONDS = float(os.environ.get('PHASH_INDEX_REFRESH_SECONDS', 5))
+PHASH_INDEX_RELOAD_SECONDS = float(os.environ.get('PHASH_INDEX_RELOAD_SECONDS', 3600))
+
+_phash_index: Optional[PHashIndex] = None
+_phash_index_lock = threading.Lock()
+_phash_index_max_id = 0
+_phash_index_loaded_at = 0.0
+_phash_index_synced_at = 0.0
+
+# Receipts saved before receipt_library_text_lsh existed are indexed by a
+# background backfill, started once per process on the first text lookup
+_text_index_backfill_started = False
+_text_index_backfill_lock = threading.Lock()
+
 
 # =============================================================================
 # DATA CLASSES
@@ -106,6 +129,7 @@ class DuplicateDetector:
     # Detection thresholds
     PHASH_THRESHOLD = 8  # Hamming distance for perceptual hash (lower = more similar)
     TEXT_SIMILARITY_THRESHOLD = 0.85  # Minimum text similarity
+    TEXT_LSH_CANDIDATES = 20  # LSH candidates confirmed with SequenceMatcher
     DATE_TOLERANCE_DAYS = 3  # Days of tolerance for date matching
     AMOUNT_TOLERANCE_PERCENT = 0.01  # 1% tolerance for amount matching
 
@@ -376,6 +400,7 @@ class DuplicateDetector:
                         UPDATE receipt_library SET deleted_at = NOW(), status = 'archived'
                         WHERE id = %s
                     """, (receipt_id,))
+                    remove_from_phash_index(receipt_id)
                 elif action == 'keep_both':
                     # Clear duplicate status
                     cursor.execute("""
@@ -447,6 +472,65 @@ class DuplicateDetector:
         logger.info(f"Found {len(all_duplicates)} potential duplicates")
         return all_duplicates
 
+    def backfill_text_index(self, batch_size: int = 500) -> int:
+        """
+        Add LSH band keys for receipts missing from receipt_library_text_lsh.
+
+        Returns the number of receipts indexed.
+        """
+        if not self.db.use_mysql:
+            return 0
+
+        indexed = 0
+        last_id = 0
+
+        while True:
+            with self.db.pooled_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT r.id, r.ocr_raw_text FROM receipt_library r
+                    WHERE r.id > %s
+                      AND r.ocr_raw_text IS NOT NULL
+                      AND r.deleted_at IS NULL
+                      AND NOT EXISTS (
+                          SELECT 1 FROM receipt_library_text_lsh l WHERE l.receipt_id = r.id
+                      )
+                    ORDER BY r.id
+                    LIMIT %s
+                """, (last_id, batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+
+                for row in rows:
+                    update_text_lsh(cursor, row['id'], row['ocr_raw_text'])
+                conn.commit()
+
+            indexed += len(rows)
+            last_id = rows[-1]['id']
+            logger.info(f"Text LSH backfill: {indexed} receipts indexed")
+
+        return indexed
+
+    def ensure_text_index_backfill(self):
+        """Run backfill_text_index() in a background thread, once per process."""
+        global _text_index_backfill_started
+        if _text_index_backfill_started or not self.db.use_mysql:
+            return
+
+        with _text_index_backfill_lock:
+            if _text_index_backfill_started:
+                return
+            _text_index_backfill_started = True
+
+        def run():
+            try:
+                self.backfill_text_index()
+            except Exception as e:
+                logger.warning(f"Text LSH backfill failed: {e}")
+
+        threading.Thread(target=run, name='text-lsh-backfill', daemon=True).start()
+
     # -------------------------------------------------------------------------
     # PRIVATE METHODS
     # -------------------------------------------------------------------------
@@ -489,6 +573,53 @@ class DuplicateDetector:
 
             return [row['id'] for row in cursor.fetchall()]
 
+    def _get_phash_index(self) -> PHashIndex:
+        """
+        Get the shared pHash index, loading or catching it up as needed.
+
+        Loads receipt_library on first use, then adds receipts with a newer
+        id (inserted by other processes) at most every
+        PHASH_INDEX_REFRESH_SECONDS, and reloads everything every
+        PHASH_INDEX_RELOAD_SECONDS.
+        """
+        global _phash_index, _phash_index_max_id, _phash_index_loaded_at, _phash_index_synced_at
+        if _phash_index is not None and time.monotonic() - _phash_index_synced_at < PHASH_INDEX_REFRESH_SECONDS:
+            return _phash_index
+
+        with _phash_index_lock:
+            now = time.monotonic()
+            if _phash_index is not None and now - _phash_index_synced_at < PHASH_INDEX_REFRESH_SECONDS:
+                return _phash_index
+
+            full = _phash_index is None or now - _phash_index_loaded_at >= PHASH_INDEX_RELOAD_SECONDS
+            index = PHashIndex(max_distance=self.PHASH_THRESHOLD) if full else _phash_index
+            after_id = 0 if full else _phash_index_max_id
+
+            with self.db.pooled_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT id, fingerprint FROM receipt_library
+                    WHERE id > %s
+                      AND fingerprint IS NOT NULL
+                      AND deleted_at IS NULL
+                    ORDER BY id
+                """, (after_id,))
+                rows = cursor.fetchall()
+
+            for row in rows:
+                index.add(row['id'], row['fingerprint'])
+            _phash_index_max_id = rows[-1]['id'] if rows else after_id
+
+            if full:
+                logger.info(f"Loaded pHash index with {len(index)} receipts")
+                _phash_index = index
+                _phash_index_loaded_at = now
+            elif rows:
+                logger.debug(f"Added {len(rows)} new receipts to the pHash index")
+            _phash_index_synced_at = now
+
+        return _phash_index
+
     def _find_by_perceptual_hash(
         self, fingerprint: str, exclude_ids: List[int]
     ) -> List[Tuple[int, int]]:
@@ -496,32 +627,29 @@ class DuplicateDetector:
         if not self.db.use_mysql or not HAS_IMAGEHASH:
             return []
 
-        matches = []
+        matches = self._get_phash_index().search(
+            fingerprint, self.PHASH_THRESHOLD, exclude=set(exclude_ids or [])
+        )
+        if not matches:
+            return []
 
+        # Drop receipts deleted by paths that bypass the index hooks
         with self.db.pooled_connection() as conn:
             cursor = conn.cursor()
-
-            exclude_clause = ""
-            if exclude_ids:
-                placeholders = ','.join(['%s'] * len(exclude_ids))
-                exclude_clause = f"AND id NOT IN ({placeholders})"
-
+            ids = [match_id for match_id, _ in matches]
+            placeholders = ','.join(['%s'] * len(ids))
             cursor.execute(f"""
-                SELECT id, fingerprint FROM receipt_library
-                WHERE fingerprint IS NOT NULL
+                SELECT id FROM receipt_library
+                WHERE id IN ({placeholders})
                   AND deleted_at IS NULL
-                  {exclude_clause}
-                LIMIT 5000
-            """, exclude_ids or [])
+            """, ids)
+            live_ids = {row['id'] for row in cursor.fetchall()}
 
-            for row in cursor.fetchall():
-                distance = self._compute_hamming_distance(fingerprint, row['fingerprint'])
-                if distance <= self.PHASH_THRESHOLD:
-                    matches.append((row['id'], distance))
+        for match_id in set(ids) - live_ids:
+            remove_from_phash_index(match_id)
 
-        # Sort by distance (lower = more similar)
-        matches.sort(key=lambda x: x[1])
-        return matches[:10]  # Return top 10
+        # Already sorted by distance (lower = more similar)
+        return [m for m in matches if m[0] in live_ids][:10]  # Return top 10
 
     def _find_by_transaction_data(
         self, merchant: str, amount: Decimal, receipt_date: date, exclude_ids: List[int]
@@ -593,12 +721,91 @@ class DuplicateDetector:
             return [row['id'] for row in cursor.fetchall()]
 
     def _find_by_text_similarity(
-        self, ocr_text: str, exclude_ids: List[int], limit: int = 100
+        self, ocr_text: str, exclude_ids: List[int], limit: int = None
     ) -> List[Tuple[int, float]]:
-        """Find receipts with similar OCR text."""
+        """
+        Find receipts with similar OCR text.
+
+        Candidates come from the MinHash/LSH band index over the whole
+        library, ranked by shared bands; only the top `limit` are confirmed
+        with SequenceMatcher. Falls back to scanning the most recent
+        receipts if the text is too short to index, the index has no
+        candidates (e.g. while the backfill is still running) or the index
+        table is not available.
+        """
         if not self.db.use_mysql or not ocr_text:
             return []
 
+        self.ensure_text_index_backfill()
+
+        limit = limit or self.TEXT_LSH_CANDIDATES
+        keys = text_band_keys(ocr_text)
+        if not keys:
+            return self._scan_recent_text_similarity(ocr_text, exclude_ids)
+
+        try:
+            candidate_texts = self._lsh_text_candidates(keys, exclude_ids, limit)
+        except Exception as e:
+            logger.warning(f"Text LSH lookup failed, scanning recent receipts: {e}")
+            return self._scan_recent_text_similarity(ocr_text, exclude_ids)
+
+        if not candidate_texts:
+            return self._scan_recent_text_similarity(ocr_text, exclude_ids)
+
+        text_normalized = ' '.join(ocr_text.lower().split())[:1000]
+
+        matches = []
+        for receipt_id, candidate_text in candidate_texts:
+            candidate_text = ' '.join(candidate_text.lower().split())
+            similarity = SequenceMatcher(
+                None, text_normalized, candidate_text
+            ).ratio()
+            if similarity >= self.TEXT_SIMILARITY_THRESHOLD:
+                matches.append((receipt_id, similarity))
+
+        # Sort by similarity
+        matches.sort(key=lambda x: x[1], reverse=True)
+        return matches[:10]
+
+    def _lsh_text_candidates(
+        self, keys: List[Tuple[int, int]], exclude_ids: List[int], limit: int
+    ) -> List[Tuple[int, str]]:
+        """Receipts sharing LSH buckets with the query, most shared bands first."""
+        with self.db.pooled_connection() as conn:
+            cursor = conn.cursor()
+
+            exclude_clause = ""
+            params = [value for key in keys for value in key]
+            if exclude_ids:
+                placeholders = ','.join(['%s'] * len(exclude_ids))
+                exclude_clause = f"AND r.id NOT IN ({placeholders})"
+                params.extend(exclude_ids)
+
+            bucket_placeholders = ','.join(['(%s, %s)'] * len(keys))
+            cursor.execute(f"""
+                SELECT r.id, SUBSTRING(r.ocr_raw_text, 1, 1000) as ocr_text,
+                       COUNT(*) as shared_bands
+                FROM receipt_library_text_lsh l
+                JOIN receipt_library r ON r.id = l.receipt_id
+                WHERE (l.band, l.bucket) IN ({bucket_placeholders})
+                  AND r.ocr_raw_text IS NOT NULL
+                  AND r.deleted_at IS NULL
+                  {exclude_clause}
+                GROUP BY r.id
+                ORDER BY shared_bands DESC
+                LIMIT %s
+            """, params + [limit])
+
+            return [
+                (row['id'], row['ocr_text'])
+                for row in cursor.fetchall()
+                if row['ocr_text']
+            ]
+
+    def _scan_recent_text_similarity(
+        self, ocr_text: str, exclude_ids: List[int], limit: int = 100
+    ) -> List[Tuple[int, float]]:
+        """Compare OCR text against the most recent receipts (no LSH index)."""
         # Normalize text for comparison
         text_normalized = ' '.join(ocr_text.lower().split())[:1000]
 
@@ -655,6 +862,22 @@ def get_duplicate_detector() -> DuplicateDetector:
     return _detector
 
 
+def add_to_phash_index(receipt_id: int, fingerprint: Optional[str]):
+    """Keep the pHash index current after a receipt is created or re-hashed."""
+    if _phash_index is None:
+        return  # Not loaded yet; the first lookup reads it from the table
+    if fingerprint:
+        _phash_index.add(receipt_id, fingerprint)
+    else:
+        _phash_index.remove(receipt_id)
+
+
+def remove_from_phash_index(receipt_id: int):
+    """Drop a deleted receipt from the pHash index."""
+    if _phash_index is not None:
+        _phash_index.remove(receipt_id)
+
+
 def find_duplicates(receipt_id: int) -> List[DuplicateMatch]:
     """Find potential duplicates of a receipt."""
     return get_duplicate_detector().find_duplicates(receipt_id=receipt_id)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Vision Image Normalizer
+=======================
+Shared preprocessing for every image sent to a vision/OCR provider.
+
+Receipts arrive as multi-megabyte phone photos, 2x PDF renders and HEIC
+conversions, and were being uploaded as-is (often as lossless PNG). Before
+an image goes to OpenAI, Gemini or Ollama it is now:
+- rotated upright from its EXIF orientation
+- converted to grayscale (receipts are dark text on light paper)
+- downscaled so the long edge is at most TARGET_LONG_EDGE, but never so far
+  that the short edge drops below MIN_SHORT_EDGE (long, narrow receipts
+  keep their width), and never upscaled
+- re-encoded as JPEG (or WebP) at QUALITY
+
+Results are cached in-process by a hash of the input content, so provider
+fallbacks, retries and re-verification of the same receipt reuse the work.
+
+Used by receipt_ocr_service, incoming_receipts_service, gemini_utils,
+ai_receipt_locator, reconciliation_agent and viewer_server.
+"""
+
+import base64
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Union
+
+try:
+    from PIL import Image, ImageOps
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+logger = logging.getLogger(__name__)
+
+TARGET_LONG_EDGE = int(os.environ.get('VISION_IMAGE_LONG_EDGE', 1600))
+MIN_SHORT_EDGE = int(os.environ.get('VISION_IMAGE_MIN_SHORT_EDGE', 1000))
+QUALITY = int(os.environ.get('VISION_IMAGE_QUALITY', 85))
+FORMAT = os.environ.get('VISION_IMAGE_FORMAT', 'JPEG').upper()
+CACHE_SIZE = int(os.environ.get('VISION_IMAGE_CACHE_SIZE', 256))
+
+MIME_TYPES = {'JPEG': 'image/jpeg', 'WEBP': 'image/webp', 'PNG': 'image/png'}
+
+
+@dataclass
+class NormalizedImage:
+    """A provider-ready encoded image."""
+    data: bytes
+    mime_type: str
+    width: int
+    height: int
+    original_bytes: Optional[int] = None
+
+    def base64(self) -> str:
+        return base64.b64encode(self.data).decode()
+
+    def data_url(self) -> str:
+        return f"data:{self.mime_type};base64,{self.base64()}"
+
+
+_cache: 'OrderedDict[str, NormalizedImage]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def target_size(width: int, height: int,
+                long_edge: int = TARGET_LONG_EDGE,
+                min_short_edge: int = MIN_SHORT_EDGE) -> tuple:
+    """Downscaled (width, height) for an image; unchanged if already small enough."""
+    long_side, short_side = max(width, height), min(width, height)
+    if long_side <= long_edge:
+        return width, height
+
+    scale = max(long_edge / long_side, min(1.0, min_short_edge / short_side))
+    if scale >= 1.0:
+        return width, height
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _content_key(image: Union['Image.Image', bytes], params: tuple) -> str:
+    digest = hashlib.blake2b(repr(params).encode(), digest_size=16)
+    if isinstance(image, (bytes, bytearray)):
+        digest.update(image)
+    else:
+        digest.update(f"{image.mode}:{image.size}".encode())
+        digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def normalize_image(
+    image: Union['Image.Image', bytes],
+    long_edge: int = TARGET_LONG_EDGE,
+    min_short_edge: int = MIN_SHORT_EDGE,
+    grayscale: bool = True,
+    fmt: str = FORMAT,
+    quality: int = QUALITY,
+) -> NormalizedImage:
+    """
+    Normalize an image (PIL Image or encoded bytes) for a vision provider.
+
+    Raises:
+        ImportError: If Pillow is not installed
+        PIL.UnidentifiedImageError: If bytes are not a readable image
+    """
+    if not HAS_PIL:
+        raise ImportError("Pillow is required for image normalization")
+
+    fmt = fmt.upper()
+    params = (long_edge, min_short_edge, grayscale, fmt, quality)
+    key = _content_key(image, params)
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+
+    original_bytes = None
+    if isinstance(image, (bytes, bytearray)):
+        original_bytes = len(image)
+        img = Image.open(io.BytesIO(image))
+    else:
+        img = image
+
+    img = ImageOps.exif_transpose(img)
+
+    if grayscale:
+        img = img.convert('L')
+    elif img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+
+    size = target_size(img.width, img.height, long_edge, min_short_edge)
+    if size != img.size:
+        img = img.resize(size, Image.Resampling.LANCZOS)
+
+    buffer = io.BytesIO()
+    if fmt == 'PNG':
+        img.save(buffer, format='PNG', optimize=True)
+    else:
+        img.save(buffer, format=fmt, quality=quality, optimize=True)
+
+    result = NormalizedImage(
+        data=buffer.getvalue(),
+        mime_type=MIME_TYPES.get(fmt, 'application/octet-stream'),
+        width=img.width,
+        height=img.height,
+        original_bytes=original_bytes,
+    )
+
+    with _cache_lock:
+        _cache[key] = result
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return result
+
+
+def normalize_base64(image_base64: str, **kwargs) -> Optional[NormalizedImage]:
+    """Normalize a base64-encoded image; None if it cannot be decoded."""
+    try:
+        return normalize_image(base64.b64decode(image_base64), **kwargs)
+    except Exception as e:
+        logger.warning(f"Image normalization failed, sending original: {e}")
+        return None
+
+
+def _sniff_mime_type(data: bytes) -> str:
+    if data.startswith(b'\x89PNG'):
+        return 'image/png'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return 'image/jpeg'
+
+
+def encode_for_vision(image_bytes: bytes) -> NormalizedImage:
+    """
+    The normalized image, or the original bytes if they can't be decoded.
+
+    Use .data_url() (or .mime_type with .base64()) rather than assuming JPEG:
+    VISION_IMAGE_FORMAT may select WebP or PNG. The fallback has no known
+    dimensions (width and height are 0).
+    """
+    try:
+        return normalize_image(image_bytes)
+    except Exception as e:
+        logger.warning(f"Image normalization failed, sending original: {e}")
+        return NormalizedImage(
+            data=image_bytes,
+            mime_type=_sniff_mime_type(image_bytes),
+            width=0,
+            height=0,
+            original_bytes=len(image_bytes),
+        )
+
+
+def clear_cache():
+    """Drop all cached normalized images."""
+    with _cache_lock:
+        _cache.clear()
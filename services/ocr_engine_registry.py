@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+OCR Engine Registry
+===================
+One shared instance per process for each heavy local OCR model.
+
+The local engines (Donut, EasyOCR, the PaddleOCR/EasyOCR/Tesseract
+ensemble) take seconds to load and hundreds of MB to hold. Before this,
+receipt_ocr_local.extractor, ultimate_extractor and multi_engine_extractor
+each created their own copy on first use, inside a request handler.
+
+The registry:
+- loads each engine once, on first get() or in a background preload
+- reports readiness, load time and idle time (status())
+- evicts engines idle for OCR_ENGINE_IDLE_SECONDS, least recently used
+  first, while available memory is below OCR_ENGINE_MIN_AVAILABLE_MEMORY
+
+Usage:
+    from services.ocr_engine_registry import get_ocr_engine_registry
+    donut = get_ocr_engine_registry().get('donut')
+
+Set OCR_PRELOAD_ENGINES=donut,easyocr to warm engines at app startup.
+Callers should fetch engines from the registry when they need them rather
+than keeping their own reference, so an evicted engine can be freed.
+"""
+
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+logger = logging.getLogger(__name__)
+
+IDLE_SECONDS = float(os.environ.get('OCR_ENGINE_IDLE_SECONDS', 900))
+MIN_AVAILABLE_MEMORY = float(os.environ.get('OCR_ENGINE_MIN_AVAILABLE_MEMORY', 0.15))
+REAP_INTERVAL = float(os.environ.get('OCR_ENGINE_REAP_INTERVAL', 60))
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class _Engine:
+    name: str
+    loader: Callable[[], Any]
+    on_evict: Optional[Callable[[], None]] = None
+    instance: Any = None
+    state: str = 'unloaded'  # unloaded | loading | ready | failed
+    error: Optional[str] = None
+    load_seconds: Optional[float] = None
+    last_used: float = 0.0
+    loads: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def available_memory_fraction() -> Optional[float]:
+    """Available / total system memory, or None if it can't be determined."""
+    if HAS_PSUTIL:
+        vm = psutil.virtual_memory()
+        return vm.available / vm.total
+    try:
+        meminfo = {}
+        with open('/proc/meminfo') as f:
+            for line in f:
+                key, value = line.split(':', 1)
+                meminfo[key] = int(value.split()[0])
+        return meminfo['MemAvailable'] / meminfo['MemTotal']
+    except (OSError, KeyError, ValueError, ZeroDivisionError):
+        return None
+
+
+class OCREngineRegistry:
+    """Thread-safe, lazily loading holder of one instance per OCR engine."""
+
+    def __init__(self, idle_seconds: float = IDLE_SECONDS,
+                 min_available_memory: float = MIN_AVAILABLE_MEMORY,
+                 reap_interval: float = REAP_INTERVAL,
+                 memory_probe: Callable[[], Optional[float]] = available_memory_fraction):
+        self.idle_seconds = idle_seconds
+        self.min_available_memory = min_available_memory
+        self.reap_interval = reap_interval
+        self.memory_probe = memory_probe
+        self._engines: Dict[str, _Engine] = {}
+        self._lock = threading.Lock()
+        self._reaper: Optional[threading.Thread] = None
+
+    def register(self, name: str, loader: Callable[[], Any],
+                 on_evict: Optional[Callable[[], None]] = None):
+        """Register (or replace) the loader for an engine."""
+        with self._lock:
+            self._engines[name] = _Engine(name=name, loader=loader, on_evict=on_evict)
+
+    def _engine(self, name: str) -> _Engine:
+        engine = self._engines.get(name)
+        if engine is None:
+            raise KeyError(f"Unknown OCR engine: {name}")
+        return engine
+
+    def get(self, name: str) -> Any:
+        """
+        Return the shared instance, loading it on first use.
+
+        Concurrent callers wait for a single load. A failed load raises
+        and is retried on the next call.
+        """
+        engine = self._engine(name)
+        instance = engine.instance
+        if instance is not None:
+            engine.last_used = time.monotonic()
+            return instance
+
+        with engine.lock:
+            if engine.instance is None:
+                engine.state = 'loading'
+                logger.info(f"Loading OCR engine '{name}'...")
+                start = time.perf_counter()
+                try:
+                    engine.instance = engine.loader()
+                except Exception as e:
+                    engine.state, engine.error = 'failed', str(e)
+                    logger.warning(f"OCR engine '{name}' failed to load: {e}")
+                    raise
+                engine.load_seconds = round(time.perf_counter() - start, 2)
+                engine.state, engine.error = 'ready', None
+                engine.loads += 1
+                logger.info(f"OCR engine '{name}' ready in {engine.load_seconds}s")
+            engine.last_used = time.monotonic()
+            instance = engine.instance
+
+        self._ensure_reaper()
+        return instance
+
+    def is_ready(self, name: str) -> bool:
+        return self._engine(name).state == 'ready'
+
+    def preload(self, names: Optional[Iterable[str]] = None,
+                background: bool = True) -> Optional[threading.Thread]:
+        """Load engines (all registered if names is None), by default in a daemon thread."""
+        names = list(names) if names is not None else list(self._engines)
+
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception:
+                    pass  # Recorded in status(); the next get() retries
+
+        if not background:
+            load_all()
+            return None
+        thread = threading.Thread(target=load_all, name='ocr-engine-preload', daemon=True)
+        thread.start()
+        return thread
+
+    def evict(self, name: str) -> bool:
+        """
+        Drop the registry's reference to an engine.
+
+        Callers still holding the instance keep it alive until they finish;
+        memory is freed once the last reference goes.
+        """
+        engine = self._engine(name)
+        with engine.lock:
+            if engine.instance is None:
+                return False
+            engine.instance = None
+            engine.state = 'unloaded'
+        if engine.on_evict:
+            try:
+                engine.on_evict()
+            except Exception as e:
+                logger.warning(f"OCR engine '{name}' eviction hook failed: {e}")
+        gc.collect()
+        logger.info(f"Evicted idle OCR engine '{name}'")
+        return True
+
+    def under_memory_pressure(self) -> bool:
+        available = self.memory_probe()
+        return available is not None and available < self.min_available_memory
+
+    def reap(self) -> List[str]:
+        """Evict idle engines, least recently used first, while memory is low."""
+        evicted = []
+        now = time.monotonic()
+        idle = sorted(
+            (e for e in self._engines.values()
+             if e.state == 'ready' and now - e.last_used >= self.idle_seconds),
+            key=lambda e: e.last_used,
+        )
+        for engine in idle:
+            if not self.under_memory_pressure():
+                break
+            if self.evict(engine.name):
+                evicted.append(engine.name)
+        return evicted
+
+    def _ensure_reaper(self):
+        if self.reap_interval <= 0 or self._reaper is not None:
+            return
+        with self._lock:
+            if self._reaper is not None:
+                return
+
+            def run():
+                while True:
+                    time.sleep(self.reap_interval)
+                    try:
+                        self.reap()
+                    except Exception as e:
+                        logger.warning(f"OCR engine reaper error: {e}")
+
+            self._reaper = threading.Thread(target=run, name='ocr-engine-reaper', daemon=True)
+            self._reaper.start()
+
+    def status(self) -> Dict[str, Any]:
+        """Readiness, load time and idle time per engine."""
+        now = time.monotonic()
+        engines = {}
+        for engine in list(self._engines.values()):
+            engines[engine.name] = {
+                'state': engine.state,
+                'ready': engine.state == 'ready',
+                'load_seconds': engine.load_seconds,
+                'idle_seconds': round(now - engine.last_used, 1) if engine.state == 'ready' else None,
+                'loads': engine.loads,
+                'error': engine.error,
+            }
+        available = self.memory_probe()
+        return {
+            'engines': engines,
+            'available_memory': round(available, 3) if available is not None else None,
+            'idle_seconds': self.idle_seconds,
+            'min_available_memory': self.min_available_memory,
+        }
+
+
+# =============================================================================
+# DEFAULT ENGINES
+# =============================================================================
+
+def _load_donut():
+    from receipt_ocr_local.donut_extractor import DonutReceiptExtractor
+    extractor = DonutReceiptExtractor()
+    extractor.load()
+    return extractor
+
+
+def _release_torch_cache():
+    torch = sys.modules.get('torch')
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+def _load_easyocr():
+    import easyocr
+    return easyocr.Reader(['en'], gpu=False)
+
+
+def _load_ensemble():
+    try:
+        from scripts.ocr.ultimate_free_ocr import UltimateFreeOCR
+    except ImportError:
+        scripts_path = str(PROJECT_ROOT / "scripts" / "ocr")
+        if scripts_path not in sys.path:
+            sys.path.insert(0, scripts_path)
+        from ultimate_free_ocr import UltimateFreeOCR
+    return UltimateFreeOCR()
+
+
+_registry: Optional[OCREngineRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_ocr_engine_registry() -> OCREngineRegistry:
+    """Get the process-wide registry with the default engines registered."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                registry = OCREngineRegistry()
+                registry.register('donut', _load_donut, on_evict=_release_torch_cache)
+                registry.register('easyocr', _load_easyocr)
+                registry.register('ensemble', _load_ensemble)
+                _registry = registry
+    return _registry
+
+
+def preload_from_env() -> Optional[threading.Thread]:
+    """Start a background preload of the engines listed in OCR_PRELOAD_ENGINES."""
+    names = [n.strip() for n in os.environ.get('OCR_PRELOAD_ENGINES', '').split(',') if n.strip()]
+    if not names:
+        return None
+    registry = get_ocr_engine_registry()
+    unknown = [n for n in names if n not in registry.status()['engines']]
+    if unknown:
+        logger.warning(f"Ignoring unknown OCR_PRELOAD_ENGINES: {', '.join(unknown)}")
+    names = [n for n in names if n not in unknown]
+    logger.info(f"Preloading OCR engines in background: {', '.join(names)}")
+    return registry.preload(names)
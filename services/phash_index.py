@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Perceptual Hash Index
+=====================
+In-process Hamming-distance index over 64-bit perceptual hashes.
+
+Uses multi-index hashing: each hash is split into fixed-width chunks and
+every chunk value gets a postings list. By the pigeonhole principle, two
+hashes within distance d of each other have at least one chunk within
+distance d // chunks, so a query only probes the chunk values near its
+own chunks and verifies those candidates with a popcount. By default the
+chunk count keeps that probe radius at 2 bits (3 x ~21-bit chunks for
+d = 8), which is a few hundred dict lookups per query and only a handful
+of candidates to verify, no matter how many receipts are indexed.
+
+Used by services/duplicate_detector.py (keyed by receipt_library id) and
+smart_auto_matcher.py (keyed by receipt filename).
+"""
+
+import threading
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+HASH_BITS = 64
+
+
+class PHashIndex:
+    """
+    Multi-index Hamming search over 64-bit hex hashes.
+
+    Queries with max_distance above the index's own max_distance are
+    rejected, since the chunk probe would no longer be exhaustive.
+    """
+
+    def __init__(self, max_distance: int = 10, chunks: Optional[int] = None):
+        if chunks is None:
+            chunks = max_distance // 3 + 1
+        if not 1 <= chunks <= HASH_BITS:
+            raise ValueError(f"chunks must be between 1 and {HASH_BITS}")
+
+        self.max_distance = max_distance
+        self.chunks = chunks
+
+        # Near-equal chunk widths, e.g. 13/13/13/13/12 for 5 chunks
+        base, extra = divmod(HASH_BITS, chunks)
+        self._widths = [base + (1 if i < extra else 0) for i in range(chunks)]
+        self._shifts = [sum(self._widths[:i]) for i in range(chunks)]
+
+        self._hashes: Dict[Any, int] = {}
+        self._postings: List[Dict[int, Set[Any]]] = [{} for _ in range(chunks)]
+        self._probe_masks: Dict[Tuple[int, int], List[int]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._hashes
+
+    @staticmethod
+    def parse(phash: Any) -> Optional[int]:
+        """Parse a hex hash (or int) to a 64-bit int, None if invalid."""
+        if phash is None:
+            return None
+        if isinstance(phash, int):
+            value = phash
+        else:
+            try:
+                value = int(str(phash).strip(), 16)
+            except ValueError:
+                return None
+        if value < 0 or value >> HASH_BITS:
+            return None
+        return value
+
+    def _split(self, value: int) -> List[int]:
+        return [
+            (value >> shift) & ((1 << width) - 1)
+            for shift, width in zip(self._shifts, self._widths)
+        ]
+
+    def _masks_within(self, width: int, radius: int) -> List[int]:
+        """All XOR masks over `width` bits with at most `radius` bits set."""
+        masks = self._probe_masks.get((width, radius))
+        if masks is None:
+            masks = [0]
+            for bits in range(1, radius + 1):
+                for positions in combinations(range(width), bits):
+                    mask = 0
+                    for p in positions:
+                        mask |= 1 << p
+                    masks.append(mask)
+            self._probe_masks[(width, radius)] = masks
+        return masks
+
+    def add(self, key: Any, phash: Any) -> bool:
+        """Index (or re-index) a hash under key. Returns False if invalid."""
+        value = self.parse(phash)
+        if value is None:
+            return False
+
+        with self._lock:
+            self.remove(key)
+            self._hashes[key] = value
+            for postings, chunk in zip(self._postings, self._split(value)):
+                postings.setdefault(chunk, set()).add(key)
+        return True
+
+    def remove(self, key: Any) -> bool:
+        """Drop key from the index. Returns False if it was not indexed."""
+        with self._lock:
+            value = self._hashes.pop(key, None)
+            if value is None:
+                return False
+            for postings, chunk in zip(self._postings, self._split(value)):
+                bucket = postings.get(chunk)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del postings[chunk]
+        return True
+
+    def search(
+        self,
+        phash: Any,
+        max_distance: Optional[int] = None,
+        exclude: Optional[Set[Any]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[Any, int]]:
+        """
+        Find indexed hashes within max_distance of phash.
+
+        Returns:
+            [(key, distance)] sorted by distance (closest first)
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        if max_distance > self.max_distance:
+            raise ValueError(
+                f"max_distance {max_distance} exceeds index radius {self.max_distance}"
+            )
+
+        value = self.parse(phash)
+        if value is None:
+            return []
+
+        radius = max_distance // self.chunks
+        candidates: Set[Any] = set()
+
+        with self._lock:
+            for postings, chunk, width in zip(self._postings, self._split(value), self._widths):
+                get = postings.get
+                masks = self._masks_within(width, radius)
+                for mask in masks:
+                    bucket = get(chunk ^ mask)
+                    if bucket:
+                        candidates |= bucket
+
+            if exclude:
+                candidates -= exclude
+
+            hashes = self._hashes
+            matches = [
+                (key, distance)
+                for key in candidates
+                if (distance := (hashes[key] ^ value).bit_count()) <= max_distance
+            ]
+
+        matches.sort(key=lambda m: m[1])
+        return matches[:limit] if limit else matches
@@ -53,8 +53,10 @@ import uuid
 import logging
 import hashlib
 import hmac
+import queue
+import threading
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Any, Tuple
+from typing import Optional, Dict, List, Any, Tuple, Callable
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 from functools import wraps
@@ -117,6 +119,7 @@ class PlaidConfig:
 
     # Sync configuration
     sync_batch_size: int = 500  # Max transactions per sync request
+    sync_pipeline_depth: int = 2  # Pages fetched ahead of the DB writer
     max_sync_retries: int = 3
     sync_retry_delay: float = 1.0  # Seconds between retries
 
@@ -360,6 +363,12 @@ class PlaidService:
     _instance = None
     _lock = None
 
+    # Transactions before this date are not synced
+    SYNC_MIN_DATE = datetime(2025, 9, 1).date()
+
+    # Rows per multi-row INSERT (one Plaid page is at most sync_batch_size)
+    UPSERT_CHUNK_SIZE = 500
+
     def __new__(cls, config: Optional[PlaidConfig] = None):
         """Singleton pattern for connection reuse."""
         if cls._instance is None:
@@ -739,7 +748,8 @@ class PlaidService:
     def sync_transactions(
         self,
         item_id: str,
-        sync_type: str = 'incremental'
+        sync_type: str = 'incremental',
+        on_page_written: Optional[Callable[[List[str]], None]] = None
     ) -> SyncResult:
         """
         Synchronize transactions for a Plaid Item.
@@ -747,9 +757,23 @@ class PlaidService:
         Uses Plaid's cursor-based sync to efficiently fetch only new/changed
         transactions. This ensures we never miss or duplicate transactions.
 
+        Pages are pipelined: this thread fetches the next page by cursor while
+        a writer thread persists the previous one. At most
+        config.sync_pipeline_depth pages wait for the writer, so fetching
+        stalls when the database falls behind. Each page is written together
+        with its next_cursor in one DB transaction, so the stored cursor never
+        runs ahead of durable data and an interrupted sync resumes from the
+        last written page. The exception is
+        TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION: Plaid requires the
+        whole pagination to restart, so the stored cursor is reset to the
+        one this sync started from before the error is raised (and retried).
+
         Args:
             item_id: The Plaid Item ID to sync
             sync_type: Type of sync ('initial', 'incremental', 'manual', 'webhook')
+            on_page_written: Called from the writer thread with the IDs of
+                added transactions once their page is committed. Blocking in
+                it applies backpressure to the whole pipeline.
 
         Returns:
             SyncResult with counts of added/modified/removed transactions
@@ -776,56 +800,56 @@ class PlaidService:
         self._record_sync_start(item_id, batch_id, sync_type, item.transactions_cursor)
 
         try:
-            added = 0
-            modified = 0
-            removed = 0
-            has_more = True
-            cursor = item.transactions_cursor
-
-            # Fetch all available transactions (handles pagination)
-            while has_more:
-                # Build request - cursor is optional on first sync
-                request_params = {
-                    'access_token': item.access_token,
-                    'count': self.config.sync_batch_size
-                }
-                if cursor:  # Only include cursor if we have one
-                    request_params['cursor'] = cursor
-
-                request = TransactionsSyncRequest(**request_params)
-                response = self._api.transactions_sync(request)
-
-                # Process added transactions
-                batch_added = 0
-                for tx in response.added:
-                    if self._process_transaction(tx, item_id, batch_id, 'added'):
-                        added += 1
-                        batch_added += 1
-
-                # Process modified transactions
-                batch_modified = 0
-                for tx in response.modified:
-                    if self._process_transaction(tx, item_id, batch_id, 'modified'):
-                        modified += 1
-                        batch_modified += 1
-
-                # Process removed transactions
-                for tx in response.removed:
-                    self._mark_transaction_removed(tx.transaction_id)
-                    removed += 1
-
-                # Update cursor for next page
-                cursor = response.next_cursor
-                has_more = response.has_more
-
-                # Log batch results including filtered count
-                plaid_count = len(response.added) + len(response.modified)
-                saved_count = batch_added + batch_modified
-                filtered_count = plaid_count - saved_count
-                logger.info(
-                    f"Sync batch: received={plaid_count}, saved={saved_count}, "
-                    f"filtered={filtered_count}, removed={len(response.removed)}, has_more={has_more}"
-                )
+            totals = {'added': 0, 'modified': 0, 'removed': 0}
+            start_cursor = item.transactions_cursor
+            cursor = start_cursor
+            restart_pagination = False
+
+            pages: queue.Queue = queue.Queue(maxsize=max(1, self.config.sync_pipeline_depth))
+            writer_errors: List[Exception] = []
+            writer = threading.Thread(
+                target=self._sync_page_writer,
+                args=(pages, item_id, batch_id, totals, writer_errors, on_page_written),
+                name=f"plaid-writer-{item_id}",
+                daemon=True
+            )
+            writer.start()
+
+            try:
+                # Fetch all available transactions (handles pagination)
+                has_more = True
+                while has_more and not writer_errors:
+                    # Build request - cursor is optional on first sync
+                    request_params = {
+                        'access_token': item.access_token,
+                        'count': self.config.sync_batch_size
+                    }
+                    if cursor:  # Only include cursor if we have one
+                        request_params['cursor'] = cursor
+
+                    request = TransactionsSyncRequest(**request_params)
+                    response = self._api.transactions_sync(request)
+
+                    # Hand the page to the writer and move on to the next cursor
+                    cursor = response.next_cursor
+                    has_more = response.has_more
+                    pages.put(response)
+            except Exception as e:
+                restart_pagination = 'TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION' in str(e)
+                raise
+            finally:
+                pages.put(None)
+                writer.join()
+                if restart_pagination:
+                    # Pages already written carried later cursors; go back to
+                    # the start of this pagination once the writer is done
+                    logger.warning(f"Transactions changed during pagination for {item_id}, restarting sync")
+                    self._reset_item_cursor(item_id, start_cursor)
+
+            if writer_errors:
+                raise writer_errors[0]
+
+            added, modified, removed = totals['added'], totals['modified'], totals['removed']
 
             # Update Item's cursor
             self._update_item_cursor(item_id, cursor)
@@ -886,105 +910,195 @@ class PlaidService:
             logger.error(f"Sync failed for {item_id}: {e}")
             raise
 
-    def _process_transaction(
+    def _sync_page_writer(
         self,
-        tx: Any,
+        pages: queue.Queue,
         item_id: str,
         batch_id: str,
-        operation: str
-    ) -> bool:
-        """Process a single transaction from Plaid.
+        totals: Dict[str, int],
+        errors: List[Exception],
+        on_page_written: Optional[Callable[[List[str]], None]]
+    ):
+        """Writer stage of sync_transactions: persist pages in order until None."""
+        while True:
+            response = pages.get()
+            if response is None:
+                return
+            if errors:
+                continue  # Keep draining after a failure so the fetcher never blocks
+
+            try:
+                batch_added, batch_modified, batch_removed, written_ids = self._write_sync_page(
+                    response.added, response.modified, response.removed, batch_id,
+                    item_id=item_id, next_cursor=response.next_cursor
+                )
+            except Exception as e:
+                errors.append(e)
+                continue
+
+            totals['added'] += batch_added
+            totals['modified'] += batch_modified
+            totals['removed'] += batch_removed
+
+            # Log batch results including filtered count
+            plaid_count = len(response.added) + len(response.modified)
+            saved_count = batch_added + batch_modified
+            filtered_count = plaid_count - saved_count
+            logger.info(
+                f"Sync batch: received={plaid_count}, saved={saved_count}, "
+                f"filtered={filtered_count}, removed={batch_removed}, has_more={response.has_more}"
+            )
+
+            if on_page_written and written_ids:
+                try:
+                    on_page_written(written_ids)
+                except Exception as e:
+                    logger.warning(f"on_page_written failed for {item_id}: {e}")
+
+    def _transaction_row(self, tx: Any, batch_id: str) -> Optional[tuple]:
+        """Convert a Plaid transaction to upsert parameters.
 
         Returns:
-            True if transaction was saved, False if filtered/skipped
+            Parameter tuple, or None if the transaction is filtered out
         """
         # Filter: Skip transactions before September 2025
-        min_date = datetime(2025, 9, 1).date()
-        if tx.date and tx.date < min_date:
-            logger.debug(f"Skipping transaction {tx.transaction_id} - date {tx.date} before {min_date}")
-            return False
+        if tx.date and tx.date < self.SYNC_MIN_DATE:
+            logger.debug(f"Skipping transaction {tx.transaction_id} - date {tx.date} before {self.SYNC_MIN_DATE}")
+            return None
+
+        # Category information
+        category_primary = None
+        category_detailed = None
+        if tx.personal_finance_category:
+            category_primary = tx.personal_finance_category.primary
+            category_detailed = tx.personal_finance_category.detailed
+
+        # Payment channel - may be enum or string depending on Plaid SDK version
+        payment_channel = None
+        if tx.payment_channel:
+            payment_channel = tx.payment_channel.value if hasattr(tx.payment_channel, 'value') else str(tx.payment_channel)
+
+        return (
+            tx.transaction_id,
+            tx.account_id,
+            float(tx.amount),
+            tx.date.isoformat() if tx.date else None,
+            tx.merchant_name,
+            tx.name,
+            tx.pending,
+            category_primary,
+            category_detailed,
+            payment_channel,
+            tx.location.city if tx.location else None,
+            tx.location.region if tx.location else None,
+            tx.authorized_date.isoformat() if tx.authorized_date else None,
+            tx.iso_currency_code or 'USD',
+            batch_id,
+        )
+
+    def _write_sync_page(
+        self,
+        added: List[Any],
+        modified: List[Any],
+        removed: List[Any],
+        batch_id: str,
+        item_id: Optional[str] = None,
+        next_cursor: Optional[str] = None
+    ) -> Tuple[int, int, int, List[str]]:
+        """Write one /transactions/sync page in a single DB transaction.
+
+        Added and modified transactions go in as multi-row upserts and
+        removals as one UPDATE, all on one connection with one commit. When
+        item_id and next_cursor are given, the Item's cursor is advanced in
+        the same transaction. If anything fails the page is rolled back, so
+        the cursor is never advanced past a partially written page.
+
+        Returns:
+            (added, modified, removed, added_ids); filtered transactions are not counted
+        """
+        added_rows = [row for row in (self._transaction_row(tx, batch_id) for tx in added) if row]
+        modified_rows = [row for row in (self._transaction_row(tx, batch_id) for tx in modified) if row]
+        removed_ids = [tx.transaction_id for tx in removed]
+        added_ids = [row[0] for row in added_rows]
+
+        rows = added_rows + modified_rows
+        advance_cursor = bool(item_id and next_cursor)
+        if not rows and not removed_ids and not advance_cursor:
+            return 0, 0, 0, []
 
         db = self._get_db()
         conn = db.get_connection()
         try:
             cursor = conn.cursor()
 
-            # Extract transaction data
-            transaction_id = tx.transaction_id
-            account_id = tx.account_id
-            amount = float(tx.amount)
-            date = tx.date.isoformat() if tx.date else None
-            merchant_name = tx.merchant_name
-            name = tx.name
-            pending = tx.pending
-
-            # Category information
-            category_primary = None
-            category_detailed = None
-            if tx.personal_finance_category:
-                category_primary = tx.personal_finance_category.primary
-                category_detailed = tx.personal_finance_category.detailed
-
-            # Payment channel - may be enum or string depending on Plaid SDK version
-            payment_channel = None
-            if tx.payment_channel:
-                payment_channel = tx.payment_channel.value if hasattr(tx.payment_channel, 'value') else str(tx.payment_channel)
-
-            # Location
-            location_city = tx.location.city if tx.location else None
-            location_region = tx.location.region if tx.location else None
-
-            # Authorized date
-            authorized_date = tx.authorized_date.isoformat() if tx.authorized_date else None
-
-            # Insert or update transaction
-            cursor.execute("""
-                INSERT INTO plaid_transactions
-                (transaction_id, account_id, amount, date, merchant_name, name,
-                 pending, category_primary, category_detailed, payment_channel,
-                 location_city, location_region, authorized_date,
-                 iso_currency_code, sync_batch_id, synced_at, processing_status)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), 'new')
-                ON DUPLICATE KEY UPDATE
-                    amount = VALUES(amount),
-                    date = VALUES(date),
-                    merchant_name = VALUES(merchant_name),
-                    name = VALUES(name),
-                    pending = VALUES(pending),
-                    category_primary = VALUES(category_primary),
-                    category_detailed = VALUES(category_detailed),
-                    payment_channel = VALUES(payment_channel),
-                    location_city = VALUES(location_city),
-                    location_region = VALUES(location_region),
-                    authorized_date = VALUES(authorized_date),
-                    sync_batch_id = VALUES(sync_batch_id),
-                    synced_at = NOW(),
-                    updated_at = NOW()
-            """, (
-                transaction_id, account_id, amount, date, merchant_name, name,
-                pending, category_primary, category_detailed, payment_channel,
-                location_city, location_region, authorized_date,
-                tx.iso_currency_code or 'USD', batch_id
-            ))
+            for start in range(0, len(rows), self.UPSERT_CHUNK_SIZE):
+                chunk = rows[start:start + self.UPSERT_CHUNK_SIZE]
+                placeholders = ', '.join(
+                    ["(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), 'new')"] * len(chunk)
+                )
+                cursor.execute(f"""
+                    INSERT INTO plaid_transactions
+                    (transaction_id, account_id, amount, date, merchant_name, name,
+                     pending, category_primary, category_detailed, payment_channel,
+                     location_city, location_region, authorized_date,
+                     iso_currency_code, sync_batch_id, synced_at, processing_status)
+                    VALUES {placeholders}
+                    ON DUPLICATE KEY UPDATE
+                        amount = VALUES(amount),
+                        date = VALUES(date),
+                        merchant_name = VALUES(merchant_name),
+                        name = VALUES(name),
+                        pending = VALUES(pending),
+                        category_primary = VALUES(category_primary),
+                        category_detailed = VALUES(category_detailed),
+                        payment_channel = VALUES(payment_channel),
+                        location_city = VALUES(location_city),
+                        location_region = VALUES(location_region),
+                        authorized_date = VALUES(authorized_date),
+                        sync_batch_id = VALUES(sync_batch_id),
+                        synced_at = NOW(),
+                        updated_at = NOW()
+                """, [value for row in chunk for value in row])
+
+            if removed_ids:
+                placeholders = ', '.join(['%s'] * len(removed_ids))
+                cursor.execute(f"""
+                    UPDATE plaid_transactions
+                    SET processing_status = 'excluded',
+                        updated_at = NOW()
+                    WHERE transaction_id IN ({placeholders})
+                """, removed_ids)
+
+            if advance_cursor:
+                cursor.execute("""
+                    UPDATE plaid_items
+                    SET transactions_cursor = %s,
+                        last_sync_attempt = NOW(),
+                        updated_at = NOW()
+                    WHERE item_id = %s
+                """, (next_cursor, item_id))
 
             conn.commit()
-            return True
+            return len(added_rows), len(modified_rows), len(removed_ids), added_ids
 
+        except Exception:
+            conn.rollback()
+            raise
         finally:
             db.return_connection(conn)
 
-    def _mark_transaction_removed(self, transaction_id: str):
-        """Mark a transaction as removed."""
+    def _reset_item_cursor(self, item_id: str, cursor: Optional[str]):
+        """Set the sync cursor for an Item without recording a successful sync."""
         db = self._get_db()
         conn = db.get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE plaid_transactions
-                SET processing_status = 'excluded',
+            cur = conn.cursor()
+            cur.execute("""
+                UPDATE plaid_items
+                SET transactions_cursor = %s,
                     updated_at = NOW()
-                WHERE transaction_id = %s
-            """, (transaction_id,))
+                WHERE item_id = %s
+            """, (cursor, item_id))
             conn.commit()
         finally:
             db.return_connection(conn)
@@ -1872,199 +1986,190 @@ class PlaidService:
             has_source_columns = False
             try:
                 cursor.execute("SELECT plaid_transaction_id FROM transactions LIMIT 1")
+                cursor.fetchall()
                 has_source_columns = True
                 logger.info("Source tracking columns available")
             except Exception:
                 logger.info("Source tracking columns not yet available - using basic import")
 
-            # Get the next available _index
-            cursor.execute("SELECT COALESCE(MAX(_index), 0) + 1 as next_index FROM transactions")
-            next_index = cursor.fetchone()['next_index']
-
-            # Get unimported transactions (processing_status = 'new')
+            # Stage unimported transactions (processing_status = 'new') with
+            # their display fields already computed
+            cursor.execute("DROP TEMPORARY TABLE IF EXISTS plaid_import_stage")
+            cursor.execute("""
+                CREATE TEMPORARY TABLE plaid_import_stage (
+                    transaction_id VARCHAR(255) NOT NULL PRIMARY KEY,
+                    account_id VARCHAR(255),
+                    date DATE,
+                    description VARCHAR(500),
+                    amount DECIMAL(15,2),
+                    category VARCHAR(255),
+                    business_type VARCHAR(255),
+                    institution VARCHAR(255),
+                    account_name VARCHAR(255),
+                    account_mask VARCHAR(20),
+                    source_display VARCHAR(600),
+                    state VARCHAR(10) NULL
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            """)
             cursor.execute("""
+                INSERT INTO plaid_import_stage
+                (transaction_id, account_id, date, description, amount, category,
+                 business_type, institution, account_name, account_mask, source_display)
                 SELECT
                     pt.transaction_id,
                     pt.account_id,
                     pt.date,
-                    pt.merchant_name,
-                    pt.name,
+                    COALESCE(NULLIF(pt.merchant_name, ''), NULLIF(pt.name, ''), 'Unknown'),
                     pt.amount,
-                    pt.category_primary,
-                    pt.category_detailed,
-                    pt.pending,
-                    pa.default_business_type,
-                    pa.name as account_name,
-                    pa.mask as account_mask,
-                    pa.type as account_type,
-                    pi.institution_name
+                    COALESCE(NULLIF(pt.category_primary, ''), NULLIF(pt.category_detailed, ''), ''),
+                    COALESCE(NULLIF(pa.default_business_type, ''), 'Personal'),
+                    NULLIF(pi.institution_name, ''),
+                    COALESCE(NULLIF(pa.name, ''), NULLIF(pa.type, '')),
+                    NULLIF(pa.mask, ''),
+                    CASE WHEN NULLIF(pi.institution_name, '') IS NOT NULL THEN CONCAT(
+                        pi.institution_name, ' - ',
+                        COALESCE(NULLIF(pa.name, ''), NULLIF(pa.type, ''), 'Account'),
+                        IF(NULLIF(pa.mask, '') IS NOT NULL, CONCAT(' (...', pa.mask, ')'), '')
+                    ) END
                 FROM plaid_transactions pt
                 JOIN plaid_accounts pa ON pt.account_id = pa.account_id
                 JOIN plaid_items pi ON pa.item_id = pi.item_id
                 WHERE pi.user_id = %s
                 AND pt.processing_status = 'new'
                 AND pt.pending = FALSE
-                ORDER BY pt.date DESC
             """, (user_id,))
+            staged = cursor.rowcount
 
-            transactions = cursor.fetchall()
-
-            if not transactions:
+            if not staged:
                 return {
                     'success': True,
                     'imported': 0,
                     'message': 'No new transactions to import'
                 }
 
-            imported = 0
-            skipped = 0
-
-            for tx in transactions:
-                # Use merchant_name if available, otherwise use name
-                description = tx['merchant_name'] or tx['name'] or 'Unknown'
-
-                # Plaid amounts are positive for debits (spending), negative for credits (refunds)
-                # Keep the same convention - positive for charges
-                amount = float(tx['amount'])
-
-                # Map category
-                category = tx['category_primary'] or tx['category_detailed'] or ''
-
-                # Get business type from account default
-                business_type = tx['default_business_type'] or 'Personal'
-
-                # Structured source info
-                institution = tx['institution_name'] or None
-                account_name = tx['account_name'] or tx['account_type'] or None
-                account_mask = tx['account_mask'] or None
-                account_id = tx['account_id']
-                transaction_id = tx['transaction_id']
-
-                # Build display string for notes (backwards compatibility)
-                source_display = None
-                if institution:
-                    source_display = f"{institution} - {account_name or 'Account'}"
-                    if account_mask:
-                        source_display += f" (...{account_mask})"
+            linked = 0
+            if has_source_columns:
+                # Already imported by Plaid ID
+                cursor.execute("""
+                    UPDATE plaid_import_stage s
+                    JOIN transactions t ON t.plaid_transaction_id = s.transaction_id
+                    SET s.state = 'exists'
+                """)
 
-                try:
-                    if has_source_columns:
-                        # Check if this transaction already exists by Plaid ID
-                        cursor.execute("""
-                            SELECT _index FROM transactions
-                            WHERE plaid_transaction_id = %s
-                        """, (transaction_id,))
-                        existing = cursor.fetchone()
-
-                        if existing:
-                            # Already imported by Plaid ID
-                            skipped += 1
-                            if skipped == 1:
-                                logger.info(f"First skip: {transaction_id} already exists at index {existing['_index']}")
-                            continue
-
-                        # Also check for duplicate by date/amount/description (from CSV imports)
-                        # Check within 2 days to catch posting date differences
-                        cursor.execute("""
-                            SELECT _index, report_id FROM transactions
-                            WHERE ABS(DATEDIFF(chase_date, %s)) <= 2
-                            AND ABS(chase_amount - %s) < 0.01
-                            AND (LOWER(chase_description) LIKE LOWER(%s)
-                                 OR LOWER(%s) LIKE CONCAT('%%', LOWER(LEFT(chase_description, 10)), '%%'))
-                            AND plaid_transaction_id IS NULL
-                            ORDER BY ABS(DATEDIFF(chase_date, %s)) ASC
-                            LIMIT 1
-                        """, (tx['date'], amount, f"%{description[:15]}%", description, tx['date']))
-                        existing_match = cursor.fetchone()
-
-                        if existing_match:
-                            # Found existing transaction - link it instead of creating duplicate
-                            cursor.execute("""
-                                UPDATE transactions
-                                SET plaid_transaction_id = %s,
-                                    plaid_account_id = %s,
-                                    source_institution = %s,
-                                    source_account_name = %s,
-                                    source_account_mask = %s
-                                WHERE _index = %s
-                            """, (transaction_id, account_id, institution, account_name, account_mask, existing_match['_index']))
-
-                            # Mark as matched in staging
-                            cursor.execute("""
-                                UPDATE plaid_transactions SET processing_status = 'matched'
-                                WHERE transaction_id = %s
-                            """, (transaction_id,))
-
-                            skipped += 1
-                            if skipped <= 3:
-                                logger.info(f"Linked Plaid tx to existing: {description[:30]} on {tx['date']} (index {existing_match['_index']})")
-                            continue
-
-                        # Use full INSERT with source tracking columns
-                        cursor.execute("""
-                            INSERT INTO transactions
-                            (_index, chase_date, chase_description, chase_amount, chase_category,
-                             category, business_type, receipt_source, notes,
-                             plaid_transaction_id, plaid_account_id,
-                             source_institution, source_account_name, source_account_mask,
-                             created_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, 'plaid', %s, %s, %s, %s, %s, %s, NOW())
-                        """, (
-                            next_index,
-                            tx['date'],
-                            description,
-                            amount,
-                            category,
-                            category,  # Also set category column
-                            business_type,
-                            source_display,
-                            transaction_id,
-                            account_id,
-                            institution,
-                            account_name,
-                            account_mask
-                        ))
-                    else:
-                        # Use basic INSERT without source tracking columns
-                        cursor.execute("""
-                            INSERT INTO transactions
-                            (_index, chase_date, chase_description, chase_amount, chase_category,
-                             category, business_type, receipt_source, notes, created_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, 'plaid', %s, NOW())
-                        """, (
-                            next_index,
-                            tx['date'],
-                            description,
-                            amount,
-                            category,
-                            category,  # Also set category column
-                            business_type,
-                            source_display
-                        ))
-
-                    # Row inserted successfully
-                    # Mark as imported in plaid_transactions
+                # Duplicates by date/amount/description (from CSV imports), within
+                # 2 days to catch posting date differences. Each round links every
+                # staged row to its closest unlinked candidate, at most once per
+                # existing row; rows that lost a contested candidate (e.g. two
+                # identical same-day charges) try again until nothing links.
+                cursor.execute("DROP TEMPORARY TABLE IF EXISTS plaid_import_links")
+                cursor.execute("""
+                    CREATE TEMPORARY TABLE plaid_import_links (
+                        transaction_id VARCHAR(255) NOT NULL PRIMARY KEY,
+                        _index INT NOT NULL UNIQUE
+                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+                """)
+                while True:
+                    cursor.execute("DELETE FROM plaid_import_links")
                     cursor.execute("""
-                        UPDATE plaid_transactions
-                        SET processing_status = 'matched',
-                            updated_at = NOW()
-                        WHERE transaction_id = %s
-                    """, (transaction_id,))
-
-                    next_index += 1
-                    imported += 1
+                        INSERT INTO plaid_import_links (transaction_id, _index)
+                        SELECT transaction_id, _index FROM (
+                            SELECT best.*,
+                                   ROW_NUMBER() OVER (
+                                       PARTITION BY best._index ORDER BY best.day_diff, best.transaction_id
+                                   ) AS tx_rank
+                            FROM (
+                                SELECT s.transaction_id, t._index,
+                                       ABS(DATEDIFF(t.chase_date, s.date)) AS day_diff,
+                                       ROW_NUMBER() OVER (
+                                           PARTITION BY s.transaction_id
+                                           ORDER BY ABS(DATEDIFF(t.chase_date, s.date)), t._index
+                                       ) AS match_rank
+                                FROM plaid_import_stage s
+                                JOIN transactions t
+                                  ON t.chase_date BETWEEN s.date - INTERVAL 2 DAY AND s.date + INTERVAL 2 DAY
+                                 AND ABS(t.chase_amount - s.amount) < 0.01
+                                 AND (LOWER(t.chase_description) LIKE LOWER(CONCAT('%', LEFT(s.description, 15), '%'))
+                                      OR LOWER(s.description) LIKE CONCAT('%', LOWER(LEFT(t.chase_description, 10)), '%'))
+                                WHERE s.state IS NULL
+                                AND t.plaid_transaction_id IS NULL
+                            ) best
+                            WHERE best.match_rank = 1
+                        ) ranked
+                        WHERE ranked.tx_rank = 1
+                    """)
+                    if cursor.rowcount <= 0:
+                        break
+                    linked += cursor.rowcount
+
+                    # Link existing transactions instead of creating duplicates
+                    cursor.execute("""
+                        UPDATE transactions t
+                        JOIN plaid_import_links l ON l._index = t._index
+                        JOIN plaid_import_stage s ON s.transaction_id = l.transaction_id
+                        SET t.plaid_transaction_id = s.transaction_id,
+                            t.plaid_account_id = s.account_id,
+                            t.source_institution = s.institution,
+                            t.source_account_name = s.account_name,
+                            t.source_account_mask = s.account_mask
+                    """)
+                    cursor.execute("""
+                        UPDATE plaid_import_stage s
+                        JOIN plaid_import_links l ON l.transaction_id = s.transaction_id
+                        SET s.state = 'linked'
+                    """)
+                cursor.execute("DROP TEMPORARY TABLE IF EXISTS plaid_import_links")
+
+                # Insert the rest with source tracking columns; _index continues
+                # from MAX(_index) in date order, newest first
+                cursor.execute("""
+                    INSERT INTO transactions
+                    (_index, chase_date, chase_description, chase_amount, chase_category,
+                     category, business_type, receipt_source, notes,
+                     plaid_transaction_id, plaid_account_id,
+                     source_institution, source_account_name, source_account_mask,
+                     created_at)
+                    SELECT
+                        base.max_index + ROW_NUMBER() OVER (ORDER BY s.date DESC, s.transaction_id),
+                        s.date, s.description, s.amount, s.category,
+                        s.category, s.business_type, 'plaid', s.source_display,
+                        s.transaction_id, s.account_id,
+                        s.institution, s.account_name, s.account_mask,
+                        NOW()
+                    FROM plaid_import_stage s
+                    CROSS JOIN (SELECT COALESCE(MAX(_index), 0) AS max_index FROM transactions) base
+                    WHERE s.state IS NULL
+                """)
+            else:
+                # Basic INSERT without source tracking columns
+                cursor.execute("""
+                    INSERT INTO transactions
+                    (_index, chase_date, chase_description, chase_amount, chase_category,
+                     category, business_type, receipt_source, notes, created_at)
+                    SELECT
+                        base.max_index + ROW_NUMBER() OVER (ORDER BY s.date DESC, s.transaction_id),
+                        s.date, s.description, s.amount, s.category,
+                        s.category, s.business_type, 'plaid', s.source_display,
+                        NOW()
+                    FROM plaid_import_stage s
+                    CROSS JOIN (SELECT COALESCE(MAX(_index), 0) AS max_index FROM transactions) base
+                """)
+            imported = cursor.rowcount
+            skipped = staged - imported
 
-                except Exception as e:
-                    logger.warning(f"Failed to import transaction {transaction_id}: {e}")
-                    if skipped == 0:
-                        # Log first error for diagnostics
-                        logger.error(f"First import error details: {type(e).__name__}: {e}")
-                    skipped += 1
-                    continue
+            # Mark everything staged as imported in plaid_transactions
+            cursor.execute("""
+                UPDATE plaid_transactions pt
+                JOIN plaid_import_stage s ON s.transaction_id = pt.transaction_id
+                SET pt.processing_status = 'matched',
+                    pt.updated_at = NOW()
+            """)
 
             conn.commit()
 
-            logger.info(f"Imported {imported} transactions from Plaid (skipped {skipped})")
+            logger.info(
+                f"Imported {imported} transactions from Plaid "
+                f"(skipped {skipped}, linked {linked} to existing)"
+            )
 
             # Get diagnostic info
             diag = {'has_source_columns': has_source_columns}
@@ -2094,6 +2199,10 @@ class PlaidService:
             }
 
         finally:
+            try:
+                conn.cursor().execute("DROP TEMPORARY TABLE IF EXISTS plaid_import_stage")
+            except Exception:
+                pass
             db.return_connection(conn)
 
     def reset_import_status(self, user_id: str = 'default') -> dict:
@@ -14,6 +14,7 @@ FEATURES:
 - Intelligent scheduling based on last sync time
 - Error recovery with exponential backoff
 - Concurrent sync with rate limiting
+- Per-Item pipeline: page fetch, DB writes and classification overlap
 - Business classification of new transactions
 - Receipt matching integration
 
@@ -31,6 +32,7 @@ Run once (cron-compatible):
 Environment Variables:
     PLAID_SYNC_INTERVAL: Sync interval in seconds (default: 3600 = 1 hour)
     PLAID_SYNC_CONCURRENT: Max concurrent syncs (default: 3)
+    PLAID_SYNC_CLASSIFY_QUEUE: Written pages buffered for classification (default: 4)
     PLAID_SYNC_ENABLED: Enable/disable worker (default: true)
 
 ================================================================================
@@ -42,6 +44,7 @@ import time
 import signal
 import logging
 import argparse
+import queue
 import threading
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -83,6 +86,9 @@ class SyncWorkerConfig:
         # Enable/disable worker
         self.enabled = os.environ.get('PLAID_SYNC_ENABLED', 'true').lower() == 'true'
 
+        # Written pages waiting for classification before the writer blocks
+        self.classify_queue_size = int(os.environ.get('PLAID_SYNC_CLASSIFY_QUEUE', 4))
+
         # Error backoff configuration
         self.initial_backoff = 60  # 1 minute
         self.max_backoff = 3600  # 1 hour
@@ -323,6 +329,12 @@ class PlaidSyncWorker:
         """
         Sync a single Plaid Item.
 
+        Runs as a three-stage pipeline: sync_transactions fetches pages while
+        its writer thread persists the previous page, and a classifier thread
+        here applies account business types to each page's inserted IDs as
+        soon as the page is committed. The classifier queue is bounded, so a
+        slow classifier holds back the writer and, through it, the fetcher.
+
         Args:
             item: Item dict from database
 
@@ -334,21 +346,34 @@ class PlaidSyncWorker:
 
         logger.info(f"Syncing {institution} ({item_id})")
 
+        classify_queue: queue.Queue = queue.Queue(maxsize=max(1, self.config.classify_queue_size))
+        classifier = threading.Thread(
+            target=self._classifier_stage,
+            args=(item_id, classify_queue),
+            name=f"plaid-classify-{item_id}",
+            daemon=True
+        )
+        classifier.start()
+
         try:
             from services.plaid_service import get_plaid_service
 
             plaid = get_plaid_service()
-            result = plaid.sync_transactions(item_id, sync_type='incremental')
+            try:
+                result = plaid.sync_transactions(
+                    item_id,
+                    sync_type='incremental',
+                    on_page_written=classify_queue.put
+                )
+            finally:
+                classify_queue.put(None)
+                classifier.join()
 
             logger.info(
                 f"Synced {institution}: "
                 f"+{result.added} ~{result.modified} -{result.removed}"
             )
 
-            # Trigger business classification for new transactions
-            if result.added > 0:
-                self._classify_new_transactions(item_id)
-
             # Auto-import to main transactions table
             imported = 0
             if result.added > 0:
@@ -371,51 +396,59 @@ class PlaidSyncWorker:
                 'error': str(e)
             }
 
-    def _classify_new_transactions(self, item_id: str):
+    def _classifier_stage(self, item_id: str, transaction_ids: queue.Queue):
         """
-        Run business classification on new transactions.
+        Classifier stage of _sync_item: consume inserted transaction IDs
+        until None and apply account default business types to them.
 
         Args:
-            item_id: The Item that was synced
+            item_id: The Item being synced
+            transaction_ids: Queue of ID lists, one per committed page
         """
-        try:
-            from db_mysql import get_mysql_db
+        account_defaults = None
+        while True:
+            ids = transaction_ids.get()
+            if ids is None:
+                return
+            if account_defaults == {}:
+                continue  # No account has a default business type
 
-            db = get_mysql_db()
-            conn = db.get_connection()
             try:
-                cursor = conn.cursor()
+                from db_mysql import get_mysql_db
 
-                # Get account's default business type
-                cursor.execute("""
-                    SELECT pa.account_id, pa.default_business_type
-                    FROM plaid_accounts pa
-                    WHERE pa.item_id = %s AND pa.default_business_type IS NOT NULL
-                """, (item_id,))
-                account_defaults = {
-                    row['account_id']: row['default_business_type']
-                    for row in cursor.fetchall()
-                }
+                db = get_mysql_db()
+                conn = db.get_connection()
+                try:
+                    cursor = conn.cursor()
 
-                if account_defaults:
-                    # Apply default business types to new transactions
-                    for account_id, business_type in account_defaults.items():
+                    if account_defaults is None:
                         cursor.execute("""
-                            UPDATE plaid_transactions
-                            SET business_type = %s
-                            WHERE account_id = %s
-                            AND processing_status = 'new'
-                            AND business_type IS NULL
-                        """, (business_type, account_id))
-
-                    conn.commit()
-                    logger.info(f"Applied business types to new transactions for {item_id}")
+                            SELECT pa.account_id, pa.default_business_type
+                            FROM plaid_accounts pa
+                            WHERE pa.item_id = %s AND pa.default_business_type IS NOT NULL
+                        """, (item_id,))
+                        account_defaults = {
+                            row['account_id']: row['default_business_type']
+                            for row in cursor.fetchall()
+                        }
+
+                    if account_defaults:
+                        placeholders = ', '.join(['%s'] * len(ids))
+                        for account_id, business_type in account_defaults.items():
+                            cursor.execute(f"""
+                                UPDATE plaid_transactions
+                                SET business_type = %s
+                                WHERE account_id = %s
+                                AND transaction_id IN ({placeholders})
+                                AND business_type IS NULL
+                            """, (business_type, account_id, *ids))
+                        conn.commit()
+
+                finally:
+                    db.return_connection(conn)
 
-            finally:
-                db.return_connection(conn)
-
-        except Exception as e:
-            logger.warning(f"Failed to classify transactions: {e}")
+            except Exception as e:
+                logger.warning(f"Failed to classify transactions for {item_id}: {e}")
 
     def _import_to_main_table(self, user_id: str) -> int:
         """
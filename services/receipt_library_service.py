@@ -37,6 +37,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from db_mysql import MySQLReceiptDatabase, get_pooled_connection
 from r2_service import upload_to_r2, get_public_url, R2_PUBLIC_URL
+from services.duplicate_detector import add_to_phash_index, remove_from_phash_index
+from services.text_lsh import update_text_lsh
 
 # Optional imports
 try:
@@ -359,11 +361,13 @@ class ReceiptLibraryService:
 
                 # Update search index
                 self._update_search_index(cursor, receipt_id, receipt)
+                self._update_text_index(cursor, receipt_id, receipt.ocr_raw_text)
 
                 # Log activity
                 self._log_activity(cursor, receipt_id, 'create', actor='system')
 
                 conn.commit()
+                add_to_phash_index(receipt_id, receipt.fingerprint)
                 logger.info(f"Created receipt {receipt_id} ({receipt.uuid})")
                 return receipt_id
 
@@ -439,12 +443,16 @@ class ReceiptLibraryService:
                     receipt = self.get_receipt(receipt_id)
                     if receipt:
                         self._update_search_index(cursor, receipt_id, receipt)
+                if 'ocr_raw_text' in updates:
+                    self._update_text_index(cursor, receipt_id, updates['ocr_raw_text'])
 
                 # Log activity
                 self._log_activity(cursor, receipt_id, 'update', actor=actor,
                                   old_value=dict(old_row), new_value=updates)
 
                 conn.commit()
+                if 'fingerprint' in updates:
+                    add_to_phash_index(receipt_id, updates['fingerprint'])
                 return True
 
             except Exception as e:
@@ -471,6 +479,7 @@ class ReceiptLibraryService:
 
                 self._log_activity(cursor, receipt_id, 'delete' if not soft else 'soft_delete', actor=actor)
                 conn.commit()
+                remove_from_phash_index(receipt_id)
                 return cursor.rowcount > 0
 
             except Exception as e:
@@ -860,6 +869,13 @@ class ReceiptLibraryService:
         except Exception as e:
             logger.error(f"Failed to update search index for receipt {receipt_id}: {e}")
 
+    def _update_text_index(self, cursor, receipt_id: int, ocr_text: Optional[str]):
+        """Update the OCR text LSH index used for duplicate detection."""
+        try:
+            update_text_lsh(cursor, receipt_id, ocr_text)
+        except Exception as e:
+            logger.error(f"Failed to update text LSH index for receipt {receipt_id}: {e}")
+
     def _log_activity(self, cursor, receipt_id: int, action: str,
                      actor: str = "system", old_value: Dict = None, new_value: Dict = None,
                      details: str = None):
@@ -33,6 +33,13 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 from collections import defaultdict
 import hashlib
 
+try:
+    import numpy as np
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 # =============================================================================
@@ -70,6 +77,9 @@ class BusinessType(Enum):
     ALL = "All"
 
 
+# Review statuses that count as matched
+MATCHED_STATUSES = ('MATCHED', 'VERIFIED', 'APPROVED')
+
 # Business type abbreviations for report IDs
 BUSINESS_ABBREV = {
     "Business": "DOW",
@@ -251,6 +261,9 @@ class ExpenseReportGenerator:
     Generates audit-ready reports with multiple formats and business type support.
     """
 
+    # calculate_statistics switches to pandas group-bys at this many transactions
+    COLUMNAR_MIN_ROWS = 1000
+
     def __init__(self, db=None, receipt_dir: Optional[Path] = None):
         """
         Initialize report generator.
@@ -433,25 +446,25 @@ class ExpenseReportGenerator:
                 all_txns = self.db.get_all_transactions()
                 rows = [dict(row) for _, row in all_txns.iterrows()]
 
+            start = self._parse_date(date_from) if date_from else None
+            end = self._parse_date(date_to) if date_to else None
+            filter_business = business_type and business_type != "All"
+
             transactions = []
             for row in rows:
-                txn = self._row_to_transaction(row)
+                # Filters on raw columns first, so skipped rows are never converted
+                if filter_business and row.get('business_type', '') != business_type:
+                    continue
 
-                # Apply filters
-                if business_type and business_type != "All" and txn.business_type != business_type:
+                if not include_submitted and row.get('already_submitted') == 'yes':
                     continue
 
-                if date_from:
-                    start = self._parse_date(date_from)
-                    if txn.date and start and txn.date < start:
-                        continue
+                txn = self._row_to_transaction(row)
 
-                if date_to:
-                    end = self._parse_date(date_to)
-                    if txn.date and end and txn.date > end:
-                        continue
+                if txn.date and start and txn.date < start:
+                    continue
 
-                if not include_submitted and txn.already_submitted == 'yes':
+                if txn.date and end and txn.date > end:
                     continue
 
                 transactions.append(txn)
@@ -466,12 +479,15 @@ class ExpenseReportGenerator:
             logger.error(f"Error fetching transactions: {e}")
             return []
 
-    def calculate_statistics(self, transactions: List[Transaction]) -> ReportSummary:
+    def calculate_statistics(self, transactions: List[Transaction],
+                             columnar: Optional[bool] = None) -> ReportSummary:
         """
         Calculate comprehensive statistics for transactions.
 
         Args:
             transactions: List of transactions to analyze
+            columnar: Use pandas group-bys on integer cents (True), the Decimal
+                loop (False), or pick by size (None: COLUMNAR_MIN_ROWS+)
 
         Returns:
             ReportSummary with all statistics
@@ -493,11 +509,18 @@ class ExpenseReportGenerator:
                 date_range_end=datetime.now(),
             )
 
+        if columnar is None:
+            columnar = PANDAS_AVAILABLE and len(transactions) >= self.COLUMNAR_MIN_ROWS
+        if columnar and PANDAS_AVAILABLE:
+            summary = self._calculate_statistics_columnar(transactions)
+            if summary is not None:
+                return summary
+
         # Basic stats
         amounts = [abs(t.amount) for t in transactions]
         total_amount = sum(amounts)
 
-        matched = [t for t in transactions if t.review_status in ('MATCHED', 'VERIFIED', 'APPROVED')]
+        matched = [t for t in transactions if t.review_status in MATCHED_STATUSES]
         receipts_attached = [t for t in transactions if t.has_receipt]
 
         dates = [t.date for t in transactions if t.date]
@@ -589,6 +612,154 @@ class ExpenseReportGenerator:
             monthly_trends=trends,
         )
 
+    def _calculate_statistics_columnar(self, transactions: List[Transaction]) -> Optional[ReportSummary]:
+        """
+        calculate_statistics on pandas group-bys over integer cents.
+
+        Produces the same ReportSummary as the Decimal loop (same totals,
+        percentages, tie order and Transaction objects); per-row Python work
+        is reading attributes, and vendor/category normalization runs once
+        per distinct value. Returns None when an amount has sub-cent
+        precision or a date can't be represented, so the caller falls back
+        to the exact loop.
+        """
+        try:
+            cents = []
+            for txn in transactions:
+                scaled = abs(txn.amount).scaleb(2)
+                whole = int(scaled)
+                if whole != scaled:
+                    return None
+                cents.append(whole)
+
+            effective = np.array([t.effective_category for t in transactions], dtype=object)
+            category_names = {}
+            vendor_names = {}
+            categories_col = []
+            vendors_col = []
+            for txn, eff in zip(transactions, effective):
+                cat = category_names.get(eff)
+                if cat is None:
+                    cat = category_names[eff] = self._normalize_category(eff)
+                categories_col.append(cat)
+                desc = txn.description
+                vendor = vendor_names.get(desc)
+                if vendor is None:
+                    vendor = vendor_names[desc] = self._normalize_vendor(desc)
+                vendors_col.append(vendor)
+
+            df = pd.DataFrame({
+                'cents': np.array(cents, dtype=np.int64),
+                'category': categories_col,
+                'vendor': vendors_col,
+                'effective': effective,
+                'date': pd.to_datetime([t.date for t in transactions]),
+            })
+        except (TypeError, ValueError, OverflowError, ArithmeticError) as e:
+            logger.debug(f"Columnar statistics unavailable, using Decimal loop: {e}")
+            return None
+
+        def money(value) -> Decimal:
+            return Decimal(int(value)).scaleb(-2)
+
+        def by_total(groups: pd.DataFrame) -> List[Tuple[Any, int, int]]:
+            # Group-bys keep first-appearance order; a stable descending sort
+            # then breaks ties the same way the dict-based loop does
+            rows = zip(groups.index, groups['sum'], groups['count'])
+            return sorted(((key, int(s), int(c)) for key, s, c in rows), key=lambda r: r[1], reverse=True)
+
+        count = len(transactions)
+        total_amount = money(df['cents'].sum())
+        matched_count = sum(t.review_status in MATCHED_STATUSES for t in transactions)
+        receipts_attached = sum(t.has_receipt for t in transactions)
+
+        date_ns = df['date'].to_numpy(dtype='datetime64[ns]')
+        has_date = ~np.isnat(date_ns)
+        dated_positions = np.flatnonzero(has_date)
+
+        def date_bounds(positions: np.ndarray) -> Tuple[datetime, datetime]:
+            """Earliest/latest original datetime among positions (now() if none)."""
+            positions = positions[has_date[positions]]
+            if not len(positions):
+                return datetime.now(), datetime.now()
+            values = date_ns[positions]
+            return (transactions[positions[np.argmin(values)]].date,
+                    transactions[positions[np.argmax(values)]].date)
+
+        # Category breakdown
+        category_groups = df.groupby('category', sort=False)
+        category_positions = category_groups.indices
+        categories = []
+        for cat, cat_cents, cat_count in by_total(category_groups['cents'].agg(['sum', 'count'])):
+            cat_total = money(cat_cents)
+            categories.append(CategoryBreakdown(
+                category=cat,
+                total=cat_total,
+                count=cat_count,
+                percentage=float(cat_total / total_amount * 100) if total_amount else 0,
+                transactions=[transactions[i] for i in category_positions[cat]]
+            ))
+
+        # Vendor breakdown (top 50)
+        vendor_groups = df.groupby('vendor', sort=False)
+        vendor_positions = vendor_groups.indices
+        vendors = []
+        for vendor, vendor_cents, vendor_count in by_total(vendor_groups['cents'].agg(['sum', 'count']))[:50]:
+            positions = vendor_positions[vendor]
+            vendor_total = money(vendor_cents)
+            first, last = date_bounds(positions)
+            vendors.append(VendorBreakdown(
+                vendor=vendor,
+                normalized_name=vendor,
+                total=vendor_total,
+                count=vendor_count,
+                average=vendor_total / vendor_count,
+                is_recurring=vendor_count >= 3,  # 3+ transactions = recurring
+                first_transaction=first,
+                last_transaction=last,
+                categories=list(set(pd.unique(effective[positions])))
+            ))
+
+        # Monthly trends
+        trends = []
+        if len(dated_positions):
+            dated = df.iloc[dated_positions]
+            year = dated['date'].dt.year.rename('year')
+            month = dated['date'].dt.month.rename('month')
+            month_totals = dated.groupby([year, month])['cents'].agg(['sum', 'count'])
+            month_categories = defaultdict(dict)
+            for (y, m, eff), cat_cents in dated.groupby([year, month, 'effective'], sort=False)['cents'].sum().items():
+                month_categories[(y, m)][eff] = money(cat_cents)
+            for (y, m), row in month_totals.iterrows():
+                trends.append(MonthlyTrend(
+                    year=int(y),
+                    month=int(m),
+                    total=money(row['sum']),
+                    count=int(row['count']),
+                    by_category=month_categories[(y, m)]
+                ))
+
+        date_start, date_end = date_bounds(np.arange(count))
+
+        return ReportSummary(
+            total_transactions=count,
+            total_amount=total_amount,
+            matched_count=matched_count,
+            unmatched_count=count - matched_count,
+            match_rate=matched_count / count * 100,
+            receipts_attached=receipts_attached,
+            receipts_missing=count - receipts_attached,
+            receipt_rate=receipts_attached / count * 100,
+            average_transaction=total_amount / count,
+            largest_transaction=money(df['cents'].max()),
+            smallest_transaction=money(df['cents'].min()),
+            date_range_start=date_start,
+            date_range_end=date_end,
+            by_category=categories,
+            by_vendor=vendors,
+            monthly_trends=trends,
+        )
+
     def generate_report_id(self, business_type: str, report_type: ReportType) -> str:
         """Generate unique report ID."""
         abbrev = BUSINESS_ABBREV.get(business_type, "GEN")
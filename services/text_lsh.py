@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+OCR Text MinHash/LSH
+====================
+MinHash signatures and LSH band keys for near-duplicate OCR text.
+
+OCR text is normalized to lowercase alphanumeric tokens and turned into
+token-bigram shingles. A MinHash signature of NUM_PERM values estimates
+the Jaccard similarity of two shingle sets. The signature is cut into
+BANDS bands of ROWS values, and each band is hashed to a 64-bit bucket
+key. Texts with Jaccard similarity s share at least one bucket with
+probability 1 - (1 - s^ROWS)^BANDS: about 0.5 at s = 0.5 and over 0.99
+at s = 0.8.
+
+Band keys are stored per receipt in receipt_library_text_lsh (see
+migrations/020_receipt_text_lsh.sql), so candidate lookup is one indexed
+query over the whole library.
+
+The permutation seeds are fixed. Changing NUM_PERM, BANDS, ROWS or the
+normalization invalidates every stored key and needs a re-backfill.
+"""
+
+import hashlib
+import re
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+MAX_TEXT_CHARS = 5000  # Same cap as the receipt_library_search index
+MIN_SHINGLES = 5       # Shorter texts are too generic to bucket
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Fixed permutations: (a * x + b) mod p over 32-bit shingle hashes
+_rng = np.random.RandomState(20240615)
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens of OCR text."""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text[:MAX_TEXT_CHARS].lower())
+
+
+def shingles(text: str) -> Set[str]:
+    """Token-bigram shingles (single tokens for one-word texts)."""
+    tokens = normalize_tokens(text)
+    if len(tokens) < 2:
+        return set(tokens)
+    return {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+
+def _hash32(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=4).digest(), 'little')
+
+
+def minhash_signature(text: str) -> Optional[np.ndarray]:
+    """MinHash signature (NUM_PERM uint64 values), None if text is too short."""
+    shingle_set = shingles(text)
+    if len(shingle_set) < MIN_SHINGLES:
+        return None
+
+    hashes = np.fromiter((_hash32(s) for s in shingle_set), dtype=np.uint64)
+    # a < 2^31 and x < 2^32, so a * x + b stays below 2^64
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return permuted.min(axis=1)
+
+
+def band_keys(signature: np.ndarray) -> List[Tuple[int, int]]:
+    """(band, bucket) pairs for a signature; buckets are signed 64-bit ints."""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(rows.tobytes(), digest_size=8).digest()
+        keys.append((band, int.from_bytes(digest, 'little', signed=True)))
+    return keys
+
+
+def text_band_keys(text: str) -> List[Tuple[int, int]]:
+    """Band keys for OCR text, empty if it is too short to index."""
+    signature = minhash_signature(text)
+    return band_keys(signature) if signature is not None else []
+
+
+def estimate_jaccard(sig1: np.ndarray, sig2: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return float(np.mean(sig1 == sig2))
+
+
+def update_text_lsh(cursor, receipt_id: int, ocr_text: Optional[str]):
+    """Replace a receipt's rows in receipt_library_text_lsh."""
+    cursor.execute(
+        "DELETE FROM receipt_library_text_lsh WHERE receipt_id = %s", (receipt_id,)
+    )
+    keys = text_band_keys(ocr_text or '')
+    if keys:
+        cursor.executemany(
+            "INSERT INTO receipt_library_text_lsh (receipt_id, band, bucket) VALUES (%s, %s, %s)",
+            [(receipt_id, band, bucket) for band, bucket in keys],
+        )
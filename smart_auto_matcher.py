@@ -21,6 +21,8 @@ from typing import Optional, Dict, List, Tuple
 from PIL import Image
 import requests
 
+from services.phash_index import PHashIndex
+
 # Database imports
 try:
     import pymysql
@@ -104,9 +106,39 @@ def are_images_similar(hash1: str, hash2: str, threshold: int = 10) -> bool:
 class DuplicateDetector:
     """Detects duplicate receipts using multiple strategies."""
 
+    # Same cutoff as are_images_similar()
+    SIMILARITY_THRESHOLD = 10
+
     def __init__(self, db_connection=None):
         self.db = db_connection
         self.hash_cache = {}  # In-memory cache of known hashes
+        self.content_index = {}  # content hash -> file
+        self.phash_index = PHashIndex(max_distance=self.SIMILARITY_THRESHOLD)
+
+    def _remember(self, filename: str, content_hash: str, perceptual_hash: Optional[str]):
+        """Add a file's hashes to the cache and both lookup indexes."""
+        self.hash_cache[filename] = {
+            'content': content_hash,
+            'perceptual': perceptual_hash
+        }
+        if content_hash:
+            self.content_index.setdefault(content_hash, filename)
+        if perceptual_hash:
+            self.phash_index.add(filename, perceptual_hash)
+
+    def forget(self, filename: str):
+        """Drop a deleted receipt file from the cache and indexes."""
+        hashes = self.hash_cache.pop(filename, None)
+        if not hashes:
+            return
+        if self.content_index.get(hashes.get('content')) == filename:
+            del self.content_index[hashes['content']]
+            # Another file may share the same bytes
+            for other_file, other in self.hash_cache.items():
+                if other.get('content') == hashes['content']:
+                    self.content_index[hashes['content']] = other_file
+                    break
+        self.phash_index.remove(filename)
 
     def load_existing_hashes(self):
         """Load existing receipt hashes from database."""
@@ -120,10 +152,7 @@ class DuplicateDetector:
                 FROM receipt_hashes
             ''')
             for row in cursor.fetchall():
-                self.hash_cache[row['receipt_file']] = {
-                    'content': row['content_hash'],
-                    'perceptual': row['perceptual_hash']
-                }
+                self._remember(row['receipt_file'], row['content_hash'], row['perceptual_hash'])
         except Exception as e:
             print(f"Could not load hashes: {e}")
 
@@ -136,21 +165,17 @@ class DuplicateDetector:
         perceptual_hash = compute_image_hash(image_data)
 
         # Check exact duplicates first (fast)
-        for existing_file, hashes in self.hash_cache.items():
-            if hashes.get('content') == content_hash:
-                return True, existing_file
+        existing_file = self.content_index.get(content_hash)
+        if existing_file is not None:
+            return True, existing_file
 
         # Check perceptual similarity (catches resized/recompressed)
-        for existing_file, hashes in self.hash_cache.items():
-            if hashes.get('perceptual'):
-                if are_images_similar(perceptual_hash, hashes['perceptual']):
-                    return True, existing_file
+        similar = self.phash_index.search(perceptual_hash, limit=1)
+        if similar:
+            return True, similar[0][0]
 
         # Not a duplicate - add to cache
-        self.hash_cache[filename] = {
-            'content': content_hash,
-            'perceptual': perceptual_hash
-        }
+        self._remember(filename, content_hash, perceptual_hash)
 
         return False, None
 
@@ -172,6 +197,7 @@ class DuplicateDetector:
                     perceptual_hash = VALUES(perceptual_hash)
             ''', (filename, content_hash, perceptual_hash))
             self.db.commit()
+            self._remember(filename, content_hash, perceptual_hash)
         except Exception as e:
             print(f"Could not store hash: {e}")
 
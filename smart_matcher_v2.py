@@ -45,6 +45,15 @@ from pathlib import Path
 from enum import Enum
 import threading
 
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+    linear_sum_assignment = None
+
 
 # =============================================================================
 # CONFIGURATION
@@ -990,6 +999,172 @@ class MatchLearner:
             return self.learned_aliases.get(bank_description.lower())
 
 
+# =============================================================================
+# CANDIDATE PREFILTER
+# =============================================================================
+
+class CandidateIndex:
+    """
+    Amount index over transactions for batch matching.
+
+    Transactions are held in a NumPy array of amount-cents (sorted), so each
+    receipt's candidate set is a binary-searched amount slice instead of a
+    scan of every transaction. Only candidates inside the window get full
+    scoring.
+
+    The amount window covers every amount the AmountMatcher can score above
+    zero (20% band, fee tolerance, tip/tax allowances). Dates are not used
+    for pruning: an exact amount and merchant score 0.90 however far apart
+    the dates are. A receipt with no usable amount gets every transaction,
+    like an unfiltered match().
+
+    This is an approximation. A transaction outside the amount window has
+    an amount score of 0, but merchant + date (+ context bonus) can still
+    put it at REVIEW, or AUTO_GOOD with calendar/contact context, so a full
+    scan may return a merchant-only match the index never offers.
+    """
+
+    # pct_diff = diff / max(r, t) <= 20% still scores
+    AMOUNT_PCT_BAND = Decimal('0.20')
+
+    def __init__(self, transactions: List[Transaction]):
+        self.transactions = list(transactions)
+
+        cents = np.array(
+            [self._to_cents(t.amount) for t in self.transactions], dtype=np.int64
+        )
+
+        # Transactions that can never score on amount are left out
+        order = np.argsort(cents, kind='stable')
+        order = order[cents[order] > 0]
+
+        self._order = order
+        self._cents = cents[order]
+        self._alive = np.ones(len(self.transactions), dtype=bool)
+        self._positions: Dict[Any, List[int]] = {}
+        for i, t in enumerate(self.transactions):
+            self._positions.setdefault(t.id, []).append(i)
+
+    @staticmethod
+    def _to_cents(amount: Any) -> int:
+        try:
+            return int((Decimal(str(amount)) * 100).to_integral_value(ROUND_HALF_UP))
+        except Exception:
+            return 0
+
+    def amount_window(self, receipt: Receipt) -> Tuple[int, int]:
+        """Inclusive (low, high) transaction amount range in cents."""
+        r_amt = Decimal(str(receipt.amount))
+        base = receipt.subtotal or r_amt
+        fee = AmountMatcher.FEE_TOLERANCE
+
+        low = min(r_amt * (1 - self.AMOUNT_PCT_BAND), r_amt - fee)
+        high = max(
+            r_amt / (1 - self.AMOUNT_PCT_BAND),
+            r_amt + fee,
+            r_amt + base * AmountMatcher.TIP_MAX_PCT,
+            base + (receipt.tax or Decimal('0')) + (receipt.tip or Decimal('0')),
+        )
+        # A cent of slack either side for quantize rounding
+        return self._to_cents(low) - 1, self._to_cents(high) + 1
+
+    def remove(self, transaction_id: Any):
+        """Drop a transaction from future candidate sets (already matched)."""
+        for pos in self._positions.get(transaction_id, ()):
+            self._alive[pos] = False
+
+    def candidates(self, receipt: Receipt) -> List[Transaction]:
+        """Transactions that could score for this receipt, in input order."""
+        if self._to_cents(receipt.amount) <= 0:
+            return [t for t, alive in zip(self.transactions, self._alive) if alive]
+
+        low, high = self.amount_window(receipt)
+        start = np.searchsorted(self._cents, low, side='left')
+        stop = np.searchsorted(self._cents, high, side='right')
+
+        positions = self._order[start:stop]
+        positions = np.sort(positions[self._alive[positions]])
+        return [self.transactions[i] for i in positions]
+
+
+# =============================================================================
+# GLOBAL ASSIGNMENT
+# =============================================================================
+
+class AssignmentSolver:
+    """
+    Maximum-weight bipartite assignment of receipts to transactions.
+
+    Input is a sparse list of (receipt_key, transaction_key, score) edges.
+    The edges are split into connected components with union-find and each
+    component is solved on its own, so a batch with tens of thousands of
+    pairs becomes many small dense problems. Components with a single
+    receipt or transaction just take their best edge; larger ones go to
+    scipy's linear_sum_assignment. Without scipy, a greedy pass over edges
+    sorted by score is used instead.
+    """
+
+    def solve(self, edges: List[Tuple[Any, Any, float]]) -> Dict[Any, Any]:
+        """
+        Returns:
+            {receipt_key: transaction_key} for the chosen edges
+        """
+        parent: Dict[Tuple[str, Any], Tuple[str, Any]] = {}
+
+        def find(node):
+            root = node
+            while parent.setdefault(root, root) != root:
+                root = parent[root]
+            while parent[node] != root:
+                parent[node], node = root, parent[node]
+            return root
+
+        for r_key, t_key, _ in edges:
+            r_root, t_root = find(('r', r_key)), find(('t', t_key))
+            if r_root != t_root:
+                parent[r_root] = t_root
+
+        components: Dict[Tuple[str, Any], List[Tuple[Any, Any, float]]] = {}
+        for edge in edges:
+            components.setdefault(find(('r', edge[0])), []).append(edge)
+
+        assignment: Dict[Any, Any] = {}
+        for component in components.values():
+            assignment.update(self._solve_component(component))
+        return assignment
+
+    def _solve_component(self, edges: List[Tuple[Any, Any, float]]) -> Dict[Any, Any]:
+        r_keys = list(dict.fromkeys(r for r, _, _ in edges))
+        t_keys = list(dict.fromkeys(t for _, t, _ in edges))
+
+        # One side of size 1: the best edge is optimal
+        if len(r_keys) == 1 or len(t_keys) == 1 or not SCIPY_AVAILABLE:
+            return self._solve_greedy(edges)
+
+        r_pos = {k: i for i, k in enumerate(r_keys)}
+        t_pos = {k: j for j, k in enumerate(t_keys)}
+        weights = np.zeros((len(r_keys), len(t_keys)))
+        for r_key, t_key, score in edges:
+            weights[r_pos[r_key], t_pos[t_key]] = score
+
+        rows, cols = linear_sum_assignment(weights, maximize=True)
+        return {
+            r_keys[i]: t_keys[j]
+            for i, j in zip(rows, cols)
+            if weights[i, j] > 0
+        }
+
+    @staticmethod
+    def _solve_greedy(edges: List[Tuple[Any, Any, float]]) -> Dict[Any, Any]:
+        assignment: Dict[Any, Any] = {}
+        taken: Set[Any] = set()
+        for r_key, t_key, _ in sorted(edges, key=lambda e: e[2], reverse=True):
+            if r_key not in assignment and t_key not in taken:
+                assignment[r_key] = t_key
+                taken.add(t_key)
+        return assignment
+
+
 # =============================================================================
 # MAIN MATCHER CLASS
 # =============================================================================
@@ -1006,6 +1181,9 @@ class SmartMatcherV2:
 
         # Batch match
         results = matcher.match_batch(receipts, transactions)
+
+        # Batch match with global optimal assignment
+        results = matcher.match_batch(receipts, transactions, optimal=True)
     """
 
     def __init__(self, db_connection=None):
@@ -1190,13 +1368,21 @@ class SmartMatcherV2:
             if score.confidence != MatchConfidence.NO_MATCH:
                 candidates.append((tx, score))
 
+        # Sort by score
+        candidates.sort(key=lambda x: x[1].total, reverse=True)
+
+        return self._resolve_candidates(receipt, candidates)
+
+    def _resolve_candidates(
+        self,
+        receipt: Receipt,
+        candidates: List[Tuple[Transaction, MatchScore]],
+    ) -> MatchResult:
+        """Pick the winner among scored candidates (sorted best first)."""
         if not candidates:
             self.stats['no_match'] += 1
             return MatchResult(receipt_id=receipt.id, matched=False)
 
-        # Sort by score
-        candidates.sort(key=lambda x: x[1].total, reverse=True)
-
         best_tx, best_score = candidates[0]
 
         # Check for collision (multiple high-scoring candidates)
@@ -1272,13 +1458,29 @@ class SmartMatcherV2:
         transactions: List[Transaction],
         calendar_events: List[Dict] = None,
         contacts: List[Dict] = None,
+        prefilter: bool = False,
+        optimal: bool = False,
     ) -> List[MatchResult]:
         """
         Match multiple receipts to transactions.
         Handles conflicts where multiple receipts could match same transaction.
+
+        By default every receipt is scored against every transaction. With
+        prefilter=True, each receipt is only scored against the transactions
+        inside its amount window (see CandidateIndex). That is much faster on
+        large batches but not identical: merchant-only matches (amount score
+        0, REVIEW or, with context, AUTO_GOOD) outside the window are never
+        considered.
+
+        By default receipts claim their best transaction greedily, highest
+        OCR confidence first. With optimal=True the auto-match pairs are
+        chosen by maximum-weight assignment over the whole batch instead
+        (see AssignmentSolver), so one receipt taking a shared transaction
+        no longer leaves another receipt without its only good match.
         """
         results = []
         matched_tx_ids: Set[Any] = set()
+        index = CandidateIndex(transactions) if prefilter else None
 
         # Sort receipts by confidence (higher first)
         sorted_receipts = sorted(
@@ -1287,9 +1489,17 @@ class SmartMatcherV2:
             reverse=True,
         )
 
+        if optimal:
+            return self._match_batch_optimal(
+                sorted_receipts, transactions, calendar_events, contacts, index,
+            )
+
         for receipt in sorted_receipts:
             # Filter out already-matched transactions
-            available = [t for t in transactions if t.id not in matched_tx_ids]
+            if index is not None:
+                available = index.candidates(receipt)
+            else:
+                available = [t for t in transactions if t.id not in matched_tx_ids]
 
             result = self.match(
                 receipt, available, calendar_events, contacts,
@@ -1300,6 +1510,78 @@ class SmartMatcherV2:
 
             if result.matched and result.transaction_id:
                 matched_tx_ids.add(result.transaction_id)
+                if index is not None:
+                    index.remove(result.transaction_id)
+
+        return results
+
+    def _match_batch_optimal(
+        self,
+        receipts: List[Receipt],
+        transactions: List[Transaction],
+        calendar_events: List[Dict],
+        contacts: List[Dict],
+        index: Optional[CandidateIndex],
+    ) -> List[MatchResult]:
+        """
+        Batch matching with a global assignment of auto-match pairs.
+
+        Every receipt is scored against its candidates once. Pairs scoring
+        at auto-match level become edges for the AssignmentSolver. Each
+        receipt is then resolved like match() would, but only over its
+        assigned transaction and the transactions nobody was assigned, so
+        near-ties still go through the CollisionResolver.
+        """
+        scored: List[List[Tuple[Transaction, MatchScore]]] = []
+        edges: List[Tuple[int, Any, float]] = []
+
+        for pos, receipt in enumerate(receipts):
+            self.stats['total_matches'] += 1
+
+            pool = index.candidates(receipt) if index is not None else transactions
+            candidates: List[Tuple[Transaction, MatchScore]] = []
+            for tx in pool:
+                if tx.has_receipt:
+                    continue
+                score = self._calculate_score(receipt, tx, calendar_events, contacts)
+                if score.confidence != MatchConfidence.NO_MATCH:
+                    candidates.append((tx, score))
+
+            candidates.sort(key=lambda x: x[1].total, reverse=True)
+            scored.append(candidates)
+
+            for tx, score in candidates:
+                if score.confidence in (MatchConfidence.AUTO_HIGH, MatchConfidence.AUTO_GOOD):
+                    edges.append((pos, tx.id, score.total))
+
+        assignment = AssignmentSolver().solve(edges)
+        taken: Set[Any] = set(assignment.values())
+
+        results = []
+        for pos, receipt in enumerate(receipts):
+            assigned_id = assignment.get(pos)
+            available = [
+                c for c in scored[pos]
+                if c[0].id == assigned_id or c[0].id not in taken
+            ]
+
+            result = self._resolve_candidates(receipt, available)
+
+            # A collision may settle on another free transaction or stay open
+            if result.transaction_id != assigned_id or not result.matched:
+                taken.discard(assigned_id)
+                if result.matched:
+                    taken.add(result.transaction_id)
+
+            if (
+                result.matched
+                and scored[pos]
+                and scored[pos][0][0].id != result.transaction_id
+                and not result.resolution_reason
+            ):
+                result.resolution_reason = "Global assignment: best candidate went to another receipt"
+
+            results.append(result)
 
         return results
 
@@ -176,6 +176,238 @@ class TestDuplicateDetector:
         assert DuplicateDetector.AMOUNT_TOLERANCE_PERCENT == 0.01
 
 
+class TestPHashIndex:
+    """Tests for phash_index.py"""
+
+    def test_finds_hashes_within_distance(self):
+        """Test search returns every hash within the radius, closest first."""
+        from services.phash_index import PHashIndex
+
+        index = PHashIndex(max_distance=8)
+        base = 0x8f3c61d2a4b07e95
+        index.add(1, f"{base:016x}")
+        index.add(2, f"{base ^ 0b1:016x}")                 # 1 bit
+        index.add(3, f"{base ^ 0x0101010101010101:016x}")  # 8 bits, spread over chunks
+        index.add(4, f"{base ^ 0x1ff:016x}")               # 9 bits
+
+        assert index.search(f"{base:016x}") == [(1, 0), (2, 1), (3, 8)]
+
+    def test_matches_brute_force(self):
+        """Test index results equal a linear Hamming scan."""
+        import random
+        from services.phash_index import PHashIndex
+
+        rng = random.Random(3)
+        index = PHashIndex(max_distance=10)
+        hashes = {}
+        base = rng.getrandbits(64)
+        for i in range(2000):
+            # Cluster around a few hashes so there is something to find
+            value = base ^ rng.getrandbits(64) if i % 2 else base
+            for _ in range(rng.randint(0, 12)):
+                value ^= 1 << rng.randrange(64)
+            hashes[i] = value
+            index.add(i, f"{value:016x}")
+
+        for query in list(hashes.values())[:50]:
+            expected = sorted(
+                k for k, v in hashes.items() if (v ^ query).bit_count() <= 10
+            )
+            assert sorted(k for k, _ in index.search(query)) == expected
+
+    def test_remove_and_reindex(self):
+        """Test removed keys disappear and re-adding replaces the hash."""
+        from services.phash_index import PHashIndex
+
+        index = PHashIndex(max_distance=8)
+        index.add(1, 'ffffffffffffffff')
+        index.remove(1)
+        assert index.search('ffffffffffffffff') == []
+
+        index.add(2, 'ffffffffffffffff')
+        index.add(2, '0000000000000000')
+        assert index.search('ffffffffffffffff') == []
+        assert index.search('0000000000000000') == [(2, 0)]
+        assert len(index) == 1
+
+    def test_exclude_and_invalid(self):
+        """Test excluded keys and unparseable hashes are skipped."""
+        from services.phash_index import PHashIndex
+
+        index = PHashIndex(max_distance=8)
+        assert index.add(1, 'not-a-hash') is False
+        index.add(2, 'ffffffffffffffff')
+        index.add(3, 'fffffffffffffffe')
+
+        assert index.search('ffffffffffffffff', exclude={2}) == [(3, 1)]
+        assert index.search(None) == []
+        with pytest.raises(ValueError):
+            index.search('ffffffffffffffff', max_distance=9)
+
+    def test_detector_index_picks_up_other_workers_rows(self, monkeypatch):
+        """Test receipts inserted elsewhere are added once the refresh TTL passes."""
+        from contextlib import contextmanager
+        import services.duplicate_detector as dd
+
+        table = [{'id': 1, 'fingerprint': 'ffffffffffffffff'}]
+        queries = []
+
+        def execute(sql, params):
+            queries.append(params[0])
+            cursor.fetchall.return_value = [r for r in table if r['id'] > params[0]]
+
+        cursor = MagicMock()
+        cursor.execute.side_effect = execute
+
+        @contextmanager
+        def pooled_connection():
+            conn = MagicMock()
+            conn.cursor.return_value = cursor
+            yield conn
+
+        clock = [1000.0]
+        monkeypatch.setattr(dd.time, 'monotonic', lambda: clock[0])
+        monkeypatch.setattr(dd, '_phash_index', None)
+        monkeypatch.setattr(dd, '_phash_index_max_id', 0)
+        with patch('services.duplicate_detector.MySQLReceiptDatabase'):
+            detector = dd.DuplicateDetector()
+        detector.db.pooled_connection = pooled_connection
+
+        index = detector._get_phash_index()
+        assert [k for k, _ in index.search('ffffffffffffffff')] == [1]
+
+        # Another worker inserts a near-identical receipt
+        table.append({'id': 2, 'fingerprint': 'fffffffffffffffe'})
+        clock[0] += 1
+        assert detector._get_phash_index() is index
+        assert queries == [0]
+
+        clock[0] += dd.PHASH_INDEX_REFRESH_SECONDS
+        assert detector._get_phash_index() is index
+        assert queries == [0, 1]
+        assert [k for k, _ in index.search('ffffffffffffffff')] == [1, 2]
+
+        clock[0] += dd.PHASH_INDEX_RELOAD_SECONDS
+        assert len(detector._get_phash_index()) == 2
+        assert queries == [0, 1, 0]
+
+
+RECEIPT_TEXT = """
+    BLUE BOTTLE COFFEE 300 WEBSTER ST OAKLAND CA
+    ORDER 4417 CASHIER MAYA 06/15/2024 08:42 AM
+    NOLA ICED COFFEE 6.50 CROISSANT 4.75 OAT MILK 0.75
+    SUBTOTAL 12.00 TAX 1.11 TOTAL 13.11 VISA XXXX1234
+    THANK YOU FOR VISITING
+"""
+
+
+class TestTextLSH:
+    """Tests for text_lsh.py"""
+
+    def test_near_duplicate_shares_buckets(self):
+        """Test OCR re-reads of the same receipt land in shared buckets."""
+        from services.text_lsh import text_band_keys
+
+        reread = RECEIPT_TEXT.replace('CROISSANT', 'CR0ISSANT').replace('OAKLAND', '0AKLAND')
+        shared = set(text_band_keys(RECEIPT_TEXT)) & set(text_band_keys(reread))
+
+        assert len(shared) >= 4
+
+    def test_unrelated_text_shares_nothing(self):
+        """Test different receipts do not collide."""
+        from services.text_lsh import text_band_keys
+
+        other = """
+            SHELL OIL 57442 NASHVILLE TN PUMP 07 UNLEADED
+            12.402 GAL @ 3.199 TOTAL 39.67 MASTERCARD AUTH 88123
+        """
+
+        assert not set(text_band_keys(RECEIPT_TEXT)) & set(text_band_keys(other))
+
+    def test_short_text_not_indexed(self):
+        """Test very short text yields no keys."""
+        from services.text_lsh import text_band_keys, minhash_signature, BANDS
+
+        assert text_band_keys('TOTAL 5.00') == []
+        assert minhash_signature('') is None
+        assert len(text_band_keys(RECEIPT_TEXT)) == BANDS
+
+    def test_signature_is_stable(self):
+        """Test signatures are deterministic (they are stored in MySQL)."""
+        from services.text_lsh import minhash_signature, estimate_jaccard
+
+        sig = minhash_signature(RECEIPT_TEXT)
+        assert estimate_jaccard(sig, minhash_signature(RECEIPT_TEXT.lower())) == 1.0
+
+    def test_update_text_lsh_replaces_rows(self):
+        """Test index rows are deleted then re-inserted for a receipt."""
+        from services.text_lsh import update_text_lsh, BANDS
+
+        cursor = MagicMock()
+        update_text_lsh(cursor, 42, RECEIPT_TEXT)
+
+        assert 'DELETE FROM receipt_library_text_lsh' in cursor.execute.call_args[0][0]
+        rows = cursor.executemany.call_args[0][1]
+        assert len(rows) == BANDS
+        assert all(row[0] == 42 for row in rows)
+
+    def test_detector_confirms_lsh_candidates(self, monkeypatch):
+        """Test LSH candidates are confirmed with SequenceMatcher."""
+        import services.duplicate_detector as dd
+        from services.duplicate_detector import DuplicateDetector
+
+        monkeypatch.setattr(dd, '_text_index_backfill_started', True)
+        with patch('services.duplicate_detector.MySQLReceiptDatabase'):
+            detector = DuplicateDetector()
+        detector.db.use_mysql = True
+        detector._lsh_text_candidates = Mock(return_value=[
+            (7, RECEIPT_TEXT.replace('MAYA', 'MAYA.')),
+            (8, 'SHELL OIL 57442 NASHVILLE TN PUMP 07 UNLEADED TOTAL 39.67'),
+        ])
+
+        matches = detector._find_by_text_similarity(RECEIPT_TEXT, [1])
+
+        assert [m[0] for m in matches] == [7]
+        keys, exclude_ids, limit = detector._lsh_text_candidates.call_args[0]
+        assert exclude_ids == [1]
+        assert limit == DuplicateDetector.TEXT_LSH_CANDIDATES
+
+    def test_detector_scans_recent_when_lsh_has_nothing(self, monkeypatch):
+        """Test short text and empty LSH results fall back to the recent scan."""
+        import services.duplicate_detector as dd
+
+        monkeypatch.setattr(dd, '_text_index_backfill_started', True)
+        with patch('services.duplicate_detector.MySQLReceiptDatabase'):
+            detector = dd.DuplicateDetector()
+        detector.db.use_mysql = True
+        detector._lsh_text_candidates = Mock(return_value=[])
+        detector._scan_recent_text_similarity = Mock(return_value=[(9, 0.9)])
+
+        assert detector._find_by_text_similarity(RECEIPT_TEXT, [1]) == [(9, 0.9)]
+        assert detector._find_by_text_similarity('TOTAL 5.00', [1]) == [(9, 0.9)]
+        assert detector._lsh_text_candidates.call_count == 1
+        assert detector._scan_recent_text_similarity.call_count == 2
+
+    def test_backfill_starts_once_per_process(self, monkeypatch):
+        """Test the first text lookup starts the LSH backfill in the background."""
+        import services.duplicate_detector as dd
+
+        started = []
+        monkeypatch.setattr(dd, '_text_index_backfill_started', False)
+        monkeypatch.setattr(dd.threading, 'Thread', lambda target, name, daemon: Mock(
+            start=lambda: started.append(name)))
+        with patch('services.duplicate_detector.MySQLReceiptDatabase'):
+            detector = dd.DuplicateDetector()
+        detector.db.use_mysql = True
+        detector._lsh_text_candidates = Mock(return_value=[])
+        detector._scan_recent_text_similarity = Mock(return_value=[])
+
+        detector._find_by_text_similarity(RECEIPT_TEXT, [])
+        detector._find_by_text_similarity(RECEIPT_TEXT, [])
+
+        assert started == ['text-lsh-backfill']
+
+
 # ============================================
 # Receipt Search Tests
 # ============================================
@@ -24,6 +24,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from smart_matcher_v2 import (
     SmartMatcherV2,
+    CandidateIndex,
+    AssignmentSolver,
     AmountMatcher,
     MerchantMatcher,
     DateMatcher,
@@ -635,6 +637,181 @@ class TestCollisionResolution(unittest.TestCase):
         self.assertEqual(len(matched_tx_ids), len(set(matched_tx_ids)))
 
 
+# =============================================================================
+# CANDIDATE PREFILTER TESTS
+# =============================================================================
+
+class TestCandidatePrefilter(unittest.TestCase):
+    """Amount prefilter used by match_batch(prefilter=True)"""
+
+    def setUp(self):
+        self.matcher = SmartMatcherV2()
+        self.today = datetime(2024, 6, 15)
+
+    def ids(self, receipt, transactions):
+        return [t.id for t in CandidateIndex(transactions).candidates(receipt)]
+
+    def test_keeps_scoreable_amounts(self):
+        """Fee, 20% band and tip-adjusted amounts stay in the window"""
+        receipt = make_receipt('Corner Pub', 85.00, self.today)
+        transactions = [
+            make_transaction('TST* CORNER PUB', 85.00, self.today, id=1),
+            make_transaction('TST* CORNER PUB', 87.00, self.today, id=2),
+            make_transaction('TST* CORNER PUB', 102.00, self.today, id=3),  # 20% tip
+            make_transaction('TST* CORNER PUB', 69.00, self.today, id=4),   # -19%
+            make_transaction('TST* CORNER PUB', 200.00, self.today, id=5),
+            make_transaction('TST* CORNER PUB', 40.00, self.today, id=6),
+        ]
+
+        self.assertEqual(self.ids(receipt, transactions), [1, 2, 3, 4])
+
+    def test_dates_are_not_pruned(self):
+        """Far-off and missing dates are kept: amount + merchant alone can auto-match"""
+        receipt = make_receipt('Starbucks', 5.75, self.today)
+        undated = make_transaction('SQ *STARBUCKS', 5.75, id=3)
+        undated.date = None
+        transactions = [
+            make_transaction('SQ *STARBUCKS', 5.75, self.today + timedelta(days=20), id=1),
+            make_transaction('SQ *STARBUCKS', 5.75, self.today - timedelta(days=60), id=2),
+            undated,
+        ]
+
+        self.assertEqual(self.ids(receipt, transactions), [1, 2, 3])
+
+    def test_prefilter_is_opt_in(self):
+        """A 45-day-old exact amount/merchant charge still matches, with or without prefilter"""
+        receipts = [make_receipt('Starbucks', 5.75, self.today, id=1)]
+        transactions = [make_transaction('SQ *STARBUCKS', 5.75, self.today + timedelta(days=45), id=7)]
+
+        default = self.matcher.match_batch(receipts, transactions)
+        filtered = self.matcher.match_batch(receipts, transactions, prefilter=True)
+
+        self.assertEqual([(r.transaction_id, r.matched) for r in default], [(7, True)])
+        self.assertEqual([(r.transaction_id, r.matched) for r in filtered], [(7, True)])
+
+    def test_receipt_without_amount_sees_everything(self):
+        """No usable receipt amount -> no amount filtering"""
+        receipt = make_receipt('Starbucks', 0, self.today)
+        transactions = [
+            make_transaction('SQ *STARBUCKS', 5.75, self.today, id=1),
+            make_transaction('SQ *STARBUCKS', 500.00, self.today, id=2),
+        ]
+
+        self.assertEqual(self.ids(receipt, transactions), [1, 2])
+
+    def test_remove_drops_matched_transaction(self):
+        """Removed transactions are no longer candidates"""
+        receipt = make_receipt('Uber', 15.00, self.today)
+        transactions = [
+            make_transaction('UBER *TRIP', 15.00, self.today, id=1),
+            make_transaction('UBER *TRIP', 15.00, self.today, id=2),
+        ]
+        index = CandidateIndex(transactions)
+        index.remove(1)
+
+        self.assertEqual([t.id for t in index.candidates(receipt)], [2])
+
+    def test_batch_matches_unfiltered(self):
+        """Prefiltered batch assigns the same transactions as a full scan"""
+        receipts = [
+            make_receipt('Starbucks', 5.75, self.today, id=1),
+            make_receipt('Corner Pub', 85.00, self.today, id=2),
+            make_receipt('Uber', 15.50, self.today, id=3),
+        ]
+        transactions = [
+            make_transaction('SQ *STARBUCKS', 5.75, self.today, id=1),
+            make_transaction('TST* CORNER PUB', 102.00, self.today, id=2),
+            make_transaction('UBER *TRIP', 15.50, self.today + timedelta(days=1), id=3),
+            make_transaction('AMAZON', 250.00, self.today, id=4),
+        ]
+
+        filtered = self.matcher.match_batch(receipts, transactions, prefilter=True)
+        unfiltered = self.matcher.match_batch(receipts, transactions)
+
+        self.assertEqual(
+            [(r.receipt_id, r.transaction_id, r.matched) for r in filtered],
+            [(r.receipt_id, r.transaction_id, r.matched) for r in unfiltered],
+        )
+
+
+# =============================================================================
+# GLOBAL ASSIGNMENT TESTS
+# =============================================================================
+
+class TestOptimalAssignment(unittest.TestCase):
+    """Maximum-weight assignment mode for match_batch"""
+
+    def setUp(self):
+        self.matcher = SmartMatcherV2()
+        self.today = datetime(2024, 6, 15)
+
+    def test_solver_beats_greedy(self):
+        """Receipt A gives up its best transaction so B can match"""
+        edges = [('A', 1, 0.95), ('A', 2, 0.80), ('B', 1, 0.90)]
+
+        self.assertEqual(AssignmentSolver().solve(edges), {'A': 2, 'B': 1})
+
+    def test_solver_independent_components(self):
+        """Disconnected groups are solved separately"""
+        edges = [
+            ('A', 1, 0.9), ('B', 1, 0.8),
+            ('C', 2, 0.9), ('C', 3, 0.7), ('D', 2, 0.85),
+        ]
+
+        self.assertEqual(
+            AssignmentSolver().solve(edges),
+            {'A': 1, 'C': 3, 'D': 2},
+        )
+
+    def test_solver_without_scipy(self):
+        """Falls back to greedy edge selection when scipy is missing"""
+        import smart_matcher_v2
+        edges = [('A', 1, 0.95), ('A', 2, 0.80), ('B', 1, 0.90)]
+        original = smart_matcher_v2.SCIPY_AVAILABLE
+        smart_matcher_v2.SCIPY_AVAILABLE = False
+        try:
+            self.assertEqual(AssignmentSolver().solve(edges), {'A': 1})
+        finally:
+            smart_matcher_v2.SCIPY_AVAILABLE = original
+
+    def test_batch_assigns_shared_transactions(self):
+        """Two receipts competing for two charges both get matched"""
+        receipts = [
+            make_receipt('Starbucks', 5.75, self.today, id=1, confidence=0.95),
+            make_receipt('Starbucks', 5.75, self.today + timedelta(days=3), id=2, confidence=0.5),
+        ]
+        transactions = [
+            make_transaction('SQ *STARBUCKS', 5.75, self.today + timedelta(days=1), id=1),
+            make_transaction('SQ *STARBUCKS', 5.75, self.today - timedelta(days=2), id=2),
+        ]
+
+        results = self.matcher.match_batch(receipts, transactions, optimal=True)
+
+        self.assertTrue(all(r.matched for r in results))
+        self.assertEqual(sorted(r.transaction_id for r in results), [1, 2])
+
+    def test_batch_result_shape(self):
+        """Optimal mode returns one MatchResult per receipt, in batch order"""
+        receipts = [
+            make_receipt('Starbucks', 5.75, self.today, id=1, confidence=0.5),
+            make_receipt('Corner Pub', 85.00, self.today, id=2, confidence=0.9),
+            make_receipt('Nowhere Diner', 999.00, self.today, id=3, confidence=0.7),
+        ]
+        transactions = [
+            make_transaction('SQ *STARBUCKS', 5.75, self.today, id=1),
+            make_transaction('TST* CORNER PUB', 102.00, self.today, id=2),
+        ]
+
+        greedy = self.matcher.match_batch(receipts, transactions)
+        optimal = self.matcher.match_batch(receipts, transactions, optimal=True)
+
+        self.assertEqual(
+            [(r.receipt_id, r.transaction_id, r.matched) for r in optimal],
+            [(r.receipt_id, r.transaction_id, r.matched) for r in greedy],
+        )
+        self.assertEqual([r.receipt_id for r in optimal], [2, 3, 1])
+
+
 # =============================================================================
 # EDGE CASE TESTS (5 tests)
 # =============================================================================
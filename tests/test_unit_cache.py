@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Thread-Safe Cache Manager
+=============================================
+
+Tests for cache_manager including:
+- DataFrameCache incremental (change-feed) refresh
+- Fallback to full reloads
+- Row patching against the cached frame
+- Per-user shards with memory budget and LRU eviction
+- Compact dtype schema
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pd = pytest.importorskip("pandas")
+
+from decimal import Decimal
+from datetime import date
+
+from cache_manager import DataFrameCache, UserDataFrameCache, RowLocator, patch_row, apply_schema, row_to_dict
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+class FakeTransactionSource:
+    """In-memory stand-in for the transactions table with a change feed."""
+
+    def __init__(self, rows: int = 5):
+        self.rows = {
+            i: {'_index': i, 'Chase Description': f'Merchant {i}', 'Chase Amount': float(i)}
+            for i in range(1, rows + 1)
+        }
+        self.version = {i: 0 for i in self.rows}
+        self.clock = 0
+        self.full_loads = 0
+        self.delta_loads = 0
+
+    def _watermark(self):
+        return {'updated_at': self.clock, 'row_count': len(self.rows)}
+
+    def upsert(self, idx: int, **values):
+        self.clock += 1
+        row = self.rows.setdefault(idx, {'_index': idx})
+        row.update(values)
+        self.version[idx] = self.clock
+
+    def delete(self, idx: int):
+        self.rows.pop(idx)
+        self.version.pop(idx)
+
+    def full_loader(self):
+        self.full_loads += 1
+        frame = pd.DataFrame(sorted(self.rows.values(), key=lambda r: r['_index']))
+        return frame, self._watermark()
+
+    def delta_loader(self, watermark):
+        self.delta_loads += 1
+        since = watermark['updated_at']
+        changed = [self.rows[i] for i, v in self.version.items() if v > since]
+        return pd.DataFrame(changed, columns=['_index', 'Chase Description', 'Chase Amount']), self._watermark()
+
+
+def make_cache(**kwargs) -> DataFrameCache:
+    cache = DataFrameCache(ttl_seconds=300, **kwargs)
+    return cache
+
+
+# =============================================================================
+# INCREMENTAL REFRESH
+# =============================================================================
+
+class TestIncrementalRefresh:
+    """DataFrameCache change-feed refresh."""
+
+    @pytest.mark.unit
+    def test_first_access_is_full_load(self):
+        source = FakeTransactionSource()
+        cache = make_cache()
+
+        df = cache.get_dataframe(loader=source.full_loader, delta_loader=source.delta_loader)
+
+        assert len(df) == 5
+        assert source.full_loads == 1
+        assert source.delta_loads == 0
+
+    @pytest.mark.unit
+    def test_invalidate_applies_delta_instead_of_reload(self):
+        source = FakeTransactionSource()
+        cache = make_cache()
+        cache.get_dataframe(loader=source.full_loader, delta_loader=source.delta_loader)
+
+        source.upsert(3, **{'Chase Description': 'Updated'})
+        source.upsert(6, **{'Chase Description': 'New row', 'Chase Amount': 6.0})
+        cache.invalidate()
+        df = cache.get_dataframe(loader=source.full_loader, delta_loader=source.delta_loader)
+
+        assert source.full_loads == 1
+        assert source.delta_loads == 1
+        assert list(df['_index']) == [1, 2, 3, 4, 5, 6]
+        assert df.loc[df['_index'] == 3, 'Chase Description'].iloc[0] == 'Updated'
+        assert cache.stats()['rows_merged'] == 2
+
+    @pytest.mark.unit
+    def test_row_count_mismatch_falls_back_to_full_reload(self):
+        source = FakeTransactionSource()
+        cache = make_cache()
+        cache.get_dataframe(loader=source.full_loader, delta_loader=source.delta_loader)
+
+        source.delete(2)
+        cache.invalidate()
+        df = cache.get_dataframe(loader=source.full_loader, delta_loader=source.delta_loader)
+
+        assert source.full_loads == 2
+        assert 2 not in set(df['_index'])
+
+    @pytest.mark.unit
+    def test_delta_loader_can_request_full_reload(self):
+        source = FakeTransactionSource()
+        cache = make_cache()
+        cache.get_dataframe(loader=source.full_loader, delta_loader=source.delta_loader)
+
+        cache.invalidate()
+        cache.get_dataframe(loader=source.full_loader, delta_loader=lambda wm: None)
+
+        assert source.full_loads == 2
+
+    @pytest.mark.unit
+    def test_delta_loader_error_falls_back_to_full_reload(self):
+        source = FakeTransactionSource()
+        cache = make_cache()
+        cache.get_dataframe(loader=source.full_loader, delta_loader=source.delta_loader)
+
+        def broken(watermark):
+            raise ConnectionError("lost connection")
+
+        cache.invalidate()
+        df = cache.get_dataframe(loader=source.full_loader, delta_loader=broken)
+
+        assert source.full_loads == 2
+        assert len(df) == 5
+
+    @pytest.mark.unit
+    def test_full_invalidate_forces_full_reload(self):
+        source = FakeTransactionSource()
+        cache = make_cache()
+        cache.get_dataframe(loader=source.full_loader, delta_loader=source.delta_loader)
+
+        cache.invalidate(full=True)
+        cache.get_dataframe(loader=source.full_loader, delta_loader=source.delta_loader)
+
+        assert source.full_loads == 2
+        assert source.delta_loads == 0
+
+    @pytest.mark.unit
+    def test_periodic_full_reload(self):
+        source = FakeTransactionSource()
+        cache = make_cache(full_reload_seconds=0.0001)
+        cache.get_dataframe(loader=source.full_loader, delta_loader=source.delta_loader)
+
+        import time
+        time.sleep(0.001)
+        cache.invalidate()
+        cache.get_dataframe(loader=source.full_loader, delta_loader=source.delta_loader)
+
+        assert source.full_loads == 2
+
+    @pytest.mark.unit
+    def test_legacy_loader_without_delta(self):
+        cache = make_cache()
+        frame = pd.DataFrame({'_index': [1, 2]})
+
+        df = cache.get_dataframe(loader=lambda: frame)
+
+        assert len(df) == 2
+        assert cache.watermark is None
+
+
+# =============================================================================
+# PER-USER SHARDS
+# =============================================================================
+
+class TestUserDataFrameCache:
+    """UserDataFrameCache sharding, budget and eviction."""
+
+    @pytest.fixture
+    def sources(self):
+        return {'alice': FakeTransactionSource(rows=50), 'bob': FakeTransactionSource(rows=50),
+                'carol': FakeTransactionSource(rows=50)}
+
+    def _read(self, cache, sources, user):
+        return cache.get_dataframe(
+            user,
+            loader=lambda u: sources[u].full_loader(),
+            delta_loader=lambda wm, u: sources[u].delta_loader(wm),
+        )
+
+    @pytest.mark.unit
+    def test_users_get_separate_shards(self, sources):
+        cache = UserDataFrameCache(ttl_seconds=300)
+        sources['bob'].upsert(1, **{'Chase Description': 'Bob only'})
+
+        alice = self._read(cache, sources, 'alice')
+        bob = self._read(cache, sources, 'bob')
+
+        assert alice.loc[alice['_index'] == 1, 'Chase Description'].iloc[0] == 'Merchant 1'
+        assert bob.loc[bob['_index'] == 1, 'Chase Description'].iloc[0] == 'Bob only'
+        assert cache.stats()['shards'] == 2
+        assert cache.total_bytes > 0
+
+    @pytest.mark.unit
+    def test_invalidate_one_user_leaves_others_cached(self, sources):
+        cache = UserDataFrameCache(ttl_seconds=300)
+        self._read(cache, sources, 'alice')
+        self._read(cache, sources, 'bob')
+
+        cache.invalidate('alice')
+        self._read(cache, sources, 'alice')
+        self._read(cache, sources, 'bob')
+
+        assert sources['alice'].delta_loads == 1
+        assert sources['bob'].delta_loads == 0
+        assert sources['bob'].full_loads == 1
+
+    @pytest.mark.unit
+    def test_lru_eviction_under_budget(self, sources):
+        probe = UserDataFrameCache(ttl_seconds=300)
+        self._read(probe, sources, 'alice')
+        one_shard = probe.total_bytes
+
+        cache = UserDataFrameCache(ttl_seconds=300, max_bytes=int(one_shard * 2.5))
+        self._read(cache, sources, 'alice')
+        self._read(cache, sources, 'bob')
+        self._read(cache, sources, 'alice')   # alice is now most recently used
+        self._read(cache, sources, 'carol')
+
+        users = cache.stats()['users']
+        assert set(users) == {'alice', 'carol'}
+        assert cache.stats()['evictions'] == 1
+        assert cache.total_bytes <= int(one_shard * 2.5)
+
+    @pytest.mark.unit
+    def test_current_shard_is_never_evicted(self, sources):
+        cache = UserDataFrameCache(ttl_seconds=300, max_bytes=1)
+
+        df = self._read(cache, sources, 'alice')
+
+        assert len(df) == 50
+        assert set(cache.stats()['users']) == {'alice'}
+
+    @pytest.mark.unit
+    def test_update_row_patches_every_shard_holding_it(self, sources):
+        cache = UserDataFrameCache(ttl_seconds=300)
+        self._read(cache, sources, 'alice')
+        self._read(cache, sources, 'bob')
+
+        assert cache.update_row('_index', 7, {'Chase Description': 'Patched'})
+        assert cache.get_row('_index', 7, user_id='alice')['Chase Description'] == 'Patched'
+        assert cache.get_row('_index', 7, user_id='carol') is None
+
+
+# =============================================================================
+# ROW ACCESS
+# =============================================================================
+
+class TestRowAccess:
+    """RowLocator lookups and patch_row assignments."""
+
+    @pytest.fixture
+    def frame(self):
+        return pd.DataFrame({
+            '_index': [10, 20, 30],
+            'Chase Amount': [1.5, 2.5, 3.5],
+            'Notes': ['a', 'b', 'c'],
+        })
+
+    @pytest.mark.unit
+    def test_locator_finds_position(self, frame):
+        locator = RowLocator('_index')
+
+        assert locator.position(frame, 30) == 2
+        assert locator.position(frame, 99) is None
+        assert locator.position(None, 30) is None
+
+    @pytest.mark.unit
+    def test_locator_rebuilds_for_new_frame(self, frame):
+        locator = RowLocator('_index')
+        locator.position(frame, 10)
+
+        reordered = frame.iloc[::-1].reset_index(drop=True)
+
+        assert locator.position(reordered, 10) == 2
+
+    @pytest.mark.unit
+    def test_locator_detects_in_place_mutation(self, frame):
+        locator = RowLocator('_index')
+        locator.position(frame, 10)
+
+        frame.loc[0, '_index'] = 40
+
+        assert locator.position(frame, 10) is None
+        assert locator.position(frame, 40) == 0
+
+    @pytest.mark.unit
+    def test_patch_row_multiple_columns(self, frame):
+        patch_row(frame, 1, {'Chase Amount': 9.0, 'Notes': 'patched'})
+
+        assert frame.loc[1, 'Chase Amount'] == 9.0
+        assert frame.loc[1, 'Notes'] == 'patched'
+        assert frame.loc[0, 'Notes'] == 'a'
+
+    @pytest.mark.unit
+    def test_patch_row_coerces_and_upcasts(self, frame):
+        frame['Count'] = [1, 2, 3]
+
+        patch_row(frame, 0, {'Chase Amount': '', 'Count': 'n/a', 'Notes': 'x'})
+
+        assert pd.isna(frame.loc[0, 'Chase Amount'])
+        assert frame['Chase Amount'].dtype == 'float64'
+        assert frame.loc[0, 'Count'] == 'n/a'
+        assert frame.loc[1, 'Count'] == 2
+        assert frame.loc[0, 'Notes'] == 'x'
+
+    @pytest.mark.unit
+    def test_patch_row_adds_missing_columns(self, frame):
+        patch_row(frame, 2, {'Review Status': 'good'}, add_missing=True)
+        patch_row(frame, 2, {'Unknown': 'skipped'})
+
+        assert frame.loc[2, 'Review Status'] == 'good'
+        assert frame.loc[0, 'Review Status'] == ''
+        assert 'Unknown' not in frame.columns
+
+    @pytest.mark.unit
+    def test_cache_update_and_get_row(self, frame):
+        cache = make_cache()
+        cache.set_dataframe(frame)
+
+        assert cache.update_row('_index', 20, {'Notes': 'updated', 'Chase Amount': 7.0})
+        assert cache.get_row('_index', 20) == {'_index': 20, 'Chase Amount': 7.0, 'Notes': 'updated'}
+        assert cache.get_row('Notes', 'c')['_index'] == 30
+        assert not cache.update_row('_index', 99, {'Notes': 'missing'})
+
+
+# =============================================================================
+# COMPACT SCHEMA
+# =============================================================================
+
+SCHEMA = {
+    'Chase Date': 'datetime',
+    'Chase Amount': 'float',
+    'Business Type': 'category',
+    'deleted': 'boolean',
+}
+
+
+class TestCompactSchema:
+    """apply_schema conversions and schema-aware patching."""
+
+    @pytest.fixture
+    def raw(self):
+        rows = 1000
+        return pd.DataFrame({
+            '_index': range(rows),
+            'Chase Date': [date(2024, 1, 1 + i % 28) if i % 50 else None for i in range(rows)],
+            'Chase Amount': [Decimal(f"{i}.25") if i % 40 else None for i in range(rows)],
+            'Business Type': [('Business', 'Personal', None)[i % 3] for i in range(rows)],
+            'deleted': [(1, 0, None)[i % 3] for i in range(rows)],
+            'Notes': [f"note {i}" for i in range(rows)],
+        }).astype({'Chase Date': object, 'Chase Amount': object, 'Business Type': object, 'deleted': object})
+
+    @pytest.mark.unit
+    def test_dtypes_and_memory(self, raw):
+        stats = apply_schema(raw, SCHEMA)
+
+        assert pd.api.types.is_datetime64_any_dtype(raw['Chase Date'])
+        assert raw['Chase Amount'].dtype == 'float64'
+        assert isinstance(raw['Business Type'].dtype, pd.CategoricalDtype)
+        assert str(raw['deleted'].dtype) == 'boolean'
+        assert set(stats['columns']) == set(SCHEMA)
+        assert stats['bytes_after'] * 3 < stats['bytes_before']
+
+    @pytest.mark.unit
+    def test_missing_value_conventions(self, raw):
+        apply_schema(raw, SCHEMA)
+
+        assert raw.loc[0, 'Chase Date'] is pd.NaT
+        assert pd.isna(raw.loc[0, 'Chase Amount'])
+        assert pd.isna(raw.loc[2, 'Business Type'])
+        assert raw.loc[2, 'deleted'] is pd.NA
+        assert raw.loc[1, 'deleted'] == False  # noqa: E712
+        assert raw.loc[1, 'Chase Amount'] == 1.25
+
+    @pytest.mark.unit
+    def test_high_cardinality_stays_object(self, raw):
+        stats = apply_schema(raw, {'Notes': 'category'})
+
+        assert not isinstance(raw['Notes'].dtype, pd.CategoricalDtype)
+        assert stats['columns'] == []
+
+    @pytest.mark.unit
+    def test_patch_keeps_compact_dtypes(self, raw):
+        apply_schema(raw, SCHEMA)
+
+        patch_row(raw, 5, {
+            'Chase Date': '2024-06-01',
+            'Chase Amount': '12.50',
+            'Business Type': 'Down Home',
+            'deleted': '1',
+        })
+
+        assert raw.loc[5, 'Chase Date'] == pd.Timestamp('2024-06-01')
+        assert raw.loc[5, 'Chase Amount'] == 12.5
+        assert raw.loc[5, 'Business Type'] == 'Down Home'
+        assert raw.loc[5, 'deleted'] == True  # noqa: E712
+        assert isinstance(raw['Business Type'].dtype, pd.CategoricalDtype)
+        assert str(raw['deleted'].dtype) == 'boolean'
+        assert raw['Chase Amount'].dtype == 'float64'
+
+    @pytest.mark.unit
+    def test_patch_and_row_dicts_keep_nulls(self, raw):
+        apply_schema(raw, SCHEMA)
+
+        patch_row(raw, 0, {'Business Type': None, 'deleted': None})
+
+        row = row_to_dict(raw, 0)
+        assert row['Business Type'] is None
+        assert row['deleted'] is None
+        assert row_to_dict(raw, 1)['Business Type'] == 'Personal'
+        assert row_to_dict(raw, 1)['deleted'] == False  # noqa: E712
+
+    @pytest.mark.unit
+    def test_delta_merge_keeps_categoricals(self):
+        cache = make_cache()
+        base = pd.DataFrame({'_index': [1, 2], 'Business Type': ['Business', 'Personal']})
+        apply_schema(base, SCHEMA, max_category_ratio=1.0)
+        cache.set_dataframe(base)
+
+        changed = pd.DataFrame({'_index': [3], 'Business Type': ['Secondary']})
+        apply_schema(changed, SCHEMA, max_category_ratio=1.0)
+        cache.merge_rows(changed)
+
+        df = cache.get_dataframe()
+        assert isinstance(df['Business Type'].dtype, pd.CategoricalDtype)
+        assert list(df['Business Type']) == ['Business', 'Personal', 'Secondary']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
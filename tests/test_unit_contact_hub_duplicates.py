@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Contact Hub Duplicate Detection
+==============================================
+
+Tests for contact-hub app.crud.find_duplicates against a stub session:
+- Blocked/pruned search groups the same contacts as an all-pairs scan
+- Pairs right at the rounded fuzz.ratio threshold are not pruned
+"""
+
+import os
+import pytest
+import random
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add contact-hub to path (its package is `app`)
+sys.path.insert(0, str(Path(__file__).parent.parent / "contact-hub"))
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("phonenumbers")
+pytest.importorskip("vobject")
+fuzz = pytest.importorskip("fuzzywuzzy.fuzz")
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app import crud
+
+
+class StubSession:
+    """Just enough of db.query(...).options(...).filter(...).all()."""
+
+    def __init__(self, contacts):
+        self.contacts = contacts
+
+    def query(self, *args):
+        return self
+
+    def options(self, *args):
+        return self
+
+    def filter(self, *args):
+        return self
+
+    def all(self):
+        return self.contacts
+
+
+def make_contact(contact_id, name, emails=(), phones=()):
+    return SimpleNamespace(
+        id=contact_id,
+        display_name=name,
+        emails=[SimpleNamespace(email=e) for e in emails],
+        phones=[SimpleNamespace(normalized=p) for p in phones],
+    )
+
+
+def brute_force_groups(contacts):
+    """Union every pair that shares an email or phone or has similar names."""
+    parent = list(range(len(contacts)))
+
+    def find(x):
+        while parent[x] != x:
+            x = parent[x]
+        return x
+
+    for i, a in enumerate(contacts):
+        for j in range(i + 1, len(contacts)):
+            b = contacts[j]
+            same_email = {e.email.lower() for e in a.emails} & {e.email.lower() for e in b.emails}
+            same_phone = {p.normalized for p in a.phones} & {p.normalized for p in b.phones}
+            similar = (a.display_name and b.display_name and
+                       fuzz.ratio(a.display_name.lower(), b.display_name.lower())
+                       >= crud.NAME_MATCH_THRESHOLD)
+            if same_email or same_phone or similar:
+                parent[find(j)] = find(i)
+
+    groups = {}
+    for i, contact in enumerate(contacts):
+        groups.setdefault(find(i), []).append(contact.id)
+    return sorted(sorted(ids) for ids in groups.values() if len(ids) > 1)
+
+
+def found_groups(contacts):
+    duplicates = crud.find_duplicates(StubSession(contacts))
+    return sorted(sorted(c.id for c in d['contacts']) for d in duplicates)
+
+
+def typo(rng, name):
+    i = rng.randrange(len(name))
+    edit = rng.choice(('drop', 'swap', 'insert', 'append'))
+    if edit == 'drop':
+        return name[:i] + name[i + 1:]
+    if edit == 'swap' and i + 1 < len(name):
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    if edit == 'insert':
+        return name[:i] + rng.choice('aeiou') + name[i:]
+    return name + rng.choice(('son', ' jr', 'ie', 'a'))
+
+
+class TestFindDuplicates:
+    """Tests for crud.find_duplicates"""
+
+    @pytest.mark.unit
+    def test_matches_brute_force(self):
+        rng = random.Random(21)
+        first = ['Maria', 'Jon', 'Priya', 'Ahmed', 'Li', 'Sofia', 'Kwame', 'Ana', 'Dmitri', 'Yuki']
+        last = ['Garcia', 'Smith', 'Patel', 'Haddad', 'Wei', 'Rossi', 'Mensah', 'Silva', 'Ivanov', 'Sato']
+
+        contacts = []
+        for contact_id in range(300):
+            if contacts and rng.random() < 0.4:
+                name = typo(rng, rng.choice(contacts).display_name or 'x')
+            else:
+                name = f"{rng.choice(first)} {rng.choice(last)}"
+            emails = [f"user{rng.randrange(400)}@example.com"] if rng.random() < 0.3 else []
+            phones = [f"+1555{rng.randrange(400):07d}"] if rng.random() < 0.3 else []
+            contacts.append(make_contact(contact_id, name if rng.random() > 0.05 else None, emails, phones))
+
+        assert found_groups(contacts) == brute_force_groups(contacts)
+
+    @pytest.mark.unit
+    def test_length_bound_allows_rounded_threshold(self):
+        """11 vs 15 chars can reach 84.6, which fuzz.ratio rounds up to 85."""
+        contacts = [make_contact(1, 'abcdefghijk'), make_contact(2, 'abcdefghijkxyzw')]
+
+        assert fuzz.ratio('abcdefghijk', 'abcdefghijkxyzw') == crud.NAME_MATCH_THRESHOLD
+        assert found_groups(contacts) == [[1, 2]]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Contact Hub Exports
+==================================
+
+Tests for contact-hub CSV/vCard exports against an in-memory sqlite database:
+- Keyset chunks cross chunk boundaries without skipping or repeating contacts
+- contact_ids and tag_id filters apply to every chunk
+- export_csv/export_vcard match a single query.all() export
+- /export/* streaming closes its own session
+"""
+
+import csv
+import io
+import os
+import pytest
+import sys
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+# Add contact-hub to path (its package is `app`)
+sys.path.insert(0, str(Path(__file__).parent.parent / "contact-hub"))
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+pytest.importorskip("phonenumbers")
+pytest.importorskip("vobject")
+pytest.importorskip("fuzzywuzzy")
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models
+from app.database import Base
+
+
+@pytest.fixture
+def session_factory():
+    engine = sqlalchemy.create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+
+    db = factory()
+    vip = models.Tag(name='VIP')
+    other = models.Tag(name='Other')
+    for i in range(1, 6):
+        contact = models.Contact(
+            id=i, first_name=f'First{i}', last_name=f'Last{i}', display_name=f'First{i} Last{i}',
+            company='Acme' if i % 2 else None, notes=f'note {i}',
+            birthday=datetime(1990, 1, i), interaction_count=i,
+        )
+        contact.emails = [
+            models.Email(email=f'c{i}@example.com', type=models.EmailType.WORK),
+            models.Email(email=f'c{i}@home.example', type=models.EmailType.PERSONAL),
+        ]
+        contact.phones = [models.Phone(number=f'+1555000000{i}', type=models.PhoneType.MOBILE)]
+        if i != 3:
+            contact.addresses = [models.Address(
+                street1=f'{i} Main St', city='Springfield', state='IL',
+                postal_code='62701', country='US', type=models.AddressType.HOME, is_primary=True,
+            )]
+        contact.tags = [vip] if i in (2, 3, 5) else [other]
+        db.add(contact)
+    db.commit()
+    db.close()
+
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(crud, '_iter_export_chunks', partial(crud._iter_export_chunks, chunk_size=2))
+
+
+def chunk_ids(db, contact_ids=None, tag_id=None):
+    chunks = crud._iter_export_chunks(db, contact_ids, tag_id, [models.Contact.emails], chunk_size=2)
+    return [[c.id for c in chunk] for chunk in chunks]
+
+
+def tag_id(db, name):
+    return db.query(models.Tag).filter(models.Tag.name == name).one().id
+
+
+def query_all(db, contact_ids=None, tag_id=None):
+    """The pre-chunking export query: every matching contact in one result."""
+    query = db.query(models.Contact)
+    if contact_ids:
+        query = query.filter(models.Contact.id.in_(contact_ids))
+    if tag_id:
+        query = query.filter(models.Contact.tags.any(models.Tag.id == tag_id))
+    return query.order_by(models.Contact.id).all()
+
+
+def single_query_csv(db, **filters):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(crud.CSV_EXPORT_HEADERS)
+    for contact in query_all(db, **filters):
+        writer.writerow(crud._csv_row(contact))
+    return output.getvalue()
+
+
+def single_query_vcard(db, **filters):
+    return '\n'.join(crud._contact_vcard(contact) for contact in query_all(db, **filters))
+
+
+class TestExportChunks:
+    """Tests for crud._iter_export_chunks"""
+
+    @pytest.mark.unit
+    def test_chunks_cross_boundary(self, db):
+        assert chunk_ids(db) == [[1, 2], [3, 4], [5]]
+
+    @pytest.mark.unit
+    def test_contact_ids_filter(self, db):
+        assert chunk_ids(db, contact_ids=[5, 1, 4, 3]) == [[1, 3], [4, 5]]
+
+    @pytest.mark.unit
+    def test_tag_filter(self, db):
+        assert chunk_ids(db, tag_id=tag_id(db, 'VIP')) == [[2, 3], [5]]
+
+    @pytest.mark.unit
+    def test_combined_filters(self, db):
+        assert chunk_ids(db, contact_ids=[1, 2, 3], tag_id=tag_id(db, 'VIP')) == [[2, 3]]
+
+
+class TestExportOutput:
+    """Chunked exports produce the same file as one query.all() export"""
+
+    @pytest.mark.unit
+    def test_csv_matches_single_query(self, db, small_chunks):
+        expected = single_query_csv(db)
+
+        assert crud.export_csv(db) == expected
+        assert expected.startswith(','.join(crud.CSV_EXPORT_HEADERS) + '\r\n')
+        assert len(list(csv.reader(io.StringIO(expected)))) == 6
+
+    @pytest.mark.unit
+    def test_csv_filtered(self, db, small_chunks):
+        vip = tag_id(db, 'VIP')
+
+        assert crud.export_csv(db, contact_ids=[1, 2, 5]) == single_query_csv(db, contact_ids=[1, 2, 5])
+        assert crud.export_csv(db, tag_id=vip) == single_query_csv(db, tag_id=vip)
+
+    @pytest.mark.unit
+    def test_csv_header_only_when_empty(self, db, small_chunks):
+        assert crud.export_csv(db, contact_ids=[99]) == single_query_csv(db, contact_ids=[99])
+
+    @pytest.mark.unit
+    def test_vcard_matches_single_query(self, db, small_chunks):
+        expected = single_query_vcard(db)
+
+        assert list(crud.iter_export_vcard(db))[1].startswith('\nBEGIN:VCARD')
+        assert crud.export_vcard(db) == expected
+        assert expected.count('BEGIN:VCARD') == 5
+
+    @pytest.mark.unit
+    def test_vcard_filtered(self, db, small_chunks):
+        vip = tag_id(db, 'VIP')
+
+        assert crud.export_vcard(db, tag_id=vip) == single_query_vcard(db, tag_id=vip)
+        assert crud.export_vcard(db, contact_ids=[99]) == ''
+
+
+class TestStreamExport:
+    """Tests for main._stream_export"""
+
+    @pytest.mark.unit
+    def test_streams_export_and_closes_session(self, session_factory, small_chunks, monkeypatch):
+        main = pytest.importorskip("app.main")
+        sessions = []
+
+        def make_session():
+            sessions.append(session_factory())
+            return sessions[-1]
+
+        monkeypatch.setattr(main, 'SessionLocal', make_session)
+
+        streamed = ''.join(main._stream_export(crud.iter_export_csv, contact_ids=None, tag_id=None))
+
+        db = session_factory()
+        assert streamed == single_query_csv(db)
+        db.close()
+        assert len(sessions) == 1
+        assert not sessions[0].in_transaction()
+
+    @pytest.mark.unit
+    def test_closes_session_when_client_disconnects(self, session_factory, small_chunks, monkeypatch):
+        main = pytest.importorskip("app.main")
+        closed = []
+
+        def make_session():
+            session = session_factory()
+            session.close = lambda: closed.append(True)
+            return session
+
+        monkeypatch.setattr(main, 'SessionLocal', make_session)
+
+        stream = main._stream_export(crud.iter_export_vcard, contact_ids=None, tag_id=None)
+        next(stream)
+        stream.close()
+
+        assert closed == [True]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
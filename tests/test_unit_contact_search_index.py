@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Contact Search Index
+=======================================
+
+Tests for services.contact_search_index:
+- Same matches, ranking and totals as the LIKE-based SQL search
+- Digits-only phone matching, notes matching, short terms
+- upsert/remove keep postings current
+- Background rebuild after invalidate()/TTL
+- Version check catching up with writes from other processes
+"""
+
+import random
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.contact_search_index import ContactSearchIndex, fold
+
+
+FIRST = ['John', 'Jon', 'Maria', 'María', 'Steve', 'Stephanie', 'Kim', 'Al']
+LAST = ['Smith', 'Smyth', 'Garcia', 'García', 'Lee', 'Miller', 'Oneal']
+COMPANIES = ['Acme', 'Smith & Co', 'Big Label Records', '', None]
+
+
+def make_contacts(count, seed=3):
+    rng = random.Random(seed)
+    contacts = []
+    for i in range(1, count + 1):
+        first, last = rng.choice(FIRST), rng.choice(LAST)
+        contacts.append({
+            'id': i,
+            'name': f"{first} {last}" if rng.random() > 0.05 else None,
+            'first_name': first,
+            'last_name': last,
+            'email': f"{first[0]}{last}{i}@example.com".lower() if rng.random() > 0.2 else '',
+            'phone': rng.choice(['', None, f"+1 (615) 555-{rng.randrange(10000):04d}", f"615-555-{rng.randrange(100):04d}"]),
+            'company': rng.choice(COMPANIES),
+            'job_title': rng.choice(['Producer', 'Engineer', None]),
+            'notes': rng.choice(['', None, 'Met at Soho House', 'Introduced by Al; likes jazz']),
+        })
+    return contacts
+
+
+def reference_search(contacts, query):
+    """The old SQL WHERE/ORDER BY, with the index's digits-only phone matching."""
+    term = fold(query)
+    digits = ''.join(c for c in query if c.isdigit())
+    ranked = []
+    for c in contacts:
+        f = {k: fold(c.get(k)) for k in ('name', 'first_name', 'last_name', 'email', 'company', 'job_title', 'notes')}
+        phone = ''.join(ch for ch in str(c.get('phone') or '') if ch.isdigit())
+        if term in f['name']:
+            rank = 0
+        elif term in f['first_name'] or term in f['last_name']:
+            rank = 1
+        elif term in f['email']:
+            rank = 2
+        elif term in f['company'] or term in f['job_title'] or term in f['notes'] or (len(digits) >= 3 and digits in phone):
+            rank = 3
+        else:
+            continue
+        ranked.append((rank, f['name'], str(c['id']), c['id']))
+    return [r[3] for r in sorted(ranked)]
+
+
+@pytest.fixture
+def contacts():
+    return make_contacts(400)
+
+
+@pytest.fixture
+def index(contacts):
+    idx = ContactSearchIndex()
+    idx.build(contacts)
+    return idx
+
+
+class TestContactSearchIndex:
+    """Tests for ContactSearchIndex"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("query", ['smi', 'SMITH', 'garcia', 'jo', 'a', 'acme', 'example.com',
+                                       'soho', 'jazz', '615-555', '(615) 555-00', 'producer', 'zzz'])
+    def test_matches_sql_semantics(self, index, contacts, query):
+        expected = reference_search(contacts, query)
+
+        ids, total = index.search(query, limit=1000)
+
+        assert total == len(expected)
+        assert ids == expected
+
+    @pytest.mark.unit
+    def test_pagination(self, index, contacts):
+        expected = reference_search(contacts, 'smith')
+
+        pages = [index.search('smith', limit=25, offset=o)[0] for o in range(0, len(expected) + 25, 25)]
+
+        assert [i for page in pages for i in page] == expected
+
+    @pytest.mark.unit
+    def test_upsert_and_remove(self, index, contacts):
+        index.upsert({'id': 9999, 'name': 'Zelda Quixote', 'email': 'zq@x.com', 'phone': '+1 212 867 5309'})
+        assert index.search('quixote')[0] == [9999]
+        assert index.search('8675309')[0] == [9999]
+
+        index.upsert({'id': 9999, 'name': 'Zelda Fitzgerald'})
+        assert index.search('quixote') == ([], 0)
+        assert index.search('8675309') == ([], 0)
+
+        index.remove(9999)
+        index.remove(contacts[0]['id'])
+        assert index.search('fitzgerald') == ([], 0)
+        assert contacts[0]['id'] not in index.search('e', limit=1000)[0]
+
+    @pytest.mark.unit
+    def test_notes_updates(self, index):
+        index.upsert({'id': 1, 'name': 'A', 'notes': 'plays cello'})
+        assert index.search('cello')[0] == [1]
+
+        index.upsert({'id': 1, 'name': 'A', 'notes': 'plays violin'})
+        assert index.search('cello') == ([], 0)
+        assert index.search('violin')[0] == [1]
+
+    @pytest.mark.unit
+    def test_loads_lazily_and_rebuilds_after_invalidate(self, contacts):
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return contacts
+
+        idx = ContactSearchIndex(loader=loader, ttl=3600)
+        assert loads == []
+        assert idx.search('smith')[1] > 0
+        assert len(loads) == 1
+
+        idx.search('smith')
+        assert len(loads) == 1
+
+        contacts.append({'id': 5000, 'name': 'Imported Person'})
+        idx.invalidate()
+        idx.search('imported')  # Served from the old contents while reloading
+        for _ in range(200):
+            if not idx.status()['rebuilding'] and len(loads) == 2:
+                break
+            time.sleep(0.01)
+        assert idx.search('imported')[0] == [5000]
+        assert not idx.status()['stale']
+
+    @pytest.mark.unit
+    def test_catches_up_with_other_writers(self):
+        """Rows another worker adds, edits or deletes are seen on the next search."""
+        table = {1: {'id': 1, 'name': 'Ann Smith', 'updated_at': 10},
+                 2: {'id': 2, 'name': 'Bob Smith', 'updated_at': 10}}
+        calls = {'load': 0, 'changed': []}
+
+        def loader():
+            calls['load'] += 1
+            return list(table.values())
+
+        def version_loader():
+            return len(table), max((r['updated_at'] for r in table.values()), default=None)
+
+        def changed_loader(since):
+            calls['changed'].append(since)
+            return [r for r in table.values() if r['updated_at'] >= since]
+
+        idx = ContactSearchIndex(loader=loader, ttl=3600, version_loader=version_loader,
+                                 changed_loader=changed_loader, check_interval=0)
+        assert idx.search('smith')[1] == 2
+
+        # Another worker inserts and edits: changed rows are upserted, no reload
+        table[3] = {'id': 3, 'name': 'Cy Smith', 'updated_at': 11}
+        table[1] = {'id': 1, 'name': 'Ann Jones', 'updated_at': 11}
+        assert idx.search('smith') == ([2, 3], 2)
+        assert idx.search('jones')[0] == [1]
+        assert calls == {'load': 1, 'changed': [10]}
+
+        # Unchanged version: nothing is re-read
+        idx.search('smith')
+        assert calls == {'load': 1, 'changed': [10]}
+
+        # A delete elsewhere leaves the count short, so the index reloads
+        del table[2]
+        assert idx.search('smith') == ([3], 1)
+        assert calls['load'] == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for MySQLReceiptDatabase Write Paths
+===============================================
+
+Tests for db_mysql without a live server:
+- Column whitelisting shared by single and bulk updates
+- Batched CASE-based updates (grouping, chunking, per-row results)
+- Read-only mode
+- Change-feed queries for the DataFrame cache
+- Cached transactions frame dtypes
+- Batch relationship-strength scoring
+"""
+
+import pytest
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("pymysql")
+
+from db_mysql import MySQLReceiptDatabase
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def make_db(conn, read_only=False):
+    """Build a database handle around a mock connection without connecting."""
+    db = MySQLReceiptDatabase.__new__(MySQLReceiptDatabase)
+    db.config = {}
+    db.use_mysql = True
+    db.read_only = read_only
+    db.schema_stats = {}
+
+    @contextmanager
+    def connection():
+        yield conn
+
+    db._pool = MagicMock()
+    db._pool.connection = connection
+    return db
+
+
+def executed(conn):
+    """(sql, params) for every statement run on the mock cursor."""
+    return [c.args for c in conn.cursor.return_value.execute.call_args_list]
+
+
+# =============================================================================
+# BULK UPDATES
+# =============================================================================
+
+@pytest.mark.unit
+class TestBulkUpdate:
+    """Tests for update_transactions_bulk."""
+
+    def test_groups_rows_by_column_set(self, mock_mysql_connection):
+        conn = mock_mysql_connection
+        conn.cursor.return_value.fetchall.return_value = [
+            {'_index': 1}, {'_index': 2}, {'_index': 3}
+        ]
+        db = make_db(conn)
+
+        results = db.update_transactions_bulk([
+            (1, {'Category': 'Food'}),
+            (2, {'Category': 'Travel'}),
+            (3, {'Category': 'Food', 'Business Type': 'Business'}),
+        ])
+
+        assert results == {1: True, 2: True, 3: True}
+        updates = [(sql, params) for sql, params in executed(conn) if sql.startswith('UPDATE')]
+        # Two column sets -> two statements, not three
+        assert len(updates) == 2
+        sql, params = next(u for u in updates if 'business_type' not in u[0])
+        assert 'category = CASE _index WHEN %s THEN %s WHEN %s THEN %s ELSE category END' in sql
+        assert params == [1, 'Food', 2, 'Travel', 1, 2]
+
+    def test_missing_rows_and_rejected_columns_report_false(self, mock_mysql_connection):
+        conn = mock_mysql_connection
+        conn.cursor.return_value.fetchall.return_value = [{'_index': 1}]
+        db = make_db(conn)
+
+        results = db.update_transactions_bulk([
+            (1, {'Notes': 'ok'}),
+            (2, {'Notes': 'gone'}),
+            (3, {'password_hash': 'x'}),
+        ])
+
+        assert results == {1: True, 2: False, 3: False}
+        for sql, _ in executed(conn):
+            assert 'password_hash' not in sql
+
+    def test_patches_for_same_row_are_merged(self, mock_mysql_connection):
+        conn = mock_mysql_connection
+        conn.cursor.return_value.fetchall.return_value = [{'_index': 7}]
+        db = make_db(conn)
+
+        db.update_transactions_bulk([
+            (7, {'Notes': 'first', 'Category': 'Food'}),
+            (7, {'Notes': 'second'}),
+        ])
+
+        updates = [(sql, params) for sql, params in executed(conn) if sql.startswith('UPDATE')]
+        assert len(updates) == 1
+        assert 'second' in updates[0][1] and 'first' not in updates[0][1]
+
+    def test_large_batches_are_chunked(self, mock_mysql_connection):
+        conn = mock_mysql_connection
+        db = make_db(conn)
+        db.BULK_UPDATE_CHUNK_SIZE = 10
+
+        db.update_transactions_bulk([(i, {'Notes': str(i)}) for i in range(25)])
+
+        statements = [sql.split()[0] for sql, _ in executed(conn)]
+        assert statements.count('SELECT') == 3
+        assert statements.count('UPDATE') == 3
+
+    def test_error_fails_every_row(self, mock_mysql_connection):
+        conn = mock_mysql_connection
+        conn.cursor.return_value.execute.side_effect = RuntimeError("deadlock")
+        db = make_db(conn)
+
+        results = db.update_transactions_bulk([(1, {'Notes': 'a'}), (2, {'Notes': 'b'})])
+
+        assert results == {1: False, 2: False}
+
+    def test_read_only_blocks_writes(self, mock_mysql_connection):
+        conn = mock_mysql_connection
+        db = make_db(conn, read_only=True)
+
+        results = db.update_transactions_bulk([(1, {'Notes': 'a'})])
+
+        assert results == {1: False}
+        assert executed(conn) == []
+
+
+# =============================================================================
+# TRANSACTIONS FRAME
+# =============================================================================
+
+@pytest.mark.unit
+class TestTransactionsFrame:
+    """Tests for the compact-dtype transactions frame."""
+
+    @pytest.fixture
+    def frame(self, mock_mysql_connection):
+        import db_mysql
+        raw = db_mysql.pd.DataFrame({
+            '_index': [1, 2, 3],
+            'chase_date': [date(2024, 1, 5), date(2024, 2, 29), None],
+            'business_type': ['Business', None, 'Business'],
+            'review_status': ['good', None, 'bad'],
+            'is_refund': [1, 0, None],
+        })
+        return make_db(mock_mysql_connection)._transactions_frame(raw)
+
+    def test_chase_date_stays_iso_date(self, frame):
+        """validate_existing_receipt and friends strptime str(row['Chase Date'])."""
+        assert str(frame.loc[0, 'Chase Date']) == '2024-01-05'
+        assert datetime.strptime(str(frame.loc[1, 'Chase Date']), '%Y-%m-%d') == datetime(2024, 2, 29)
+        assert frame.loc[2, 'Chase Date'] is None
+
+    def test_nulls_are_kept(self, frame):
+        assert str(frame['Is Refund'].dtype) == 'boolean'
+        assert frame.loc[2, 'Is Refund'] is frame['Is Refund'].dtype.na_value
+        assert frame['Business Type'].isna().tolist() == [False, True, False]
+
+    def test_string_columns_take_fillna_and_new_labels(self, frame):
+        """/api/review/stats and batch-categorize fillna("") then compare; bulk edits assign new labels."""
+        business = frame.get("Business Type", "").fillna("")
+        assert (business == "Business").sum() == 2
+        review = frame.get("Review Status", "").fillna("")
+        assert frame[(review == "") & (business == "")]["_index"].tolist() == [2]
+
+        frame.loc[frame['_index'] == 2, 'Business Type'] = 'EM.co'
+        assert (frame.get("Business Type", "").fillna("") == "EM.co").sum() == 1
+
+
+# =============================================================================
+# CHANGE FEED
+# =============================================================================
+
+@pytest.mark.unit
+class TestChangeFeed:
+    """Tests for get_transactions_changed_since."""
+
+    @pytest.fixture
+    def queries(self, monkeypatch):
+        import db_mysql
+        calls = []
+
+        def read_sql_query(query, conn, params=()):
+            calls.append((' '.join(query.split()), params))
+            return db_mysql.pd.DataFrame()
+
+        monkeypatch.setattr(db_mysql.pd, 'read_sql_query', read_sql_query)
+        return calls
+
+    def test_inserts_and_updates_are_separate_union_branches(self, mock_mysql_connection, queries):
+        db = make_db(mock_mysql_connection)
+        db.CHANGE_FEED_OVERLAP_SECONDS = 2
+
+        db.get_transactions_changed_since({'updated_at': NOW, 'max_index': 41}, user_id='u1')
+
+        (query, params), = queries
+        assert ' OR ' not in query
+        assert query == ('SELECT * FROM transactions WHERE _index > %s AND user_id = %s '
+                         'UNION SELECT * FROM transactions WHERE updated_at >= %s AND user_id = %s '
+                         'ORDER BY _index')
+        assert params == (41, 'u1', NOW - timedelta(seconds=2), 'u1')
+
+    def test_without_updated_at_only_new_rows(self, mock_mysql_connection, queries):
+        db = make_db(mock_mysql_connection)
+
+        db.get_transactions_changed_since({'updated_at': None, 'max_index': 7})
+
+        assert queries == [('SELECT * FROM transactions WHERE _index > %s ORDER BY _index', (7,))]
+
+
+# =============================================================================
+# RELATIONSHIP STRENGTH
+# =============================================================================
+
+NOW = datetime(2025, 6, 1, 12, 0, 0)
+
+
+@pytest.mark.unit
+class TestRelationshipStrength:
+    """Tests for the batch relationship-strength job."""
+
+    def test_factors(self):
+        strength, factors = MySQLReceiptDatabase._relationship_strength_factors(
+            {'total_interactions': 12, 'recent_30d': 6, 'last_interaction': NOW - timedelta(days=3),
+             'first_interaction': NOW - timedelta(days=400)},
+            {'expense_count': 2},
+            NOW,
+        )
+
+        assert factors == {'interaction_frequency': 0.3, 'recency': 0.3, 'longevity': 0.2, 'financial': 0.03}
+        assert strength == 0.83
+
+    def test_no_activity(self):
+        strength, factors = MySQLReceiptDatabase._relationship_strength_factors({}, {}, NOW)
+
+        assert strength == 0.05
+        assert factors['recency'] == 0 and factors['longevity'] == 0
+
+    def test_refresh_scores_changed_contacts_in_grouped_queries(self, mock_mysql_connection):
+        conn = mock_mysql_connection
+        cursor = conn.cursor.return_value
+        cursor.fetchone.return_value = {'now': NOW}
+        cursor.fetchall.side_effect = [
+            [{'id': 7}, {'id': 3}, {'id': 9}],  # contacts needing a new score
+            [{'contact_id': 3, 'total_interactions': 20, 'recent_30d': 11,
+              'last_interaction': NOW - timedelta(days=40), 'first_interaction': NOW - timedelta(days=100)}],
+            [{'contact_id': 9, 'expense_count': 10, 'total_spent': 812.5}],
+        ]
+        db = make_db(conn)
+
+        result = db.atlas_refresh_relationship_strengths()
+
+        assert result['updated'] == 3
+        statements = executed(conn)
+        # NOW, dirty ids, interaction stats, expense stats, one UPDATE
+        assert len(statements) == 5
+        assert 'UNION' in statements[1][0] and 'GROUP BY ic.contact_id' in statements[2][0]
+        sql, params = statements[4]
+        assert sql.strip().startswith('UPDATE contacts')
+        assert 'updated_at = updated_at' in sql
+        assert params == [3, 0.6, 7, 0.05, 9, 0.15, NOW, 3, 7, 9]
+
+    def test_refresh_chunks_large_batches(self, mock_mysql_connection):
+        conn = mock_mysql_connection
+        cursor = conn.cursor.return_value
+        cursor.fetchone.return_value = {'now': NOW}
+        cursor.fetchall.side_effect = [[{'id': i} for i in range(25)]] + [[]] * 6
+        db = make_db(conn)
+        db.RELATIONSHIP_STRENGTH_CHUNK_SIZE = 10
+
+        db.atlas_refresh_relationship_strengths(full=True)
+
+        statements = [sql.split()[0] for sql, *_ in executed(conn)]
+        assert statements.count('UPDATE') == 3
+        assert executed(conn)[1][0] == "SELECT id FROM contacts"
+
+    def test_refresh_blocked_in_read_only(self, mock_mysql_connection):
+        db = make_db(mock_mysql_connection, read_only=True)
+
+        assert db.atlas_refresh_relationship_strengths() == {'updated': 0}
+        assert executed(mock_mysql_connection) == []
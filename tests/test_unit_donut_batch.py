@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Batched Donut Inference
+======================================
+
+Tests for DonutReceiptExtractor.extract_batch with a stub processor and
+model (no weights are downloaded):
+- One generate() call per chunk of batch_size images
+- Images opened one chunk at a time
+- Results in input order, with missing files reported in place
+- Per-item parsing of the batch output
+"""
+
+import pytest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from PIL import Image
+
+from receipt_ocr_local.donut_extractor import DonutReceiptExtractor
+
+
+class StubTokenizer:
+    pad_token_id, eos_token_id, unk_token_id = 0, 1, 2
+
+    def __call__(self, text, add_special_tokens=False, return_tensors="pt"):
+        return SimpleNamespace(input_ids=torch.tensor([[5]]))
+
+    def batch_decode(self, outputs, skip_special_tokens=False):
+        return [f"<s_cord-v2>STARBUCKS TOTAL ${int(row[0])}.75<pad>" for row in outputs]
+
+
+class StubProcessor:
+    tokenizer = StubTokenizer()
+
+    def __call__(self, images, return_tensors="pt"):
+        # Encode each image's width so outputs can be traced back to inputs
+        return SimpleNamespace(pixel_values=torch.tensor([[float(img.width)] for img in images]))
+
+
+class StubModel:
+    def __init__(self):
+        self.batch_sizes = []
+
+    def generate(self, pixel_values, decoder_input_ids, **kwargs):
+        assert decoder_input_ids.shape[0] == pixel_values.shape[0]
+        self.batch_sizes.append(pixel_values.shape[0])
+        return pixel_values.long()
+
+
+@pytest.fixture
+def extractor():
+    ext = DonutReceiptExtractor(model_path=Path("stub"), batch_size=4)
+    ext.processor = StubProcessor()
+    ext.model = StubModel()
+    ext.device = "cpu"
+    ext._loaded = True
+    return ext
+
+
+class TestDonutBatch:
+    """Tests for DonutReceiptExtractor.extract_batch"""
+
+    @pytest.mark.unit
+    def test_chunks_and_order(self, extractor, tmp_path):
+        """Ten images in chunks of four; a missing file keeps its slot."""
+        paths = []
+        for width in range(10, 20):
+            path = tmp_path / f"r{width}.png"
+            Image.new("RGB", (width, 30), "white").save(path)
+            paths.append(str(path))
+        paths.insert(3, str(tmp_path / "missing.png"))
+        progress = []
+
+        results = extractor.extract_batch(paths, progress_callback=lambda done, total: progress.append(done))
+
+        assert extractor.model.batch_sizes == [4, 4, 2]
+        assert progress == [5, 9, 11]
+        assert results[3]["error"] == "File not found"
+        totals = [r["Receipt Total"] for i, r in enumerate(results) if i != 3]
+        assert totals == [width + 0.75 for width in range(10, 20)]
+        assert all("<pad>" not in r["raw_output"] for i, r in enumerate(results) if i != 3)
+
+    @pytest.mark.unit
+    def test_images_opened_per_chunk(self, extractor, tmp_path, monkeypatch):
+        """Only the current chunk's images are open when generate() runs."""
+        import receipt_ocr_local.donut_extractor as donut_extractor
+
+        paths = []
+        for width in range(10, 20):
+            path = tmp_path / f"r{width}.png"
+            Image.new("RGB", (width, 30), "white").save(path)
+            paths.append(str(path))
+
+        opened = []
+        real_open = donut_extractor.Image.open
+        monkeypatch.setattr(donut_extractor.Image, "open", lambda p: opened.append(p) or real_open(p))
+        opened_at_generate = []
+        generate = extractor.model.generate
+
+        def counting_generate(pixel_values, decoder_input_ids, **kwargs):
+            opened_at_generate.append(len(opened))
+            return generate(pixel_values, decoder_input_ids, **kwargs)
+
+        extractor.model.generate = counting_generate
+        extractor.extract_batch(paths)
+
+        assert opened_at_generate == [4, 8, 10]
+
+    @pytest.mark.unit
+    def test_extract_is_a_batch_of_one(self, extractor, tmp_path):
+        path = tmp_path / "r.png"
+        Image.new("RGB", (42, 30), "white").save(path)
+
+        result = extractor.extract(path)
+
+        assert extractor.model.batch_sizes == [1]
+        assert result["Receipt Total"] == 42.75
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Gmail Batch Fetch
+================================
+
+Tests for services.gmail_batch against a local fake Gmail service:
+- Batches of 50 gets (never more than 100), results in request order
+- metadata format passes metadataHeaders
+- Per-message batch errors retried with a plain get after a backoff
+- Whole-batch failure falls back to plain gets after a backoff
+- Metadata-first scan only fetches survivors in full
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import services.gmail_batch as gmail_batch
+from services.gmail_batch import fetch_messages, get_header, METADATA_HEADERS
+
+
+class FakeGmailError(Exception):
+    pass
+
+
+class FakeRequest:
+    def __init__(self, service, kwargs):
+        self.service = service
+        self.kwargs = kwargs
+
+    def execute(self):
+        self.service.log.append('get')
+        self.service.single_gets.append(self.kwargs['id'])
+        return self.service.respond(self.kwargs, single=True)
+
+
+class FakeBatch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id=None):
+        assert len(self.requests) < 100, "Gmail allows at most 100 calls per batch"
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.log.append('batch')
+        self.service.batches.append([r.kwargs['id'] for _, r in self.requests])
+        if self.service.fail_batches:
+            raise FakeGmailError("503 backend error")
+        for request_id, request in self.requests:
+            try:
+                response = self.service.respond(request.kwargs, single=False)
+            except FakeGmailError as e:
+                self.callback(request_id, None, e)
+            else:
+                self.callback(request_id, response, None)
+
+
+class FakeGmailService:
+    """Just enough of users().messages().get() and new_batch_http_request()."""
+
+    def __init__(self, mailbox, rate_limited=(), missing=(), fail_batches=False):
+        self.mailbox = mailbox
+        self.rate_limited = set(rate_limited)
+        self.missing = set(missing)
+        self.fail_batches = fail_batches
+        self.batches = []
+        self.single_gets = []
+        self.fetched = []  # (id, format)
+        self.log = []  # 'batch', 'get' and 'sleep' in call order
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def get(self, **kwargs):
+        return FakeRequest(self, kwargs)
+
+    def new_batch_http_request(self, callback=None):
+        return FakeBatch(self, callback)
+
+    def respond(self, kwargs, single):
+        message_id, format = kwargs['id'], kwargs.get('format', 'full')
+        if message_id in self.missing:
+            raise FakeGmailError("404 not found")
+        if message_id in self.rate_limited and not single:
+            raise FakeGmailError("429 rateLimitExceeded")
+        self.fetched.append((message_id, format))
+        message = self.mailbox[message_id]
+        headers = message['headers']
+        if format == 'metadata':
+            wanted = {h.lower() for h in kwargs.get('metadataHeaders', [])}
+            headers = [h for h in headers if h['name'].lower() in wanted]
+            return {'id': message_id, 'snippet': message['snippet'], 'payload': {'headers': headers}}
+        return {'id': message_id, 'snippet': message['snippet'],
+                'payload': {'headers': headers, 'parts': message['parts']}}
+
+
+@pytest.fixture
+def make_service(monkeypatch):
+    """FakeGmailService whose backoff sleeps are recorded instead of slept."""
+    services = []
+    monkeypatch.setattr(gmail_batch.time, 'sleep', lambda seconds: services[-1].log.append('sleep'))
+
+    def factory(*args, **kwargs):
+        services.append(FakeGmailService(*args, **kwargs))
+        return services[-1]
+
+    return factory
+
+
+def make_mailbox(count):
+    mailbox = {}
+    for i in range(count):
+        sender = 'news@mailchimp.com' if i % 3 == 0 else f'receipts@shop{i}.com'
+        mailbox[f'm{i}'] = {
+            'headers': [
+                {'name': 'Subject', 'value': f'Receipt #{i}'},
+                {'name': 'From', 'value': f'Shop <{sender}>'},
+                {'name': 'Date', 'value': 'Mon, 1 Sep 2025 10:00:00 -0500'},
+                {'name': 'X-Mailer', 'value': 'bulk'},
+            ],
+            'snippet': f'Your total is ${i}.00',
+            'parts': [{'mimeType': 'text/html', 'body': {'data': ''}}],
+        }
+    return mailbox
+
+
+class TestFetchMessages:
+    """Tests for fetch_messages"""
+
+    @pytest.mark.unit
+    def test_batches_of_50_in_order(self, make_service):
+        service = make_service(make_mailbox(120))
+        ids = [f'm{i}' for i in reversed(range(120))]
+
+        messages = fetch_messages(service, ids + ids[:5])
+
+        assert list(messages) == ids
+        assert [len(b) for b in service.batches] == [50, 50, 20]
+        assert service.single_gets == []
+        assert 'sleep' not in service.log
+        assert all(m['payload']['parts'] for m in messages.values())
+
+    @pytest.mark.unit
+    def test_batch_size_capped_at_api_maximum(self, make_service):
+        service = make_service(make_mailbox(250))
+
+        fetch_messages(service, [f'm{i}' for i in range(250)], batch_size=500)
+
+        assert [len(b) for b in service.batches] == [100, 100, 50]
+
+    @pytest.mark.unit
+    def test_metadata_headers(self, make_service):
+        service = make_service(make_mailbox(3))
+
+        messages = fetch_messages(service, ['m1', 'm2'], format='metadata',
+                                  metadata_headers=METADATA_HEADERS)
+
+        assert set(service.fetched) == {('m1', 'metadata'), ('m2', 'metadata')}
+        assert get_header(messages['m1'], 'subject') == 'Receipt #1'
+        assert get_header(messages['m1'], 'X-Mailer') == ''
+        assert 'parts' not in messages['m1']['payload']
+
+    @pytest.mark.unit
+    def test_failed_items_retried_individually(self, make_service):
+        service = make_service(make_mailbox(10), rate_limited={'m2', 'm7'}, missing={'m5'})
+
+        messages = fetch_messages(service, [f'm{i}' for i in range(10)])
+
+        assert list(messages) == [f'm{i}' for i in range(10) if i != 5]
+        assert sorted(service.single_gets) == ['m2', 'm5', 'm7']
+        assert service.log == ['batch', 'sleep', 'get', 'get', 'get']
+
+    @pytest.mark.unit
+    def test_batch_failure_falls_back_to_single_gets(self, make_service):
+        service = make_service(make_mailbox(5), fail_batches=True)
+
+        messages = fetch_messages(service, ['m0', 'm1', 'm2'], batch_size=2)
+
+        assert list(messages) == ['m0', 'm1', 'm2']
+        assert service.batches == [['m0', 'm1'], ['m2']]
+        assert service.single_gets == ['m0', 'm1', 'm2']
+        assert service.log == ['batch', 'sleep', 'get', 'get', 'batch', 'sleep', 'get']
+
+    @pytest.mark.unit
+    def test_empty(self, make_service):
+        service = make_service({})
+        assert fetch_messages(service, []) == {}
+        assert service.batches == []
+
+
+class TestMetadataFirstScan:
+    """The scanners' two-pass pattern: cheap header filter, then full bodies"""
+
+    @pytest.mark.unit
+    def test_filtered_messages_never_fetched_in_full(self, make_service):
+        service = make_service(make_mailbox(120))
+        ids = [f'm{i}' for i in range(120)]
+
+        metadata = fetch_messages(service, ids, format='metadata', metadata_headers=METADATA_HEADERS)
+        survivors = [i for i, m in metadata.items() if 'mailchimp.com' not in get_header(m, 'From')]
+        full = fetch_messages(service, survivors)
+
+        assert [len(b) for b in service.batches] == [50, 50, 20, 50, 30]
+        full_fetches = {i for i, fmt in service.fetched if fmt == 'full'}
+        assert full_fetches == set(survivors) == set(full)
+        assert not any(int(i[1:]) % 3 == 0 for i in full_fetches)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
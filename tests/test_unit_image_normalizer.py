@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Vision Image Normalizer
+==========================================
+
+Tests for services.image_normalizer on synthesized receipt photos:
+- EXIF rotation, grayscale and adaptive downscaling
+- Long, narrow receipts keeping their width
+- Payload size versus the original upload
+- Text lines surviving the resize
+- In-process cache by content hash
+"""
+
+import base64
+import io
+import numpy as np
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from PIL import Image, ImageDraw, ImageFont
+
+from services import image_normalizer
+from services.image_normalizer import (
+    normalize_image, normalize_base64, encode_for_vision, target_size,
+)
+
+
+LINES = ['STARBUCKS #1234', 'LATTE GRANDE   5.25', 'TAX            0.50', 'TOTAL          5.75']
+
+
+def receipt_photo(width=3024, height=4032, orientation=None, fmt='PNG'):
+    """A phone-sized photo of receipt text on slightly noisy paper."""
+    img = Image.effect_noise((width, height), 12).convert('RGB')
+    img = Image.blend(img, Image.new('RGB', (width, height), (235, 230, 220)), 0.8)
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=max(24, width // 40))
+    line_height = max(24, width // 40) * 3
+    for i, line in enumerate(LINES):
+        draw.text((width // 10, height // 5 + i * line_height), line, fill=(20, 20, 20), font=font)
+
+    buffer = io.BytesIO()
+    if orientation:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        img.save(buffer, format='JPEG', quality=95, exif=exif.tobytes())
+    else:
+        img.save(buffer, format=fmt, compress_level=1)
+    return buffer.getvalue()
+
+
+def dark_rows(img):
+    """Number of separate bands of rows containing dark (text) pixels."""
+    ink = (np.asarray(img.convert('L')) < 100).any(axis=1)
+    return int(ink[0]) + int(np.count_nonzero(ink[1:] & ~ink[:-1]))
+
+
+@pytest.fixture(scope='module')
+def phone_photo():
+    return receipt_photo()
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    image_normalizer.clear_cache()
+    yield
+    image_normalizer.clear_cache()
+
+
+class TestTargetSize:
+    """Tests for the adaptive resize rule"""
+
+    @pytest.mark.unit
+    def test_downscale_and_no_upscale(self):
+        assert target_size(3024, 4032) == (1200, 1600)
+        assert target_size(800, 600) == (800, 600)
+
+    @pytest.mark.unit
+    def test_narrow_receipt_keeps_short_edge(self):
+        """A 1200x6000 till roll is only shrunk to the minimum short edge."""
+        assert target_size(1200, 6000) == (1000, 5000)
+        assert target_size(900, 6000) == (900, 6000)
+
+
+class TestNormalizeImage:
+    """Tests for normalize_image and the encode helpers"""
+
+    @pytest.mark.unit
+    def test_phone_photo_is_shrunk(self, phone_photo):
+        """A 12MP PNG upload becomes a grayscale JPEG with a 1600px long edge."""
+        raw = phone_photo
+        result = normalize_image(raw)
+
+        decoded = Image.open(io.BytesIO(result.data))
+        assert decoded.format == 'JPEG' and decoded.mode == 'L'
+        assert (result.width, result.height) == (1200, 1600)
+        assert result.original_bytes == len(raw)
+        assert len(result.data) < len(raw) / 10
+
+    @pytest.mark.unit
+    def test_exif_orientation_applied(self):
+        """Photos saved sideways with an orientation tag come out upright."""
+        result = normalize_image(receipt_photo(4032, 3024, orientation=6))
+
+        assert (result.width, result.height) == (1200, 1600)
+
+    @pytest.mark.unit
+    def test_text_lines_survive(self, phone_photo):
+        """Every printed line is still a separate band of ink after resizing."""
+        raw = phone_photo
+        result = normalize_image(raw)
+
+        assert dark_rows(Image.open(io.BytesIO(raw))) == len(LINES)
+        assert dark_rows(Image.open(io.BytesIO(result.data))) == len(LINES)
+
+    @pytest.mark.unit
+    def test_cache_hit_by_content(self):
+        """The same bytes (or PIL image) are only normalized once."""
+        raw = receipt_photo(1600, 2000)
+        first = normalize_image(raw)
+
+        assert normalize_image(bytes(raw)) is first
+        assert normalize_image(raw, quality=60) is not first
+
+        img = Image.open(io.BytesIO(raw))
+        assert normalize_image(img) is normalize_image(img.copy())
+
+    @pytest.mark.unit
+    def test_undecodable_input_falls_back(self):
+        """Non-image payloads are sent unchanged rather than failing the call."""
+        fallback = encode_for_vision(b'not an image')
+        assert fallback.data == b'not an image' and fallback.mime_type == 'image/jpeg'
+        assert encode_for_vision(b'RIFF\0\0\0\0WEBPjunk').mime_type == 'image/webp'
+        assert normalize_base64(base64.b64encode(b'not an image').decode()) is None
+
+        result = normalize_base64(base64.b64encode(receipt_photo(600, 800)).decode())
+        assert result.data_url().startswith('data:image/jpeg;base64,')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Concurrent OCR Batches
+=====================================
+
+Tests for ReceiptOCRService.verify_batch / extract_batch and ProviderBudget:
+- Token bucket pacing and in-flight caps
+- Routing around open circuits; waiting for (or opting out of) busy budgets
+- Progress callback contract and input-ordered results
+- Batch throughput bound by provider budgets, not serial latency
+"""
+
+import pytest
+import threading
+import time
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from receipt_ocr_service import ReceiptOCRService, ProviderBudget
+
+
+def good_result(method):
+    return {
+        'supplier_name': 'Starbucks', 'total_amount': 5.75, 'date': '2024-06-15',
+        'confidence': 0.9, 'ocr_method': method,
+    }
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """OCR service with stubbed OpenAI/Gemini providers and no cache."""
+    svc = ReceiptOCRService(use_cache=False)
+    svc.openai_ready = True
+    svc.gemini_ready = True
+    svc.ollama_ready = False
+    svc.budgets = {
+        'openai': ProviderBudget(requests_per_minute=60_000, max_concurrent=8),
+        'gemini': ProviderBudget(requests_per_minute=60_000, max_concurrent=4),
+        'ollama': ProviderBudget(requests_per_minute=0, max_concurrent=1),
+    }
+    svc.calls = {'openai': 0, 'gemini': 0}
+    svc.latency = 0.0
+    lock = threading.Lock()
+
+    def provider(name):
+        def extract(image):
+            time.sleep(svc.latency)
+            with lock:
+                svc.calls[name] += 1
+            return good_result(name)
+        return extract
+
+    monkeypatch.setattr(svc, '_load_image', lambda path: None)
+    monkeypatch.setattr(svc, '_extract_with_openai', provider('openai'))
+    monkeypatch.setattr(svc, '_extract_with_gemini', provider('gemini'))
+    return svc
+
+
+@pytest.fixture
+def receipt_files(tmp_path):
+    def make(count):
+        paths = []
+        for i in range(count):
+            path = tmp_path / f'receipt_{i}.jpg'
+            path.write_bytes(b'img')
+            paths.append(str(path))
+        return paths
+    return make
+
+
+class TestProviderBudget:
+    """Tests for the per-provider token bucket"""
+
+    @pytest.mark.unit
+    def test_burst_then_refill(self):
+        """A spent bucket refuses until it refills at the per-minute rate."""
+        budget = ProviderBudget(requests_per_minute=600, max_concurrent=2)
+
+        assert budget.try_acquire() and budget.try_acquire()
+        budget.release()
+        budget.release()
+        assert not budget.try_acquire()  # Burst spent, 10/s refill
+        assert 0 < budget.wait_time() <= 0.1
+
+        time.sleep(0.12)
+        assert budget.try_acquire()
+
+    @pytest.mark.unit
+    def test_in_flight_cap_without_rate_limit(self):
+        """RPM 0 is unlimited; only max_concurrent applies."""
+        budget = ProviderBudget(requests_per_minute=0, max_concurrent=1)
+
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+        assert budget.wait_time() == 0.0
+        budget.release()
+        assert budget.try_acquire()
+
+
+class TestOCRBatch:
+    """Tests for concurrent verify_batch / extract_batch"""
+
+    @pytest.mark.unit
+    def test_routes_around_open_circuit(self, service, receipt_files):
+        """Receipts go to the next provider while a circuit is open."""
+        for _ in range(service.circuit_breaker.failure_threshold):
+            service.circuit_breaker.record_failure('openai')
+
+        results = service.extract_batch(receipt_files(6))
+
+        assert [r['ocr_method'] for r in results] == ['gemini'] * 6
+        assert service.calls == {'openai': 0, 'gemini': 6}
+
+    @pytest.mark.unit
+    def test_exhausted_budget_waits_for_preferred_provider(self, service, receipt_files):
+        """A busy primary is waited for rather than failing over."""
+        service.budgets['openai'] = ProviderBudget(requests_per_minute=600, max_concurrent=2)
+
+        results = service.extract_batch(receipt_files(6))
+
+        assert [r['ocr_method'] for r in results] == ['openai'] * 6
+        assert service.calls == {'openai': 6, 'gemini': 0}
+
+    @pytest.mark.unit
+    def test_fallback_on_busy_uses_next_provider(self, service, receipt_files):
+        """With fallback_on_busy, work flows to the next provider once the burst is spent."""
+        service.fallback_on_busy = True
+        service.budgets['openai'] = ProviderBudget(requests_per_minute=0.01, max_concurrent=2)
+        service.budgets['gemini'] = ProviderBudget(requests_per_minute=0, max_concurrent=4)
+
+        results = service.extract_batch(receipt_files(10))
+
+        assert all(r['status'] == 'success' for r in results)
+        assert service.calls == {'openai': 2, 'gemini': 8}
+
+    @pytest.mark.unit
+    def test_progress_callback_and_result_order(self, service, receipt_files):
+        """Progress counts up once per receipt; results keep input order."""
+        paths = receipt_files(20)
+        items = [
+            {'image_path': path, 'amount': 5.75, 'merchant': 'Starbucks', 'transaction_id': i}
+            for i, path in enumerate(paths)
+        ]
+        items.append({'image_path': '/missing.jpg', 'amount': 1.0, 'transaction_id': 'missing'})
+        progress = []
+
+        result = service.verify_batch(
+            items, progress_callback=lambda done, total, item: progress.append((done, total))
+        )
+
+        assert progress == [(i, 21) for i in range(1, 22)]
+        assert [r['transaction_id'] for r in result['results']] == list(range(20)) + ['missing']
+        assert (result['verified'], result['failed'], result['errors']) == (20, 0, 1)
+
+    @pytest.mark.unit
+    @pytest.mark.performance
+    def test_batch_bound_by_budget_not_serial_latency(self, service, receipt_files):
+        """500 verifications run ~12 at a time instead of one by one."""
+        service.latency = 0.02
+        items = [{'image_path': path, 'amount': 5.75, 'merchant': 'Starbucks'} for path in receipt_files(500)]
+
+        start = time.perf_counter()
+        result = service.verify_batch(items)
+        elapsed = time.perf_counter() - start
+
+        assert result['verified'] == 500
+        # Serial: 500 x 20ms = 10s; 12 workers should need ~1s
+        assert elapsed < 3.0, f"Batch took {elapsed:.2f}s"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
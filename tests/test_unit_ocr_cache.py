@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Two-Tier OCR Cache
+=====================================
+
+Tests for receipt_ocr_service.OCRCache with a stub MySQL backend:
+- Memory hits skipping both the file re-hash and the DB round trip
+- Re-hashing only when a file's size or mtime changes
+- LRU cap on the in-process tier
+- Hit/miss stats reported through get_stats
+"""
+
+import json
+import os
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import receipt_ocr_service
+from receipt_ocr_service import OCRCache
+
+
+class StubDB:
+    """ocr_cache table as a dict; counts SELECT round trips."""
+
+    def __init__(self):
+        self.rows = {}
+        self.selects = 0
+
+    def get_connection(self):
+        db = self
+
+        class Cursor:
+            def execute(self, sql, params=None):
+                self.row = None
+                if 'SELECT extracted_data' in sql:
+                    db.selects += 1
+                    data = db.rows.get(params[0])
+                    self.row = {'extracted_data': data} if data else None
+                elif 'INSERT INTO ocr_cache' in sql:
+                    db.rows[params[0]] = params[2]
+                elif 'COUNT(*)' in sql:
+                    self.row = {'cnt': len(db.rows)}
+
+            def fetchone(self):
+                return self.row
+
+        class Connection:
+            def cursor(self):
+                return Cursor()
+
+            def commit(self):
+                pass
+
+        return Connection()
+
+    def return_connection(self, conn):
+        pass
+
+
+@pytest.fixture
+def db(monkeypatch):
+    stub = StubDB()
+    monkeypatch.setattr(receipt_ocr_service, 'get_db', lambda: stub)
+    return stub
+
+
+@pytest.fixture
+def receipt(tmp_path):
+    path = tmp_path / 'receipt.jpg'
+    path.write_bytes(b'receipt image bytes')
+    return str(path)
+
+
+RESULT = {'supplier_name': 'Starbucks', 'total_amount': 5.75, 'confidence': 0.9}
+
+
+class TestOCRCacheMemoryTier:
+    """Tests for the in-process LRU in front of ocr_cache"""
+
+    @pytest.mark.unit
+    def test_memory_hit_skips_hash_and_db(self, db, receipt):
+        """After the first lookup, repeats are served without I/O."""
+        cache = OCRCache()
+        file_hash = cache._compute_hash(receipt)
+        db.rows[file_hash] = json.dumps(RESULT)
+        cache.clear_memory()
+
+        for _ in range(5):
+            assert cache.get(receipt) == RESULT
+
+        stats = cache.memory_stats()
+        assert db.selects == 1
+        assert stats['hashes_computed'] == 2  # Once before, once after clear_memory
+        assert (stats['db_hits'], stats['memory_hits'], stats['misses']) == (1, 4, 0)
+
+    @pytest.mark.unit
+    def test_set_populates_memory(self, db, receipt):
+        """A freshly extracted result is a memory hit for the next caller."""
+        cache = OCRCache()
+        cache.set(receipt, dict(RESULT, from_cache=False))
+
+        cached = cache.get(receipt)
+        cached['from_cache'] = True
+
+        assert db.selects == 0
+        assert cache.get(receipt)['from_cache'] is False  # Callers get copies
+
+    @pytest.mark.unit
+    def test_changed_file_is_rehashed(self, db, receipt):
+        """A new size or mtime invalidates the hash; the old result is not served."""
+        cache = OCRCache()
+        cache.set(receipt, RESULT)
+
+        Path(receipt).write_bytes(b'a different receipt')
+        stat = os.stat(receipt)
+        os.utime(receipt, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert cache.get(receipt) is None
+        assert cache.memory_stats()['hashes_computed'] == 2
+        assert db.selects == 1
+
+    @pytest.mark.unit
+    def test_lru_cap(self, db, tmp_path):
+        """The memory tier holds at most memory_size entries, evicting the oldest."""
+        cache = OCRCache(memory_size=3)
+        paths = []
+        for i in range(5):
+            path = tmp_path / f'r{i}.jpg'
+            path.write_bytes(f'receipt {i}'.encode())
+            paths.append(str(path))
+            cache.set(str(path), dict(RESULT, total_amount=float(i)))
+
+        assert cache.memory_stats()['entries'] == 3
+        assert cache.get(paths[4])['total_amount'] == 4.0
+        assert db.selects == 0
+        assert cache.get(paths[0])['total_amount'] == 0.0  # From MySQL
+        assert db.selects == 1
+
+    @pytest.mark.unit
+    def test_stats_include_memory_tier(self, db, receipt, tmp_path):
+        cache = OCRCache()
+        cache.set(receipt, RESULT)
+        cache.get(receipt)
+        cache.get(str(tmp_path / 'missing.jpg'))
+        other = tmp_path / 'other.jpg'
+        other.write_bytes(b'unseen')
+        cache.get(str(other))
+
+        stats = cache.get_stats()
+
+        assert stats['enabled'] and stats['count'] == 1
+        assert stats['memory']['memory_hits'] == 1
+        assert stats['memory']['misses'] == 1
+        assert stats['memory']['hit_rate'] == 0.5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the OCR Engine Registry
+======================================
+
+Tests for services.ocr_engine_registry with stub loaders:
+- One load per process shared by concurrent callers
+- Background preload and readiness/load-time reporting
+- Failed loads reported and retried
+- Idle eviction only under memory pressure, least recently used first
+"""
+
+import pytest
+import threading
+import time
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.ocr_engine_registry import OCREngineRegistry
+
+
+class SlowLoader:
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("weights missing")
+        return object()
+
+
+@pytest.fixture
+def memory():
+    """Mutable available-memory fraction seen by the registry."""
+    return {'available': 0.5}
+
+
+@pytest.fixture
+def registry(memory):
+    return OCREngineRegistry(idle_seconds=0.05, min_available_memory=0.2,
+                             reap_interval=0, memory_probe=lambda: memory['available'])
+
+
+class TestOCREngineRegistry:
+    """Tests for OCREngineRegistry"""
+
+    @pytest.mark.unit
+    def test_single_shared_instance(self, registry):
+        """Concurrent first calls wait for one load and get the same object."""
+        loader = SlowLoader(delay=0.05)
+        registry.register('donut', loader)
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(registry.get('donut'))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert loader.calls == 1
+        assert len({id(r) for r in results}) == 1
+        assert registry.get('donut') is results[0]
+
+    @pytest.mark.unit
+    def test_preload_reports_readiness_and_load_time(self, registry):
+        registry.register('donut', SlowLoader(delay=0.05))
+        registry.register('easyocr', SlowLoader())
+
+        assert registry.status()['engines']['donut']['state'] == 'unloaded'
+        registry.preload(['donut']).join(timeout=5)
+
+        status = registry.status()['engines']
+        assert registry.is_ready('donut') and not registry.is_ready('easyocr')
+        assert status['donut']['load_seconds'] >= 0.05
+        assert status['donut']['idle_seconds'] is not None
+        assert status['easyocr']['state'] == 'unloaded'
+
+    @pytest.mark.unit
+    def test_failed_load_is_reported_and_retried(self, registry):
+        loader = SlowLoader(fail=True)
+        registry.register('ensemble', loader)
+
+        registry.preload(background=False)
+        status = registry.status()['engines']['ensemble']
+        assert status['state'] == 'failed' and status['error'] == 'weights missing'
+
+        loader.fail = False
+        assert registry.get('ensemble') is not None
+        assert loader.calls == 2 and registry.is_ready('ensemble')
+
+    @pytest.mark.unit
+    def test_idle_eviction_under_memory_pressure(self, registry, memory):
+        """Nothing is evicted with memory to spare; under pressure the LRU idle engine goes first."""
+        evicted_hooks = []
+        donut_loader = SlowLoader()
+        registry.register('donut', donut_loader, on_evict=lambda: evicted_hooks.append('donut'))
+        registry.register('easyocr', SlowLoader())
+        registry.get('donut')
+        registry.get('easyocr')
+        time.sleep(0.06)
+
+        assert registry.reap() == []
+
+        memory['available'] = 0.1
+        registry.get('easyocr')  # Recently used: not idle
+        assert registry.reap() == ['donut']
+        assert evicted_hooks == ['donut']
+        assert registry.status()['engines']['donut']['state'] == 'unloaded'
+        assert registry.is_ready('easyocr')
+
+        registry.get('donut')
+        assert donut_loader.calls == 2
+
+    @pytest.mark.unit
+    def test_unknown_engine(self, registry):
+        with pytest.raises(KeyError):
+            registry.get('llama')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
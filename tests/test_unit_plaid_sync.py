@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Plaid Sync Pipeline
+======================================
+
+Tests for PlaidService.sync_transactions and PlaidSyncWorker._sync_item
+with a stub Plaid client and a stub database:
+- Item cursor committed in the same transaction as each page
+- Cursor reset to the loop start on a mutation during pagination
+- Page fetches overlapping DB writes
+- Classifier stage receiving inserted IDs per page
+- Import linking every identical same-day charge to its own CSV row
+"""
+
+import pytest
+import time
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import services.plaid_service as plaid_service
+from services.plaid_service import PlaidService, PlaidConfig, SyncResult
+
+
+ITEM_ROW = {
+    'item_id': 'item-1', 'access_token': 'token', 'institution_id': None,
+    'institution_name': 'Bank', 'status': 'active', 'transactions_cursor': None,
+    'last_successful_sync': None, 'user_id': 'default', 'created_at': None,
+}
+
+
+class StubDB:
+    """Records committed statements; optionally slow or failing on commit."""
+
+    def __init__(self, commit_latency=0.0, fail_on_page=None):
+        self.commit_latency = commit_latency
+        self.fail_on_page = fail_on_page
+        self.committed = []
+        self.pages_committed = 0
+
+    def get_connection(self):
+        db = self
+        pending = []
+
+        class Cursor:
+            def execute(self, sql, params=None):
+                pending.append((sql, params))
+
+            def fetchone(self):
+                return dict(ITEM_ROW)
+
+            def fetchall(self):
+                return []
+
+        class Connection:
+            def cursor(self):
+                return Cursor()
+
+            def commit(self):
+                is_page = any('INSERT INTO plaid_transactions' in sql for sql, _ in pending)
+                if is_page:
+                    time.sleep(db.commit_latency)
+                    if db.fail_on_page == db.pages_committed + 1:
+                        raise RuntimeError("deadlock")
+                    db.pages_committed += 1
+                db.committed.extend(pending)
+                pending.clear()
+
+            def rollback(self):
+                pending.clear()
+
+        return Connection()
+
+    def return_connection(self, conn):
+        pass
+
+    def stored_cursor(self):
+        cursors = [
+            params[0] for sql, params in self.committed
+            if 'SET transactions_cursor' in sql
+        ]
+        return cursors[-1] if cursors else None
+
+
+def make_page(page, size=50, has_more=True):
+    added = [
+        SimpleNamespace(
+            transaction_id=f'tx-{page}-{i}', account_id='acct-1', amount=10.0 + i,
+            date=date(2025, 10, 1), merchant_name='Coffee', name='COFFEE', pending=False,
+            personal_finance_category=None, payment_channel='online', location=None,
+            authorized_date=None, iso_currency_code='USD',
+        )
+        for i in range(size)
+    ]
+    return SimpleNamespace(
+        added=added, modified=[], removed=[],
+        next_cursor=f'cursor-{page}', has_more=has_more,
+    )
+
+
+class StubPlaidApi:
+    def __init__(self, pages, fetch_latency=0.0):
+        self.responses = [make_page(p, has_more=p < pages) for p in range(1, pages + 1)]
+        self.fetch_latency = fetch_latency
+        self.requests = []
+
+    def transactions_sync(self, request):
+        time.sleep(self.fetch_latency)
+        self.requests.append(request)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def make_service(monkeypatch):
+    monkeypatch.setattr(plaid_service, 'PLAID_SDK_AVAILABLE', True)
+    monkeypatch.setattr(plaid_service, 'TransactionsSyncRequest', dict, raising=False)
+
+    def factory(api, db):
+        monkeypatch.setattr(PlaidService, '_instance', None)
+        service = PlaidService(PlaidConfig(client_id='', secret=''))
+        service._api = api
+        service._db = db
+        service.import_to_transactions = Mock(return_value={'imported': 0})
+        return service
+
+    return factory
+
+
+class TestSyncPipeline:
+    """Tests for the pipelined PlaidService.sync_transactions"""
+
+    @pytest.mark.unit
+    def test_cursor_committed_with_each_page(self, make_service):
+        """Fetching follows next_cursor; the stored cursor tracks committed pages."""
+        db = StubDB()
+        api = StubPlaidApi(pages=3)
+        service = make_service(api, db)
+
+        result = service.sync_transactions('item-1')
+
+        assert result.added == 150
+        assert [r.get('cursor') for r in api.requests] == [None, 'cursor-1', 'cursor-2']
+        assert db.pages_committed == 3
+        assert db.stored_cursor() == 'cursor-3'
+
+    @pytest.mark.unit
+    def test_failed_page_leaves_cursor_at_last_durable_page(self, make_service):
+        """A write failure stops the sync without advancing past written pages."""
+        db = StubDB(fail_on_page=3)
+        service = make_service(StubPlaidApi(pages=5), db)
+
+        # Unwrap require_plaid_sdk and retry_on_error to skip retry delays
+        sync_once = PlaidService.sync_transactions.__wrapped__.__wrapped__
+        with pytest.raises(RuntimeError, match="deadlock"):
+            sync_once(service, 'item-1')
+
+        assert db.pages_committed == 2
+        assert db.stored_cursor() == 'cursor-2'
+
+    @pytest.mark.unit
+    def test_mutation_during_pagination_resets_cursor(self, make_service, monkeypatch):
+        """The stored cursor goes back to where the sync started, then the retry restarts."""
+        monkeypatch.setitem(ITEM_ROW, 'transactions_cursor', 'cursor-0')
+        db = StubDB()
+        api = StubPlaidApi(pages=4)
+        # Two pages, a mutation error on the third request, then all four again
+        api.responses = api.responses[:2] + StubPlaidApi(pages=4).responses
+
+        def transactions_sync(request):
+            api.requests.append(request)
+            if len(api.requests) == 3:
+                raise RuntimeError("TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION")
+            return api.responses.pop(0)
+
+        api.transactions_sync = transactions_sync
+        service = make_service(api, db)
+        sync_once = PlaidService.sync_transactions.__wrapped__.__wrapped__
+
+        with pytest.raises(RuntimeError, match="MUTATION_DURING_PAGINATION"):
+            sync_once(service, 'item-1')
+        assert db.pages_committed == 2
+        assert db.stored_cursor() == 'cursor-0'
+
+        result = sync_once(service, 'item-1')
+        assert result.added == 200
+        assert [r.get('cursor') for r in api.requests[3:]] == ['cursor-0', 'cursor-1', 'cursor-2', 'cursor-3']
+        assert db.stored_cursor() == 'cursor-4'
+
+    @pytest.mark.unit
+    @pytest.mark.performance
+    def test_fetch_overlaps_writes(self, make_service):
+        """The next page is fetched while the previous one is being written."""
+        pages, latency = 6, 0.05
+        service = make_service(StubPlaidApi(pages, fetch_latency=latency), StubDB(commit_latency=latency))
+
+        start = time.perf_counter()
+        result = service.sync_transactions('item-1')
+        elapsed = time.perf_counter() - start
+
+        assert result.added == pages * 50
+        # Sequential fetch + write would take pages * 2 * latency (0.6s)
+        assert elapsed < pages * 2 * latency * 0.85, f"Sync took {elapsed:.2f}s"
+
+
+class LinkingDB:
+    """Models the import statements over in-memory staged and existing rows."""
+
+    def __init__(self, staged, existing):
+        self.stage = {tid: dict(row, state=None) for tid, row in staged.items()}
+        self.transactions = {idx: dict(row, plaid_transaction_id=None) for idx, row in existing.items()}
+        self.links = {}
+        self.inserted = []
+
+    def candidates(self):
+        for tid, s in self.stage.items():
+            for idx, t in self.transactions.items():
+                if (s['state'] is None and t['plaid_transaction_id'] is None
+                        and abs(t['date'] - s['date']) <= timedelta(days=2)
+                        and abs(t['amount'] - s['amount']) < 0.01):
+                    yield tid, idx, abs((t['date'] - s['date']).days)
+
+    def link_round(self):
+        """match_rank = 1 per staged row, then tx_rank = 1 per existing row."""
+        best = {}
+        for tid, idx, diff in self.candidates():
+            best[tid] = min(best.get(tid, (diff, idx)), (diff, idx))
+        ranked = {}
+        for tid, (diff, idx) in best.items():
+            if idx not in ranked or (diff, tid) < ranked[idx]:
+                ranked[idx] = (diff, tid)
+        return {tid: idx for idx, (_, tid) in ranked.items()}
+
+    def get_connection(self):
+        db = self
+
+        class Cursor:
+            rowcount = 0
+
+            def execute(self, sql, params=None):
+                self.rowcount = 0
+                if 'INSERT INTO plaid_import_stage' in sql:
+                    self.rowcount = len(db.stage)
+                elif 'DELETE FROM plaid_import_links' in sql:
+                    db.links = {}
+                elif 'INSERT INTO plaid_import_links' in sql:
+                    db.links = db.link_round()
+                    self.rowcount = len(db.links)
+                elif 'UPDATE transactions t' in sql:
+                    for tid, idx in db.links.items():
+                        db.transactions[idx]['plaid_transaction_id'] = tid
+                elif "SET s.state = 'linked'" in sql:
+                    for tid in db.links:
+                        db.stage[tid]['state'] = 'linked'
+                elif 'INSERT INTO transactions' in sql:
+                    db.inserted = [tid for tid, s in db.stage.items() if s['state'] is None]
+                    self.rowcount = len(db.inserted)
+
+            def fetchone(self):
+                return {'cnt': 0}
+
+            def fetchall(self):
+                return []
+
+        connection = Mock()
+        connection.cursor.return_value = Cursor()
+        return connection
+
+    def return_connection(self, conn):
+        pass
+
+
+class TestImportLinking:
+    """Tests for linking staged Plaid rows to CSV-imported transactions"""
+
+    @pytest.mark.unit
+    def test_identical_same_day_charges_each_link(self, monkeypatch):
+        """Both staged charges rank _index 10 first; the second still links to 11."""
+        monkeypatch.setattr(PlaidService, '_instance', None)
+        charge = {'date': date(2025, 10, 1), 'amount': 4.50}
+        db = LinkingDB(
+            staged={'tx-a': charge, 'tx-b': charge, 'tx-c': {'date': date(2025, 10, 1), 'amount': 9.99}},
+            existing={10: charge, 11: charge},
+        )
+        service = PlaidService(PlaidConfig(client_id='', secret=''))
+        service._db = db
+
+        result = service.import_to_transactions()
+
+        assert result['success'], result
+        assert {idx: t['plaid_transaction_id'] for idx, t in db.transactions.items()} == {10: 'tx-a', 11: 'tx-b'}
+        assert db.inserted == ['tx-c']
+        assert result['imported'] == 1
+
+
+class TestSyncWorkerClassifier:
+    """Tests for the classifier stage of PlaidSyncWorker._sync_item"""
+
+    @pytest.mark.unit
+    def test_classifier_receives_written_ids(self, monkeypatch):
+        """Each committed page's added IDs are classified by account default."""
+        import db_mysql
+        from services.plaid_sync_worker import PlaidSyncWorker
+
+        executed = []
+
+        class Cursor:
+            def execute(self, sql, params=None):
+                executed.append((sql, params))
+
+            def fetchall(self):
+                return [{'account_id': 'acct-1', 'default_business_type': 'Business'}]
+
+        connection = Mock()
+        connection.cursor.return_value = Cursor()
+        db = Mock()
+        db.get_connection.return_value = connection
+        monkeypatch.setattr(db_mysql, 'get_mysql_db', lambda: db)
+
+        def sync_transactions(item_id, sync_type, on_page_written):
+            on_page_written(['tx-1', 'tx-2'])
+            on_page_written(['tx-3'])
+            return SyncResult(success=True, batch_id='b', item_id=item_id, added=3)
+
+        plaid = Mock()
+        plaid.sync_transactions.side_effect = sync_transactions
+        plaid.import_to_transactions.return_value = {'success': True, 'imported': 3}
+        monkeypatch.setattr(plaid_service, 'get_plaid_service', lambda: plaid)
+
+        worker = PlaidSyncWorker()
+        result = worker._sync_item({'item_id': 'item-1', 'user_id': 'default', 'institution_name': 'Bank'})
+
+        assert result['success'] and result['added'] == 3 and result['imported'] == 3
+        updates = [params for sql, params in executed if 'UPDATE plaid_transactions' in sql]
+        assert updates == [
+            ('Business', 'acct-1', 'tx-1', 'tx-2'),
+            ('Business', 'acct-1', 'tx-3'),
+        ]
+        # Account defaults are loaded once per Item
+        assert sum('FROM plaid_accounts' in sql for sql, _ in executed) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
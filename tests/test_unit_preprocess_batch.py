@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Batch Receipt Preprocessing
+==========================================
+
+Tests for ReceiptPreprocessor.process_batch and adaptive stage skipping:
+- Pool output identical to in-process preprocessing
+- Arrays returned through shared memory, blocks freed afterwards (also on error)
+- Denoise/contrast skipped only for images that don't need them
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+from receipt_ocr_local.config import OCRConfig
+from receipt_ocr_local.preprocess import ReceiptPreprocessor
+
+
+def fast_config(**overrides):
+    """Skip the slow geometric stages so tests stay quick."""
+    settings = dict(auto_rotate=False, deskew=False, perspective_correction=False)
+    settings.update(overrides)
+    return OCRConfig(**settings)
+
+
+def write_receipt(path, noise=0.0, low_contrast=False, seed=0):
+    img = np.full((600, 400, 3), 235, dtype=np.uint8)
+    ink = 190 if low_contrast else 20
+    for line in range(8):
+        cv2.putText(img, f"ITEM {line}  {line + 1}.99", (20, 60 + line * 60),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, (ink, ink, ink), 2)
+    if noise:
+        rng = np.random.default_rng(seed)
+        img = np.clip(img + rng.normal(0, noise, img.shape), 0, 255).astype(np.uint8)
+    cv2.imwrite(str(path), img)
+    return str(path)
+
+
+class TestProcessBatch:
+    """Tests for ReceiptPreprocessor.process_batch"""
+
+    @pytest.mark.unit
+    def test_pool_matches_inline(self, tmp_path):
+        """Worker output read back from shared memory equals process()."""
+        preprocessor = ReceiptPreprocessor(fast_config(denoise=False))
+        paths = [write_receipt(tmp_path / f"r{i}.png", noise=5, seed=i) for i in range(4)]
+        paths.insert(2, str(tmp_path / "missing.png"))
+
+        results = preprocessor.process_batch(paths, max_workers=2)
+
+        assert len(results) == 5
+        assert results[2][0] is None and 'error' in results[2][1]
+        for path, (img, metadata) in zip(paths[:2] + paths[3:], results[:2] + results[3:]):
+            expected, expected_meta = preprocessor.process(path)
+            assert np.array_equal(img, expected)
+            assert metadata['final_size'] == expected_meta['final_size']
+
+    @pytest.mark.unit
+    def test_blocks_freed_when_collection_fails(self, tmp_path, monkeypatch):
+        """A failed read still unlinks every block the workers created."""
+        from multiprocessing import shared_memory
+        import receipt_ocr_local.preprocess as preprocess
+
+        preprocessor = ReceiptPreprocessor(fast_config(denoise=False))
+        paths = [write_receipt(tmp_path / f"r{i}.png", seed=i) for i in range(4)]
+        names = []
+        real_read, real_discard = preprocess._read_shared_memory, preprocess._discard_shared_memory
+
+        def failing_read(name, shape, dtype):
+            names.append(name)
+            if len(names) == 2:
+                raise RuntimeError("copy failed")  # Leaves this block for cleanup
+            return real_read(name, shape, dtype)
+
+        def recording_discard(future):
+            if not future.cancelled() and future.exception() is None:
+                names.append(future.result()[0])
+            real_discard(future)
+
+        monkeypatch.setattr(preprocess, '_read_shared_memory', failing_read)
+        monkeypatch.setattr(preprocess, '_discard_shared_memory', recording_discard)
+
+        with pytest.raises(RuntimeError, match="copy failed"):
+            preprocessor.process_batch(paths, max_workers=2)
+
+        assert len(set(names)) >= 2
+        for name in set(names):
+            with pytest.raises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+
+    @pytest.mark.unit
+    def test_adaptive_skips_unneeded_stages(self, tmp_path):
+        """Clean, high-contrast scans skip denoise and CLAHE; noisy, faded ones don't."""
+        preprocessor = ReceiptPreprocessor(fast_config(adaptive_stages=True))
+        clean = write_receipt(tmp_path / "clean.png")
+        noisy = write_receipt(tmp_path / "noisy.png", noise=12, low_contrast=True)
+
+        _, clean_meta = preprocessor.process(clean)
+        _, noisy_meta = preprocessor.process(noisy)
+
+        assert set(clean_meta['steps_skipped']) == {'denoise', 'contrast'}
+        assert 'denoised' not in clean_meta['steps_applied']
+        assert noisy_meta['steps_skipped'] == []
+        assert {'denoised', 'contrast_enhanced'} <= set(noisy_meta['steps_applied'])
+        assert noisy_meta['quality']['noise_sigma'] > clean_meta['quality']['noise_sigma']
+
+    @pytest.mark.unit
+    def test_adaptive_off_by_default(self, tmp_path):
+        preprocessor = ReceiptPreprocessor(fast_config())
+
+        _, metadata = preprocessor.process(write_receipt(tmp_path / "clean.png"))
+
+        assert metadata['steps_skipped'] == []
+        assert 'denoised' in metadata['steps_applied']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Local Receipt Index
+======================================
+
+Tests for local_receipt_index.LocalReceiptIndex, the amount-bucketed index
+ai_receipt_locator.find_best_receipt uses instead of scanning the folder:
+- Amount window and restaurant-tip subtotal candidates
+- Incremental refresh on folder changes
+- Metadata loaded once per file
+"""
+
+import os
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from local_receipt_index import LocalReceiptIndex
+
+
+@pytest.fixture
+def receipt_dir(tmp_path):
+    """Receipts folder with a metadata table keyed by filename."""
+    meta = {
+        'starbucks.jpg': {'total_amount': 5.75, 'receipt_date': '2024-06-15'},
+        'pub.jpg': {'total_amount': 85.00, 'subtotal_amount': 85.00},
+        'hotel.png': {'total_amount': 412.20},
+        'unreadable.jpg': None,
+    }
+    for name in meta:
+        (tmp_path / name).write_bytes(b'img')
+    (tmp_path / 'notes.txt').write_text('not a receipt')
+    return tmp_path, meta
+
+
+def make_index(receipt_dir):
+    path, meta = receipt_dir
+    calls = []
+
+    def loader(name):
+        calls.append(name)
+        return meta.get(name)
+
+    return LocalReceiptIndex(path, loader), calls
+
+
+class TestLocalReceiptIndex:
+    """Tests for LocalReceiptIndex"""
+
+    @pytest.mark.unit
+    def test_candidates_within_amount_window(self, receipt_dir):
+        """Only receipts whose amount can score are returned."""
+        index, _ = make_index(receipt_dir)
+        index.refresh()
+
+        assert [name for name, _ in index.candidates(5.75)] == ['starbucks.jpg']
+        assert [name for name, _ in index.candidates(6.00)] == ['starbucks.jpg']
+        assert index.candidates(7.00) == []
+        assert [name for name, _ in index.candidates(416.00)] == ['hotel.png']
+        assert index.candidates(0) == []
+
+    @pytest.mark.unit
+    def test_tip_adjusted_subtotal(self, receipt_dir):
+        """Charges 15-25% over a receipt subtotal find that receipt."""
+        index, _ = make_index(receipt_dir)
+        index.refresh()
+
+        assert [name for name, _ in index.candidates(102.00)] == ['pub.jpg']
+        assert index.candidates(120.00) == []
+
+    @pytest.mark.unit
+    def test_refresh_is_incremental(self, receipt_dir):
+        """Metadata loads once per file; unchanged folders are not re-listed."""
+        path, meta = receipt_dir
+        index, calls = make_index(receipt_dir)
+
+        assert index.refresh() is True
+        assert sorted(calls) == sorted(meta)
+        assert index.refresh() is False
+
+        meta['uber.jpg'] = {'total_amount': 15.50}
+        (path / 'uber.jpg').write_bytes(b'img')
+        (path / 'hotel.png').unlink()
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 10**9))
+        calls.clear()
+
+        assert index.refresh() is True
+        assert calls == ['uber.jpg']
+        assert [name for name, _ in index.candidates(15.50)] == ['uber.jpg']
+        assert index.candidates(412.20) == []
+        assert len(index) == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
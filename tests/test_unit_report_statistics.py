@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for Report Statistics
+================================
+
+Tests for ExpenseReportGenerator.calculate_statistics comparing the
+pandas/integer-cents path with the Decimal loop on generated data:
+- Identical ReportSummary (totals, tie order, vendor dates, monthly trends)
+- Fallback to the loop for sub-cent amounts
+- fetch_transactions filters
+"""
+
+import random
+import pytest
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("pandas")
+
+from services.report_generator import ExpenseReportGenerator, Transaction
+
+
+DESCRIPTIONS = [
+    'TST* BLUEBIRD CAFE', 'SQ *HATTIE B', 'UBER *TRIP 12345678', 'AMZN*Marketplace',
+    'DELTA AIR 0062312345', 'Soho House', 'PARKING - 42', '', None,
+]
+CATEGORIES = [
+    'DH: Travel Costs - Airfare', 'Software subscriptions', 'BD: Client Business Meals',
+    'Office Supplies', '', None,
+]
+
+
+def generate_transactions(count, seed=7):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    transactions = []
+    for i in range(count):
+        transactions.append(Transaction(
+            index=i,
+            date=None if rng.random() < 0.03 else start + timedelta(days=rng.randrange(400), hours=rng.randrange(24)),
+            description=rng.choice(DESCRIPTIONS),
+            # Round amounts make ties between categories and vendors likely
+            amount=Decimal(rng.choice([-1, 1]) * rng.choice([500, 1000, rng.randrange(1, 100000)])).scaleb(-2),
+            category=rng.choice(CATEGORIES),
+            chase_category=rng.choice(['Food & Drink', 'Travel', '']),
+            business_type=rng.choice(['Business', 'Personal']),
+            receipt_file='r.jpg' if rng.random() < 0.4 else None,
+            r2_url='https://r2/x.jpg' if rng.random() < 0.1 else None,
+            review_status=rng.choice(['MATCHED', 'VERIFIED', 'APPROVED', 'PENDING', None]),
+            mi_category=rng.choice([None, None, 'Meals']),
+        ))
+    return transactions
+
+
+@pytest.fixture
+def generator():
+    return ExpenseReportGenerator(db=None)
+
+
+class TestColumnarStatistics:
+    """Tests for the columnar calculate_statistics path"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("count", [1, 7, 250, 5000])
+    def test_matches_decimal_loop(self, generator, count):
+        transactions = generate_transactions(count, seed=count)
+
+        loop = generator.calculate_statistics(transactions, columnar=False)
+        columnar = generator.calculate_statistics(transactions, columnar=True)
+
+        assert columnar == loop
+        assert [c.category for c in columnar.by_category] == [c.category for c in loop.by_category]
+        assert [v.vendor for v in columnar.by_vendor] == [v.vendor for v in loop.by_vendor]
+        assert [v.categories for v in columnar.by_vendor] == [v.categories for v in loop.by_vendor]
+
+    @pytest.mark.unit
+    def test_sub_cent_amounts_use_decimal_loop(self, generator):
+        """Amounts that aren't whole cents are summed exactly, not rounded."""
+        transactions = generate_transactions(20)
+        transactions[3].amount = Decimal('10.005')
+
+        summary = generator.calculate_statistics(transactions, columnar=True)
+
+        assert generator._calculate_statistics_columnar(transactions) is None
+        assert summary.total_amount == sum(abs(t.amount) for t in transactions)
+        assert summary == generator.calculate_statistics(transactions, columnar=False)
+
+    @pytest.mark.unit
+    def test_size_threshold(self, generator, monkeypatch):
+        calls = []
+        original = generator._calculate_statistics_columnar
+        monkeypatch.setattr(generator, '_calculate_statistics_columnar',
+                            lambda txns: calls.append(len(txns)) or original(txns))
+
+        generator.calculate_statistics(generate_transactions(10))
+        generator.calculate_statistics(generate_transactions(generator.COLUMNAR_MIN_ROWS))
+
+        assert calls == [generator.COLUMNAR_MIN_ROWS]
+
+
+class TestFetchTransactions:
+    """Tests for fetch_transactions filtering"""
+
+    @pytest.mark.unit
+    def test_filters(self):
+        class StubDB:
+            def get_reportable_expenses(self, **kwargs):
+                return [
+                    {'_index': 1, 'chase_date': '2024-03-01', 'chase_amount': '10.00', 'business_type': 'Business'},
+                    {'_index': 2, 'chase_date': '2024-05-01', 'chase_amount': '20.00', 'business_type': 'Business'},
+                    {'_index': 3, 'chase_date': '2024-03-15', 'chase_amount': '30.00', 'business_type': 'Personal'},
+                    {'_index': 4, 'chase_date': '2024-03-20', 'chase_amount': '40.00', 'business_type': 'Business',
+                     'already_submitted': 'yes'},
+                    {'_index': 5, 'chase_date': '2024-03-25', 'chase_amount': '50.00', 'business_type': 'Business'},
+                ]
+
+        generator = ExpenseReportGenerator(db=StubDB())
+
+        txns = generator.fetch_transactions('Business', '2024-03-01', '2024-03-31')
+
+        assert [t.index for t in txns] == [5, 1]
+        assert [t.index for t in generator.fetch_transactions('All', include_submitted=True)] == [2, 5, 4, 3, 1]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -19,7 +19,7 @@ from pathlib import Path
 from difflib import SequenceMatcher
 from datetime import datetime, date, timezone
 
-from flask import Flask, send_from_directory, jsonify, request, abort, Response, make_response, send_file, g
+from flask import Flask, send_from_directory, jsonify, request, abort, Response, make_response, send_file, g, has_request_context
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 # Initialize structured logging first
@@ -71,6 +71,8 @@ load_dotenv()
 
 # Import Gemini utility with automatic key fallback
 from gemini_utils import generate_content_with_fallback, analyze_receipt_image, get_model as get_gemini_model
+from services.image_normalizer import NormalizedImage, encode_for_vision
+from services.contact_search_index import ContactSearchIndex, INDEX_COLUMNS as CONTACT_INDEX_COLUMNS
 
 # Import unified OCR service (Mindee-quality extraction)
 try:
@@ -81,6 +83,10 @@ except ImportError as e:
     OCR_SERVICE_AVAILABLE = False
     print(f"⚠️ Receipt OCR Service not available: {e}")
 
+# Warm local OCR models in the background (OCR_PRELOAD_ENGINES=donut,easyocr)
+from services.ocr_engine_registry import preload_from_env as preload_ocr_engines
+preload_ocr_engines()
+
 # === MERCHANT INTELLIGENCE ===
 try:
     from merchant_intelligence import get_merchant_intelligence, process_transaction_mi, process_all_mi
@@ -1214,6 +1220,9 @@ def api_pool_status():
 
         status['health'] = health
         status['timestamp'] = datetime.now().isoformat()
+        status['dataframe_cache'] = get_user_df_cache().stats()
+        # Memory saved by the compact dtype schema on the last full load
+        status['dataframe_schema'] = getattr(db, 'schema_stats', {}) if db else {}
 
         return jsonify({
             'ok': True,
@@ -1410,7 +1419,10 @@ def handle_exception(error):
 
 
 # Thread-safe caching (replaces global df)
-from cache_manager import get_df_cache, get_receipt_meta_cache, DataFrameCache, ThreadSafeCache
+from cache_manager import (
+    get_df_cache, get_user_df_cache, get_receipt_meta_cache, DataFrameCache, ThreadSafeCache,
+    RowLocator, patch_row,
+)
 
 # Legacy globals for backward compatibility during transition
 # These will be updated by the cache manager
@@ -1487,6 +1499,8 @@ def safe_json(data):
             if math.isnan(v) or math.isinf(v):
                 return None
             return v
+        elif v is pd.NaT or v is pd.NA:
+            return None
         elif isinstance(v, datetime):
             return v.strftime('%Y-%m-%d %H:%M:%S')
         elif hasattr(v, 'strftime'):  # Handle date objects too
@@ -1800,32 +1814,72 @@ def normalize_merchant_name(s: str | None) -> str:
 DF_CACHE_TTL_SECONDS = 300  # 5 minutes TTL for DataFrame cache
 import time as _time_module  # For cache timestamp
 
-# Thread-safe DataFrame cache instance
-_df_cache_instance = get_df_cache()
+# Thread-safe DataFrame cache instance, sharded per user (DF_CACHE_MAX_MB budget)
+_df_cache_instance = get_user_df_cache()
+
+
+def _cache_user_id() -> str | None:
+    """User whose cache shard serves this call (None = all users).
+
+    Background jobs run outside a request and keep using the all-users shard.
+    """
+    if not USER_SCOPING_ENABLED or not has_request_context():
+        return None
+    return get_current_user_id()
 
 
-def _load_from_database() -> pd.DataFrame:
-    """Internal loader function for thread-safe cache."""
+def _load_from_database(user_id: str | None = None) -> tuple[pd.DataFrame, dict]:
+    """Internal full loader for thread-safe cache. Returns (DataFrame, watermark)."""
     if not db:
         raise RuntimeError("MySQL database not available")
 
     start_time = _time_module.time()
-    new_df = db.get_all_transactions()
+    # Read the watermark first: anything changed during the load is re-fetched
+    # by the next delta (merging is idempotent), so nothing can slip through.
+    watermark = db.get_transactions_watermark(user_id=user_id)
+    new_df = db.get_all_transactions(user_id=user_id)
 
     # Ensure _index is integer for proper comparisons
     if '_index' in new_df.columns:
         new_df['_index'] = pd.to_numeric(new_df['_index'], errors='coerce').fillna(0).astype(int)
 
     load_time = _time_module.time() - start_time
-    print(f"✅ Loaded {len(new_df)} transactions from MySQL in {load_time:.2f}s (cached for {DF_CACHE_TTL_SECONDS}s)")
-    return new_df
+    scope = f" for user {user_id}" if user_id else ""
+    print(f"✅ Loaded {len(new_df)} transactions{scope} from MySQL in {load_time:.2f}s (cached for {DF_CACHE_TTL_SECONDS}s)")
+    return new_df, watermark
+
+
+def _load_changes_from_database(watermark: dict, user_id: str | None = None) -> tuple[pd.DataFrame, dict] | None:
+    """Internal delta loader for thread-safe cache: rows changed since watermark."""
+    if not db or not watermark:
+        return None
+
+    new_watermark = db.get_transactions_watermark(user_id=user_id)
+    changed = db.get_transactions_changed_since(watermark, user_id=user_id)
+
+    if '_index' in changed.columns:
+        changed['_index'] = pd.to_numeric(changed['_index'], errors='coerce').fillna(0).astype(int)
+
+    if len(changed):
+        logger.debug(f"Merged {len(changed)} changed transactions into cache")
+    return changed, new_watermark
 
 
-def load_data(force_refresh=False):
+def _get_cached_df() -> pd.DataFrame | None:
+    """Read the current user's transaction cache, refreshing incrementally when stale."""
+    return _df_cache_instance.get_dataframe(
+        _cache_user_id(),
+        loader=_load_from_database,
+        delta_loader=_load_changes_from_database,
+    )
+
+
+def load_data(force_refresh=False, full_reload=False):
     """Load all transactions from MySQL database with thread-safe caching.
 
     Args:
-        force_refresh: If True, bypass cache and reload from database
+        force_refresh: If True, bypass cache and pull changes from the database
+        full_reload: If True, discard the cache and reload every row
 
     Returns:
         pandas DataFrame with all transactions
@@ -1835,12 +1889,12 @@ def load_data(force_refresh=False):
     if not db:
         raise RuntimeError("MySQL database not available")
 
-    if force_refresh:
-        _df_cache_instance.invalidate()
+    if force_refresh or full_reload:
+        _df_cache_instance.invalidate(_cache_user_id(), full=full_reload)
 
     try:
         # Thread-safe load with automatic cache management
-        cached_df = _df_cache_instance.get_dataframe(loader=_load_from_database)
+        cached_df = _get_cached_df()
 
         # Update legacy global (for backward compatibility with code not yet migrated)
         df = cached_df
@@ -1851,9 +1905,34 @@ def load_data(force_refresh=False):
         raise
 
 
-def invalidate_cache():
-    """Force cache invalidation on next request (thread-safe)."""
-    _df_cache_instance.invalidate()
+def invalidate_cache(full=False, user_id=None):
+    """Force cache refresh on next request (thread-safe).
+
+    Refreshes are incremental unless full=True. With user_id only that
+    user's shard (and the all-users shard) is refreshed.
+    """
+    _df_cache_instance.invalidate(user_id, full=full)
+
+
+# O(1) _index -> position lookup for the legacy global df
+_legacy_df_locator = RowLocator('_index')
+
+
+def _sync_cached_row(idx: int, patch: dict) -> None:
+    """Apply a patch already written to MySQL to the cached frames (no reload)."""
+    cache_patch = {col: value if col == "_index" else sanitize_value(value)
+                   for col, value in patch.items()}
+    # If the patch can't be applied in place the next read pulls the delta
+    try:
+        _df_cache_instance.update_row('_index', idx, cache_patch)
+    except Exception as e:
+        logger.debug(f"Cache patch failed for row #{idx}: {e}")
+        _df_cache_instance.invalidate()
+
+    # The legacy global df is a copy handed out earlier; keep it in step too
+    pos = _legacy_df_locator.position(df, idx)
+    if pos is not None:
+        patch_row(df, pos, cache_patch, add_missing=True)
 
 
 # Legacy alias for backward compatibility
@@ -1886,11 +1965,10 @@ def ensure_df(force_refresh=False):
     """
     global df
     # Use thread-safe cache
-    cached_df = _df_cache_instance.get_dataframe(loader=_load_from_database)
+    cached_df = _get_cached_df()
 
     if force_refresh or cached_df is None:
-        load_data(force_refresh=True)
-        cached_df = _df_cache_instance.get_dataframe()
+        cached_df = load_data(force_refresh=True)
 
     # Update legacy global for backward compatibility
     df = cached_df
@@ -1902,41 +1980,18 @@ def ensure_df(force_refresh=False):
 # =============================================================================
 
 def get_row_by_index(idx: int) -> dict | None:
-    """Return a row dict by _index (thread-safe)."""
-    # Use thread-safe cache method
-    return _df_cache_instance.get_row('_index', idx)
-
-
-def update_row_by_index(idx: int, patch: dict, source: str = "viewer_ui") -> bool:
-    """
-    Apply patch to df row with given _index, then save to MySQL.
-
-    This function:
-    1. Saves changes to MySQL IMMEDIATELY using db.update_transaction()
-    2. Logs all changes to audit log for tracking
-    3. Updates in-memory DataFrame
-
-    Args:
-        idx: Transaction _index to update
-        patch: Dict of column -> value changes
-        source: Source of the update (e.g., "viewer_ui", "auto_match", "gmail_search")
-
-    Returns:
-        True if update successful, False otherwise
-    """
-    global df
-    ensure_df()
-
-    # Verify row exists
-    mask = df["_index"] == idx
-    if not mask.any():
-        print(f"⚠️  Row #{idx} not found", flush=True)
-        return False
+    """Return a row dict by _index (thread-safe, O(1) hash lookup, no frame copy)."""
+    user_id = _cache_user_id()
+    _df_cache_instance.refresh(
+        user_id,
+        loader=_load_from_database,
+        delta_loader=_load_changes_from_database,
+    )
+    return _df_cache_instance.get_row('_index', idx, user_id=user_id)
 
-    # Get old values for audit logging
-    old_row = df.loc[mask].iloc[0].to_dict()
 
-    # === DELETION PROTECTION: Mark receipts as deleted when removed ===
+def _apply_deletion_protection(old_row: dict, patch: dict, source: str) -> None:
+    """Flag receipts the user removed so recovery scripts don't restore them."""
     # If user is clearing/removing a receipt, mark it as deleted_by_user=1
     # This prevents auto-recovery scripts from re-uploading it
     if "Receipt File" in patch or "receipt_file" in patch:
@@ -1952,22 +2007,9 @@ def update_row_by_index(idx: int, patch: dict, source: str = "viewer_ui") -> boo
             patch["review_status"] = None
             print(f"   Cleared review_status (no receipt to review)", flush=True)
 
-    # === STEP 1: Update MySQL ===
-    if not db:
-        logger.error("MySQL not available for update")
-        return False
 
-    try:
-        success = db.update_transaction(idx, patch)
-        if not success:
-            logger.error(f"MySQL update failed for row #{idx}")
-            return False
-        logger.debug(f"MySQL updated: row #{idx}")
-    except Exception as e:
-        logger.error(f"MySQL error for row #{idx}: {e}")
-        return False
-
-    # === STEP 2: Log changes to audit log ===
+def _audit_row_update(idx: int, old_row: dict, patch: dict, source: str) -> None:
+    """Write per-field audit entries for a committed row update."""
     if AUDIT_LOGGING_ENABLED and audit_logger:
         try:
             for field_name, new_value in patch.items():
@@ -2016,17 +2058,111 @@ def update_row_by_index(idx: int, patch: dict, source: str = "viewer_ui") -> boo
             print(f"⚠️  Audit logging failed: {e}", flush=True)
             # Don't fail the update if audit logging fails
 
+
+def update_row_by_index(idx: int, patch: dict, source: str = "viewer_ui") -> bool:
+    """
+    Apply patch to df row with given _index, then save to MySQL.
+
+    This function:
+    1. Saves changes to MySQL IMMEDIATELY using db.update_transaction()
+    2. Logs all changes to audit log for tracking
+    3. Updates in-memory DataFrame
+
+    Args:
+        idx: Transaction _index to update
+        patch: Dict of column -> value changes
+        source: Source of the update (e.g., "viewer_ui", "auto_match", "gmail_search")
+
+    Returns:
+        True if update successful, False otherwise
+    """
+    # Verify row exists and get old values for audit logging
+    old_row = get_row_by_index(idx)
+    if old_row is None:
+        print(f"⚠️  Row #{idx} not found", flush=True)
+        return False
+
+    # === DELETION PROTECTION: Mark receipts as deleted when removed ===
+    _apply_deletion_protection(old_row, patch, source)
+
+    # === STEP 1: Update MySQL ===
+    if not db:
+        logger.error("MySQL not available for update")
+        return False
+
+    try:
+        success = db.update_transaction(idx, patch)
+        if not success:
+            logger.error(f"MySQL update failed for row #{idx}")
+            return False
+        logger.debug(f"MySQL updated: row #{idx}")
+    except Exception as e:
+        logger.error(f"MySQL error for row #{idx}: {e}")
+        return False
+
+    # === STEP 2: Log changes to audit log ===
+    _audit_row_update(idx, old_row, patch, source)
+
     # === STEP 3: Update in-memory DataFrame ===
-    for col, value in patch.items():
-        if col not in df.columns:
-            df[col] = ""
-        if col != "_index":
-            value = sanitize_value(value)
-        df.loc[mask, col] = value
+    # One positional assignment per frame; the write never forces a reload
+    _sync_cached_row(idx, patch)
 
     return True
 
 
+def update_rows_by_index(updates: dict, source: str = "viewer_ui") -> dict:
+    """
+    Bulk counterpart of update_row_by_index().
+
+    Applies the same deletion protection and audit logging per row, but
+    writes every patch with one db.update_transactions_bulk() call (one
+    database transaction) instead of one UPDATE and commit per row.
+
+    Args:
+        updates: Dict of _index -> patch
+        source: Source of the update (e.g., "ai_categorize", "auto_match")
+
+    Returns:
+        Dict of _index -> True if that row was updated
+    """
+    results = {idx: False for idx in updates}
+    if not db:
+        logger.error("MySQL not available for update")
+        return results
+
+    old_rows = {}
+    for idx, patch in updates.items():
+        old_row = get_row_by_index(idx)
+        if old_row is None:
+            print(f"⚠️  Row #{idx} not found", flush=True)
+            continue
+        _apply_deletion_protection(old_row, patch, source)
+        old_rows[idx] = old_row
+
+    if not old_rows:
+        return results
+
+    try:
+        written = db.update_transactions_bulk(
+            [(idx, updates[idx]) for idx in old_rows]
+        )
+    except Exception as e:
+        logger.error(f"MySQL bulk update error ({len(old_rows)} rows): {e}")
+        return results
+
+    for idx, old_row in old_rows.items():
+        if not written.get(int(idx)):
+            logger.error(f"MySQL update failed for row #{idx}")
+            continue
+        patch = updates[idx]
+        _audit_row_update(idx, old_row, patch, source)
+        _sync_cached_row(idx, patch)
+        results[idx] = True
+
+    logger.debug(f"MySQL bulk updated: {sum(results.values())}/{len(updates)} rows")
+    return results
+
+
 # =============================================================================
 # RECEIPT META CACHE (MySQL-backed)
 # =============================================================================
@@ -2144,9 +2280,9 @@ def save_receipt_meta():
             pass
 
 
-def encode_image_base64(path: Path) -> str:
+def encode_image(path: Path) -> NormalizedImage:
     with path.open("rb") as f:
-        return base64.b64encode(f.read()).decode("utf-8")
+        return encode_for_vision(f.read())
 
 
 def extract_receipt_with_vision(path: Path) -> dict | None:
@@ -2270,7 +2406,7 @@ def extract_receipt_with_vision(path: Path) -> dict | None:
     print(f"   🔄 Falling back to GPT-4.1 Vision...", flush=True)
 
     try:
-        b64 = encode_image_base64(path)
+        image = encode_image(path)
     except Exception as e:
         print(f"⚠️ Could not read image {path}: {e}")
         return None
@@ -2319,7 +2455,7 @@ Always respond ONLY with a JSON object like:
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/jpeg;base64,{b64}",
+                                "url": image.data_url(),
                                 "detail": "high",
                             },
                         },
@@ -7464,8 +7600,9 @@ def update_row():
             if not success:
                 abort(404, f"_index {idx} not found")
 
-            # Reload df to stay in sync
-            df = db.get_all_transactions()
+            # Patch the cache to stay in sync (no full reload)
+            _sync_cached_row(idx, patch)
+            df = ensure_df()
             return jsonify(safe_json({"ok": True}))
         except Exception as e:
             print(f"⚠️  MySQL update failed for _index {idx}: {e}")
@@ -7657,7 +7794,7 @@ def ai_match():
 
     if not row:
         # Fallback to DataFrame lookup
-        df = db.get_all_transactions() if USE_DATABASE and db else df
+        df = ensure_df() if USE_DATABASE and db else df
         if '_index' in df.columns:
             df['_index'] = pd.to_numeric(df['_index'], errors='coerce').fillna(0).astype(int)
         mask = df["_index"] == idx
@@ -7709,7 +7846,8 @@ def ai_match():
                 # Apply update
                 if USE_DATABASE and db:
                     db.update_transaction(idx, update_data)
-                    df = db.get_all_transactions()
+                    _sync_cached_row(idx, update_data)
+                    df = ensure_df()
                 else:
                     for col, value in update_data.items():
                         if col not in df.columns:
@@ -7732,7 +7870,8 @@ def ai_match():
                 # Apply update
                 if USE_DATABASE and db:
                     db.update_transaction(idx, update_data)
-                    df = db.get_all_transactions()
+                    _sync_cached_row(idx, update_data)
+                    df = ensure_df()
                 else:
                     for col, value in update_data.items():
                         if col not in df.columns:
@@ -7784,7 +7923,8 @@ def ai_match():
             # Apply update
             if USE_DATABASE and db:
                 db.update_transaction(idx, update_data)
-                df = db.get_all_transactions()
+                _sync_cached_row(idx, update_data)
+                df = ensure_df()
             else:
                 for col, value in update_data.items():
                     if col not in df.columns:
@@ -7820,7 +7960,8 @@ def ai_match():
             # Apply update to database
             if USE_DATABASE and db:
                 db.update_transaction(idx, update_data)
-                df = db.get_all_transactions()
+                _sync_cached_row(idx, update_data)
+                df = ensure_df()
             else:
                 for col, value in update_data.items():
                     if col not in df.columns:
@@ -7880,7 +8021,7 @@ def ai_note():
 
     # Get transaction row
     if USE_DATABASE and db:
-        df = db.get_all_transactions()
+        df = ensure_df()
 
     mask = df["_index"] == idx
     if not mask.any():
@@ -7896,7 +8037,8 @@ def ai_note():
             # Update transaction with AI note
             if USE_DATABASE and db:
                 db.update_transaction(idx, {'AI Note': note})
-                df = db.get_all_transactions()
+                _sync_cached_row(idx, {'AI Note': note})
+                df = ensure_df()
             else:
                 if 'AI Note' not in df.columns:
                     df['AI Note'] = ""
@@ -8545,6 +8687,7 @@ def api_ai_batch_categorize():
         indexes = uncategorized["_index"].tolist()[:limit]
 
     results = []
+    pending = {}  # _index -> patch, written in one bulk update below
     for idx in indexes[:limit]:
         try:
             mask = df["_index"] == idx
@@ -8570,7 +8713,7 @@ def api_ai_batch_categorize():
                 if result.get("business_type"):
                     update_data["Business Type"] = result["business_type"]
                 if update_data:
-                    update_row_by_index(idx, update_data, source="batch_categorize")
+                    pending[idx] = update_data
 
             results.append({
                 "_index": idx,
@@ -8584,6 +8727,9 @@ def api_ai_batch_categorize():
             print(f"⚠️ Batch categorize error for {idx}: {e}")
             continue
 
+    if pending:
+        update_rows_by_index(pending, source="batch_categorize")
+
     return jsonify({
         "ok": True,
         "processed": len(results),
@@ -9795,6 +9941,70 @@ def atlas_people_photo(identifier):
 # ATLAS CONTACTS API (UI-friendly endpoints)
 # =============================================================================
 
+def _load_contact_index_rows():
+    conn, db_type = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT {', '.join(CONTACT_INDEX_COLUMNS)} FROM contacts")
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        return_db_connection(conn)
+
+
+def _contact_index_version():
+    conn, db_type = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COUNT(*) AS total, MAX(updated_at) AS updated FROM contacts")
+        row = cursor.fetchone()
+        return row['total'], row['updated']
+    finally:
+        cursor.close()
+        return_db_connection(conn)
+
+
+def _load_changed_contact_rows(since):
+    conn, db_type = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT {', '.join(CONTACT_INDEX_COLUMNS)} FROM contacts WHERE updated_at >= %s",
+                       (since,))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        return_db_connection(conn)
+
+
+# Each gunicorn worker has its own index; the version check picks up the others' writes
+atlas_contact_index = ContactSearchIndex(loader=_load_contact_index_rows,
+                                         version_loader=_contact_index_version,
+                                         changed_loader=_load_changed_contact_rows)
+
+
+def _reindex_atlas_contacts(contact_ids):
+    """Refresh contacts in the search index after they were created, updated or deleted"""
+    try:
+        contact_ids = list(contact_ids)
+        conn, db_type = get_db_connection()
+        cursor = conn.cursor()
+        placeholders = ','.join(['%s'] * len(contact_ids))
+        cursor.execute(f"SELECT {', '.join(CONTACT_INDEX_COLUMNS)} FROM contacts WHERE id IN ({placeholders})",
+                       tuple(contact_ids))
+        rows = cursor.fetchall()
+        cursor.close()
+        return_db_connection(conn)
+        for row in rows:
+            atlas_contact_index.upsert(row)
+        found = {str(row['id']) for row in rows}
+        for contact_id in contact_ids:
+            if str(contact_id) not in found:
+                atlas_contact_index.remove(int(contact_id) if str(contact_id).isdigit() else contact_id)
+    except Exception as e:
+        print(f"Contact search index refresh failed, rebuilding: {e}")
+        atlas_contact_index.invalidate()
+
+
 @app.route("/api/atlas/contacts", methods=["GET"])
 def atlas_contacts():
     """Get all contacts from database with unified format for UI"""
@@ -9826,7 +10036,24 @@ def atlas_contacts():
 
         # Use contacts table as the single source of truth
         try:
+            page_ids = None
             if search:
+                try:
+                    page_ids, total = atlas_contact_index.search(search, limit=limit, offset=offset)
+                except Exception as idx_err:
+                    print(f"Contact search index unavailable, searching with SQL: {idx_err}")
+
+            if page_ids is not None:
+                # Index gives the ranked page; fetch those rows by primary key
+                contacts = []
+                if page_ids:
+                    placeholders = ','.join(['%s'] * len(page_ids))
+                    cursor.execute(f"SELECT * FROM contacts WHERE id IN ({placeholders})", tuple(page_ids))
+                    by_id = {row['id']: row for row in cursor.fetchall()}
+                    contacts = [by_id[i] for i in page_ids if i in by_id]
+                    # Rows deleted since the index last caught up don't count
+                    total -= len(page_ids) - len(contacts)
+            elif search:
                 # Normalize phone search (remove non-digits for phone matching)
                 search_term = f'%{search}%'
                 phone_search = ''.join(c for c in search if c.isdigit())
@@ -9853,20 +10080,9 @@ def atlas_contacts():
                 """, (search_term, search_term, search_term, search_term, search_term,
                       search_term, search_term, phone_search_term, phone_search_term,
                       search_term, search_term, search_term, search_term, limit, offset))
-            else:
-                cursor.execute(f"""
-                    SELECT * FROM contacts
-                    {order_clause}
-                    LIMIT %s OFFSET %s
-                """, (limit, offset))
-
-            contacts = cursor.fetchall()
+                contacts = cursor.fetchall()
 
-            # Get total count
-            if search:
-                search_term = f'%{search}%'
-                phone_search = ''.join(c for c in search if c.isdigit())
-                phone_search_term = f'%{phone_search}%' if len(phone_search) >= 3 else ''
+                # Get total count
                 cursor.execute("""
                     SELECT COUNT(*) as total FROM contacts
                     WHERE name LIKE %s
@@ -9879,11 +10095,20 @@ def atlas_contacts():
                        OR (REPLACE(REPLACE(REPLACE(phone, '-', ''), ' ', ''), '+', '') LIKE %s AND %s != '')
                 """, (search_term, search_term, search_term, search_term, search_term,
                       search_term, search_term, phone_search_term, phone_search_term))
+                result = cursor.fetchone()
+                total = result['total'] if result else 0
             else:
-                cursor.execute("SELECT COUNT(*) as total FROM contacts")
+                cursor.execute(f"""
+                    SELECT * FROM contacts
+                    {order_clause}
+                    LIMIT %s OFFSET %s
+                """, (limit, offset))
+                contacts = cursor.fetchall()
 
-            result = cursor.fetchone()
-            total = result['total'] if result else 0
+                # Get total count
+                cursor.execute("SELECT COUNT(*) as total FROM contacts")
+                result = cursor.fetchone()
+                total = result['total'] if result else 0
 
             # Format contacts for UI
             formatted = []
@@ -10195,6 +10420,7 @@ def atlas_contact_update(contact_id):
         conn.commit()
         cursor.close()
         return_db_connection(conn)
+        _reindex_atlas_contacts([contact_id])
 
         return jsonify({
             "ok": True,
@@ -10235,6 +10461,7 @@ def atlas_contact_delete(contact_id):
         conn.commit()
         cursor.close()
         return_db_connection(conn)
+        _reindex_atlas_contacts([contact_id])
 
         if deleted:
             return jsonify({
@@ -10530,6 +10757,7 @@ def atlas_contacts_enrich():
             results.append(enrichment_info)
 
         conn.commit()
+        atlas_contact_index.invalidate()
         cursor.close()
         return_db_connection(conn)
 
@@ -10670,6 +10898,7 @@ def atlas_contact_enrich_single(contact_id):
             sql = f"UPDATE contacts SET {', '.join(set_clauses)} WHERE id = %s"
             cursor.execute(sql, values)
             conn.commit()
+            _reindex_atlas_contacts([contact_id])
             enrichment_info['updated'] = True
 
         cursor.close()
@@ -10814,6 +11043,7 @@ def atlas_contacts_bulk_delete():
         conn.commit()
         cursor.close()
         return_db_connection(conn)
+        _reindex_atlas_contacts(contact_ids)
 
         return jsonify({
             'ok': True,
@@ -11432,6 +11662,7 @@ def atlas_sync_google_pull():
                 continue
 
         conn.commit()
+        atlas_contact_index.invalidate()
         cursor.close()
         return_db_connection(conn)
 
@@ -11547,6 +11778,7 @@ def atlas_contact_create():
         conn.commit()
         cursor.close()
         return_db_connection(conn)
+        _reindex_atlas_contacts([new_id])
 
         return jsonify({
             "ok": True,
@@ -11791,6 +12023,7 @@ def atlas_sync_google():
                 continue
 
         conn.commit()
+        atlas_contact_index.invalidate()
         cursor.close()
         return_db_connection(conn)
 
@@ -11968,6 +12201,7 @@ def _import_contacts_from_json(contacts_data):
                 continue
 
         conn.commit()
+        atlas_contact_index.invalidate()
         cursor.close()
         return_db_connection(conn)
 
@@ -12123,6 +12357,7 @@ def atlas_sync_crm():
                     continue
 
         conn.commit()
+        atlas_contact_index.invalidate()
         cursor.close()
         return_db_connection(conn)
 
@@ -12362,6 +12597,7 @@ def atlas_contacts_upload():
                 continue
 
         conn.commit()
+        atlas_contact_index.invalidate()
         cursor.close()
         return_db_connection(conn)
 
@@ -14436,7 +14672,7 @@ def add_manual_expense():
                 conn.commit()
 
             # Reload df to stay in sync
-            df = db.get_all_transactions()
+            df = load_data(force_refresh=True)
 
             print(f"✅ Manual expense added: {new_index} - {data['merchant']} ${data['amount']}", flush=True)
 
@@ -14584,7 +14820,7 @@ def bulk_import_transactions():
         cursor.close()
 
         # Reload DataFrame
-        df = db.get_all_transactions()
+        df = load_data(force_refresh=True)
 
         return jsonify({
             "ok": True,
@@ -14707,7 +14943,7 @@ def reports_submit():
         )
 
         # Reload df to reflect changes
-        df = db.get_all_transactions()
+        df = load_data(force_refresh=True)
 
         return jsonify(safe_json({
             "ok": True,
@@ -14841,7 +15077,7 @@ def reports_delete(report_id):
             abort(404, f"Report {report_id} not found")
 
         # Reload df to reflect changes
-        df = db.get_all_transactions()
+        df = load_data(force_refresh=True)
 
         return jsonify(safe_json({
             "ok": True,
@@ -14882,7 +15118,7 @@ def reports_unsubmit(report_id):
             abort(500, f"Failed to unsubmit report {report_id}")
 
         # Reload df to reflect changes
-        df = db.get_all_transactions()
+        df = load_data(force_refresh=True)
 
         print(f"✅ Report '{report_name}' unsubmitted. {expense_count} expenses returned to main viewer.", flush=True)
 
@@ -18841,7 +19077,7 @@ def process_mi():
             if process_all_mi:
                 count = process_all_mi()
                 if USE_DATABASE and db:
-                    df = db.get_all_transactions()
+                    df = load_data(force_refresh=True)
                 return jsonify({
                     "ok": True,
                     "processed": count,
@@ -18855,7 +19091,7 @@ def process_mi():
             idx = int(data["_index"])
 
             if USE_DATABASE and db:
-                df = db.get_all_transactions()
+                df = ensure_df()
 
             mask = df["_index"] == idx
             if not mask.any():
@@ -18879,7 +19115,8 @@ def process_mi():
 
                 if USE_DATABASE and db:
                     db.update_transaction(idx, update_data)
-                    df = db.get_all_transactions()
+                    _sync_cached_row(idx, update_data)
+                    df = ensure_df()
 
                 return jsonify({
                     "ok": True,
@@ -19084,7 +19321,7 @@ def process_mi_ocr():
 
             # Reload dataframe to get updated data
             if USE_DATABASE and db:
-                df = db.get_all_transactions()
+                df = load_data(force_refresh=True)
 
             return jsonify({
                 "ok": True,
@@ -19131,7 +19368,7 @@ def process_mi_batch():
 
         # Reload dataframe
         if USE_DATABASE and db:
-            df = db.get_all_transactions()
+            df = load_data(force_refresh=True)
 
         return jsonify({
             "ok": True,
@@ -23311,13 +23548,12 @@ def accept_incoming_receipt():
             df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
             print(f"   📊 Added transaction #{transaction_id} to in-memory DataFrame (now {len(df)} rows)")
         elif df is not None and action == 'attached':
-            # Update existing row in DataFrame
-            mask = df['_index'] == matched_transaction_id
-            if mask.any():
-                df.loc[mask, 'Receipt File'] = receipt_file_str
-                if receipt_url_str:
-                    df.loc[mask, 'receipt_url'] = receipt_url_str
-                print(f"   📊 Updated transaction #{matched_transaction_id} in DataFrame with receipt")
+            # Update existing row in DataFrame (and the shared cache)
+            attach_patch = {'Receipt File': receipt_file_str}
+            if receipt_url_str:
+                attach_patch['receipt_url'] = receipt_url_str
+            _sync_cached_row(matched_transaction_id, attach_patch)
+            print(f"   📊 Updated transaction #{matched_transaction_id} in DataFrame with receipt")
 
         print(f"✅ Accepted receipt {receipt_id} → transaction {transaction_id} ({action})")
 
@@ -27364,15 +27600,11 @@ def generate_missing_receipt_form():
             })
 
         # Also update the global df cache so refresh works without server restart
-        if df is not None:
-            mask = df['_index'] == row_index
-            if mask.any():
-                df.loc[mask, 'Receipt File'] = final_filename
-                df.loc[mask, 'receipt_file'] = final_filename
-                df.loc[mask, 'Review Status'] = 'good'
-                df.loc[mask, 'review_status'] = 'good'
-                df.loc[mask, 'Notes'] = f"Missing Receipt Form - {reason}"
-                df.loc[mask, 'notes'] = f"Missing Receipt Form - {reason}"
+        _sync_cached_row(row_index, {
+            'Receipt File': final_filename,
+            'Review Status': 'good',
+            'Notes': f"Missing Receipt Form - {reason}",
+        })
 
         return jsonify({
             'ok': True,
@@ -27864,6 +28096,22 @@ def api_contact_hub_relationship_strength(contact_id):
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/contact-hub/intelligence/strength/refresh", methods=["POST"])
+@login_required
+def api_contact_hub_refresh_relationship_strengths():
+    """Recompute materialized relationship strength for changed (or, with full=true, all) contacts"""
+    if not USE_DATABASE or not db:
+        return jsonify({"error": "Database not available"}), 500
+
+    try:
+        data = request.get_json(silent=True) or {}
+        result = db.atlas_refresh_relationship_strengths(full=bool(data.get('full')))
+        return jsonify({"ok": True, **result})
+    except Exception as e:
+        print(f"Relationship strength refresh error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route("/api/contact-hub/intelligence/insights/<int:contact_id>", methods=["GET"])
 @login_required
 def api_contact_hub_relationship_insights(contact_id):
@@ -29564,6 +29812,14 @@ def background_sync_interactions():
             except Exception as e:
                 print(f"  ⚠️ Count update error: {e}")
 
+            # Re-score contacts with new interactions or expense links
+            try:
+                if USE_DATABASE and db and hasattr(db, 'atlas_refresh_relationship_strengths'):
+                    result = db.atlas_refresh_relationship_strengths()
+                    print(f"  ✅ Relationship strength: {result.get('updated', 0)} contacts re-scored")
+            except Exception as e:
+                print(f"  ⚠️ Relationship strength refresh error: {e}")
+
             _last_interaction_sync = datetime.now()
             print("✅ Automatic interaction sync complete")
 